@@ -7,9 +7,10 @@ Main application controller using GTK4 and libadwaita
 # Standard library imports
 import gettext
 import locale
+import logging
 import os
+import signal
 import warnings
-import traceback
 
 # Third-party imports
 import gi
@@ -21,23 +22,16 @@ from gi.repository import Gtk, Adw, Gio, Gdk, GLib
 # Local imports
 from core.config import Config
 from core.services import ProjectManager
+from core.spell_dictionaries import DictionaryDiscovery, ENCHANT_AVAILABLE
 from ui.main_window import MainWindow
+from ui.spell_service import get_spell_service
+from utils import tracing
 from utils.i18n import _
 
-# Try to load enchant for spell checking
-try:
-    import enchant
-    ENCHANT_AVAILABLE = True
-except ImportError:
-    ENCHANT_AVAILABLE = False
-    enchant = None
+logger = logging.getLogger(__name__)
 
-# Try to load PyGTKSpellcheck
-try:
-    import gtkspellcheck
-    SPELL_CHECK_AVAILABLE = True
-except ImportError:
-    SPELL_CHECK_AVAILABLE = False
+# Spell checking only needs the enchant backend (see ui.spell_service)
+SPELL_CHECK_AVAILABLE = ENCHANT_AVAILABLE
 
 
 def setup_system_localization():
@@ -124,7 +118,7 @@ def setup_system_localization():
             try:
                 locale.setlocale(locale.LC_ALL, 'C')
             except locale.Error as fallback_error:
-                print(_("Aviso: Não foi possível definir localidade do sistema: {}").format(fallback_error))
+                logger.warning(_("Aviso: Não foi possível definir localidade do sistema: {}").format(fallback_error))
     
     # Configure environment variables for GTK/GSpell translations
     detected_language = target_language.split('_')[0]  # pt_BR -> pt
@@ -174,8 +168,10 @@ class TacApplication(Adw.Application):
         self._suppress_warnings()
         
         # Application components
-        self.config = Config()
-        self.project_manager = ProjectManager()
+        with tracing.span('Config()', 'startup'):
+            self.config = Config()
+        with tracing.span('ProjectManager()', 'startup'):
+            self.project_manager = ProjectManager()
         self.main_window = None
         
         # Check spell checking availability
@@ -196,69 +192,56 @@ class TacApplication(Adw.Application):
         
         
     def _check_spell_dependencies(self):
-        """Check and configure spell checking dependencies"""
-        if not SPELL_CHECK_AVAILABLE:
-            print(_("PyGTKSpellcheck não instalado - desativando verificação ortográfica"))
-            self.config.set_spell_check_enabled(False)
-            return
-        
+        """Configure spell checking from the cached dictionary discovery"""
         if not ENCHANT_AVAILABLE:
-            print(_("Backend Enchant não disponível - desativando verificação ortográfica"))
+            logger.debug(_("Backend Enchant não disponível - desativando verificação ortográfica"))
             self.config.set_spell_check_enabled(False)
             return
-        
-        try:
-            # Debug: List found backends and dictionaries
-            try:
-                broker = enchant.Broker()
-                print(f"DEBUG: Enchant Backends: {broker.describe()}")
-                print(f"DEBUG: Enchant Provider: {broker.get_provider()}")
-            except:
-                pass
-
-            # Check for available dictionaries
-            # Arch Fix: Test both 'pt_BR' and 'pt-BR'
-            target_langs = ['pt_BR', 'pt-BR', 'en_US', 'en-US', 'en_GB', 'es_ES', 'fr_FR', 'de_DE', 'it_IT']
-            available_dicts = []
-            
-            for lang in target_langs:
-                try:
-                    if enchant.dict_exists(lang):
-                        norm_lang = lang.replace('-', '_')
-                        if norm_lang not in available_dicts:
-                            available_dicts.append(norm_lang)
-                except Exception as e:
-                    print(f"DEBUG: Error checking dict {lang}: {e}")
-
-            if available_dicts:
-                print(f"DEBUG: Available spell check dictionaries: {available_dicts}")
-                
-                self.config.set('spell_check_available_languages', available_dicts)
-                
-                # Tries to use the detected language, but checks if it actually exists in the list
-                if DETECTED_SPELLCHECK_LANGUAGE in available_dicts:
-                    detected = DETECTED_SPELLCHECK_LANGUAGE
-                elif DETECTED_SPELLCHECK_LANGUAGE.replace('-', '_') in available_dicts:
-                    detected = DETECTED_SPELLCHECK_LANGUAGE.replace('-', '_')
-                else:
-                    detected = available_dicts[0]
-                
-                print(f"DEBUG: Setting spell language to: {detected}")
-                self.config.set_spell_check_language(detected)
-                
+
+        # Probing enchant is slow: use the last result now and revalidate
+        # in the background once the window is shown
+        self.dictionary_discovery = DictionaryDiscovery(self.config.cache_dir)
+        cached_languages = self.dictionary_discovery.load_cached()
+        if cached_languages is not None:
+            self._apply_spell_languages(cached_languages)
+
+    def _apply_spell_languages(self, available_dicts):
+        """Store the available dictionaries and pick the spell check language"""
+        if available_dicts:
+            logger.debug("Available spell check dictionaries: %s", available_dicts)
+
+            self.config.set('spell_check_available_languages', available_dicts)
+
+            # Tries to use the detected language, but checks if it actually exists in the list
+            if DETECTED_SPELLCHECK_LANGUAGE in available_dicts:
+                detected = DETECTED_SPELLCHECK_LANGUAGE
+            elif DETECTED_SPELLCHECK_LANGUAGE.replace('-', '_') in available_dicts:
+                detected = DETECTED_SPELLCHECK_LANGUAGE.replace('-', '_')
             else:
-                print(_("Nenhum dicionário encontrado - desativando verificação ortográfica"))
-                self.config.set_spell_check_enabled(False)
-                
-        except ImportError as e:
-            print(_("Erro de importação ao verificar dependências ortográficas: {}").format(e))
-            self.config.set_spell_check_enabled(False)
-        except Exception as e:
-            print(_("Erro inesperado ao verificar dependências ortográficas: {}").format(e))
-            import traceback
-            traceback.print_exc()
+                detected = available_dicts[0]
+
+            self.config.set_spell_check_language(detected)
+        else:
+            logger.debug(_("Nenhum dicionário encontrado - desativando verificação ortográfica"))
             self.config.set_spell_check_enabled(False)
-    
+
+    def _revalidate_spell_dictionaries(self):
+        """Re-run dictionary discovery off the main thread"""
+        if ENCHANT_AVAILABLE:
+            self.dictionary_discovery.revalidate(
+                lambda languages: GLib.idle_add(self._on_spell_dictionaries_changed, languages)
+            )
+        return False
+
+    def _on_spell_dictionaries_changed(self, languages):
+        """Apply a discovery result that differs from the cached one"""
+        previous_language = self.config.get_spell_check_language()
+        self._apply_spell_languages(languages)
+
+        language = self.config.get_spell_check_language()
+        if languages and language != previous_language:
+            get_spell_service(self.config).set_language(language)
+        return False
 
     def _setup_icon_theme(self):
         """Setup custom icon theme path with PRIORITY"""
@@ -279,12 +262,10 @@ class TacApplication(Adw.Application):
                 new_paths = [icons_dir] + current_paths
                 icon_theme.set_search_path(new_paths)
 
-                if os.environ.get('TAC_DEBUG'):
-                    print(_("Ícones personalizados carregados com prioridade: {}").format(icons_dir))
+                logger.debug(_("Ícones personalizados carregados com prioridade: {}").format(icons_dir))
 
         except Exception as e:
-            if os.environ.get('TAC_DEBUG'):
-                print(_("Aviso: Não foi possível configurar tema de ícones: {}").format(e))
+            logger.debug(_("Aviso: Não foi possível configurar tema de ícones: {}").format(e))
     
     def _on_startup(self, app):
         """Called when application starts"""
@@ -300,10 +281,12 @@ class TacApplication(Adw.Application):
             
             # Apply application theme
             self._setup_theme()
+
+            # kill -USR1 <pid> writes the performance trace
+            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGUSR1, self._on_dump_trace_signal)
             
         except Exception as e:
-            print(_("Erro durante inicialização da aplicação: {}: {}").format(type(e).__name__, e))
-            traceback.print_exc()
+            logger.exception(_("Erro durante inicialização da aplicação: {}: {}").format(type(e).__name__, e))
     
     def _on_activate(self, app):
         """Called when application is activated"""
@@ -314,16 +297,16 @@ class TacApplication(Adw.Application):
                     project_manager=self.project_manager,
                     config=self.config
                 )
-                if os.environ.get('TAC_DEBUG'):
-                    print(_("Janela principal criada"))
+                logger.debug(_("Janela principal criada"))
+
+                # Low priority so the first frame is drawn before discovery starts
+                GLib.idle_add(self._revalidate_spell_dictionaries, priority=GLib.PRIORITY_LOW)
             
             self.main_window.present()
-            if os.environ.get('TAC_DEBUG'):
-                print(_("Janela principal apresentada"))
+            logger.debug(_("Janela principal apresentada"))
             
         except Exception as e:
-            print(_("Erro ao ativar aplicação: {}: {}").format(type(e).__name__, e))
-            traceback.print_exc()
+            logger.exception(_("Erro ao ativar aplicação: {}: {}").format(type(e).__name__, e))
             self.quit()
     
     def _setup_actions(self):
@@ -337,6 +320,7 @@ class TacApplication(Adw.Application):
             ('about', self._action_about),
             ('quit', self._action_quit),
             ('ai_assistant', self._action_ai_assistant),
+            ('dump_trace', self._action_dump_trace),
         ]
         
         try:
@@ -345,8 +329,7 @@ class TacApplication(Adw.Application):
                 action.connect('activate', callback)
                 self.add_action(action)
         except Exception as e:
-            print(_("Erro ao configurar ações: {}: {}").format(type(e).__name__, e))
-            traceback.print_exc()
+            logger.exception(_("Erro ao configurar ações: {}: {}").format(type(e).__name__, e))
     
     def _setup_menu(self):
         """Setup application menu and keyboard shortcuts"""
@@ -369,8 +352,7 @@ class TacApplication(Adw.Application):
                 self.set_accels_for_action(action, [accelerator])
                 
         except Exception as e:
-            print(_("Erro ao configurar menu: {}: {}").format(type(e).__name__, e))
-            traceback.print_exc()
+            logger.exception(_("Erro ao configurar menu: {}: {}").format(type(e).__name__, e))
     
     def _setup_theme(self):
         """Setup application theme"""
@@ -445,6 +427,15 @@ class TacApplication(Adw.Application):
                 border: 1px solid alpha(@warning_color, 0.6);
             }
 
+            /* Virtualized paragraph list */
+            .paragraph-list,
+            .paragraph-list > row,
+            .paragraph-list > row:hover,
+            .paragraph-list > row:selected {
+                background: none;
+                padding: 0;
+            }
+
             /* Footnote badge styles */
             .footnote-badge {
                 background: @accent_bg_color;
@@ -471,12 +462,10 @@ class TacApplication(Adw.Application):
                         Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
                     )
             except Exception as e:
-                if os.environ.get('TAC_DEBUG'):
-                    print(_("Não foi possível aplicar CSS: {}").format(e))
+                logger.debug(_("Não foi possível aplicar CSS: {}").format(e))
                     
         except Exception as e:
-            print(_("Erro ao configurar tema: {}: {}").format(type(e).__name__, e))
-            traceback.print_exc()
+            logger.exception(_("Erro ao configurar tema: {}: {}").format(type(e).__name__, e))
     
     # Existing action methods
     def _action_new_project(self, action, param):
@@ -485,7 +474,7 @@ class TacApplication(Adw.Application):
             if self.main_window:
                 self.main_window.show_new_project_dialog()
         except Exception as e:
-            print(_("Erro ao mostrar diálogo de novo projeto: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro ao mostrar diálogo de novo projeto: {}: {}").format(type(e).__name__, e))
     
     def _action_open_project(self, action, param):
         """Handle open project action"""
@@ -493,7 +482,7 @@ class TacApplication(Adw.Application):
             if self.main_window:
                 self.main_window.show_open_project_dialog()
         except Exception as e:
-            print(_("Erro ao mostrar diálogo de abrir projeto: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro ao mostrar diálogo de abrir projeto: {}: {}").format(type(e).__name__, e))
     
     def _action_save_project(self, action, param):
         """Handle save project action"""
@@ -501,7 +490,7 @@ class TacApplication(Adw.Application):
             if self.main_window:
                 self.main_window.save_current_project()
         except Exception as e:
-            print(_("Erro ao salvar projeto: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro ao salvar projeto: {}: {}").format(type(e).__name__, e))
     
     def _action_export_project(self, action, param):
         """Handle export project action"""
@@ -509,7 +498,7 @@ class TacApplication(Adw.Application):
             if self.main_window:
                 self.main_window.show_export_dialog()
         except Exception as e:
-            print(_("Erro ao mostrar diálogo de exportação: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro ao mostrar diálogo de exportação: {}: {}").format(type(e).__name__, e))
     
     def _action_preferences(self, action, param):
         """Handle preferences action"""
@@ -517,7 +506,7 @@ class TacApplication(Adw.Application):
             if self.main_window:
                 self.main_window.show_preferences_dialog()
         except Exception as e:
-            print(_("Erro ao mostrar diálogo de preferências: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro ao mostrar diálogo de preferências: {}: {}").format(type(e).__name__, e))
     
     def _action_about(self, action, param):
         """Handle about action"""
@@ -525,7 +514,7 @@ class TacApplication(Adw.Application):
             if self.main_window:
                 self.main_window.show_about_dialog()
         except Exception as e:
-            print(_("Erro ao mostrar diálogo sobre: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro ao mostrar diálogo sobre: {}: {}").format(type(e).__name__, e))
 
     def _action_ai_assistant(self, action, param):
         """Handle AI assistant action"""
@@ -533,14 +522,44 @@ class TacApplication(Adw.Application):
             if self.main_window:
                 self.main_window.open_ai_assistant_prompt()
         except Exception as e:
-            print(_("Erro ao abrir assistente de IA: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro ao abrir assistente de IA: {}: {}").format(type(e).__name__, e))
     
+    def _action_dump_trace(self, action, param):
+        """Start recording a performance trace, or save the recorded one"""
+        if not tracing.is_enabled():
+            tracing.set_enabled(True)
+            self._notify(_("Rastreamento de desempenho ativado"))
+            return
+        path = self._dump_trace()
+        if path:
+            self._notify(_("Rastreamento salvo em {}").format(path))
+
+    def _on_dump_trace_signal(self):
+        """SIGUSR1 handler"""
+        path = self._dump_trace()
+        if path:
+            logger.warning(_("Rastreamento salvo em {}").format(path))
+        return GLib.SOURCE_CONTINUE
+
+    def _dump_trace(self):
+        try:
+            return tracing.dump_chrome_trace(directory=self.config.cache_dir / 'traces')
+        except OSError as e:
+            logger.warning(_("Erro ao salvar rastreamento: {}").format(e))
+            return None
+
+    def _notify(self, message: str):
+        if self.main_window:
+            self.main_window._show_toast(message)
+        else:
+            logger.warning(message)
+
     def _action_quit(self, action, param):
         """Handle quit action"""
         try:
             self.quit()
         except Exception as e:
-            print(_("Erro ao sair da aplicação: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro ao sair da aplicação: {}: {}").format(type(e).__name__, e))
     
     def do_shutdown(self):
         """Called when application shuts down"""
@@ -548,18 +567,15 @@ class TacApplication(Adw.Application):
             # Save configuration
             if self.config:
                 self.config.save()
-                if os.environ.get('TAC_DEBUG'):
-                    print(_("Configuração salva"))
+                logger.debug(_("Configuração salva"))
             
             # Call parent shutdown
             Adw.Application.do_shutdown(self)
             
-            if os.environ.get('TAC_DEBUG'):
-                print(_("Encerramento da aplicação completo"))
+            logger.debug(_("Encerramento da aplicação completo"))
                 
         except Exception as e:
-            print(_("Erro durante encerramento: {}: {}").format(type(e).__name__, e))
-            traceback.print_exc()
+            logger.exception(_("Erro durante encerramento: {}: {}").format(type(e).__name__, e))
     
     # Utility methods for debugging
     def debug_spell_config(self):
@@ -567,7 +583,7 @@ class TacApplication(Adw.Application):
         if self.config:
             self.config.debug_spell_config()
         else:
-            print(_("Sem configuração disponível para debug ortográfico"))
+            logger.debug(_("Sem configuração disponível para debug ortográfico"))
     
     def get_main_window(self):
         """Get reference to main window"""
@@ -15,6 +15,7 @@ from .models import (
 )
 from .services import ProjectManager, ExportService
 from .ai_assistant import WritingAiAssistant
+from .history import ProjectHistory
 
 __all__ = [
     # Configuration
@@ -31,7 +32,10 @@ __all__ = [
     # Services
     'ProjectManager',
     'ExportService',
-    'WritingAiAssistant'
+    'WritingAiAssistant',
+
+    # History
+    'ProjectHistory'
 ]
 
 __version__ = Config.APP_VERSION
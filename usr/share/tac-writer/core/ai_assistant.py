@@ -9,14 +9,7 @@ import logging
 import threading
 import weakref
 import os
-from typing import Any, Dict, List, Optional, Tuple
-try:
-    from pypdf import PdfReader
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-
-import requests
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import gi
 
@@ -24,8 +17,15 @@ gi.require_version("Adw", "1")
 gi.require_version("GLib", "2.0")
 from gi.repository import Adw, GLib
 
+from utils.helpers import DependencyHelper
 from utils.i18n import _
 
+# requests and pypdf are imported on first use (worker threads), not at startup
+PDF_AVAILABLE = DependencyHelper.is_available('pypdf')
+
+if TYPE_CHECKING:
+    import requests
+
 
 class WritingAiAssistant:
     """Coordinates conversations with an external AI service."""
@@ -182,6 +182,8 @@ class WritingAiAssistant:
             "x-goog-api-key": api_key,
         }
 
+        import requests
+
         try:
             response = requests.post(url, headers=headers, json=payload, timeout=60)
         except requests.RequestException as exc:
@@ -240,6 +242,8 @@ class WritingAiAssistant:
         if site_name:
             headers["X-Title"] = site_name
 
+        import requests
+
         try:
             response = requests.post(url, headers=headers, json=payload, timeout=60)
         except requests.RequestException as exc:
@@ -464,6 +468,7 @@ class WritingAiAssistant:
             # 1. Text Extraction from PDF
             text_content = ""
             try:
+                from pypdf import PdfReader
                 reader = PdfReader(pdf_path)
                 for page in reader.pages:
                     extracted = page.extract_text()
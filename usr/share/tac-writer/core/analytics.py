@@ -0,0 +1,206 @@
+"""
+TAC Analytics
+Writing metrics of a project, computed per paragraph on a worker thread
+"""
+
+import logging
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .markup import strip_markup
+from .models import Project, ParagraphType
+
+logger = logging.getLogger(__name__)
+
+# Paragraph types that make up the TAC structure of an essay
+TAC_SECTION_TYPES = [
+    ParagraphType.INTRODUCTION,
+    ParagraphType.ARGUMENT,
+    ParagraphType.ARGUMENT_RESUMPTION,
+    ParagraphType.QUOTE,
+    ParagraphType.EPIGRAPH,
+    ParagraphType.CONCLUSION,
+]
+
+# Paragraphs whose text is not prose
+_SKIPPED_TYPES = {ParagraphType.IMAGE, ParagraphType.LATEX, ParagraphType.CODE}
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:[-'’][^\W\d_]+)*")
+_SENTENCE_RE = re.compile(r"[^.!?…]+(?:[.!?…]+|$)")
+_VOWEL_GROUP_RE = re.compile(r"[aeiouyáéíóúâêîôûãõàèìòùäëïöüœæ]+")
+
+# Function words, ignored by the lexical density
+_STOPWORDS = {
+    'pt': frozenset("""
+        a à ao aos as às com como da das de do dos e é ela elas ele eles em
+        entre era essa esse esta este eu foi há isso isto já la lhe mais mas
+        me mesmo muito na nas nem no nos não o os ou para pela pelas pelo
+        pelos por porque quando que quem se sem ser seu sua são também te
+        tem um uma umas uns você
+    """.split()),
+    'en': frozenset("""
+        a about after all also an and any are as at be because been but by
+        can could do for from had has have he her his how i if in into is it
+        its not of on or our she so than that the their them then there these
+        they this to was we were what when which who will with would you
+    """.split()),
+}
+
+
+def _flesch(language: str, words_per_sentence: float, syllables_per_word: float) -> float:
+    """Flesch reading ease (Martins et al. adaptation for Portuguese)"""
+    base = 248.835 if language == 'pt' else 206.835
+    score = base - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+    return max(0.0, min(100.0, score))
+
+
+class ParagraphMetrics:
+    """Metrics of one paragraph"""
+
+    __slots__ = ('content', 'type', 'words', 'characters', 'sentence_lengths',
+                 'syllables', 'content_words')
+
+    def __init__(self, content: str, paragraph_type: ParagraphType, language: str):
+        self.content = content
+        self.type = paragraph_type
+        text = strip_markup(content) if paragraph_type not in _SKIPPED_TYPES else ''
+
+        words = _WORD_RE.findall(text)
+        self.words = len(words)
+        self.characters = len(text)
+        self.sentence_lengths = [
+            count for count in (len(_WORD_RE.findall(sentence)) for sentence in _SENTENCE_RE.findall(text))
+            if count
+        ]
+
+        stopwords = _STOPWORDS.get(language, _STOPWORDS['en'])
+        self.syllables = 0
+        self.content_words = 0
+        for word in words:
+            lowered = word.lower()
+            self.syllables += max(1, len(_VOWEL_GROUP_RE.findall(lowered)))
+            if lowered not in stopwords:
+                self.content_words += 1
+
+    def summary(self) -> Dict[str, float]:
+        sentences = len(self.sentence_lengths)
+        return {
+            'words': self.words,
+            'sentences': sentences,
+            'average_sentence_length': self.words / sentences if sentences else 0.0,
+        }
+
+
+class AnalyticsEngine:
+    """
+    Writing analytics kept up to date off the main thread.
+
+    submit() hands the worker a cheap snapshot of (id, type, content) for
+    every paragraph; the worker recomputes only the paragraphs whose content
+    or type changed since the last run, aggregates the project and passes
+    the result to the callback on the worker thread (UI callers hop back
+    to the main loop with GLib.idle_add). Submissions made while the worker
+    is busy are coalesced into the latest one.
+    """
+
+    def __init__(self, language: str = 'pt', words_per_minute: int = 200):
+        self.language = 'pt' if language.lower().startswith('pt') else 'en'
+        self.words_per_minute = words_per_minute
+        self._metrics: Dict[str, ParagraphMetrics] = {}
+        self._pending: Optional[Tuple[str, List[tuple], Callable]] = None
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def submit(self, project: Project, callback: Callable[[Dict], None]) -> None:
+        """Queue an analysis of the project"""
+        paragraphs = [(p.id, p.type, p.content or '') for p in project.paragraphs]
+        with self._condition:
+            self._pending = (project.id, paragraphs, callback)
+            self._condition.notify()
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='analytics', daemon=True)
+                self._worker.start()
+
+    def reset(self) -> None:
+        """Forget the cached metrics (e.g. another project was opened)"""
+        with self._condition:
+            self._pending = None
+            self._metrics = {}
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                project_id, paragraphs, callback = self._pending
+                self._pending = None
+                metrics = self._metrics
+
+            try:
+                result = self._analyze(metrics, project_id, paragraphs)
+            except Exception as e:
+                logger.exception("Error computing writing analytics: %s", e)
+                continue
+
+            try:
+                callback(result)
+            except Exception as e:
+                logger.exception("Error in analytics callback: %s", e)
+
+    def _analyze(self, metrics: Dict[str, ParagraphMetrics], project_id: str,
+                 paragraphs: List[tuple]) -> Dict:
+        """Update the per-paragraph metrics and aggregate them (worker thread)"""
+        live_ids = set()
+        recomputed = 0
+        for paragraph_id, paragraph_type, content in paragraphs:
+            live_ids.add(paragraph_id)
+            entry = metrics.get(paragraph_id)
+            if entry is None or entry.type != paragraph_type or (
+                    entry.content is not content and entry.content != content):
+                metrics[paragraph_id] = ParagraphMetrics(content, paragraph_type, self.language)
+                recomputed += 1
+
+        for paragraph_id in [pid for pid in metrics if pid not in live_ids]:
+            del metrics[paragraph_id]
+
+        return self._aggregate(metrics, project_id, [p[0] for p in paragraphs], recomputed)
+
+    def _aggregate(self, metrics: Dict[str, ParagraphMetrics], project_id: str,
+                   order: List[str], recomputed: int) -> Dict:
+        words = sum(m.words for m in metrics.values())
+        characters = sum(m.characters for m in metrics.values())
+        syllables = sum(m.syllables for m in metrics.values())
+        content_words = sum(m.content_words for m in metrics.values())
+        sentence_lengths = [length for pid in order for length in metrics[pid].sentence_lengths]
+        sentences = len(sentence_lengths)
+
+        words_per_sentence = words / sentences if sentences else 0.0
+        syllables_per_word = syllables / words if words else 0.0
+
+        section_words = {t.value: 0 for t in TAC_SECTION_TYPES}
+        for entry in metrics.values():
+            if entry.type.value in section_words:
+                section_words[entry.type.value] += entry.words
+        section_total = sum(section_words.values())
+
+        return {
+            'project_id': project_id,
+            'recomputed_paragraphs': recomputed,
+            'words': words,
+            'characters': characters,
+            'sentences': sentences,
+            'average_sentence_length': words_per_sentence,
+            'longest_sentence': max(sentence_lengths) if sentence_lengths else 0,
+            'long_sentences': sum(1 for length in sentence_lengths if length > 30),
+            'syllables_per_word': syllables_per_word,
+            'reading_ease': _flesch(self.language, words_per_sentence, syllables_per_word) if words else 0.0,
+            'lexical_density': content_words / words if words else 0.0,
+            'reading_time_minutes': words / self.words_per_minute if self.words_per_minute else 0.0,
+            'section_words': section_words,
+            'section_balance': {
+                key: (value / section_total if section_total else 0.0)
+                for key, value in section_words.items()
+            },
+            'paragraphs': {pid: metrics[pid].summary() for pid in order},
+        }
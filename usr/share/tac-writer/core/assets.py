@@ -0,0 +1,186 @@
+"""
+TAC Assets
+Sync of the image files referenced by image paragraphs, stored on the
+remote by content hash
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from .sync import CHUNK_SIZE, RevisionConflict, SyncBackend, Transfer
+from utils.tracing import traced
+
+BLOBS_DIR = '/assets/blobs'
+# Hash of images whose paragraph predates the 'hash' metadata key, by project and file name
+NAMES_DIR = '/assets/names'
+
+
+def file_digest(path) -> str:
+    """SHA-256 of a file, hex encoded"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def image_path(data_dir, project_id: str, metadata: Dict) -> Path:
+    """
+    Local file of an image paragraph: the path it was inserted with if it
+    exists on this machine, otherwise its place in the images folder
+    (where synced images are downloaded to)
+    """
+    path = Path(metadata.get('path') or '')
+    if metadata.get('path') and path.exists():
+        return path
+    return Path(data_dir) / 'images' / project_id / Path(metadata.get('filename') or '').name
+
+
+def blob_path(digest: str) -> str:
+    return f"{BLOBS_DIR}/{digest[:2]}/{digest}"
+
+
+def _read_chunks(path, transfer: Transfer) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            transfer.check()
+            yield block
+
+
+class AssetSync:
+    """
+    Uploads the images referenced by the database and downloads them on
+    demand.
+
+    Each image is stored once per content hash, however many paragraphs
+    or projects use it. Which files were already uploaded to the current
+    remote is remembered locally (by size and mtime), so a sync with no
+    new images makes no remote request at all.
+    """
+
+    def __init__(self, backend: SyncBackend, data_dir, transfer: Optional[Transfer] = None):
+        self.backend = backend
+        self.data_dir = Path(data_dir)
+        self.transfer = transfer or Transfer()
+        self.state_path = self.data_dir / 'sync_assets.json'
+
+    # Upload
+
+    @traced('AssetSync.upload', 'sync')
+    def upload(self, db_path) -> Dict:
+        """Upload the images not yet on the remote; returns counts"""
+        stats = {'uploaded': 0, 'skipped': 0, 'bytes': 0}
+        uploaded = self._load_state()
+        pending = []
+        for project_id, metadata in self._image_references(db_path):
+            path = image_path(self.data_dir, project_id, metadata)
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # Missing here too: nothing to upload
+            key = f"{project_id}/{Path(metadata.get('filename') or path.name).name}"
+            record = uploaded.get(key)
+            if record and record[0] == st.st_size and record[1] == st.st_mtime_ns:
+                continue
+            pending.append((key, path, st, metadata.get('hash')))
+
+        if not pending:
+            return stats
+
+        remote_blobs: Optional[Set[str]] = None
+        try:
+            for key, path, st, named_hash in pending:
+                self.transfer.check()
+                digest = file_digest(path)
+                if remote_blobs is None:
+                    remote_blobs = {entry.path.rsplit('/', 1)[-1]
+                                    for entry in self.backend.list(BLOBS_DIR)}
+                if digest in remote_blobs:
+                    stats['skipped'] += 1
+                else:
+                    try:
+                        self.backend.put_chunks(blob_path(digest), _read_chunks(path, self.transfer),
+                                                if_revision=None)
+                    except RevisionConflict:
+                        pass  # Uploaded by another device meanwhile
+                    remote_blobs.add(digest)
+                    stats['uploaded'] += 1
+                    stats['bytes'] += st.st_size
+                if named_hash != digest:
+                    # Paragraph without (or with a stale) hash: publish it by name
+                    self.backend.put(f"{NAMES_DIR}/{key}", digest.encode('ascii'))
+                uploaded[key] = [st.st_size, st.st_mtime_ns, digest]
+        finally:
+            self._save_state(uploaded)
+        return stats
+
+    def _image_references(self, db_path) -> Iterator[Tuple[str, Dict]]:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            rows = conn.execute("SELECT project_id, content FROM paragraphs WHERE type = 'image'").fetchall()
+        finally:
+            conn.close()
+        for project_id, content in rows:
+            try:
+                metadata = json.loads(content) if content else None
+            except ValueError:
+                continue
+            if isinstance(metadata, dict) and metadata.get('filename'):
+                yield project_id, metadata
+
+    def _load_state(self) -> Dict:
+        try:
+            state = json.loads(self.state_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get('location') != self.backend.location:
+            return {}
+        return state.get('uploaded', {})
+
+    def _save_state(self, uploaded: Dict) -> None:
+        temp = self.state_path.with_suffix('.tmp')
+        temp.write_text(json.dumps({'location': self.backend.location, 'uploaded': uploaded}),
+                        encoding='utf-8')
+        temp.replace(self.state_path)
+
+    # Download
+
+    @traced('AssetSync.fetch', 'sync')
+    def fetch(self, project_id: str, metadata: Dict) -> Optional[Path]:
+        """
+        Download the image of a paragraph into the images folder. Returns
+        the local file, or None if the remote does not have it.
+        """
+        target = image_path(self.data_dir, project_id, metadata)
+        if target.exists():
+            return target
+
+        digest = metadata.get('hash')
+        if not digest:
+            pointer = self.backend.get(f"{NAMES_DIR}/{project_id}/{target.name}")
+            if not pointer:
+                return None
+            digest = pointer.decode('ascii').strip()
+
+        chunks = self.backend.get_chunks(blob_path(digest))
+        if chunks is None:
+            return None
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp, 'wb') as f:
+                for chunk in chunks:
+                    self.transfer.check()
+                    f.write(chunk)
+            if file_digest(temp) != digest:
+                raise ValueError(f"Imagem corrompida na transferência: {target.name}")
+            os.replace(temp, target)
+        finally:
+            if temp.exists():
+                temp.unlink()
+        return target
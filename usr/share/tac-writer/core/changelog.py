@@ -0,0 +1,240 @@
+"""
+TAC Changelog
+Row-level change log of the database and the changesets exchanged by
+incremental sync
+"""
+
+import gzip
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .merger import snapshot_database
+
+CHANGESET_VERSION = 1
+
+# Synced tables and the columns a changeset carries for them
+SYNCED_TABLES = {
+    'projects': ['id', 'name', 'created_at', 'modified_at', 'metadata', 'document_formatting'],
+    'paragraphs': ['id', 'project_id', 'type', 'content', 'created_at', 'modified_at',
+                   'order', 'formatting', 'footnotes'],
+}
+
+
+def install_change_log(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the change_log table and the triggers that fill it.
+
+    Every write to a synced table leaves one entry per row: the latest
+    operation and a logical clock (the AUTOINCREMENT key, so it only grows).
+    An older entry of the same row is replaced, which keeps the log as
+    large as the set of rows changed since the last acknowledged sync.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            clock INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id TEXT NOT NULL,
+            op TEXT NOT NULL,
+            UNIQUE (table_name, row_id)
+        );
+    """)
+    for table in SYNCED_TABLES:
+        for event, ref, op in (('INSERT', 'NEW', 'upsert'), ('UPDATE', 'NEW', 'upsert'),
+                               ('DELETE', 'OLD', 'delete')):
+            # DELETE + INSERT rather than INSERT OR REPLACE: the conflict
+            # clause of an outer upsert would override the trigger's
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS change_log_{table}_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    DELETE FROM change_log WHERE table_name = '{table}' AND row_id = {ref}.id;
+                    INSERT INTO change_log (table_name, row_id, op) VALUES ('{table}', {ref}.id, '{op}');
+                END;
+            """)
+
+
+def _quoted(columns):
+    return ', '.join(f'"{c}"' for c in columns)
+
+
+def _columns(conn, table):
+    available = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    return [c for c in SYNCED_TABLES[table] if c in available]
+
+
+def build_changeset(db_path, device_id: str, previous_clock: int) -> Optional[Dict]:
+    """
+    Changeset of every logged change in a database (normally a snapshot,
+    so rows and log are read consistently), or None if there is none.
+
+    'previous' is the clock of the device's last uploaded changeset, so a
+    reader can tell whether it missed one.
+    """
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    try:
+        entries = conn.execute(
+            "SELECT clock, table_name, row_id, op FROM change_log WHERE clock > ? ORDER BY clock",
+            (previous_clock,)
+        ).fetchall()
+        if not entries:
+            return None
+
+        changeset = {
+            'version': CHANGESET_VERSION,
+            'device': device_id,
+            'previous': previous_clock,
+            'clock': entries[-1]['clock'],
+            'created_at': datetime.now().isoformat(),
+            'upserts': {table: [] for table in SYNCED_TABLES},
+            'deletes': {table: [] for table in SYNCED_TABLES},
+        }
+        for table in SYNCED_TABLES:
+            columns = _columns(conn, table)
+            ids = [e['row_id'] for e in entries if e['table_name'] == table and e['op'] == 'upsert']
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT {_quoted(columns)} FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+                changeset['upserts'][table].extend(dict(row) for row in rows)
+            changeset['deletes'][table] = [
+                e['row_id'] for e in entries if e['table_name'] == table and e['op'] == 'delete'
+            ]
+        return changeset
+    finally:
+        conn.close()
+
+
+def encode_changeset(changeset: Dict) -> bytes:
+    return gzip.compress(json.dumps(changeset, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_changeset(data: bytes) -> Dict:
+    changeset = json.loads(gzip.decompress(data).decode('utf-8'))
+    if changeset.get('version') != CHANGESET_VERSION:
+        raise ValueError("Versão de changeset não suportada")
+    return changeset
+
+
+def changeset_name(changeset: Dict) -> str:
+    """File name of a changeset: previous and new clock of its device"""
+    return f"{changeset['previous']:012d}-{changeset['clock']:012d}.json.gz"
+
+
+def parse_changeset_name(name: str):
+    """(previous, clock) from a changeset file name, or None"""
+    try:
+        previous, clock = name[:-len('.json.gz')].split('-')
+        return int(previous), int(clock)
+    except ValueError:
+        return None
+
+
+def materialize(base_db_path, changesets: List[Dict], target_path) -> Path:
+    """
+    Rebuild the remote state as a database: the base snapshot (the remote
+    as of the last sync) with the newer changesets applied in order.
+    """
+    target_path = snapshot_database(base_db_path, target_path)
+    conn = sqlite3.connect(str(target_path))
+    try:
+        with conn:
+            for changeset in changesets:
+                _apply(conn, changeset)
+    finally:
+        conn.close()
+    return target_path
+
+
+def _apply(conn, changeset: Dict) -> None:
+    for table in SYNCED_TABLES:
+        columns = set(_columns(conn, table))
+        for row in changeset['upserts'].get(table, []):
+            names = [c for c in row if c in columns]
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({_quoted(names)}) VALUES ({', '.join('?' * len(names))})",
+                [row[c] for c in names]
+            )
+        for row_id in changeset['deletes'].get(table, []):
+            conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+
+
+def prune_echoes(db_path, changesets: List[Dict]) -> int:
+    """
+    Drop log entries of rows that now match what the changesets carry.
+
+    Applying remote changes logs them locally like any write; rows that
+    ended up equal to the remote version do not need to be sent back.
+    Rows merged with local edits still differ and stay logged.
+    """
+    latest: Dict[tuple, Optional[Dict]] = {}
+    for changeset in changesets:
+        for table in SYNCED_TABLES:
+            for row in changeset['upserts'].get(table, []):
+                latest[(table, row['id'])] = row
+            for row_id in changeset['deletes'].get(table, []):
+                latest[(table, row_id)] = None
+
+    pruned = 0
+    conn = sqlite3.connect(str(db_path), timeout=30.0)
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            for (table, row_id), remote in latest.items():
+                if remote is None:
+                    local = conn.execute(f"SELECT id FROM {table} WHERE id = ?", (row_id,)).fetchone()
+                    same = local is None
+                else:
+                    names = [c for c in remote if c in SYNCED_TABLES[table]]
+                    local = conn.execute(f"SELECT {_quoted(names)} FROM {table} WHERE id = ?",
+                                         (row_id,)).fetchone()
+                    same = local is not None and all(local[c] == remote[c] for c in names)
+                if same:
+                    pruned += conn.execute(
+                        "DELETE FROM change_log WHERE table_name = ? AND row_id = ?", (table, row_id)
+                    ).rowcount
+    finally:
+        conn.close()
+    return pruned
+
+
+def log_head(db_path) -> int:
+    """
+    Current logical clock of a database: the highest clock ever given to
+    a log entry, which AUTOINCREMENT keeps even after entries are deleted
+    """
+    conn = sqlite3.connect(str(db_path))
+    try:
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+        return row[0] if row else 0
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+
+
+def has_changes(db_path, since_clock: int) -> bool:
+    """True if rows changed after since_clock are still logged"""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute("SELECT 1 FROM change_log WHERE clock > ? LIMIT 1", (since_clock,)).fetchone() is not None
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def acknowledge(db_path, clock: int) -> None:
+    """Forget log entries up to clock (they reached the remote)"""
+    conn = sqlite3.connect(str(db_path), timeout=30.0)
+    try:
+        with conn:
+            conn.execute("DELETE FROM change_log WHERE clock <= ?", (clock,))
+    finally:
+        conn.close()
+
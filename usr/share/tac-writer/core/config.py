@@ -5,9 +5,13 @@ Application configuration management following XDG standards
 
 import os
 import json
+import logging
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
+logger = logging.getLogger(__name__)
+
 
 class Config:
     """Application configuration manager"""
@@ -23,6 +27,8 @@ class Config:
     APP_DESIGNERS = ["Narayan Silva"]
 
     def __init__(self):
+        # The sync worker stores its state while the main loop edits settings
+        self._lock = threading.RLock()
         self._setup_directories()
         self._load_defaults()
         self.load()
@@ -74,6 +80,8 @@ class Config:
             'highlight_current_line': True,
             'auto_save': True,
             'auto_save_interval': 5,
+            'ui_update_interval_ms': 0,
+            'thumbnail_texture_cache_size': 64,
 
             # Spell checking settings
             'spell_check_enabled': True,
@@ -81,6 +89,7 @@ class Config:
             'spell_check_show_language_menu': True,
             'spell_check_available_languages': ['pt_BR', 'en_US', 'es_ES', 'fr_FR', 'de_DE', 'it_IT', 'ru_RU', 'zh_CH'],
             'spell_check_personal_dictionary': str(self.config_dir / 'personal_dict.txt'),
+            'spell_check_cache_size': 50000,
 
             # Formatting defaults
             'default_paragraph_indent': 1.25,
@@ -97,6 +106,7 @@ class Config:
             'recent_files_limit': 10,
             'confirm_on_close': True,
             'restore_session': True,
+            'undo_history_budget_kb': 2048,
             'show_welcome_dialog': True,
             'show_first_run_tutorial': True,
             'show_post_creation_tip': True,
@@ -122,7 +132,30 @@ class Config:
             'ai_openrouter_site_name': '',
 
             # Recent projects list
-            'recent_projects': []
+            'recent_projects': [],
+
+            # First visible paragraph of each project, restored when it is opened
+            'project_scroll_positions': {},
+
+            # Incremental cloud sync: this device's id, the clock of its last
+            # uploaded changeset and the last changeset applied per device
+            # (None until the device is bootstrapped from a full snapshot)
+            'sync_device_id': '',
+            'sync_uploaded_clock': 0,
+            'sync_applied_clocks': None,
+            # Where to sync ('dropbox' or 'folder'), the folder used by the
+            # folder backend and the remote the sync state above belongs to
+            'sync_backend': 'dropbox',
+            'sync_folder': '',
+            'sync_remote': '',
+            # Revisions of the remote files seen by the last sync
+            'sync_remote_fingerprint': '',
+
+            # Background sync: after startup, some seconds after each save
+            # and periodically (seconds)
+            'auto_sync': True,
+            'auto_sync_delay': 10,
+            'auto_sync_interval': 300
         }
 
     def get(self, key: str, default: Any = None) -> Any:
@@ -131,20 +164,23 @@ class Config:
 
     def set(self, key: str, value: Any) -> None:
         """Set configuration value"""
-        self._config[key] = value
+        with self._lock:
+            self._config[key] = value
 
     def update(self, updates: Dict[str, Any]) -> None:
         """Update multiple configuration values"""
-        self._config.update(updates)
+        with self._lock:
+            self._config.update(updates)
 
     def reset(self, key: Optional[str] = None) -> None:
         """Reset configuration to defaults"""
         if key:
             defaults = Config()._config
             if key in defaults:
-                self._config[key] = defaults[key]
+                self.set(key, defaults[key])
         else:
-            self._load_defaults()
+            with self._lock:
+                self._load_defaults()
 
     @property
     def config_file(self) -> Path:
@@ -159,13 +195,21 @@ class Config:
         return db_path
 
     def save(self) -> bool:
-        """Save configuration to file"""
+        """
+        Save configuration to file. The settings are serialized under the
+        lock and written to a temporary file first, so a failed save never
+        leaves config.json truncated.
+        """
+        temp_path = self.config_file.with_suffix('.tmp')
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=2, ensure_ascii=False)
+            with self._lock:
+                data = json.dumps(self._config, indent=2, ensure_ascii=False)
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(temp_path, self.config_file)
             return True
         except Exception as e:
-            print(f"Error saving configuration: {e}")
+            logger.warning("Error saving configuration: %s", e)
             return False
 
     def load(self) -> bool:
@@ -174,10 +218,10 @@ class Config:
             if self.config_file.exists():
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     saved_config = json.load(f)
-                self._config.update(saved_config)
+                self.update(saved_config)
             return True
         except Exception as e:
-            print(f"Error loading configuration: {e}")
+            logger.warning("Error loading configuration: %s", e)
             return False
 
     def get_recent_projects(self) -> list:
@@ -186,7 +230,7 @@ class Config:
 
     def add_recent_project(self, project_path: str) -> None:
         """Add project to recent projects list"""
-        recent = self.get_recent_projects()
+        recent = list(self.get_recent_projects())
         if project_path in recent:
             recent.remove(project_path)
         recent.insert(0, project_path)
@@ -196,7 +240,7 @@ class Config:
 
     def remove_recent_project(self, project_path: str) -> None:
         """Remove project from recent projects list"""
-        recent = self.get_recent_projects()
+        recent = list(self.get_recent_projects())
         if project_path in recent:
             recent.remove(project_path)
             self.set('recent_projects', recent)
@@ -204,11 +248,13 @@ class Config:
     def export_config(self, file_path: str) -> bool:
         """Export configuration to file"""
         try:
+            with self._lock:
+                data = json.dumps(self._config, indent=2, ensure_ascii=False)
             with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=2, ensure_ascii=False)
+                f.write(data)
             return True
         except Exception as e:
-            print(f"Error exporting configuration: {e}")
+            logger.warning("Error exporting configuration: %s", e)
             return False
 
     def import_config(self, file_path: str) -> bool:
@@ -216,10 +262,10 @@ class Config:
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 imported_config = json.load(f)
-            self._config.update(imported_config)
+            self.update(imported_config)
             return True
         except Exception as e:
-            print(f"Error importing configuration: {e}")
+            logger.warning("Error importing configuration: %s", e)
             return False
 
     # Spell checking methods
@@ -0,0 +1,196 @@
+"""
+TAC Document
+Format-independent model of a project shared by the exporters: blocks
+grouped by the TAC rules, inline runs, footnote references and images
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .assets import image_path
+from .markup import Run, parse_markup
+from .models import Project, ParagraphType
+from utils.tracing import traced
+
+# Source paragraphs joined into TAC paragraphs
+TEXT_TYPES = (ParagraphType.INTRODUCTION, ParagraphType.ARGUMENT,
+              ParagraphType.CONCLUSION, ParagraphType.ARGUMENT_RESUMPTION)
+
+# Text types that always open a new TAC paragraph, typeset with a first-line indent
+_OPENING_TYPES = (ParagraphType.INTRODUCTION, ParagraphType.ARGUMENT_RESUMPTION)
+
+# Paragraph types exported on their own, by block kind
+_TEXT_BLOCK_KINDS = {
+    ParagraphType.TITLE_1: 'title1',
+    ParagraphType.TITLE_2: 'title2',
+    ParagraphType.QUOTE: 'quote',
+    ParagraphType.EPIGRAPH: 'epigraph',
+}
+_SOURCE_BLOCK_KINDS = {
+    ParagraphType.CODE: 'code',
+    ParagraphType.LATEX: 'latex',
+}
+
+# Projects whose document is kept by a DocumentCache
+DOCUMENT_CACHE_SIZE = 4
+
+
+class Segment:
+    """
+    Text of one source paragraph: its inline runs and the numbers of its
+    footnotes (1-based indexes into Document.footnotes)
+    """
+
+    __slots__ = ('runs', 'notes')
+
+    def __init__(self, runs: List[Run], notes: List[int]):
+        self.runs = runs
+        self.notes = notes
+
+
+class TextBlock:
+    """
+    Title, quote, epigraph or TAC paragraph ('text').
+
+    A TAC paragraph joins consecutive text paragraphs, one segment each;
+    the other kinds hold a single segment. indent is set on TAC
+    paragraphs opened by an introduction or argument resumption.
+    """
+
+    __slots__ = ('kind', 'segments', 'indent')
+
+    def __init__(self, kind: str, segments: List[Segment], indent: bool = False):
+        self.kind = kind
+        self.segments = segments
+        self.indent = indent
+
+
+class SourceBlock:
+    """Code ('code') or LaTeX ('latex') paragraph, kept verbatim"""
+
+    __slots__ = ('kind', 'source')
+
+    def __init__(self, kind: str, source: str):
+        self.kind = kind
+        self.source = source
+
+
+class ImageBlock:
+    """Image paragraph: its metadata and the local file it resolves to"""
+
+    __slots__ = ('kind', 'metadata', 'path')
+
+    def __init__(self, metadata: Dict, path: Path):
+        self.kind = 'image'
+        self.metadata = metadata
+        self.path = path
+
+
+class Document:
+    """
+    A project as the exporters see it. Built once per project revision
+    and shared between exports, so it must not be modified.
+    """
+
+    __slots__ = ('title', 'author', 'blocks', 'footnotes')
+
+    def __init__(self, title: str, author: str, blocks: List, footnotes: List[List[Run]]):
+        self.title = title
+        self.author = author
+        self.blocks = blocks
+        # Distinct footnote texts in order of first reference
+        self.footnotes = footnotes
+
+
+@traced('build_document', 'export')
+def build_document(project: Project, data_dir=None) -> Document:
+    """
+    Build the document of a project. Images are resolved against data_dir
+    (see core.assets.image_path) or, without one, their stored path.
+    """
+    blocks = []
+    footnotes: List[List[Run]] = []
+    footnote_numbers: Dict[str, int] = {}
+    group: Optional[TextBlock] = None
+
+    def segment(paragraph) -> Segment:
+        notes = []
+        for text in getattr(paragraph, 'footnotes', None) or []:
+            number = footnote_numbers.get(text)
+            if number is None:
+                footnotes.append(parse_markup(text))
+                number = footnote_numbers[text] = len(footnotes)
+            notes.append(number)
+        return Segment(parse_markup(paragraph.content.strip()), notes)
+
+    for paragraph in project.paragraphs:
+        if paragraph.type in TEXT_TYPES:
+            if group is None or paragraph.type in _OPENING_TYPES:
+                group = TextBlock('text', [], indent=paragraph.type in _OPENING_TYPES)
+                blocks.append(group)
+            group.segments.append(segment(paragraph))
+            continue
+
+        # Any other paragraph ends the TAC paragraph in progress
+        group = None
+        if paragraph.type in _TEXT_BLOCK_KINDS:
+            blocks.append(TextBlock(_TEXT_BLOCK_KINDS[paragraph.type], [segment(paragraph)]))
+        elif paragraph.type in _SOURCE_BLOCK_KINDS:
+            blocks.append(SourceBlock(_SOURCE_BLOCK_KINDS[paragraph.type], paragraph.content))
+        elif paragraph.type == ParagraphType.IMAGE:
+            metadata = paragraph.get_image_metadata()
+            if metadata:
+                if data_dir is not None:
+                    path = image_path(data_dir, project.id, metadata)
+                else:
+                    path = Path(metadata.get('path') or '')
+                blocks.append(ImageBlock(metadata, path))
+
+    return Document(project.name, project.metadata.get('author', ''), blocks, footnotes)
+
+
+def _revision_key(project: Project) -> Tuple:
+    """
+    Everything build_document reads from a project. Comparing keys is
+    cheap: unchanged paragraphs still hold the same string objects.
+    """
+    return (
+        project.name,
+        project.metadata.get('author', ''),
+        tuple((p.id, p.type, p.content, tuple(getattr(p, 'footnotes', None) or ()))
+              for p in project.paragraphs),
+    )
+
+
+class DocumentCache:
+    """
+    Documents of the last exported projects, rebuilt only when the
+    project changed since. Exporting one revision to several formats
+    (even from several threads) builds its document once.
+    """
+
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, project: Project) -> Document:
+        key = _revision_key(project)
+        with self._lock:
+            entry = self._entries.get(project.id)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(project.id)
+                return entry[1]
+
+            document = build_document(project, self.data_dir)
+            self._entries[project.id] = (key, document)
+            self._entries.move_to_end(project.id)
+            if len(self._entries) > DOCUMENT_CACHE_SIZE:
+                self._entries.popitem(last=False)
+            return document
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
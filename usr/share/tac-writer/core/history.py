@@ -0,0 +1,309 @@
+"""
+TAC Project History
+Structural undo/redo log for project-level operations
+"""
+
+import sys
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from .models import Project, Paragraph
+from utils.i18n import _
+
+
+class HistoryOperation:
+    """Base class for a reversible project operation"""
+
+    label = ""
+
+    def apply(self, project: Project) -> None:
+        """Apply (or re-apply) the operation to the project"""
+        raise NotImplementedError
+
+    def revert(self, project: Project) -> None:
+        """Undo the operation on the project"""
+        raise NotImplementedError
+
+    def affected_ids(self) -> List[str]:
+        """Paragraph IDs whose widgets must be rebuilt after apply/revert"""
+        return []
+
+    def size_bytes(self) -> int:
+        """Approximate memory held by this operation"""
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(value) for value in self.__dict__.values()
+        )
+
+
+class InsertParagraphOp(HistoryOperation):
+    """A paragraph was inserted at a position"""
+
+    label = _("Inserir parágrafo")
+
+    def __init__(self, paragraph: Paragraph, position: int):
+        self.paragraph_data = paragraph.to_dict()
+        self.position = position
+
+    def _insert(self, project: Project) -> None:
+        paragraph = Paragraph.from_dict(self.paragraph_data)
+        position = max(0, min(self.position, len(project.paragraphs)))
+        project.paragraphs.insert(position, paragraph)
+        project.update_paragraph_order()
+
+    def _remove(self, project: Project) -> None:
+        # Keep edits made after the operation so redo/undo restores them
+        paragraph = project.get_paragraph(self.paragraph_data['id'])
+        if paragraph:
+            self.paragraph_data = paragraph.to_dict()
+        project.remove_paragraph(self.paragraph_data['id'])
+
+    def apply(self, project: Project) -> None:
+        self._insert(project)
+
+    def revert(self, project: Project) -> None:
+        self._remove(project)
+
+    def affected_ids(self) -> List[str]:
+        return [self.paragraph_data['id']]
+
+    def size_bytes(self) -> int:
+        return super().size_bytes() + _dict_size(self.paragraph_data)
+
+
+class RemoveParagraphOp(InsertParagraphOp):
+    """A paragraph was removed from a position"""
+
+    label = _("Remover parágrafo")
+
+    def apply(self, project: Project) -> None:
+        self._remove(project)
+
+    def revert(self, project: Project) -> None:
+        self._insert(project)
+
+
+class ReplaceParagraphOp(HistoryOperation):
+    """A paragraph was replaced by another one (e.g. image edited)"""
+
+    label = _("Editar imagem")
+
+    def __init__(self, old_paragraph: Paragraph, new_paragraph: Paragraph, position: int):
+        self.old_data = old_paragraph.to_dict()
+        self.new_data = new_paragraph.to_dict()
+        self.position = position
+
+    def _swap(self, project: Project, current: Dict[str, Any], target: Dict[str, Any]) -> None:
+        project.remove_paragraph(current['id'])
+        position = max(0, min(self.position, len(project.paragraphs)))
+        project.paragraphs.insert(position, Paragraph.from_dict(target))
+        project.update_paragraph_order()
+
+    def apply(self, project: Project) -> None:
+        self._swap(project, self.old_data, self.new_data)
+
+    def revert(self, project: Project) -> None:
+        self._swap(project, self.new_data, self.old_data)
+
+    def affected_ids(self) -> List[str]:
+        return [self.old_data['id'], self.new_data['id']]
+
+    def size_bytes(self) -> int:
+        return super().size_bytes() + _dict_size(self.old_data) + _dict_size(self.new_data)
+
+
+class MoveParagraphOp(HistoryOperation):
+    """A paragraph was moved between positions"""
+
+    label = _("Mover parágrafo")
+
+    def __init__(self, paragraph_id: str, old_position: int, new_position: int):
+        self.paragraph_id = paragraph_id
+        self.old_position = old_position
+        self.new_position = new_position
+
+    def apply(self, project: Project) -> None:
+        project.move_paragraph(self.paragraph_id, self.new_position)
+
+    def revert(self, project: Project) -> None:
+        project.move_paragraph(self.paragraph_id, self.old_position)
+
+
+class FootnoteEditOp(HistoryOperation):
+    """The footnotes of a paragraph were edited"""
+
+    label = _("Editar notas de rodapé")
+
+    def __init__(self, paragraph_id: str, old_footnotes: List[str], new_footnotes: List[str]):
+        self.paragraph_id = paragraph_id
+        self.old_footnotes = tuple(old_footnotes)
+        self.new_footnotes = tuple(new_footnotes)
+
+    def apply(self, project: Project) -> None:
+        paragraph = project.get_paragraph(self.paragraph_id)
+        if paragraph:
+            paragraph.footnotes = list(self.new_footnotes)
+
+    def revert(self, project: Project) -> None:
+        paragraph = project.get_paragraph(self.paragraph_id)
+        if paragraph:
+            paragraph.footnotes = list(self.old_footnotes)
+
+    def affected_ids(self) -> List[str]:
+        return [self.paragraph_id]
+
+    def size_bytes(self) -> int:
+        return super().size_bytes() + sum(
+            sys.getsizeof(text) for text in self.old_footnotes + self.new_footnotes
+        )
+
+
+class ContentChangeOp(HistoryOperation):
+    """The stored content of a paragraph was rewritten (e.g. by replace)"""
+
+    label = _("Substituir texto")
+
+    def __init__(self, paragraph_id: str, old_content: str, new_content: str):
+        self.paragraph_id = paragraph_id
+        self.old_content = old_content
+        self.new_content = new_content
+
+    def apply(self, project: Project) -> None:
+        paragraph = project.get_paragraph(self.paragraph_id)
+        if paragraph:
+            paragraph.update_content(self.new_content)
+
+    def revert(self, project: Project) -> None:
+        paragraph = project.get_paragraph(self.paragraph_id)
+        if paragraph:
+            paragraph.update_content(self.old_content)
+
+    def affected_ids(self) -> List[str]:
+        return [self.paragraph_id]
+
+
+class InlineFormatOp(ContentChangeOp):
+    """
+    An inline tag (bold, italic, underline) was toggled over a text range.
+
+    Stores the content before and after rather than the range, so undo
+    restores tags that were already present and is not thrown off by
+    later typing in the paragraph.
+    """
+
+    label = _("Alterar formatação")
+
+
+class CompositeOp(HistoryOperation):
+    """Several operations undone and redone as a single step"""
+
+    def __init__(self, operations: List[HistoryOperation], label: str = ""):
+        self.operations = list(operations)
+        self.label = label or (operations[0].label if operations else "")
+
+    def apply(self, project: Project) -> None:
+        for operation in self.operations:
+            operation.apply(project)
+
+    def revert(self, project: Project) -> None:
+        for operation in reversed(self.operations):
+            operation.revert(project)
+
+    def affected_ids(self) -> List[str]:
+        ids = []
+        for operation in self.operations:
+            ids.extend(operation.affected_ids())
+        return ids
+
+    def size_bytes(self) -> int:
+        return sys.getsizeof(self) + sum(op.size_bytes() for op in self.operations)
+
+
+class ProjectHistory:
+    """Bounded undo/redo stacks of structural project operations"""
+
+    def __init__(self, budget_bytes: int = 2 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self._undo = deque()
+        self._redo = deque()
+        self._undo_bytes = 0
+        self._redo_bytes = 0
+
+    def record(self, operation: HistoryOperation) -> None:
+        """Record an operation that has already been applied"""
+        size = operation.size_bytes()
+        if size > self.budget_bytes:
+            # A single operation larger than the budget cannot be kept
+            self.clear()
+            return
+
+        self._undo.append((operation, size))
+        self._undo_bytes += size
+        self._redo.clear()
+        self._redo_bytes = 0
+        self._enforce_budget()
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self, project: Project) -> Optional[HistoryOperation]:
+        """Revert the latest operation, returning it (or None)"""
+        if not self._undo:
+            return None
+        operation, size = self._undo.pop()
+        self._undo_bytes -= size
+        operation.revert(project)
+        project._update_modified_time()
+        self._redo.append((operation, size))
+        self._redo_bytes += size
+        self._enforce_budget()
+        return operation
+
+    def redo(self, project: Project) -> Optional[HistoryOperation]:
+        """Re-apply the latest undone operation, returning it (or None)"""
+        if not self._redo:
+            return None
+        operation, size = self._redo.pop()
+        self._redo_bytes -= size
+        operation.apply(project)
+        project._update_modified_time()
+        self._undo.append((operation, size))
+        self._undo_bytes += size
+        self._enforce_budget()
+        return operation
+
+    def clear(self) -> None:
+        """Drop all recorded operations"""
+        self._undo.clear()
+        self._redo.clear()
+        self._undo_bytes = 0
+        self._redo_bytes = 0
+
+    @property
+    def used_bytes(self) -> int:
+        return self._undo_bytes + self._redo_bytes
+
+    def _enforce_budget(self) -> None:
+        """Drop the oldest entries until the stacks fit in the budget"""
+        while self.used_bytes > self.budget_bytes and self._redo:
+            _operation, size = self._redo.popleft()
+            self._redo_bytes -= size
+        while self.used_bytes > self.budget_bytes and self._undo:
+            _operation, size = self._undo.popleft()
+            self._undo_bytes -= size
+
+
+def _dict_size(data: Dict[str, Any]) -> int:
+    """Rough recursive size of a serialized paragraph"""
+    total = sys.getsizeof(data)
+    for key, value in data.items():
+        total += sys.getsizeof(key)
+        if isinstance(value, dict):
+            total += _dict_size(value)
+        elif isinstance(value, (list, tuple)):
+            total += sum(sys.getsizeof(item) for item in value)
+        else:
+            total += sys.getsizeof(value)
+    return total
@@ -0,0 +1,103 @@
+"""
+TAC Inline Markup
+Helpers for the inline <b>, <i>, <u> markup stored in paragraph content
+"""
+
+import re
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+# Order in which tags are opened when serializing (closed in reverse)
+INLINE_TAGS = (('bold', 'b'), ('italic', 'i'), ('underline', 'u'))
+
+_TAG_BY_MARKER = {marker: name for name, marker in INLINE_TAGS}
+_MARKUP_RE = re.compile(r'(</?[biu]>)')
+
+Run = Tuple[str, FrozenSet[str]]
+
+
+def parse_markup(content: str) -> List[Run]:
+    """
+    Split stored content into runs of (text, active tag names).
+
+    Mirrors ParagraphEditor._set_content_from_storage so offsets computed
+    on the runs match the offsets of the plain text shown in the buffer.
+    """
+    runs: List[Run] = []
+    if not content:
+        return runs
+
+    active = set()
+    for part in _MARKUP_RE.split(content):
+        if not part:
+            continue
+        if _MARKUP_RE.fullmatch(part):
+            name = _TAG_BY_MARKER[part.strip('</>')]
+            if part.startswith('</'):
+                active.discard(name)
+            else:
+                active.add(name)
+        else:
+            runs.append((part, frozenset(active)))
+    return runs
+
+
+def serialize_markup(runs: List[Run]) -> str:
+    """Serialize runs back to the storage format used by ParagraphEditor"""
+    output = []
+    for text, tags in _merge_runs(runs):
+        for name, marker in INLINE_TAGS:
+            if name in tags:
+                output.append(f'<{marker}>')
+        output.append(text)
+        for name, marker in reversed(INLINE_TAGS):
+            if name in tags:
+                output.append(f'</{marker}>')
+    return "".join(output)
+
+
+def render_markup(runs: List[Run], markers: Dict[str, Tuple[str, str]],
+                  escape: Optional[Callable[[str], str]] = None) -> str:
+    """
+    Render runs in another markup: markers maps tag names to their
+    (open, close) strings and escape converts the text of each run. Tags
+    without a marker are dropped. Output is always well nested: a tag that
+    ends inside another closes and reopens the inner ones.
+    """
+    output = []
+    stack: List[str] = []
+    for text, tags in runs:
+        wanted = [name for name, _marker in INLINE_TAGS if name in tags and name in markers]
+        keep = 0
+        while keep < len(stack) and stack[keep] in wanted:
+            keep += 1
+        for name in reversed(stack[keep:]):
+            output.append(markers[name][1])
+        del stack[keep:]
+        for name in wanted:
+            if name not in stack:
+                output.append(markers[name][0])
+                stack.append(name)
+        output.append(escape(text) if escape else text)
+    for name in reversed(stack):
+        output.append(markers[name][1])
+    return "".join(output)
+
+
+def strip_markup(content: str) -> str:
+    """Return the plain text of stored content"""
+    if not content:
+        return ""
+    return _MARKUP_RE.sub('', content)
+
+
+def _merge_runs(runs: List[Run]) -> List[Run]:
+    """Merge adjacent runs sharing the same tags"""
+    merged: List[Run] = []
+    for text, tags in runs:
+        if not text:
+            continue
+        if merged and merged[-1][1] == tags:
+            merged[-1] = (merged[-1][0] + text, tags)
+        else:
+            merged.append((text, tags))
+    return merged
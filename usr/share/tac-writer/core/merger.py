@@ -1,10 +1,167 @@
+"""
+TAC Merger
+Paragraph-level three-way merge of the local database with another copy
+of it (cloud sync or backup import)
+"""
+
+import json
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
+# Columns merged when both databases have them (older backups may lack some)
+PROJECT_COLUMNS = ['id', 'name', 'created_at', 'modified_at', 'metadata', 'document_formatting']
+PARAGRAPH_COLUMNS = ['id', 'project_id', 'type', 'content', 'created_at', 'modified_at',
+                     'order', 'formatting', 'footnotes']
+
+# Columns holding JSON objects, merged key by key
+JSON_OBJECT_COLUMNS = {'metadata', 'document_formatting', 'formatting'}
+
+# Columns that are not merged as values: identity, timestamps and position
+_FIXED_COLUMNS = {'id', 'project_id', 'created_at', 'modified_at', 'order'}
+
+_MISSING = object()
+
+
+def snapshot_database(source_path, target_path) -> Path:
+    """Consistent copy of a database (WAL content included) using the backup API"""
+    target_path = Path(target_path)
+    if target_path.exists():
+        target_path.unlink()
+
+    source = sqlite3.connect(str(source_path), timeout=30.0)
+    try:
+        target = sqlite3.connect(str(target_path))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+    finally:
+        source.close()
+    return target_path
+
+
+def rebase_edits(stored, edited, since, base_ids):
+    """
+    Re-apply the paragraph edits made to an open project since it was
+    last saved onto a newer copy of it (stored, e.g. just reloaded after a
+    sync merge). since is the time of that save and base_ids the ids of
+    its paragraphs then.
+
+    Paragraphs added or modified since then replace their stored version
+    (or are inserted after the paragraph preceding them in edited), and
+    paragraphs deleted since then are removed; everything else, including
+    the order, comes from stored. Returns stored.
+    """
+    base = set(base_ids)
+    edited_ids = {p.id for p in edited.paragraphs}
+    changed = {p.id: p for p in edited.paragraphs if p.id not in base or p.modified_at > since}
+    deleted = base - edited_ids
+
+    kept = [changed.pop(p.id, p) for p in stored.paragraphs if p.id not in deleted]
+    kept_ids = {p.id for p in kept}
+
+    # Paragraphs missing from stored go after the one they follow in edited
+    following = {}
+    previous = None
+    for paragraph in edited.paragraphs:
+        if paragraph.id in changed:
+            following.setdefault(previous, []).append(paragraph)
+        elif paragraph.id in kept_ids:
+            previous = paragraph.id
+
+    paragraphs = following.get(None, [])
+    for paragraph in kept:
+        paragraphs.append(paragraph)
+        paragraphs.extend(following.get(paragraph.id, ()))
+
+    stored.paragraphs = paragraphs
+    stored.update_paragraph_order()
+    return stored
+
+
+def _merge_value(base, local, remote, local_wins):
+    """Three-way merge of one value. Returns (value, conflict)"""
+    if local == remote:
+        return local, False
+    if local == base:
+        return remote, False
+    if remote == base:
+        return local, False
+    return (local if local_wins else remote), True
+
+
+def merge_json_object(base, local, remote, local_wins):
+    """Three-way merge of a JSON object column, key by key"""
+    if local == remote or local == base or remote == base:
+        return _merge_value(base, local, remote, local_wins)
+    try:
+        objects = [json.loads(value) if value else {} for value in (base, local, remote)]
+    except (TypeError, ValueError):
+        return _merge_value(base, local, remote, local_wins)
+    if not all(isinstance(obj, dict) for obj in objects):
+        return _merge_value(base, local, remote, local_wins)
+
+    base_obj, local_obj, remote_obj = objects
+    merged = {}
+    conflict = False
+    for key in dict.fromkeys(list(local_obj) + list(remote_obj)):
+        value, clash = _merge_value(base_obj.get(key, _MISSING), local_obj.get(key, _MISSING),
+                                    remote_obj.get(key, _MISSING), local_wins)
+        conflict = conflict or clash
+        if value is not _MISSING:
+            merged[key] = value
+    return json.dumps(merged), conflict
+
+
+def _fresh_timestamp(newest):
+    """A modified_at later than newest, for a row version neither side had"""
+    now = datetime.now().isoformat(timespec='microseconds')
+    if newest and now <= newest:
+        try:
+            now = (datetime.fromisoformat(newest) + timedelta(microseconds=1)).isoformat(timespec='microseconds')
+        except ValueError:
+            pass
+    return now
+
+
+def _quoted(columns):
+    return ', '.join(f'"{c}"' for c in columns)
+
+
+def _sequence(paragraphs):
+    """Paragraph ids in document order"""
+    rows = sorted(paragraphs.values(), key=lambda row: (row.get('order') or 0, row['id']))
+    return [row['id'] for row in rows]
+
+
 class DatabaseMerger:
-    def __init__(self, local_db_path):
+    """
+    Merges another copy of the database into the local one.
+
+    With a base snapshot (the database as it was after the last sync) the
+    merge is three-way and per paragraph: each side's changes since the
+    base are combined field by field (content, type, formatting keys,
+    footnotes), paragraph order is merged as a sequence, and insertions and
+    deletions on either side are kept. Only a field changed differently on
+    both sides, or a paragraph edited on one side and deleted on the other,
+    is a conflict; the newer version wins and the conflict is reported.
+
+    Without a base, the older version of each row stands in for it, so the
+    newer paragraph wins and nothing is deleted.
+
+    Everything runs in one transaction with the other database ATTACHed.
+    Projects only one side changed are applied with set-based statements:
+    new projects and projects the remote version supersedes are copied
+    with INSERT ... SELECT, projects deleted remotely are deleted, projects
+    changed only locally are left alone. Only projects changed on both
+    sides are loaded and merged row by row, and their result is written as
+    the minimal set of INSERT/UPDATE/DELETE statements.
+    """
+
+    def __init__(self, local_db_path, base_db_path=None):
         self.local_db_path = local_db_path
+        self.base_db_path = base_db_path
 
     def merge(self, backup_db_path):
         """
@@ -14,117 +171,459 @@ class DatabaseMerger:
         if not Path(backup_db_path).exists():
             raise FileNotFoundError("Arquivo de backup não encontrado")
 
-        # Connect to both banks
-        local_conn = sqlite3.connect(self.local_db_path)
-        backup_conn = sqlite3.connect(backup_db_path)
-        
-        # Configure to return dictionaries
+        has_base = bool(self.base_db_path) and Path(self.base_db_path).exists()
+
+        # Autocommit mode: ATTACH must run outside a transaction, the
+        # transaction itself is opened explicitly below
+        local_conn = sqlite3.connect(self.local_db_path, timeout=30.0, isolation_level=None)
         local_conn.row_factory = sqlite3.Row
-        backup_conn.row_factory = sqlite3.Row
-        
-        local_cursor = local_conn.cursor()
-        backup_cursor = backup_conn.cursor()
-
-        stats = {
-            "projects_added": 0, 
-            "projects_updated": 0, 
-            "paragraphs_processed": 0
+        local_conn.execute("ATTACH DATABASE ? AS backup", (str(backup_db_path),))
+        if has_base:
+            local_conn.execute("ATTACH DATABASE ? AS base", (str(self.base_db_path),))
+
+        self._stats = {
+            "projects_added": 0,
+            "projects_updated": 0,
+            "projects_deleted": 0,
+            "paragraphs_added": 0,
+            "paragraphs_updated": 0,
+            "paragraphs_deleted": 0,
+            "paragraphs_processed": 0,
+            # Ids of the projects whose local rows were written
+            "projects_changed": [],
+            "conflicts": []
         }
 
         try:
-            # Get all projects from Backup
-            backup_cursor.execute("SELECT * FROM projects")
-            backup_projects = backup_cursor.fetchall()
-
-            for b_proj in backup_projects:
-                # Try to find the project locally by ID
-                query = "SELECT * FROM projects WHERE id = ?"
-                local_cursor.execute(query, (b_proj['id'],))
-                local_proj = local_cursor.fetchone()
-
-                if not local_proj:
-                    # SCENARIO 1: New Project
-                    cols = list(b_proj.keys())
-                    placeholders = ','.join(['?'] * len(cols))
-                    # Add " in columms name (ex: "name", "metadata")
-                    col_names = ','.join([f'"{c}"' for c in cols])
-                    values = [b_proj[c] for c in cols]
-                    
-                    local_cursor.execute(
-                        f"INSERT INTO projects ({col_names}) VALUES ({placeholders})", 
-                        values
-                    )
-                    stats["projects_added"] += 1
-                else:
-                    # SCENARIO 2: Project Exists - Check date
-                    b_time = b_proj['modified_at']
-                    l_time = local_proj['modified_at']
-                    
-                    if b_time > l_time:
-                        # Update the local project
-                        cols = list(b_proj.keys())
-                        # Add " in SET clause (ex: "name" = ?)
-                        set_clause = ', '.join([f'"{c}" = ?' for c in cols])
-                        values = [b_proj[c] for c in cols]
-                        values.append(b_proj['id']) # Para o WHERE
-                        
-                        local_cursor.execute(
-                            f"UPDATE projects SET {set_clause} WHERE id = ?", 
-                            values
-                        )
-                        stats["projects_updated"] += 1
-                        
-                        # Cleans up old paragraphs for rewriting
-                        local_cursor.execute("DELETE FROM paragraphs WHERE project_id = ?", (b_proj['id'],))
-
-                # 2. Merge Paragraphs
-                should_process_paragraphs = False
-                if not local_proj: 
-                    should_process_paragraphs = True
-                elif b_proj['modified_at'] > local_proj['modified_at']:
-                    should_process_paragraphs = True
-
-                if should_process_paragraphs:
-                    backup_cursor.execute(
-                        'SELECT * FROM paragraphs WHERE project_id = ? ORDER BY "order" ASC', 
-                        (b_proj['id'],)
-                    )
-                    backup_paragraphs = backup_cursor.fetchall()
-
-                    for b_para in backup_paragraphs:
-                        # Check existence
-                        local_cursor.execute("SELECT 1 FROM paragraphs WHERE id = ?", (b_para['id'],))
-                        exists = local_cursor.fetchone()
-                        
-                        cols = list(b_para.keys())
-                        values = [b_para[c] for c in cols]
-                        
-                        if not exists:
-                            placeholders = ','.join(['?'] * len(cols))
-                            col_names = ','.join([f'"{c}"' for c in cols])
-                            
-                            local_cursor.execute(
-                                f"INSERT INTO paragraphs ({col_names}) VALUES ({placeholders})", 
-                                values
-                            )
-                        else:
-                            # Update existing paragraph
-                            set_clause = ', '.join([f'"{c}" = ?' for c in cols])
-                            values.append(b_para['id'])
-                            
-                            local_cursor.execute(
-                                f"UPDATE paragraphs SET {set_clause} WHERE id = ?", 
-                                values
-                            )
-                            
-                        stats["paragraphs_processed"] += 1
-
-            local_conn.commit()
+            project_columns = self._common_columns(local_conn, 'projects', PROJECT_COLUMNS)
+            paragraph_columns = self._common_columns(local_conn, 'paragraphs', PARAGRAPH_COLUMNS)
+            self._project_fields = [c for c in project_columns if c not in _FIXED_COLUMNS]
+            self._paragraph_fields = [c for c in paragraph_columns if c not in _FIXED_COLUMNS]
+
+            local_conn.execute("BEGIN IMMEDIATE")
+
+            changed = self._changed_projects(local_conn, 'main', 'backup', project_columns, paragraph_columns)
+            self._id_table(local_conn, 'merge_changed', changed)
+            replaced, deleted, both = self._classify(local_conn, changed, has_base,
+                                                     project_columns, paragraph_columns)
+            self._replace_projects(local_conn, replaced, project_columns, paragraph_columns)
+            self._delete_projects(local_conn, deleted)
+
+            for project_id in both:
+                local = self._load_project(local_conn, 'main', project_id, project_columns, paragraph_columns)
+                remote = self._load_project(local_conn, 'backup', project_id, project_columns, paragraph_columns)
+                base = self._load_project(local_conn, 'base', project_id, project_columns,
+                                          paragraph_columns) if has_base else None
+                self._merge_project(local_conn, project_id, base, local, remote)
+
+            local_conn.execute("COMMIT")
+
+            stats = self._stats
+            stats["paragraphs_processed"] = (stats["paragraphs_added"] + stats["paragraphs_updated"]
+                                             + stats["paragraphs_deleted"])
             return stats
 
         except Exception as e:
-            local_conn.rollback()
+            if local_conn.in_transaction:
+                local_conn.execute("ROLLBACK")
             raise e
         finally:
+            local_conn.execute("DETACH DATABASE backup")
+            if has_base:
+                local_conn.execute("DETACH DATABASE base")
             local_conn.close()
-            backup_conn.close()
+
+    # Reading
+
+    @staticmethod
+    def _common_columns(conn, table, wanted):
+        """Columns of table present in both the local and the backup database"""
+        local = {row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")}
+        backup = {row[1] for row in conn.execute(f"PRAGMA backup.table_info({table})")}
+        return [column for column in wanted if column in local and column in backup]
+
+    @staticmethod
+    def _changed_projects(conn, schema, other, project_columns, paragraph_columns, among=None):
+        """
+        Ids of projects whose rows differ between two of the attached
+        databases, optionally only among the ids of a temp table. Rows are
+        matched on their primary key and compared column by column, so no
+        side is sorted or copied.
+        """
+        def differ(columns):
+            return ' OR '.join(f'a."{c}" IS NOT b."{c}"' for c in columns if c != 'id')
+
+        def only(column):
+            return f"AND {column} IN (SELECT id FROM temp.{among})" if among else ""
+
+        rows = conn.execute(f"""
+            SELECT a.id FROM {schema}.projects a LEFT JOIN {other}.projects b ON b.id = a.id
+            WHERE (b.id IS NULL OR {differ(project_columns)}) {only('a.id')}
+            UNION SELECT b.id FROM {other}.projects b LEFT JOIN {schema}.projects a ON a.id = b.id
+            WHERE a.id IS NULL {only('b.id')}
+            UNION SELECT a.project_id FROM {schema}.paragraphs a LEFT JOIN {other}.paragraphs b ON b.id = a.id
+            WHERE (b.id IS NULL OR {differ(paragraph_columns)}) {only('a.project_id')}
+            UNION SELECT b.project_id FROM {other}.paragraphs b LEFT JOIN {schema}.paragraphs a ON a.id = b.id
+            WHERE (a.id IS NULL OR a.project_id IS NOT b.project_id) {only('b.project_id')}
+        """).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _project_ids(conn, schema):
+        return {row[0] for row in conn.execute(f"SELECT id FROM {schema}.projects")}
+
+    def _classify(self, conn, changed, has_base, project_columns, paragraph_columns):
+        """
+        Split the changed projects into (replaced, deleted, both): projects
+        the remote version replaces as a whole, projects deleted remotely
+        and untouched locally, and projects to merge row by row. Projects
+        only changed locally are in none of them.
+        """
+        local_ids = self._project_ids(conn, 'main')
+        remote_ids = self._project_ids(conn, 'backup')
+        base_ids = self._project_ids(conn, 'base') if has_base else set()
+
+        if has_base and self._base_has_columns(conn, project_columns, paragraph_columns):
+            local_dirty = set(self._changed_projects(conn, 'main', 'base', project_columns,
+                                                     paragraph_columns, 'merge_changed'))
+            remote_dirty = set(self._changed_projects(conn, 'backup', 'base', project_columns,
+                                                      paragraph_columns, 'merge_changed'))
+        elif has_base:
+            # Rows of an older base cannot be compared: merge everything row by row
+            local_dirty = remote_dirty = set(changed)
+        else:
+            superseded = self._superseded_projects(conn, paragraph_columns)
+            local_dirty = {pid for pid in changed if pid not in superseded}
+            remote_dirty = set(changed)
+
+        replaced, deleted, both = [], [], []
+        for project_id in changed:
+            if project_id in base_ids and project_id not in remote_dirty:
+                continue  # Only changed locally
+            if project_id not in local_ids and project_id not in base_ids:
+                replaced.append(project_id)  # New remotely
+            elif project_id in local_ids and project_id not in local_dirty:
+                (replaced if project_id in remote_ids else deleted).append(project_id)
+            elif project_id in local_ids and project_id not in remote_ids and project_id not in base_ids:
+                continue  # Only exists locally
+            else:
+                both.append(project_id)
+        return replaced, deleted, both
+
+    @staticmethod
+    def _base_has_columns(conn, project_columns, paragraph_columns):
+        projects = {row[1] for row in conn.execute("PRAGMA base.table_info(projects)")}
+        paragraphs = {row[1] for row in conn.execute("PRAGMA base.table_info(paragraphs)")}
+        return set(project_columns) <= projects and set(paragraph_columns) <= paragraphs
+
+    @staticmethod
+    def _superseded_projects(conn, paragraph_columns):
+        """
+        Without a base: ids of projects the remote version supersedes, i.e.
+        the row-by-row merge would yield the remote version. The remote
+        project is newer and every local paragraph is also remote, either
+        newer there or identical (its position aside).
+        """
+        same = ' AND '.join(f'b."{c}" IS l."{c}"' for c in paragraph_columns if c != 'order')
+        rows = conn.execute(f"""
+            SELECT b.id FROM backup.projects b JOIN main.projects l ON l.id = b.id
+            WHERE b.modified_at > l.modified_at AND b.id IN (SELECT id FROM temp.merge_changed)
+            EXCEPT
+            SELECT l.project_id FROM main.paragraphs l LEFT JOIN backup.paragraphs b ON b.id = l.id
+            WHERE l.project_id IN (SELECT id FROM temp.merge_changed)
+            AND (b.id IS NULL OR NOT (b.modified_at > l.modified_at OR ({same})))
+        """).fetchall()
+        return {row[0] for row in rows}
+
+    @staticmethod
+    def _load_project(conn, schema, project_id, project_columns, paragraph_columns):
+        """(project row, {paragraph id: row}) of one database, or None"""
+        available = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(paragraphs)")}
+        project_cols = _quoted(project_columns)
+        paragraph_cols = _quoted([c for c in paragraph_columns if c in available])
+
+        row = conn.execute(f"SELECT {project_cols} FROM {schema}.projects WHERE id = ?",
+                           (project_id,)).fetchone()
+        if row is None:
+            return None
+        paragraphs = {
+            p_row['id']: dict(p_row)
+            for p_row in conn.execute(f"SELECT {paragraph_cols} FROM {schema}.paragraphs WHERE project_id = ?",
+                                      (project_id,))
+        }
+        return dict(row), paragraphs
+
+    # Merging
+
+    def _merge_project(self, conn, project_id, base, local, remote):
+        if remote is None:
+            if local is None or base is None:
+                return  # Only exists locally
+            if self._same_project(local, base):
+                self._delete_project(conn, project_id)
+            else:
+                self._conflict(local[0], None, ['deleted'], 'local', {})
+            return
+
+        if local is None:
+            if base is not None:
+                # Deleted locally: brought back only if it changed remotely since
+                if self._same_project(remote, base):
+                    return
+                self._conflict(remote[0], None, ['deleted'], 'remote', {})
+            self._insert_project(conn, remote)
+            return
+
+        base_row, base_paragraphs = base if base is not None else (None, None)
+        local_row, local_paragraphs = local
+        remote_row, remote_paragraphs = remote
+
+        project_row = self._merge_row(base_row, local_row, remote_row, self._project_fields, None)
+
+        merged = {}
+        for paragraph_id in dict.fromkeys(list(local_paragraphs) + list(remote_paragraphs)):
+            l_row = local_paragraphs.get(paragraph_id)
+            r_row = remote_paragraphs.get(paragraph_id)
+            b_row = base_paragraphs.get(paragraph_id) if base_paragraphs is not None else None
+
+            if l_row is not None and r_row is not None:
+                merged[paragraph_id] = self._merge_row(b_row, l_row, r_row, self._paragraph_fields, local_row)
+            elif b_row is None:
+                # Added on one side
+                merged[paragraph_id] = l_row if l_row is not None else r_row
+            elif not self._same_fields(l_row if l_row is not None else r_row, b_row, self._paragraph_fields):
+                # Edited on one side, deleted on the other: the edit is kept
+                kept = 'local' if l_row is not None else 'remote'
+                merged[paragraph_id] = l_row if l_row is not None else r_row
+                self._conflict(local_row, paragraph_id, ['deleted'], kept, {})
+            # else: deleted on one side and untouched on the other
+
+        order = self._merge_order(
+            _sequence(base_paragraphs) if base_paragraphs is not None else None,
+            _sequence(local_paragraphs), _sequence(remote_paragraphs),
+            merged, local_row, remote_row)
+        if order != _sequence(local_paragraphs):
+            for index, paragraph_id in enumerate(order):
+                merged[paragraph_id] = dict(merged[paragraph_id], order=index)
+
+        changed = self._apply_paragraphs(conn, local_paragraphs, merged)
+        if changed or project_row != local_row:
+            project_row['modified_at'] = max(local_row['modified_at'], remote_row['modified_at'])
+            self._update_row(conn, 'projects', local_row, project_row)
+            self._stats["projects_updated"] += 1
+            self._stats["projects_changed"].append(project_id)
+
+    def _merge_row(self, base, local, remote, fields, project_row):
+        """Field-by-field merge of the local and remote versions of a row"""
+        local_wins = (local.get('modified_at') or '') >= (remote.get('modified_at') or '')
+        if base is None:
+            # No common ancestor: the older version stands in for it
+            base = remote if local_wins else local
+
+        merged = dict(local)
+        clashes = []
+        for field in fields:
+            merge = merge_json_object if field in JSON_OBJECT_COLUMNS else _merge_value
+            merged[field], clash = merge(base.get(field), local.get(field), remote.get(field), local_wins)
+            if clash:
+                clashes.append(field)
+
+        if clashes:
+            loser = remote if local_wins else local
+            self._conflict(project_row or local, local['id'] if project_row else None, clashes,
+                           'local' if local_wins else 'remote', {f: loser.get(f) for f in clashes})
+        if any(merged[field] != local.get(field) for field in fields):
+            newest = max(local['modified_at'], remote['modified_at'])
+            if project_row is not None and (
+                    newest != remote['modified_at'] or
+                    any(merged[field] != remote.get(field) for field in fields)):
+                # A paragraph version neither side had gets a timestamp of
+                # its own: (id, modified_at) identifies the content of a
+                # paragraph (see core.merkle.MerkleCache)
+                newest = _fresh_timestamp(newest)
+            merged['modified_at'] = newest
+        return merged
+
+    def _merge_order(self, base_seq, local_seq, remote_seq, merged, local_row, remote_row):
+        """
+        Merge the paragraph order as a sequence.
+
+        The side that reordered the paragraphs it shares with the base gives
+        the order; paragraphs only found in the other side are inserted
+        after the paragraph they follow there.
+        """
+        local_newer = local_row['modified_at'] >= remote_row['modified_at']
+        if base_seq is None:
+            primary, secondary = (local_seq, remote_seq) if local_newer else (remote_seq, local_seq)
+        else:
+            shared = set(base_seq) & set(local_seq) & set(remote_seq)
+            base_rel = [pid for pid in base_seq if pid in shared]
+            local_rel = [pid for pid in local_seq if pid in shared]
+            remote_rel = [pid for pid in remote_seq if pid in shared]
+            if local_rel == base_rel:
+                primary, secondary = remote_seq, local_seq
+            elif remote_rel == base_rel or remote_rel == local_rel:
+                primary, secondary = local_seq, remote_seq
+            else:
+                primary, secondary = (local_seq, remote_seq) if local_newer else (remote_seq, local_seq)
+                self._conflict(local_row, None, ['order'], 'local' if local_newer else 'remote', {})
+
+        result = [pid for pid in primary if pid in merged]
+        placed = set(result)
+        previous = None
+        for pid in secondary:
+            if pid in placed:
+                previous = pid
+                continue
+            if pid not in merged:
+                continue
+            result.insert(result.index(previous) + 1 if previous is not None else 0, pid)
+            placed.add(pid)
+            previous = pid
+        return result
+
+    @staticmethod
+    def _same_fields(row, other, fields):
+        return all(row.get(field) == other.get(field) for field in fields)
+
+    def _same_project(self, side, base):
+        """Whether a project is unchanged since the base (order included)"""
+        row, paragraphs = side
+        base_row, base_paragraphs = base
+        if not self._same_fields(row, base_row, self._project_fields):
+            return False
+        if paragraphs.keys() != base_paragraphs.keys():
+            return False
+        return all(
+            self._same_fields(paragraphs[pid], base_paragraphs[pid], self._paragraph_fields + ['order'])
+            for pid in paragraphs
+        )
+
+    def _conflict(self, project_row, paragraph_id, fields, kept, discarded):
+        self._stats["conflicts"].append({
+            'project_id': project_row['id'],
+            'project_name': project_row.get('name'),
+            'paragraph_id': paragraph_id,
+            'fields': fields,
+            'kept': kept,
+            'discarded': discarded,
+        })
+
+    # Writing
+
+    def _replace_projects(self, conn, project_ids, project_columns, paragraph_columns):
+        """Make the local rows of these projects those of the remote database"""
+        if not project_ids:
+            return
+        self._id_table(conn, 'merge_replaced', project_ids)
+        projects = "SELECT id FROM temp.merge_replaced"
+
+        cursor = conn.execute(f"""
+            DELETE FROM main.paragraphs WHERE project_id IN ({projects}) AND NOT EXISTS (
+                SELECT 1 FROM backup.paragraphs b
+                WHERE b.id = main.paragraphs.id AND b.project_id = main.paragraphs.project_id
+            )
+        """)
+        self._stats["paragraphs_deleted"] += max(cursor.rowcount, 0)
+
+        # Remote rows missing or different locally
+        differ = ' OR '.join(f'b."{c}" IS NOT l."{c}"' for c in paragraph_columns if c != 'id')
+        incoming = f"""
+            SELECT {', '.join(f'b."{c}"' for c in paragraph_columns)}
+            FROM backup.paragraphs b LEFT JOIN main.paragraphs l ON l.id = b.id
+            WHERE b.project_id IN ({projects}) AND (l.id IS NULL OR {differ})
+        """
+        added = conn.execute(f"""
+            SELECT COUNT(*) FROM backup.paragraphs b
+            WHERE b.project_id IN ({projects}) AND b.id NOT IN (SELECT id FROM main.paragraphs)
+        """).fetchone()[0]
+        cursor = conn.execute(self._upsert_sql('paragraphs', paragraph_columns, incoming))
+        self._stats["paragraphs_added"] += added
+        self._stats["paragraphs_updated"] += max(cursor.rowcount, 0) - added
+
+        new = conn.execute(f"""
+            SELECT COUNT(*) FROM ({projects}) WHERE id NOT IN (SELECT id FROM main.projects)
+        """).fetchone()[0]
+        conn.execute(self._upsert_sql('projects', project_columns,
+                                      f"SELECT {_quoted(project_columns)} FROM backup.projects "
+                                      f"WHERE id IN ({projects})"))
+        self._stats["projects_added"] += new
+        self._stats["projects_updated"] += len(project_ids) - new
+        self._stats["projects_changed"].extend(project_ids)
+
+    def _delete_projects(self, conn, project_ids):
+        for project_id in project_ids:
+            self._delete_project(conn, project_id)
+
+    def _apply_paragraphs(self, conn, local_paragraphs, merged):
+        """Write the differences between the local and merged paragraphs"""
+        changed = 0
+        for paragraph_id in local_paragraphs.keys() - merged.keys():
+            conn.execute("DELETE FROM main.paragraphs WHERE id = ?", (paragraph_id,))
+            self._stats["paragraphs_deleted"] += 1
+            changed += 1
+
+        for paragraph_id, row in merged.items():
+            current = local_paragraphs.get(paragraph_id)
+            if current is None:
+                self._insert_row(conn, 'paragraphs', row)
+                self._stats["paragraphs_added"] += 1
+                changed += 1
+            elif self._update_row(conn, 'paragraphs', current, row):
+                self._stats["paragraphs_updated"] += 1
+                changed += 1
+        return changed
+
+    def _insert_project(self, conn, project):
+        row, paragraphs = project
+        self._insert_row(conn, 'projects', row)
+        for p_row in paragraphs.values():
+            self._insert_row(conn, 'paragraphs', p_row)
+        self._stats["projects_added"] += 1
+        self._stats["paragraphs_added"] += len(paragraphs)
+        self._stats["projects_changed"].append(row['id'])
+
+    def _delete_project(self, conn, project_id):
+        cursor = conn.execute("DELETE FROM main.paragraphs WHERE project_id = ?", (project_id,))
+        conn.execute("DELETE FROM main.projects WHERE id = ?", (project_id,))
+        self._stats["projects_deleted"] += 1
+        self._stats["paragraphs_deleted"] += max(cursor.rowcount, 0)
+        self._stats["projects_changed"].append(project_id)
+
+    @staticmethod
+    def _id_table(conn, name, ids):
+        """Temp table of ids, dropped with the connection"""
+        conn.execute(f"CREATE TEMP TABLE {name} (id TEXT PRIMARY KEY)")
+        conn.executemany(f"INSERT INTO temp.{name} (id) VALUES (?)", [(i,) for i in ids])
+
+    @staticmethod
+    def _upsert_sql(table, columns, select):
+        """Copy the rows of select into a local table, updating rows with the same id"""
+        updates = ', '.join(f'{_quoted([c])} = excluded.{_quoted([c])}' for c in columns if c != 'id')
+        # WHERE true: without it "ON" would be parsed as a join constraint
+        return f"""
+            INSERT INTO main.{table} ({_quoted(columns)})
+            SELECT * FROM ({select}) WHERE true
+            ON CONFLICT(id) DO UPDATE SET {updates}
+        """
+
+    @staticmethod
+    def _insert_row(conn, table, row):
+        columns = list(row)
+        conn.execute(
+            f"INSERT OR REPLACE INTO main.{table} ({_quoted(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})",
+            [row[c] for c in columns]
+        )
+
+    @staticmethod
+    def _update_row(conn, table, current, row):
+        """UPDATE only the columns that changed; returns whether anything did"""
+        changed = [c for c in row if c != 'id' and row[c] != current.get(c)]
+        if not changed:
+            return False
+        conn.execute(
+            f"UPDATE main.{table} SET {', '.join(f'{_quoted([c])} = ?' for c in changed)} WHERE id = ?",
+            [row[c] for c in changed] + [row['id']]
+        )
+        return True
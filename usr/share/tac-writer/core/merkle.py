@@ -0,0 +1,394 @@
+"""
+TAC Merkle
+Content hashes of a database arranged as a Merkle tree (paragraphs ->
+projects -> library), used to preview a merge without comparing every row
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .merger import JSON_OBJECT_COLUMNS, merge_json_object
+
+# Fields hashed separately, so a preview can tell which fields changed
+# (the same fields DatabaseMerger merges one by one)
+PROJECT_FIELDS = ['name', 'metadata', 'document_formatting']
+PARAGRAPH_FIELDS = ['type', 'content', 'formatting', 'footnotes']
+
+
+
+def _digest(value) -> bytes:
+    if value is None:
+        return b'\x00' * 8
+    return hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+
+
+def _quoted(names, available):
+    return ', '.join(f'"{name}"' if name in available else 'NULL' for name in names)
+
+
+class Leaf:
+    """Hash of one paragraph (one digest per field and one over all of them)"""
+
+    __slots__ = ('fields', 'hash', 'modified_at', 'order')
+
+    def __init__(self, fields: Tuple[bytes, ...], leaf_hash: bytes, modified_at: str, order: int):
+        self.fields = fields
+        self.hash = leaf_hash
+        self.modified_at = modified_at
+        self.order = order
+
+
+class ProjectNode:
+    """Hash of one project: its own fields plus its paragraphs in order"""
+
+    __slots__ = ('id', 'name', 'modified_at', 'fields', 'leaves', 'hash')
+
+    def __init__(self, project_id: str, name: str, modified_at: str, fields: Tuple[bytes, ...]):
+        self.id = project_id
+        self.name = name
+        self.modified_at = modified_at
+        self.fields = fields
+        self.leaves: Dict[str, Leaf] = {}
+        self.hash = b''
+
+    def seal(self) -> None:
+        """Put the leaves in document order and compute the project hash"""
+        self.leaves = dict(sorted(self.leaves.items(), key=lambda item: (item[1].order or 0, item[0])))
+        h = hashlib.blake2b(b''.join(self.fields), digest_size=16)
+        for paragraph_id, leaf in self.leaves.items():
+            h.update(paragraph_id.encode('utf-8'))
+            h.update(leaf.hash)
+        self.hash = h.digest()
+
+    def sequence(self) -> List[str]:
+        """Paragraph ids in document order"""
+        return list(self.leaves)
+
+
+class MerkleTree:
+    """Project nodes of a database and the root hash over all of them"""
+
+    def __init__(self, db_path, projects: Dict[str, ProjectNode]):
+        self.db_path = Path(db_path)
+        self.projects = projects
+        h = hashlib.blake2b(digest_size=16)
+        for project_id in sorted(projects):
+            h.update(project_id.encode('utf-8'))
+            h.update(projects[project_id].hash)
+        self.root = h.digest()
+
+    def row_values(self, table: str, row_id: str, names: List[str]) -> Dict[str, object]:
+        """Current values of some fields of a row (used for the rare detailed checks)"""
+        conn = _connect(self.db_path)
+        try:
+            available = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            row = conn.execute(f"SELECT {_quoted(names, available)} FROM {table} WHERE id = ?",
+                               (row_id,)).fetchone()
+        finally:
+            conn.close()
+        return dict(zip(names, row)) if row else {}
+
+
+class MerkleCache:
+    """
+    Paragraph hashes keyed by (paragraph id, modified_at).
+
+    Every edit bumps modified_at, and a merge gives the paragraphs it
+    combines from both sides a new one, so a paragraph with a known key does
+    not need its content read and hashed again. The cache is shared between
+    databases (local, backup, sync base), since copies of one library have
+    mostly the same paragraphs.
+    """
+
+    def __init__(self, max_entries: int = 500000):
+        self.max_entries = max_entries
+        self._hashes: Dict[Tuple[str, str], Tuple[Tuple[bytes, ...], bytes]] = {}
+        # Last tree built per database file, with the file stamp it matches
+        self._trees: Dict[str, Tuple[tuple, 'MerkleTree']] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self) -> Callable:
+        """Lock-free getter for a build (dict reads are atomic)"""
+        return self._hashes.get
+
+    def put_many(self, items) -> None:
+        with self._lock:
+            if len(self._hashes) + len(items) > self.max_entries:
+                self._hashes = {}
+            self._hashes.update(items)
+
+    def tree(self, db_path, stamp) -> Optional['MerkleTree']:
+        with self._lock:
+            entry = self._trees.get(str(db_path))
+        return entry[1] if entry is not None and entry[0] == stamp else None
+
+    def put_tree(self, db_path, stamp, tree: 'MerkleTree') -> None:
+        with self._lock:
+            self._trees[str(db_path)] = (stamp, tree)
+
+
+def _file_stamp(db_path) -> tuple:
+    """Size and mtime of a database and its WAL file"""
+    stamp = []
+    for path in (Path(db_path), Path(f"{db_path}-wal")):
+        try:
+            st = path.stat()
+            stamp.append((st.st_size, st.st_mtime_ns))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _connect(db_path):
+    return sqlite3.connect(f"file:{Path(db_path)}?mode=ro", uri=True, timeout=30.0)
+
+
+def build_tree(db_path, cache: Optional[MerkleCache] = None) -> MerkleTree:
+    """
+    Hash a database. Only paragraphs missing from the cache are read in
+    full, and an unchanged file reuses its previous tree.
+    """
+    stamp = _file_stamp(db_path)
+    if cache is not None:
+        tree = cache.tree(db_path, stamp)
+        if tree is not None:
+            return tree
+
+    conn = _connect(db_path)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(paragraphs)")}
+        project_columns = {row[1] for row in conn.execute("PRAGMA table_info(projects)")}
+
+        projects = {}
+        for row in conn.execute(
+                f"SELECT id, name, modified_at, {_quoted(PROJECT_FIELDS, project_columns)} FROM projects"):
+            projects[row[0]] = ProjectNode(row[0], row[1], row[2], tuple(map(_digest, row[3:])))
+
+        lookup = cache.lookup() if cache is not None else {}.get
+        missing = {}
+        for paragraph_id, project_id, modified_at, order in conn.execute(
+                'SELECT id, project_id, modified_at, "order" FROM paragraphs'):
+            node = projects.get(project_id)
+            if node is None:
+                continue
+            hashes = lookup((paragraph_id, modified_at))
+            if hashes is None:
+                missing[paragraph_id] = node
+            else:
+                node.leaves[paragraph_id] = Leaf(hashes[0], hashes[1], modified_at, order)
+
+        if missing:
+            fresh = {}
+            # Paragraphs not in the cache: read their content in one pass
+            for row in conn.execute(
+                    f'SELECT id, modified_at, "order", {_quoted(PARAGRAPH_FIELDS, columns)} FROM paragraphs'):
+                node = missing.get(row[0])
+                if node is None:
+                    continue
+                fields = tuple(map(_digest, row[3:]))
+                leaf_hash = hashlib.blake2b(b''.join(fields), digest_size=8).digest()
+                node.leaves[row[0]] = Leaf(fields, leaf_hash, row[1], row[2])
+                fresh[(row[0], row[1])] = (fields, leaf_hash)
+            if cache is not None:
+                cache.put_many(fresh)
+    finally:
+        conn.close()
+
+    for node in projects.values():
+        node.seal()
+    tree = MerkleTree(db_path, projects)
+    if cache is not None:
+        cache.put_tree(db_path, stamp, tree)
+    return tree
+
+
+class MergePreview:
+    """
+    What merging a database into the local one would do (dry run).
+
+    Each list holds dicts with project_id, project_name and, for
+    paragraph entries, paragraph_id.
+    """
+
+    def __init__(self):
+        self.projects_added: List[Dict] = []
+        self.projects_updated: List[Dict] = []
+        self.projects_deleted: List[Dict] = []
+        self.paragraphs_added: List[Dict] = []
+        self.paragraphs_updated: List[Dict] = []
+        self.paragraphs_deleted: List[Dict] = []
+        self.conflicts: List[Dict] = []
+        self.projects_compared = 0
+
+    def is_empty(self) -> bool:
+        return not (self.projects_added or self.projects_updated or self.projects_deleted
+                    or self.conflicts)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'projects_added': len(self.projects_added),
+            'projects_updated': len(self.projects_updated),
+            'projects_deleted': len(self.projects_deleted),
+            'paragraphs_added': len(self.paragraphs_added),
+            'paragraphs_updated': len(self.paragraphs_updated),
+            'paragraphs_deleted': len(self.paragraphs_deleted),
+            'conflicts': len(self.conflicts),
+        }
+
+
+def diff_trees(local: MerkleTree, remote: MerkleTree, base: Optional[MerkleTree] = None) -> MergePreview:
+    """
+    Compare two trees top-down, following the rules of DatabaseMerger.
+
+    Equal roots end the comparison; otherwise only projects whose hashes
+    differ are descended into. With a base tree (the common ancestor),
+    changes on both sides of the same field are conflicts; without one the
+    newer version wins and nothing is deleted.
+    """
+    preview = MergePreview()
+    if local.root == remote.root:
+        return preview
+
+    base_projects = base.projects if base is not None else None
+    for project_id in sorted(local.projects.keys() | remote.projects.keys()):
+        l_node = local.projects.get(project_id)
+        r_node = remote.projects.get(project_id)
+        if l_node is not None and r_node is not None and l_node.hash == r_node.hash:
+            continue
+        preview.projects_compared += 1
+        b_node = base_projects.get(project_id) if base_projects is not None else None
+        _diff_project(preview, (base, local, remote), b_node, l_node, r_node)
+    return preview
+
+
+def _entry(node: ProjectNode, paragraph_id: Optional[str] = None, **extra) -> Dict:
+    entry = {'project_id': node.id, 'project_name': node.name}
+    if paragraph_id is not None:
+        entry['paragraph_id'] = paragraph_id
+    entry.update(extra)
+    return entry
+
+
+def _diff_project(preview: MergePreview, trees, base, local, remote) -> None:
+    if remote is None:
+        if base is not None:
+            if local.hash == base.hash:
+                preview.projects_deleted.append(_entry(local))
+                preview.paragraphs_deleted.extend(_entry(local, pid) for pid in local.leaves)
+            else:
+                preview.conflicts.append(_entry(local, fields=['deleted'], kept='local'))
+        return
+
+    if local is None:
+        if base is not None:
+            if remote.hash == base.hash:
+                return
+            preview.conflicts.append(_entry(remote, fields=['deleted'], kept='remote'))
+        preview.projects_added.append(_entry(remote))
+        preview.paragraphs_added.extend(_entry(remote, pid) for pid in remote.leaves)
+        return
+
+    local_wins = local.modified_at >= remote.modified_at
+    changed, clash = _diff_fields(base.fields if base is not None else None,
+                                  local.fields, remote.fields, local_wins,
+                                  _resolver(trees, 'projects', local.id, PROJECT_FIELDS))
+    if clash:
+        preview.conflicts.append(_entry(local, fields=[PROJECT_FIELDS[i] for i in clash],
+                                        kept='local' if local_wins else 'remote'))
+
+    base_leaves = base.leaves if base is not None else None
+    for paragraph_id in local.leaves.keys() | remote.leaves.keys():
+        l_leaf = local.leaves.get(paragraph_id)
+        r_leaf = remote.leaves.get(paragraph_id)
+        b_leaf = base_leaves.get(paragraph_id) if base_leaves is not None else None
+
+        if l_leaf is not None and r_leaf is not None:
+            if l_leaf.hash == r_leaf.hash:
+                continue
+            leaf_local_wins = l_leaf.modified_at >= r_leaf.modified_at
+            updated, clash = _diff_fields(b_leaf.fields if b_leaf is not None else None,
+                                          l_leaf.fields, r_leaf.fields, leaf_local_wins,
+                                          _resolver(trees, 'paragraphs', paragraph_id, PARAGRAPH_FIELDS))
+            if clash:
+                preview.conflicts.append(_entry(local, paragraph_id,
+                                                fields=[PARAGRAPH_FIELDS[i] for i in clash],
+                                                kept='local' if leaf_local_wins else 'remote'))
+            if updated:
+                preview.paragraphs_updated.append(_entry(local, paragraph_id))
+                changed = True
+        elif b_leaf is None:
+            if r_leaf is not None:
+                preview.paragraphs_added.append(_entry(local, paragraph_id))
+                changed = True
+        else:
+            leaf = l_leaf if l_leaf is not None else r_leaf
+            if leaf.hash != b_leaf.hash:
+                preview.conflicts.append(_entry(local, paragraph_id, fields=['deleted'],
+                                                kept='local' if l_leaf is not None else 'remote'))
+            elif l_leaf is not None:
+                preview.paragraphs_deleted.append(_entry(local, paragraph_id))
+                changed = True
+
+    reordered, clash = _diff_order(base, local, remote, local_wins)
+    if clash:
+        preview.conflicts.append(_entry(local, fields=['order'], kept='local' if local_wins else 'remote'))
+    if changed or reordered:
+        preview.projects_updated.append(_entry(local))
+
+
+def _diff_order(base, local, remote, local_wins) -> Tuple[bool, bool]:
+    """Whether the remote paragraph order would be taken, and whether both sides reordered"""
+    shared = local.leaves.keys() & remote.leaves.keys()
+    if base is not None:
+        shared &= base.leaves.keys()
+    local_rel = [pid for pid in local.sequence() if pid in shared]
+    remote_rel = [pid for pid in remote.sequence() if pid in shared]
+    if local_rel == remote_rel:
+        return False, False
+    if base is None:
+        return not local_wins, False
+    base_rel = [pid for pid in base.sequence() if pid in shared]
+    if local_rel == base_rel:
+        return True, False
+    if remote_rel == base_rel:
+        return False, False
+    return not local_wins, True
+
+
+def _resolver(trees, table, row_id, names) -> Callable:
+    """Loads (base, local, remote) values of a field when hashes are not enough"""
+    def resolve(index):
+        values = [tree.row_values(table, row_id, [names[index]]).get(names[index]) for tree in trees]
+        return names[index], values
+    return resolve
+
+
+def _diff_fields(base, local, remote, local_wins, resolve) -> Tuple[bool, List[int]]:
+    """
+    Field-wise three-way comparison of hashes.
+
+    Returns whether the local row would change and the indexes of the
+    conflicting fields. JSON object fields changed on both sides are read
+    back and compared key by key, as DatabaseMerger merges them.
+    """
+    if base is None:
+        # No common ancestor: the older version stands in for it
+        base = remote if local_wins else local
+    updated = False
+    clash = []
+    for index, (b, l, r) in enumerate(zip(base, local, remote)):
+        if l == r or r == b:
+            continue
+        if l == b:
+            updated = True
+            continue
+        name, values = resolve(index)
+        if name in JSON_OBJECT_COLUMNS and not merge_json_object(*values, local_wins)[1]:
+            updated = True
+            continue
+        clash.append(index)
+        updated = updated or not local_wins
+    return updated, clash
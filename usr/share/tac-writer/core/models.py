@@ -140,8 +140,9 @@ class Paragraph:
     
     def set_image_metadata(self, filename: str, path: str, original_size: tuple, 
                           display_size: tuple, alignment: str = 'center', 
-                          caption: str = '', alt_text: str = '', width_percent: float = 80.0) -> None:
-        """Set metadata for image paragraph"""
+                          caption: str = '', alt_text: str = '', width_percent: float = 80.0,
+                          content_hash: str = '') -> None:
+        """Set metadata for image paragraph (content_hash: SHA-256 of the file, used by sync)"""
         import json
         if self.type != ParagraphType.IMAGE:
             raise ValueError("Can only set image metadata on IMAGE type paragraphs")
@@ -156,6 +157,8 @@ class Paragraph:
             'alt_text': alt_text,
             'width_percent': width_percent
         }
+        if content_hash:
+            metadata['hash'] = content_hash
         self.content = json.dumps(metadata)
         self.modified_at = datetime.now()
     
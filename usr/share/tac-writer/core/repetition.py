@@ -0,0 +1,260 @@
+"""
+TAC Repetition
+Local detection of repeated words and near-duplicate paragraphs
+(word shingles, MinHash signatures and LSH buckets)
+"""
+
+import hashlib
+import random
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .markup import strip_markup
+from .models import ParagraphType
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:[-'’][^\W\d_]+)*")
+
+# Paragraphs whose text is not prose
+_SKIPPED_TYPES = {ParagraphType.IMAGE, ParagraphType.LATEX, ParagraphType.CODE}
+
+# Words too common to count as a repetition
+_STOPWORDS = frozenset("""
+    a à ao aos as às até com como da das de do dos e é ela elas ele eles em
+    entre era essa essas esse esses esta estas este estes eu foi for há isso
+    isto já lhe lhes mais mas me mesma mesmo muito na nas nem no nos não o
+    os ou para pela pelas pelo pelos por porque quando que quem se seja sem
+    ser seu seus sua suas são também tem têm um uma umas uns você
+    about after also and are been but can could does for from had has have
+    her his its not one our she such than that the their them then there
+    these they this those was were what when which who will with would you
+""".split())
+
+# Key of an indexed paragraph: (project_id, paragraph_id)
+ParagraphKey = Tuple[str, str]
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Words of a plain text as (lowercased word, start, end)"""
+    return [(m.group().casefold(), m.start(), m.end()) for m in _WORD_RE.finditer(text)]
+
+
+class RepeatedWord:
+    """A word used more than once within the sliding window"""
+
+    __slots__ = ('word', 'spans')
+
+    def __init__(self, word: str, spans: List[Tuple[int, int]]):
+        self.word = word
+        # Plain-text offsets of every occurrence involved
+        self.spans = spans
+
+
+class _Entry:
+    """Indexed state of one paragraph"""
+
+    __slots__ = ('content', 'plain', 'shingles', 'signature', 'repetitions')
+
+    def __init__(self, content, plain, shingles, signature, repetitions):
+        self.content = content
+        self.plain = plain
+        self.shingles = shingles
+        self.signature = signature
+        self.repetitions = repetitions
+
+
+class RepetitionIndex:
+    """
+    Incremental index of paragraphs for repetition and near-duplicate checks.
+
+    Each paragraph is reduced to its word n-gram shingles and a MinHash
+    signature. Signatures are split into bands that are hashed into LSH
+    buckets, so candidate duplicates are found without comparing every
+    pair; candidates are then confirmed with the exact Jaccard similarity
+    of their shingles. Paragraphs are only re-indexed when their content
+    changed. The index is guarded by a lock and can be fed from a worker
+    thread.
+    """
+
+    def __init__(self, window: int = 40, shingle_size: int = 3,
+                 num_perm: int = 64, bands: int = 16, min_word_length: int = 4):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.window = window
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.min_word_length = min_word_length
+
+        # One random 64-bit mask per hash function: XOR-ing the (already
+        # well mixed) shingle hashes with it acts as the permutation, and
+        # map() keeps the inner loop in C. Fixed seed: signatures stay
+        # comparable between runs
+        rng = random.Random(1)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+
+        self._entries: Dict[ParagraphKey, _Entry] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[ParagraphKey]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Indexing
+
+    def update(self, key: ParagraphKey, content: str,
+               paragraph_type: ParagraphType = ParagraphType.ARGUMENT) -> bool:
+        """Index a paragraph; returns False if it was already up to date"""
+        content = content or ''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.content is content or entry.content == content):
+                return False
+            if entry is not None:
+                self._unbucket(key, entry)
+
+            plain = strip_markup(content) if paragraph_type not in _SKIPPED_TYPES else ''
+            words = tokenize(plain)
+            shingles = self._shingles([word for word, _start, _end in words])
+            signature = self._signature(shingles) if shingles else None
+            entry = _Entry(content, plain, shingles, signature, self._repetitions(words))
+            self._entries[key] = entry
+            if signature is not None:
+                for band in self._bands(signature):
+                    self._buckets.setdefault(band, set()).add(key)
+            return True
+
+    def remove(self, key: ParagraphKey) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._unbucket(key, entry)
+
+    def sync(self, project_id: str, paragraphs: Iterable[Tuple[str, ParagraphType, str]]) -> int:
+        """
+        Bring the paragraphs of one project up to date.
+
+        paragraphs yields (paragraph_id, type, content). Paragraphs of the
+        project missing from it are dropped. Returns how many were re-indexed.
+        """
+        changed = 0
+        with self._lock:
+            live = set()
+            for paragraph_id, paragraph_type, content in paragraphs:
+                key = (project_id, paragraph_id)
+                live.add(key)
+                if self.update(key, content, paragraph_type):
+                    changed += 1
+            for key in [k for k in self._entries if k[0] == project_id and k not in live]:
+                self.remove(key)
+        return changed
+
+    def retain_projects(self, project_ids: Iterable[str]) -> None:
+        """Drop the paragraphs of projects that no longer exist"""
+        wanted = set(project_ids)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] not in wanted]:
+                self.remove(key)
+
+    # Queries
+
+    def repetitions(self, key: ParagraphKey) -> List[RepeatedWord]:
+        """Words repeated within the sliding window of a paragraph"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return list(entry.repetitions) if entry else []
+
+    def near_duplicates(self, key: ParagraphKey, threshold: float = 0.6) -> List[Tuple[ParagraphKey, float]]:
+        """Indexed paragraphs similar to the given one, most similar first"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.signature is None:
+                return []
+            candidates = set()
+            for band in self._bands(entry.signature):
+                candidates.update(self._buckets.get(band, ()))
+            candidates.discard(key)
+
+            found = []
+            for other in candidates:
+                similarity = _jaccard(entry.shingles, self._entries[other].shingles)
+                if similarity >= threshold:
+                    found.append((other, similarity))
+        found.sort(key=lambda item: item[1], reverse=True)
+        return found
+
+    def duplicate_pairs(self, project_id: Optional[str] = None,
+                        threshold: float = 0.6) -> List[Tuple[ParagraphKey, ParagraphKey, float]]:
+        """
+        Pairs of near-duplicate paragraphs, most similar first.
+
+        With project_id, only pairs involving that project are returned
+        (the other paragraph may belong to any indexed project).
+        """
+        pairs = {}
+        with self._lock:
+            keys = [k for k in self._entries if project_id is None or k[0] == project_id]
+            for key in keys:
+                for other, similarity in self.near_duplicates(key, threshold):
+                    pair = (key, other) if key < other else (other, key)
+                    pairs[pair] = similarity
+        return sorted(((a, b, s) for (a, b), s in pairs.items()), key=lambda item: item[2], reverse=True)
+
+    def plain_text(self, key: ParagraphKey) -> str:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.plain if entry else ''
+
+    # Internals
+
+    def _shingles(self, words: List[str]) -> frozenset:
+        size = self.shingle_size
+        if len(words) < size:
+            return frozenset()
+        return frozenset(
+            int.from_bytes(hashlib.blake2b(' '.join(words[i:i + size]).encode('utf-8'),
+                                           digest_size=8).digest(), 'little')
+            for i in range(len(words) - size + 1)
+        )
+
+    def _signature(self, shingles: frozenset) -> Tuple[int, ...]:
+        return tuple(min(map(mask.__xor__, shingles)) for mask in self._masks)
+
+    def _bands(self, signature: Tuple[int, ...]):
+        rows = self.rows
+        for band in range(self.bands):
+            yield (band, signature[band * rows:(band + 1) * rows])
+
+    def _unbucket(self, key: ParagraphKey, entry: _Entry) -> None:
+        if entry.signature is None:
+            return
+        for band in self._bands(entry.signature):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _repetitions(self, words: List[Tuple[str, int, int]]) -> List[RepeatedWord]:
+        """Content words seen again less than `window` words after the previous use"""
+        last_seen: Dict[str, int] = {}
+        spans: Dict[str, List[Tuple[int, int]]] = {}
+        for index, (word, start, end) in enumerate(words):
+            if len(word) < self.min_word_length or word in _STOPWORDS:
+                continue
+            previous = last_seen.get(word)
+            if previous is not None and index - previous <= self.window:
+                occurrences = spans.setdefault(word, [])
+                previous_span = (words[previous][1], words[previous][2])
+                if not occurrences or occurrences[-1] != previous_span:
+                    occurrences.append(previous_span)
+                occurrences.append((start, end))
+            last_seen[word] = index
+        return [RepeatedWord(word, occurrences) for word, occurrences in spans.items()]
+
+
+def _jaccard(first: frozenset, second: frozenset) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
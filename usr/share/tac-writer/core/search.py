@@ -0,0 +1,258 @@
+"""
+TAC Search
+Find and replace over the project model, independent of the editor widgets
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from .markup import parse_markup, serialize_markup, strip_markup
+from .models import Project, ParagraphType
+
+
+class SearchOptions:
+    """Matching modes of a search"""
+
+    def __init__(self, regex: bool = False, whole_word: bool = False,
+                 accent_insensitive: bool = False, case_sensitive: bool = False):
+        self.regex = regex
+        self.whole_word = whole_word
+        self.accent_insensitive = accent_insensitive
+        self.case_sensitive = case_sensitive
+
+    def key(self) -> Tuple[bool, bool]:
+        """Options that change the folded text"""
+        if self.regex:
+            # Accents cannot be folded out of a pattern, so regexes only fold case
+            return (False, self.case_sensitive)
+        return (self.accent_insensitive, self.case_sensitive)
+
+
+class SearchMatch:
+    """A match in the plain text of a paragraph"""
+
+    __slots__ = ('paragraph_id', 'start', 'end', 'groups')
+
+    def __init__(self, paragraph_id: str, start: int, end: int, groups=None):
+        self.paragraph_id = paragraph_id
+        self.start = start
+        self.end = end
+        # Spans of the regex groups in plain-text offsets, for replacement
+        self.groups = groups or {}
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+
+def fold_text(text: str, accent_insensitive: bool = False,
+              case_sensitive: bool = False) -> Tuple[str, Optional[List[int]]]:
+    """
+    Fold text for matching and map every folded character to its source offset.
+
+    Case folding may expand a character ("ß" -> "ss") and accent folding
+    drops combining marks, so the offset map is needed to translate matches
+    back to the plain text shown in the editor.
+    """
+    if not accent_insensitive:
+        folded = text if case_sensitive else text.casefold()
+        if len(folded) == len(text):
+            # Common case: folding kept the length, offsets are identical
+            return folded, None
+
+    pieces = []
+    offsets = []
+    for index, char in enumerate(text):
+        piece = char if case_sensitive else char.casefold()
+        if accent_insensitive:
+            piece = ''.join(c for c in unicodedata.normalize('NFD', piece)
+                            if not unicodedata.combining(c))
+        pieces.append(piece)
+        offsets.extend([index] * len(piece))
+    return ''.join(pieces), offsets
+
+
+class _FoldedParagraph:
+    """Cached plain and folded text of one paragraph"""
+
+    __slots__ = ('content', 'plain', 'folded')
+
+    def __init__(self, content: str, options_key: Tuple[bool, bool]):
+        self.content = content
+        self.plain = strip_markup(content)
+        self.folded = {options_key: fold_text(self.plain, *options_key)}
+
+    def get_folded(self, options_key: Tuple[bool, bool]) -> Tuple[str, Optional[List[int]]]:
+        folded = self.folded.get(options_key)
+        if folded is None:
+            folded = fold_text(self.plain, *options_key)
+            self.folded[options_key] = folded
+        return folded
+
+
+class SearchIndex:
+    """
+    Per-paragraph cache of folded text used by find and replace.
+
+    Entries are keyed by paragraph id and rebuilt only when the paragraph
+    content changed since it was folded.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _FoldedParagraph] = {}
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _entry(self, paragraph, options_key: Tuple[bool, bool]) -> _FoldedParagraph:
+        entry = self._entries.get(paragraph.id)
+        content = paragraph.content or ""
+        if entry is None or (entry.content is not content and entry.content != content):
+            entry = _FoldedParagraph(content, options_key)
+            self._entries[paragraph.id] = entry
+        return entry
+
+    def compile(self, query: str, options: SearchOptions):
+        """Compile the query into a pattern over folded text, or raise re.error"""
+        flags = 0
+        if options.regex:
+            # Folding the pattern source would change escapes (\S -> \s),
+            # so the pattern is kept as written and matches case-insensitively
+            pattern = query
+            if not options.case_sensitive:
+                flags = re.IGNORECASE
+        else:
+            pattern = re.escape(fold_text(query, *options.key())[0])
+        if options.whole_word:
+            pattern = rf'\b(?:{pattern})\b'
+        return re.compile(pattern, flags)
+
+    def find_all(self, project: Project, query: str, options: SearchOptions) -> List[SearchMatch]:
+        """Return every match in document order"""
+        if not query or not project:
+            return []
+
+        compiled = self.compile(query, options)
+        options_key = options.key()
+        live_ids = set()
+        matches: List[SearchMatch] = []
+
+        for paragraph in project.paragraphs:
+            live_ids.add(paragraph.id)
+            if paragraph.type == ParagraphType.IMAGE:
+                continue
+            folded, offsets = self._entry(paragraph, options_key).get_folded(options_key)
+            for found in compiled.finditer(folded):
+                if found.end() == found.start():
+                    # Empty regex matches cannot be highlighted or replaced
+                    continue
+                start, end = _to_plain(found.span(), offsets)
+                groups = {}
+                for group in range(1, (compiled.groups or 0) + 1):
+                    if found.start(group) >= 0:
+                        groups[group] = _to_plain(found.span(group), offsets)
+                for name, group in compiled.groupindex.items():
+                    if group in groups:
+                        groups[name] = groups[group]
+                matches.append(SearchMatch(paragraph.id, start, end, groups))
+
+        # Forget paragraphs that were removed from the project
+        for paragraph_id in list(self._entries):
+            if paragraph_id not in live_ids:
+                del self._entries[paragraph_id]
+
+        return matches
+
+    def replace_all(self, project: Project, query: str, replacement: str,
+                    options: SearchOptions) -> Dict[str, Tuple[str, str]]:
+        """
+        Compute the replacement of every match without touching the project.
+
+        Returns {paragraph_id: (old_content, new_content)} for the changed
+        paragraphs; inline formatting of the first replaced character is kept.
+        """
+        changes: Dict[str, Tuple[str, str]] = {}
+        by_paragraph: Dict[str, List[SearchMatch]] = {}
+        for match in self.find_all(project, query, options):
+            by_paragraph.setdefault(match.paragraph_id, []).append(match)
+
+        for paragraph_id, matches in by_paragraph.items():
+            paragraph = project.get_paragraph(paragraph_id)
+            entry = self._entries[paragraph_id]
+            edits = []
+            for match in matches:
+                text = _expand(replacement, match, entry.plain) if options.regex else replacement
+                edits.append((match.start, match.end, text))
+            new_content = replace_ranges(paragraph.content, edits)
+            if new_content != paragraph.content:
+                changes[paragraph_id] = (paragraph.content, new_content)
+
+        return changes
+
+
+def replace_ranges(content: str, edits: List[Tuple[int, int, str]]) -> str:
+    """
+    Replace sorted, non-overlapping plain-text ranges of stored content.
+
+    Each replacement takes the inline tags of the first character it replaces.
+    """
+    runs = []
+    offset = 0
+    for text, tags in parse_markup(content):
+        runs.append((offset, offset + len(text), text, tags))
+        offset += len(text)
+
+    output = []
+    cursor = 0
+    for start, end, replacement in edits:
+        output.extend(_slice_runs(runs, cursor, start))
+        output.append((replacement, _tags_at(runs, start)))
+        cursor = end
+    output.extend(_slice_runs(runs, cursor, offset))
+    return serialize_markup(output)
+
+
+def _slice_runs(runs, start: int, end: int):
+    """Runs restricted to the plain-text range [start, end)"""
+    for run_start, run_end, text, tags in runs:
+        if run_end <= start or run_start >= end:
+            continue
+        yield (text[max(start, run_start) - run_start:min(end, run_end) - run_start], tags)
+
+
+def _tags_at(runs, position: int):
+    """Inline tags of the character at position"""
+    for run_start, run_end, _text, tags in runs:
+        if run_start <= position < run_end:
+            return tags
+    return frozenset()
+
+
+def _to_plain(span: Tuple[int, int], offsets: Optional[List[int]]) -> Tuple[int, int]:
+    """Translate a span of folded text to plain-text offsets"""
+    start, end = span
+    if offsets is None:
+        return start, end
+    if start >= len(offsets):
+        # Empty span at the very end of the text
+        position = offsets[-1] + 1 if offsets else 0
+        return position, position
+    if end <= start:
+        return offsets[start], offsets[start]
+    return offsets[start], offsets[end - 1] + 1
+
+
+_GROUP_REF_RE = re.compile(r'\\(?:(\d+)|g<(\w+)>|(.))')
+
+
+def _expand(template: str, match: SearchMatch, plain: str) -> str:
+    """Expand \\1 and \\g<name> references with the original (unfolded) text"""
+    def substitute(ref):
+        number, name, escaped = ref.groups()
+        if escaped is not None:
+            return {'n': '\n', 't': '\t'}.get(escaped, escaped)
+        key = int(number) if number else (int(name) if name.isdigit() else name)
+        span = match.groups.get(key)
+        return plain[span[0]:span[1]] if span else ''
+    return _GROUP_REF_RE.sub(substitute, template)
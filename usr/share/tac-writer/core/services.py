@@ -4,35 +4,32 @@ Business logic and data services for the TAC application
 """
 
 import json
+import logging
 import shutil
 import zipfile
 import sqlite3
 import threading
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterator, List, Optional, Any
 from datetime import datetime
 
 from .config import Config
 from .models import Project, Paragraph, ParagraphType
-from utils.helpers import FileHelper
+from .changelog import install_change_log
+from .document import Document, DocumentCache, TextBlock
+from .markup import Run, render_markup
+from utils.helpers import FileHelper, DependencyHelper
+from utils.tracing import traced
 from utils.i18n import _
 
-# PyLaTeX dependencies
-try:
-    from pylatex import Document, Section, Subsection, Command, Package, \
-                        Figure, NoEscape, NewLine
-
-    from pylatex.base_classes import Environment
-    from pylatex.utils import italic, bold, escape_latex
+logger = logging.getLogger(__name__)
 
-    class Quote(Environment):
-        pass
-
-    PYLATEX_AVAILABLE = True
-except ImportError as e:
-    print(f"ERRO PYLATEX: {e}")
-    PYLATEX_AVAILABLE = False
+# Optional export dependencies are probed here and imported by the exporters
+# that need them, so loading this module stays cheap
+PYLATEX_AVAILABLE = DependencyHelper.is_available('pylatex')
+PDF_AVAILABLE = DependencyHelper.is_available('reportlab')
+IMAGE_PROCESSING_AVAILABLE = DependencyHelper.is_available('PIL')
 
 # ODT export dependencies
 try:
@@ -41,24 +38,26 @@ try:
 except ImportError:
     ODT_AVAILABLE = False
 
-# PDF export dependencies
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import cm
-    from reportlab.platypus import SimpleDocTemplate, Paragraph as RLParagraph, Spacer, Image as RLImage
-    from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+# Paragraphs decoded per batch when a project is loaded progressively
+PROJECT_LOAD_BATCH = 50
 
-# Image processing dependencies
-try:
-    from PIL import Image as PILImage
-    import base64
-    IMAGE_PROCESSING_AVAILABLE = True
-except ImportError:
-    IMAGE_PROCESSING_AVAILABLE = False
+
+class _LightParagraph:
+    """Paragraph stand-in with the attributes needed for list statistics"""
+
+    __slots__ = ('type', 'content')
+
+    def __init__(self, p_type, content):
+        try:
+            self.type = ParagraphType(p_type)
+        except ValueError:
+            # Handle old 'argument_quote' -> 'quote' migration
+            if p_type == 'argument_quote':
+                self.type = ParagraphType.QUOTE
+            else:
+                # Skip invalid types
+                self.type = None
+        self.content = content or ''
 
 
 class ProjectManager:
@@ -68,10 +67,11 @@ class ProjectManager:
         self.config = Config()
         self.db_path = self.config.database_path
         self._migration_lock = threading.Lock()
+        self._merkle_cache = None
         self._init_db()
         self._run_migration_if_needed()
         
-        print(_("ProjectManager inicializado com banco de dados: {}").format(self.db_path))
+        logger.debug(_("ProjectManager inicializado com banco de dados: {}").format(self.db_path))
 
     def _get_db_connection(self):
         """Get a new database connection with optimized settings"""
@@ -88,7 +88,7 @@ class ProjectManager:
             conn.execute("PRAGMA synchronous = NORMAL;")
             return conn
         except sqlite3.Error as e:
-            print(_("Erro de conexão com banco de dados: {}").format(e))
+            logger.warning(_("Erro de conexão com banco de dados: {}").format(e))
             raise
     
     def _project_exists(self, project_id: str) -> bool:
@@ -99,7 +99,7 @@ class ProjectManager:
                 cursor.execute("SELECT 1 FROM projects WHERE id = ? LIMIT 1", (project_id,))
                 return cursor.fetchone() is not None
         except sqlite3.Error as e:
-            print(_("Erro ao verificar existência do projeto: {}").format(e))
+            logger.warning(_("Erro ao verificar existência do projeto: {}").format(e))
             return False
 
     def _validate_json_data(self, data: Dict[str, Any]) -> bool:
@@ -108,7 +108,7 @@ class ProjectManager:
         
         for field in required_fields:
             if field not in data:
-                print(_("Dados de projeto inválidos: faltando campo '{}'").format(field))
+                logger.warning(_("Dados de projeto inválidos: faltando campo '{}'").format(field))
                 return False
         
         # Validate paragraphs if present
@@ -117,7 +117,7 @@ class ProjectManager:
                 required_para_fields = ['id', 'type', 'content', 'order']
                 for field in required_para_fields:
                     if field not in para_data:
-                        print(_("Parágrafo inválido {}: faltando campo '{}'").format(i, field))
+                        logger.warning(_("Parágrafo inválido {}: faltando campo '{}'").format(i, field))
                         return False
         
         return True
@@ -135,11 +135,11 @@ class ProjectManager:
                 for json_file in json_files:
                     zf.write(json_file, json_file.name)
             
-            print(_("Backup de migração criado: {}").format(backup_file))
+            logger.debug(_("Backup de migração criado: {}").format(backup_file))
             return backup_file
             
         except (OSError, zipfile.BadZipFile) as e:
-            print(_("Falha ao criar backup de migração: {}").format(e))
+            logger.warning(_("Falha ao criar backup de migração: {}").format(e))
             return None
 
     def _run_migration_if_needed(self):
@@ -153,12 +153,12 @@ class ProjectManager:
             if not json_files:
                 return
 
-            print(_("Encontrados {} projetos JSON antigos. Iniciando migração...").format(len(json_files)))
+            logger.debug(_("Encontrados {} projetos JSON antigos. Iniciando migração...").format(len(json_files)))
             
             # Create backup first
             backup_file = self._create_migration_backup(json_files)
             if not backup_file:
-                print(_("Migração abortada: Não foi possível criar backup"))
+                logger.warning(_("Migração abortada: Não foi possível criar backup"))
                 return
             
             # Load and validate all projects before migration
@@ -178,14 +178,14 @@ class ProjectManager:
                     projects_to_migrate.append((project, project_file))
                     
                 except (json.JSONDecodeError, OSError) as e:
-                    print(_("Erro ao carregar {}: {}").format(project_file.name, e))
+                    logger.warning(_("Erro ao carregar {}: {}").format(project_file.name, e))
                     invalid_files.append(project_file)
             
             if invalid_files:
-                print(_("Aviso: {} arquivos têm erros de validação e serão pulados").format(len(invalid_files)))
+                logger.warning(_("Aviso: {} arquivos têm erros de validação e serão pulados").format(len(invalid_files)))
             
             if not projects_to_migrate:
-                print(_("Sem projetos válidos para migrar"))
+                logger.warning(_("Sem projetos válidos para migrar"))
                 return
             
             # Perform migration in single transaction
@@ -211,7 +211,7 @@ class ProjectManager:
                         
                         # Commit transaction
                         conn.commit()
-                        print(_("Transação de migração efetivada com sucesso"))
+                        logger.debug(_("Transação de migração efetivada com sucesso"))
                         
                         # Mark files as migrated only after successful DB commit
                         for project, project_file in projects_to_migrate:
@@ -219,19 +219,19 @@ class ProjectManager:
                                 migrated_file = project_file.with_suffix('.json.migrated')
                                 project_file.rename(migrated_file)
                             except OSError as e:
-                                print(_("Aviso: Não foi possível renomear {}: {}").format(project_file.name, e))
+                                logger.warning(_("Aviso: Não foi possível renomear {}: {}").format(project_file.name, e))
                         
                     except Exception as e:
                         # Rollback transaction
                         conn.rollback()
-                        print(_("Migração falhou, transação revertida: {}").format(e))
+                        logger.warning(_("Migração falhou, transação revertida: {}").format(e))
                         return
                         
             except sqlite3.Error as e:
-                print(_("Migração falhou com erro de banco de dados: {}").format(e))
+                logger.warning(_("Migração falhou com erro de banco de dados: {}").format(e))
                 return
             
-            print(_("Migração completa. {} projetos migrados com sucesso.").format(migrated_count))
+            logger.debug(_("Migração completa. {} projetos migrados com sucesso.").format(migrated_count))
             
             # Run database maintenance after migration
             self._vacuum_database()
@@ -244,7 +244,7 @@ class ProjectManager:
                 metadata_json = json.dumps(project.metadata)
                 formatting_json = json.dumps(project.document_formatting)
             except (TypeError, ValueError) as e:
-                print(_("Erro de serialização JSON para projeto {}: {}").format(project.name, e))
+                logger.warning(_("Erro de serialização JSON para projeto {}: {}").format(project.name, e))
                 return False
             
             cursor.execute("""
@@ -264,8 +264,18 @@ class ProjectManager:
                 formatting_json
             ))
 
-            # Delete existing paragraphs for this project
-            cursor.execute("DELETE FROM paragraphs WHERE project_id = ?", (project.id,))
+            # Delete paragraphs removed from the project; the others are
+            # upserted below and left untouched when nothing changed, so the
+            # change log only sees real edits
+            current_ids = {p.id for p in project.paragraphs}
+            removed = [
+                (row[0],) for row in cursor.execute(
+                    "SELECT id FROM paragraphs WHERE project_id = ?", (project.id,)
+                ).fetchall()
+                if row[0] not in current_ids
+            ]
+            if removed:
+                cursor.executemany("DELETE FROM paragraphs WHERE id = ?", removed)
 
             # Insert paragraphs
             paragraphs_data = []
@@ -274,7 +284,7 @@ class ProjectManager:
                     formatting_json = json.dumps(p.formatting)
                     footnotes_json = json.dumps(p.footnotes if hasattr(p, 'footnotes') else [])
                 except (TypeError, ValueError) as e:
-                    print(_("Erro de serialização JSON para parágrafo {}: {}").format(p.id, e))
+                    logger.warning(_("Erro de serialização JSON para parágrafo {}: {}").format(p.id, e))
                     return False
                     
                 paragraphs_data.append((
@@ -286,15 +296,29 @@ class ProjectManager:
             if paragraphs_data:
                 cursor.executemany("""
                     INSERT INTO paragraphs (id, project_id, type, content, created_at, modified_at, "order", formatting, footnotes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        project_id=excluded.project_id,
+                        type=excluded.type,
+                        content=excluded.content,
+                        created_at=excluded.created_at,
+                        modified_at=excluded.modified_at,
+                        "order"=excluded."order",
+                        formatting=excluded.formatting,
+                        footnotes=excluded.footnotes
+                    WHERE (paragraphs.project_id, paragraphs.type, paragraphs.content, paragraphs.created_at,
+                           paragraphs.modified_at, paragraphs."order", paragraphs.formatting, paragraphs.footnotes)
+                        IS NOT (excluded.project_id, excluded.type, excluded.content, excluded.created_at,
+                                excluded.modified_at, excluded."order", excluded.formatting, excluded.footnotes);
                 """, paragraphs_data)
             
             return True
             
         except sqlite3.Error as e:
-            print(_("Erro de banco de dados ao salvar projeto {}: {}").format(project.name, e))
+            logger.warning(_("Erro de banco de dados ao salvar projeto {}: {}").format(project.name, e))
             return False
 
+    @traced('ProjectManager.save_project', 'io')
     def save_project(self, project: Project, is_migration: bool = False) -> bool:
         """Save project to the database (UPSERT)"""
         if is_migration:
@@ -312,32 +336,31 @@ class ProjectManager:
                     success = self._save_project_to_db(cursor, project)
                     if success:
                         conn.commit()
-                        print(_("Projeto salvo no banco de dados: {}").format(project.name))
+                        logger.debug(_("Projeto salvo no banco de dados: {}").format(project.name))
                         return True
                     else:
                         conn.rollback()
-                        print(_("Falha ao salvar projeto no banco de dados: {}").format(project.name))
+                        logger.warning(_("Falha ao salvar projeto no banco de dados: {}").format(project.name))
                         return False
                 except sqlite3.Error as db_error:
                     conn.rollback()
-                    print(_("Erro de banco de dados ao salvar projeto '{}': {}").format(project.name, db_error))
+                    logger.warning(_("Erro de banco de dados ao salvar projeto '{}': {}").format(project.name, db_error))
                     raise
                 except Exception as e:
                     conn.rollback()
-                    print(_("Erro inesperado ao salvar projeto '{}': {}: {}").format(
+                    logger.exception(_("Erro inesperado ao salvar projeto '{}': {}: {}").format(
                         project.name, type(e).__name__, e))
                     raise
                     
         except sqlite3.Error as db_error:
-            print(_("Erro de conexão para projeto '{}': {}").format(project.name, db_error))
+            logger.warning(_("Erro de conexão para projeto '{}': {}").format(project.name, db_error))
             return False
         except Exception as e:
-            print(_("Erro inesperado em save_project para '{}': {}: {}").format(
+            logger.exception(_("Erro inesperado em save_project para '{}': {}: {}").format(
                 project.name, type(e).__name__, e))
-            import traceback
-            traceback.print_exc()
             return False
         
+    @traced('ProjectManager._create_database_backup', 'io')
     def _create_database_backup(self) -> bool:
         """Create backup of database file maintaining only 3 most recent backups"""
         if not self.config.get('backup_files', False):
@@ -364,11 +387,11 @@ class ProjectManager:
             # Clean old backups - keep only 3 most recent
             self._cleanup_old_backups(backup_dir)
             
-            print(_("Backup do banco de dados criado: {}").format(backup_path))
+            logger.debug(_("Backup do banco de dados criado: {}").format(backup_path))
             return True
             
         except (OSError, shutil.Error) as e:
-            print(_("Aviso: Backup do banco de dados falhou: {}").format(e))
+            logger.warning(_("Aviso: Backup do banco de dados falhou: {}").format(e))
             return False
 
     def _cleanup_old_backups(self, backup_dir: Path, max_backups: int = 3):
@@ -382,10 +405,10 @@ class ProjectManager:
             # Remove files beyond the limit
             for old_backup in backup_files[max_backups:]:
                 old_backup.unlink()
-                print(_("Backup antigo removido: {}").format(old_backup))
+                logger.debug(_("Backup antigo removido: {}").format(old_backup))
                 
         except OSError as e:
-            print(_("Aviso: Limpeza de backups antigos falhou: {}").format(e))
+            logger.warning(_("Aviso: Limpeza de backups antigos falhou: {}").format(e))
             
     def _get_documents_directory(self) -> Path:
         """Get user's Documents directory in a language-aware way"""
@@ -427,83 +450,84 @@ class ProjectManager:
         try:
             with self._get_db_connection() as conn:
                 cursor = conn.cursor()
-                
-                # Get all projects first
+
+                # Projects and their paragraphs in a single query, grouped below
                 cursor.execute("""
-                    SELECT p.id, p.name, p.created_at, p.modified_at
+                    SELECT p.id, p.name, p.created_at, p.modified_at,
+                           par.type AS paragraph_type, par.content AS paragraph_content
                     FROM projects p
-                    ORDER BY p.modified_at DESC;
+                    LEFT JOIN paragraphs par ON par.project_id = p.id
+                    ORDER BY p.modified_at DESC, p.id, par."order" ASC;
                 """)
-                projects = cursor.fetchall()
-                
-                for project_row in projects:
-                    project_id = project_row['id']
-                    
-                    # Get paragraphs for this project in correct order
-                    cursor.execute("""
-                        SELECT type, content FROM paragraphs 
-                        WHERE project_id = ? ORDER BY "order" ASC
-                    """, (project_id,))
-                    paragraphs_rows = cursor.fetchall()
-                    
-                    # Convert database rows to lightweight paragraph objects for calculation
-                    paragraph_data = []
-                    for p_row in paragraphs_rows:
-                        # Create a simple object with the attributes needed for statistics
-                        class LightParagraph:
-                            def __init__(self, p_type, content):
-                                try:
-                                    self.type = ParagraphType(p_type)
-                                except ValueError:
-                                    # Handle old 'argument_quote' -> 'quote' migration
-                                    if p_type == 'argument_quote':
-                                        self.type = ParagraphType.QUOTE
-                                    else:
-                                        # Skip invalid types
-                                        self.type = None
-                                self.content = content or ''
-                        
-                        light_p = LightParagraph(p_row['type'], p_row['content'])
-                        if light_p.type is not None:
-                            paragraph_data.append(light_p)
-                    
-                    # Use consolidated static methods from Project class
-                    total_words = sum(
-                        Project._calculate_word_count(p.content) 
-                        for p in paragraph_data
-                    )
-                    total_paragraphs = Project._count_logical_paragraphs(paragraph_data)
-                    
-                    stats = {
-                        'total_paragraphs': total_paragraphs,
-                        'total_words': total_words,
-                    }
-                    
-                    projects_info.append({
-                        'id': project_row['id'],
-                        'name': project_row['name'],
-                        'created_at': project_row['created_at'],
-                        'modified_at': project_row['modified_at'],
-                        'statistics': stats,
-                        'file_path': None
-                    })
-                    
+
+                current = None
+                paragraph_data = []
+                for row in cursor:
+                    if current is None or row['id'] != current['id']:
+                        if current is not None:
+                            projects_info.append(self._project_list_entry(current, paragraph_data))
+                        current = row
+                        paragraph_data = []
+
+                    if row['paragraph_type'] is None:
+                        # Project without paragraphs (LEFT JOIN placeholder)
+                        continue
+                    light_p = _LightParagraph(row['paragraph_type'], row['paragraph_content'])
+                    if light_p.type is not None:
+                        paragraph_data.append(light_p)
+
+                if current is not None:
+                    projects_info.append(self._project_list_entry(current, paragraph_data))
+
         except sqlite3.Error as e:
-            print(_("Erro de banco de dados ao listar projetos: {}").format(e))
+            logger.warning(_("Erro de banco de dados ao listar projetos: {}").format(e))
         except Exception as e:
-            print(_("Erro inesperado ao listar projetos: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro inesperado ao listar projetos: {}: {}").format(type(e).__name__, e))
         
         return projects_info
 
+    def list_paragraph_texts(self) -> Dict[str, List[tuple]]:
+        """Content of every paragraph in the library as {project_id: [(id, type, content)]}"""
+        texts: Dict[str, List[tuple]] = {}
+        try:
+            with self._get_db_connection() as conn:
+                cursor = conn.execute(
+                    'SELECT project_id, id, type, content FROM paragraphs ORDER BY project_id, "order"'
+                )
+                for row in cursor:
+                    light_p = _LightParagraph(row['type'], row['content'])
+                    if light_p.type is not None:
+                        texts.setdefault(row['project_id'], []).append((row['id'], light_p.type, light_p.content))
+        except sqlite3.Error as e:
+            logger.warning(_("Erro de banco de dados ao listar projetos: {}").format(e))
+        return texts
+
+    @staticmethod
+    def _project_list_entry(project_row, paragraph_data) -> Dict[str, Any]:
+        """Build the list_projects() entry of a project"""
+        # Use consolidated static methods from Project class
+        stats = {
+            'total_paragraphs': Project._count_logical_paragraphs(paragraph_data),
+            'total_words': sum(Project._calculate_word_count(p.content) for p in paragraph_data),
+        }
+        return {
+            'id': project_row['id'],
+            'name': project_row['name'],
+            'created_at': project_row['created_at'],
+            'modified_at': project_row['modified_at'],
+            'statistics': stats,
+            'file_path': None
+        }
+
     def _vacuum_database(self):
         """Perform database maintenance"""
         try:
             with self._get_db_connection() as conn:
                 conn.execute("VACUUM;")
                 conn.execute("ANALYZE;")
-                print(_("Manutenção do banco de dados concluída"))
+                logger.debug(_("Manutenção do banco de dados concluída"))
         except sqlite3.Error as e:
-            print(_("Manutenção do banco de dados falhou: {}").format(e))
+            logger.warning(_("Manutenção do banco de dados falhou: {}").format(e))
 
     def get_database_info(self) -> Dict[str, Any]:
         """Get database statistics and health information"""
@@ -580,10 +604,19 @@ class ProjectManager:
                 except sqlite3.OperationalError:
                     # Column already exists
                     pass
+
+                # Serves both loading a project and the grouped list_projects() join
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_paragraphs_project_order
+                    ON paragraphs (project_id, "order");
+                """)
+
+                # Row-level change log read by incremental sync
+                install_change_log(cursor)
                     
                 conn.commit()
         except sqlite3.Error as e:
-            print(_("Erro de inicialização do banco de dados: {}").format(e))
+            logger.warning(_("Erro de inicialização do banco de dados: {}").format(e))
             raise
 
     def create_project(self, name: str, template: str = "academic_essay") -> Project:
@@ -595,14 +628,15 @@ class ProjectManager:
                 pass
             
             if self.save_project(project):
-                print(_("Projeto criado: {} ({})").format(project.name, project.id))
+                logger.debug(_("Projeto criado: {} ({})").format(project.name, project.id))
                 return project
             else:
                 raise RuntimeError(_("Falha ao salvar novo projeto no banco de dados"))
         except Exception as e:
-            print(_("Erro ao criar projeto: {}: {}").format(type(e).__name__, e))
+            logger.exception(_("Erro ao criar projeto: {}: {}").format(type(e).__name__, e))
             raise
 
+    @traced('ProjectManager.load_project', 'io')
     def load_project(self, project_id: str) -> Optional[Project]:
         """Load project by ID from the database"""
         try:
@@ -613,7 +647,7 @@ class ProjectManager:
                 project_row = cursor.fetchone()
                 
                 if not project_row:
-                    print(_("Projeto com ID {} não encontrado no banco de dados.").format(project_id))
+                    logger.warning(_("Projeto com ID {} não encontrado no banco de dados.").format(project_id))
                     return None
                 
                 project_data = dict(project_row)
@@ -621,42 +655,82 @@ class ProjectManager:
                 project_data['document_formatting'] = json.loads(project_data['document_formatting'])
                 
                 cursor.execute("SELECT * FROM paragraphs WHERE project_id = ? ORDER BY \"order\" ASC", (project_id,))
-                paragraphs_rows = cursor.fetchall()
-
-                paragraphs_data = []
-                for p_row in paragraphs_rows:
-                    p_data = dict(p_row)
-                    p_data['formatting'] = json.loads(p_data['formatting'])
-                    
-                    # Handle footnotes (with backward compatibility)
-                    if p_data.get('footnotes'):
-                        try:
-                            p_data['footnotes'] = json.loads(p_data['footnotes'])
-                        except (json.JSONDecodeError, TypeError):
-                            p_data['footnotes'] = []
-                    else:
-                        p_data['footnotes'] = []
-                        
-                    paragraphs_data.append(p_data)
+                paragraphs_data = [self._paragraph_data(p_row) for p_row in cursor.fetchall()]
                 
                 project_data['paragraphs'] = paragraphs_data
                 
                 project = Project.from_dict(project_data)
-                print(_("Projeto carregado do banco de dados: {}").format(project.name))
+                logger.debug(_("Projeto carregado do banco de dados: {}").format(project.name))
                 return project
                 
         except sqlite3.Error as e:
-            print(_("Erro de banco de dados ao carregar projeto: {}").format(e))
+            logger.warning(_("Erro de banco de dados ao carregar projeto: {}").format(e))
             return None
         except (json.JSONDecodeError, KeyError, ValueError) as e:
-            print(_("Erro de dados ao carregar projeto: {}: {}").format(type(e).__name__, e))
+            logger.warning(_("Erro de dados ao carregar projeto: {}: {}").format(type(e).__name__, e))
             return None
         except Exception as e:
-            print(_("Erro inesperado ao carregar projeto: {}: {}").format(type(e).__name__, e))
-            import traceback
-            traceback.print_exc()
+            logger.exception(_("Erro inesperado ao carregar projeto: {}: {}").format(type(e).__name__, e))
             return None
 
+    def iter_project_load(self, project_id: str, focus_index: int = 0,
+                          batch_size: int = PROJECT_LOAD_BATCH) -> Iterator[tuple]:
+        """
+        Load a project progressively (safe to run on a worker thread).
+
+        Yields ('project', project, paragraph_count) with a project that has
+        no paragraphs yet, then ('paragraphs', start, paragraphs) batches.
+        The batch around focus_index comes first, then the rest of the
+        document after it and finally the part before it. Nothing is yielded
+        if the project does not exist.
+        """
+        with self._get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
+            project_row = cursor.fetchone()
+            if not project_row:
+                logger.warning(_("Projeto com ID {} não encontrado no banco de dados.").format(project_id))
+                return
+
+            project_data = dict(project_row)
+            project_data['metadata'] = json.loads(project_data['metadata'])
+            project_data['document_formatting'] = json.loads(project_data['document_formatting'])
+
+            # Fetching the rows is cheap; decoding them is what gets streamed
+            cursor.execute("SELECT * FROM paragraphs WHERE project_id = ? ORDER BY \"order\" ASC", (project_id,))
+            rows = cursor.fetchall()
+
+        yield 'project', Project.from_dict(project_data), len(rows)
+
+        count = len(rows)
+        focus_start = max(0, min(focus_index, count - 1) - batch_size // 2)
+        ranges = [(start, min(start + batch_size, count))
+                  for start in range(focus_start, count, batch_size)]
+        ranges += [(start, min(start + batch_size, focus_start))
+                   for start in range(0, focus_start, batch_size)]
+
+        for start, end in ranges:
+            yield 'paragraphs', start, [
+                Paragraph.from_dict(self._paragraph_data(p_row)) for p_row in rows[start:end]
+            ]
+
+    @staticmethod
+    def _paragraph_data(p_row) -> Dict[str, Any]:
+        """Decode a paragraphs row into the dictionary read by Paragraph.from_dict"""
+        p_data = dict(p_row)
+        p_data['formatting'] = json.loads(p_data['formatting'])
+
+        # Handle footnotes (with backward compatibility)
+        if p_data.get('footnotes'):
+            try:
+                p_data['footnotes'] = json.loads(p_data['footnotes'])
+            except (json.JSONDecodeError, TypeError):
+                p_data['footnotes'] = []
+        else:
+            p_data['footnotes'] = []
+        return p_data
+
     def delete_project(self, project_id: str) -> bool:
         """Delete project from the database"""
         try:
@@ -665,12 +739,13 @@ class ProjectManager:
                 cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
                 conn.commit()
                 
-                print(_("Projeto excluído do banco de dados: {}").format(project_id))
+                logger.debug(_("Projeto excluído do banco de dados: {}").format(project_id))
                 return True
         except sqlite3.Error as e:
-            print(_("Erro de banco de dados ao excluir projeto: {}").format(e))
+            logger.warning(_("Erro de banco de dados ao excluir projeto: {}").format(e))
             return False
 
+    @traced('ProjectManager.create_manual_backup', 'io')
     def create_manual_backup(self) -> Optional[Path]:
         """Create a manual backup of the database"""
         try:
@@ -693,11 +768,11 @@ class ProjectManager:
             # Clean old backups - keep only 10 most recent
             self._cleanup_old_backups(backup_dir, max_backups=10)
             
-            print(_("Backup manual criado: {}").format(backup_path))
+            logger.debug(_("Backup manual criado: {}").format(backup_path))
             return backup_path
             
         except (OSError, shutil.Error) as e:
-            print(_("Erro ao criar backup manual: {}").format(e))
+            logger.warning(_("Erro ao criar backup manual: {}").format(e))
             return None
 
     def list_available_backups(self) -> List[Dict[str, Any]]:
@@ -737,14 +812,14 @@ class ProjectManager:
                         'is_valid': self._validate_backup_file(backup_file)
                     })
                 except (OSError, ValueError) as e:
-                    print(_("Erro ao ler arquivo de backup {}: {}").format(backup_file, e))
+                    logger.warning(_("Erro ao ler arquivo de backup {}: {}").format(backup_file, e))
                     continue
             
             # Sort by creation date (newest first)
             backups.sort(key=lambda x: x['created_at'], reverse=True)
             
         except OSError as e:
-            print(_("Erro ao listar backups: {}").format(e))
+            logger.warning(_("Erro ao listar backups: {}").format(e))
             
         return backups
 
@@ -776,7 +851,7 @@ class ProjectManager:
                 return True
                 
         except sqlite3.Error as e:
-            print(_("Erro de validação de backup: {}").format(e))
+            logger.warning(_("Erro de validação de backup: {}").format(e))
             return False
 
     def import_database(self, backup_path: Path) -> bool:
@@ -784,7 +859,7 @@ class ProjectManager:
         try:
             # Validate backup file
             if not self._validate_backup_file(backup_path):
-                print(_("Arquivo de backup inválido"))
+                logger.warning(_("Arquivo de backup inválido"))
                 return False
             
             # Create backup of current database
@@ -793,7 +868,7 @@ class ProjectManager:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 current_backup_path = self.db_path.with_suffix(f'.backup_{timestamp}.db')
                 shutil.copy2(self.db_path, current_backup_path)
-                print(_("Banco de dados atual salvo em: {}").format(current_backup_path))
+                logger.debug(_("Banco de dados atual salvo em: {}").format(current_backup_path))
             
             try:
                 # Replace current database
@@ -804,7 +879,7 @@ class ProjectManager:
                     cursor = conn.cursor()
                     cursor.execute("SELECT COUNT(*) FROM projects")
                     project_count = cursor.fetchone()[0]
-                    print(_("Banco de dados importado com sucesso com {} projetos").format(project_count))
+                    logger.debug(_("Banco de dados importado com sucesso com {} projetos").format(project_count))
                 
                 return True
                 
@@ -812,13 +887,11 @@ class ProjectManager:
                 # Restore backup if import failed
                 if current_backup_path and current_backup_path.exists():
                     shutil.copy2(current_backup_path, self.db_path)
-                    print(_("Importação falhou, banco de dados anterior restaurado"))
+                    logger.warning(_("Importação falhou, banco de dados anterior restaurado"))
                 raise e
                 
         except Exception as e:
-            print(_("Erro ao importar banco de dados: {}: {}").format(type(e).__name__, e))
-            import traceback
-            traceback.print_exc()
+            logger.exception(_("Erro ao importar banco de dados: {}: {}").format(type(e).__name__, e))
             return False
 
     def delete_backup(self, backup_path: Path) -> bool:
@@ -826,11 +899,11 @@ class ProjectManager:
         try:
             if backup_path.exists():
                 backup_path.unlink()
-                print(_("Backup excluído: {}").format(backup_path))
+                logger.debug(_("Backup excluído: {}").format(backup_path))
                 return True
             return False
         except OSError as e:
-            print(_("Erro ao excluir backup: {}").format(e))
+            logger.warning(_("Erro ao excluir backup: {}").format(e))
             return False
 
     @property
@@ -839,251 +912,104 @@ class ProjectManager:
         return self.config.data_dir / 'projects'
 
 
-    def merge_database(self, external_db_path: str) -> dict:
+    @property
+    def sync_base_path(self) -> Path:
+        """Snapshot of the database as of the last successful cloud sync"""
+        return self.config.data_dir / 'sync_base.db'
+
+    @traced('ProjectManager.merge_database', 'sync')
+    def merge_database(self, external_db_path: str, base_db_path: Optional[str] = None) -> dict:
         """
         Mescla um banco de dados externo com o atual.
+
+        With base_db_path (the common ancestor, e.g. the sync base) the
+        merge is three-way per paragraph; without it the newer version of
+        each paragraph wins.
         """
         from core.merger import DatabaseMerger
-        
-        # Caminho do banco atual (definido no config ou self.db_path)
-        current_db = self.config.get('database_file')
-        
-        merger = DatabaseMerger(self.db_path)
+
+        merger = DatabaseMerger(self.db_path, base_db_path)
         try:
             stats = merger.merge(external_db_path)
+            for conflict in stats['conflicts']:
+                logger.warning(_("Conflito de mesclagem em '{}' ({}): mantida versão {}").format(
+                    conflict['project_name'], ', '.join(conflict['fields']), conflict['kept']))
             return stats
         except Exception as e:
-            print(f"Erro no merge: {e}")
+            logger.warning("Erro no merge: %s", e)
             raise e
 
+    def preview_merge(self, external_db_path: str, base_db_path: Optional[str] = None):
+        """
+        Dry run of merge_database: compare Merkle trees of content hashes
+        and report what would be added, updated, deleted or conflicting.
+        """
+        from core.merkle import MerkleCache, build_tree, diff_trees
+
+        if self._merkle_cache is None:
+            self._merkle_cache = MerkleCache()
+        local = build_tree(self.db_path, self._merkle_cache)
+        remote = build_tree(external_db_path, self._merkle_cache)
+        base = None
+        if base_db_path and Path(base_db_path).exists():
+            base = build_tree(base_db_path, self._merkle_cache)
+        return diff_trees(local, remote, base)
+
+    def create_database_snapshot(self, target_path: Path) -> Path:
+        """Write a consistent copy of the database to target_path"""
+        from core.merger import snapshot_database
+        return snapshot_database(self.db_path, target_path)
+
+# Inline tags of each export format, as (open, close) strings
+_ODT_MARKERS = {
+    'bold': ('<text:span text:style-name="T_Bold">', '</text:span>'),
+    'italic': ('<text:span text:style-name="T_Italic">', '</text:span>'),
+    'underline': ('<text:span text:style-name="T_Underline">', '</text:span>'),
+}
+# ReportLab uses <b>, <i>, <u> natively
+_PDF_MARKERS = {'bold': ('<b>', '</b>'), 'italic': ('<i>', '</i>'), 'underline': ('<u>', '</u>')}
+_LATEX_MARKERS = {
+    'bold': ('\\textbf{', '}'),
+    'italic': ('\\textit{', '}'),
+    'underline': ('\\underline{', '}'),
+}
+# Markdown has no underline
+_MD_MARKERS = {'bold': ('**', '**'), 'italic': ('*', '*')}
+
+
 class ExportService:
-    """Handles document export operations"""
+    """
+    Handles document export operations.
+
+    Every format is written from the project's Document (core.document),
+    built once per project revision: exporting to several formats groups
+    paragraphs and numbers footnotes only once.
+    """
     
-    def __init__(self):
+    def __init__(self, data_dir=None):
         self.odt_available = ODT_AVAILABLE
         self.pdf_available = PDF_AVAILABLE
         self.pylatex_available = PYLATEX_AVAILABLE
+        # Images missing at their stored path are looked up in data_dir/images
+        self.documents = DocumentCache(data_dir)
         
         if not self.odt_available:
-            print(_("Aviso: Exportação ODT indisponível (faltando dependências xml)"))
+            logger.debug(_("Aviso: Exportação ODT indisponível (faltando dependências xml)"))
         if not self.pdf_available:
-            print(_("Aviso: Exportação PDF indisponível (faltando reportlab)"))
+            logger.debug(_("Aviso: Exportação PDF indisponível (faltando reportlab)"))
         if not self.pylatex_available:
-            print(_("Aviso: Exportação LaTeX indisponível (faltando biblioteca pylatex)"))
+            logger.debug(_("Aviso: Exportação LaTeX indisponível (faltando biblioteca pylatex)"))
     
-    def _collect_footnotes(self, project: Project) -> tuple:
+    def _block_text(self, block: TextBlock, format_runs: Callable[[List[Run]], str],
+                    format_note: Callable[[int], str]) -> str:
         """
-        Collect all unique footnotes from project and create mapping.
-        
-        Returns:
-            tuple: (all_footnotes list, footnote_map dict)
-        """
-        all_footnotes = []
-        footnote_map = {}
-        
-        for paragraph in project.paragraphs:
-            if hasattr(paragraph, 'footnotes') and paragraph.footnotes:
-                paragraph_footnotes = []
-                for footnote_text in paragraph.footnotes:
-                    # Check if footnote already exists
-                    existing_num = None
-                    for i, existing_footnote in enumerate(all_footnotes):
-                        if footnote_text == existing_footnote:
-                            existing_num = i + 1
-                            break
-                    
-                    if existing_num is None:
-                        # New footnote
-                        footnote_num = len(all_footnotes) + 1
-                        all_footnotes.append(footnote_text)
-                        paragraph_footnotes.append(footnote_num)
-                    else:
-                        # Reuse existing footnote
-                        paragraph_footnotes.append(existing_num)
-                
-                footnote_map[paragraph.id] = paragraph_footnotes
-        
-        return all_footnotes, footnote_map
-    
-    def _group_paragraphs(self, project: Project, footnote_map: dict) -> list:
+        Text of a block in an export format: its segments joined by spaces,
+        each followed by its footnote references
         """
-        Group paragraphs following TAC methodology.
-        
-        Returns:
-            list: List of grouped paragraph dictionaries with structure:
-                {
-                    'type': 'title1' | 'title2' | 'quote' | 'content',
-                    'content': str,
-                    'indent': bool (for content type only)
-                }
-        """
-        grouped = []
-        current_paragraph_content = []
-        paragraph_starts_with_introduction = False
-        last_was_quote = False
-        
-        for i, paragraph in enumerate(project.paragraphs):
-            content = paragraph.content.strip()
-            
-            if paragraph.type == ParagraphType.TITLE_1:
-                # Write accumulated content first
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    grouped.append({
-                        'type': 'content',
-                        'content': combined,
-                        'indent': paragraph_starts_with_introduction
-                    })
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                grouped.append({'type': 'title1', 'content': content})
-                last_was_quote = False
-            
-            elif paragraph.type == ParagraphType.TITLE_2:
-                # Write accumulated content first
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    grouped.append({
-                        'type': 'content',
-                        'content': combined,
-                        'indent': paragraph_starts_with_introduction
-                    })
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                grouped.append({'type': 'title2', 'content': content})
-                last_was_quote = False
-            
-            elif paragraph.type == ParagraphType.QUOTE:
-                # Write accumulated content first
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    grouped.append({
-                        'type': 'content',
-                        'content': combined,
-                        'indent': paragraph_starts_with_introduction
-                    })
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                grouped.append({'type': 'quote', 'content': content})
-                last_was_quote = True
-            
-            elif paragraph.type == ParagraphType.EPIGRAPH:
-                # Write accumulated content first
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    grouped.append({
-                        'type': 'content',
-                        'content': combined,
-                        'indent': paragraph_starts_with_introduction
-                    })
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                # Add epigraph with its own type for special formatting
-                grouped.append({'type': 'epigraph', 'content': content})
-                last_was_quote = True # Treat it like a quote to start a new paragraph after
-            
-            elif paragraph.type == ParagraphType.IMAGE:
-                # Write accumulated content first
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    grouped.append({
-                        'type': 'content',
-                        'content': combined,
-                        'indent': paragraph_starts_with_introduction
-                    })
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                # Add image to grouped list
-                img_metadata = paragraph.get_image_metadata()
-                if img_metadata:
-                    grouped.append({'type': 'image', 'metadata': img_metadata})
-                last_was_quote = False
-            
-            elif paragraph.type == ParagraphType.CODE:
-                # Write accumulated content first
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    grouped.append({
-                        'type': 'content',
-                        'content': combined,
-                        'indent': paragraph_starts_with_introduction
-                    })
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                grouped.append({'type': 'code', 'content': content})
-                last_was_quote = False
-
-            elif paragraph.type in [ParagraphType.INTRODUCTION, ParagraphType.ARGUMENT, ParagraphType.CONCLUSION, ParagraphType.ARGUMENT_RESUMPTION]:
-                # Determine if should start new paragraph
-                should_start_new = (
-                    paragraph.type == ParagraphType.INTRODUCTION or
-                    paragraph.type == ParagraphType.ARGUMENT_RESUMPTION or
-                    last_was_quote or
-                    not current_paragraph_content
-                )
-                
-                if should_start_new and current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    grouped.append({
-                        'type': 'content',
-                        'content': combined,
-                        'indent': paragraph_starts_with_introduction
-                    })
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                # Determine paragraph style
-                if not current_paragraph_content:
-                    if paragraph.type == ParagraphType.INTRODUCTION or paragraph.type == ParagraphType.ARGUMENT_RESUMPTION:
-                        paragraph_starts_with_introduction = True
-                    elif last_was_quote:
-                        paragraph_starts_with_introduction = False
-                
-                # Add footnote references
-                if paragraph.id in footnote_map:
-                    for footnote_num in footnote_map[paragraph.id]:
-                        content += f"^{footnote_num}"
-                
-                current_paragraph_content.append(content)
-                
-                # Check if next paragraph starts new group
-                next_is_new = False
-                if i + 1 < len(project.paragraphs):
-                    next_p = project.paragraphs[i + 1]
-                    if next_p.type in [ParagraphType.INTRODUCTION, ParagraphType.TITLE_1, 
-                                      ParagraphType.TITLE_2, ParagraphType.QUOTE]:
-                        next_is_new = True
-                else:
-                    next_is_new = True
-                
-                if next_is_new:
-                    combined = " ".join(current_paragraph_content)
-                    grouped.append({
-                        'type': 'content',
-                        'content': combined,
-                        'indent': paragraph_starts_with_introduction
-                    })
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                last_was_quote = False
-        
-        # Write any remaining content
-        if current_paragraph_content:
-            combined = " ".join(current_paragraph_content)
-            grouped.append({
-                'type': 'content',
-                'content': combined,
-                'indent': paragraph_starts_with_introduction
-            })
-        
-        return grouped
+        return " ".join(
+            format_runs(segment.runs) + "".join(format_note(number) for number in segment.notes)
+            for segment in block.segments
+        )
 
     def get_available_formats(self) -> List[str]:
         """Get list of available export formats"""
@@ -1100,97 +1026,94 @@ class ExportService:
 
 
 
+    @traced('ExportService.export_project', 'export')
     def export_project(self, project: Project, file_path: str, format_type: str) -> bool:
         """Export project to specified format"""
         try:
             if format_type.lower() == 'txt':
-                return self._export_txt(project, file_path)
+                return self._export_txt(self.documents.get(project), file_path)
             elif format_type.lower() == 'md':
-                return self._export_md(project, file_path)
+                return self._export_md(self.documents.get(project), file_path)
             elif format_type.lower() == 'odt' and self.odt_available:
-                return self._export_odt(project, file_path)
+                return self._export_odt(project, self.documents.get(project), file_path)
             elif format_type.lower() == 'pdf' and self.pdf_available:
-                return self._export_pdf(project, file_path)
+                return self._export_pdf(self.documents.get(project), file_path)
             elif format_type.lower() == 'tex' and self.pylatex_available:
-                return self._export_latex(project, file_path)
+                return self._export_latex(self.documents.get(project), file_path)
             else:
-                print(_("Formato de exportação '{}' não disponível").format(format_type))
+                logger.debug(_("Formato de exportação '{}' não disponível").format(format_type))
                 return False
 
             
                 
         except Exception as e:
-            print(_("Erro ao exportar projeto: {}: {}").format(type(e).__name__, e))
-            import traceback
-            traceback.print_exc()
+            logger.exception(_("Erro ao exportar projeto: {}: {}").format(type(e).__name__, e))
             return False
 
-    def _export_txt(self, project: Project, file_path: str) -> bool:
+    def _export_txt(self, document: Document, file_path: str) -> bool:
         """Export to plain text format"""
         try:
             # Ensure parent directory exists
             file_path_obj = Path(file_path)
             file_path_obj.parent.mkdir(parents=True, exist_ok=True)
             
-            # Collect footnotes and group paragraphs
-            all_footnotes, footnote_map = self._collect_footnotes(project)
-            grouped = self._group_paragraphs(project, footnote_map)
-            
             with open(file_path, 'w', encoding='utf-8') as f:
                 # Project title
-                f.write(f"{project.name}\n")
-                f.write("=" * len(project.name) + "\n\n")
+                f.write(f"{document.title}\n")
+                f.write("=" * len(document.title) + "\n\n")
                 
-                # Write grouped content
-                for item in grouped:
-                    if item['type'] == 'title1':
-                        f.write(f"\n{item['content']}\n")
-                        f.write("-" * len(item['content']) + "\n\n")
-                    
-                    elif item['type'] == 'title2':
-                        f.write(f"\n{item['content']}\n\n")
-                    
-                    elif item['type'] == 'quote':
-                        f.write(f"        {item['content']}\n\n")
-
-                    elif item['type'] == 'epigraph':
-                        # Indent epigraph significantly to the right
-                        f.write(f"                            {item['content']}\n\n")
-                    
-                    elif item['type'] == 'image':
+                # Write blocks
+                for block in document.blocks:
+                    if block.kind == 'image':
                         # Add image placeholder in TXT
-                        metadata = item['metadata']
+                        metadata = block.metadata
                         caption = metadata.get('caption', '')
                         if caption:
                             f.write(f"\n[IMAGE: {metadata.get('filename', 'image')} - {caption}]\n\n")
                         else:
                             f.write(f"\n[IMAGE: {metadata.get('filename', 'image')}]\n\n")
+                        continue
+
+                    if not isinstance(block, TextBlock):
+                        continue
+                    text = self._block_text(block, self._plain_text, lambda number: f"^{number}")
+
+                    if block.kind == 'title1':
+                        f.write(f"\n{text}\n")
+                        f.write("-" * len(text) + "\n\n")
                     
-                    elif item['type'] == 'content':
-                        if item['indent']:
-                            f.write(f"    {item['content']}\n\n")
-                        else:
-                            f.write(f"{item['content']}\n\n")
+                    elif block.kind == 'title2':
+                        f.write(f"\n{text}\n\n")
+                    
+                    elif block.kind == 'quote':
+                        f.write(f"        {text}\n\n")
+
+                    elif block.kind == 'epigraph':
+                        # Indent epigraph significantly to the right
+                        f.write(f"                            {text}\n\n")
+                    
+                    elif block.indent:
+                        f.write(f"    {text}\n\n")
+                    else:
+                        f.write(f"{text}\n\n")
                 
                 # Write footnotes
-                if all_footnotes:
+                if document.footnotes:
                     f.write("\n" + "=" * 20 + "\n")
                     f.write(_("Notas de rodapé:") + "\n\n")
-                    for i, footnote in enumerate(all_footnotes):
-                        f.write(f"{i + 1}. {footnote}\n\n")
+                    for i, footnote in enumerate(document.footnotes):
+                        f.write(f"{i + 1}. {self._plain_text(footnote)}\n\n")
             
             return True
             
         except OSError as e:
-            print(_("Erro de arquivo ao exportar para TXT: {}").format(e))
+            logger.warning(_("Erro de arquivo ao exportar para TXT: {}").format(e))
             return False
         except Exception as e:
-            print(_("Erro inesperado ao exportar para TXT: {}: {}").format(type(e).__name__, e))
-            import traceback
-            traceback.print_exc()
+            logger.exception(_("Erro inesperado ao exportar para TXT: {}: {}").format(type(e).__name__, e))
             return False
 
-    def _export_odt(self, project: Project, file_path: str) -> bool:
+    def _export_odt(self, project: Project, document: Document, file_path: str) -> bool:
         """Export to OpenDocument Text format"""
         try:
             # Ensure parent directory exists
@@ -1208,17 +1131,13 @@ class ExportService:
                 
                 # Collect image files and copy them to Pictures directory
                 image_files = []
-                for paragraph in project.paragraphs:
-                    if paragraph.type == ParagraphType.IMAGE:
-                        img_metadata = paragraph.get_image_metadata()
-                        if img_metadata:
-                            img_path = Path(img_metadata['path'])
-                            if img_path.exists():
-                                # Copy image to Pictures directory
-                                dest_name = img_metadata['filename']
-                                dest_path = temp_dir / "Pictures" / dest_name
-                                shutil.copy2(img_path, dest_path)
-                                image_files.append(dest_name)
+                for block in document.blocks:
+                    if block.kind == 'image' and block.path.exists():
+                        # Copy image to Pictures directory
+                        dest_name = block.metadata['filename']
+                        dest_path = temp_dir / "Pictures" / dest_name
+                        shutil.copy2(block.path, dest_path)
+                        image_files.append(dest_name)
                 
                 # Create manifest.xml (with images)
                 self._create_manifest(temp_dir / "META-INF" / "manifest.xml", image_files)
@@ -1227,7 +1146,7 @@ class ExportService:
                 self._create_styles(temp_dir / "styles.xml")
                 
                 # Create content.xml
-                content_xml = self._generate_odt_content(project)
+                content_xml = self._generate_odt_content(document)
                 with open(temp_dir / "content.xml", 'w', encoding='utf-8') as f:
                     f.write(content_xml)
                 
@@ -1254,292 +1173,109 @@ class ExportService:
                 shutil.rmtree(temp_dir, ignore_errors=True)
                 
         except (OSError, zipfile.BadZipFile) as e:
-            print(_("Erro de arquivo ao exportar para ODT: {}").format(e))
+            logger.warning(_("Erro de arquivo ao exportar para ODT: {}").format(e))
             return False
         except Exception as e:
-            print(_("Erro inesperado ao exportar para ODT: {}: {}").format(type(e).__name__, e))
-            import traceback
-            traceback.print_exc()
+            logger.exception(_("Erro inesperado ao exportar para ODT: {}: {}").format(type(e).__name__, e))
             return False
 
-    def _format_text_for_odt(self, text: str) -> str:
+    def _plain_text(self, runs: List[Run]) -> str:
+        """Text of runs without formatting"""
+        return "".join(text for text, _tags in runs)
+
+    def _format_runs_for_odt(self, runs: List[Run]) -> str:
         """
-        Converts internal HTML-like tags (<b>, <i>, <u>) to ODT XML tags.
-        Also handles XML escaping for the content.
+        Converts runs to ODT XML: escaped text, formatting as text:span
+        elements with the T_Bold, T_Italic and T_Underline styles.
         """
-        if not text:
-            return ""
-
-        # 1. Escape XML special characters first
-        text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-
-        # 2. Replace escaped tags with ODT spans
-        # Bold
-        text = text.replace('&lt;b&gt;', '<text:span text:style-name="T_Bold">')
-        text = text.replace('&lt;/b&gt;', '</text:span>')
-        # Italic
-        text = text.replace('&lt;i&gt;', '<text:span text:style-name="T_Italic">')
-        text = text.replace('&lt;/i&gt;', '</text:span>')
-        # Underline
-        text = text.replace('&lt;u&gt;', '<text:span text:style-name="T_Underline">')
-        text = text.replace('&lt;/u&gt;', '</text:span>')
-        
-        # Handle line breaks
-        text = text.replace('\n', '<text:line-break/>')
+        def escape(text):
+            text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            # Handle line breaks
+            return text.replace('\n', '<text:line-break/>')
 
-        return text
+        return render_markup(runs, _ODT_MARKERS, escape)
 
-    def _format_text_for_pdf(self, text: str) -> str:
+    def _format_runs_for_pdf(self, runs: List[Run]) -> str:
         """
-        Prepares text for ReportLab PDF.
-        Escapes XML characters but preserves <b>, <i>, <u> tags.
+        Prepares runs for ReportLab PDF.
+        Escapes XML characters and writes formatting as <b>, <i>, <u> tags.
         """
-        if not text:
-            return ""
-
-        # 1. Escape everything first to ensure safety
-        text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-
-        # 2. Restore the specific formatting tags we support
-        # ReportLab uses <b>, <i>, <u> natively
-        tags = ['b', 'i', 'u']
-        for tag in tags:
-            text = text.replace(f'&lt;{tag}&gt;', f'<{tag}>')
-            text = text.replace(f'&lt;/{tag}&gt;', f'</{tag}>')
-        
-        # Handle line breaks for PDF
-        text = text.replace('\n', '<br/>')
+        def escape(text):
+            text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            # Handle line breaks for PDF
+            return text.replace('\n', '<br/>')
 
-        return text
+        return render_markup(runs, _PDF_MARKERS, escape)
 
-    def _format_text_for_latex(self, text: str) -> Any:
+    def _format_runs_for_latex(self, runs: List[Run]) -> str:
         """
-        Converte tags internas (HTML-like) para comandos LaTeX usando utilitários do PyLaTeX.
-        Retorna um objeto NoEscape pronto para ser inserido no documento.
+        Converte runs para comandos LaTeX, escapando o texto com os utilitários do PyLaTeX.
+        Retorna texto pronto para ser inserido no documento como NoEscape.
         """
-        if not text:
-            return ""
-
-        # 1. Use placeholders for tags 
-        text = text.replace("<b>", "@@BOLD_START@@").replace("</b>", "@@BOLD_END@@")
-        text = text.replace("<i>", "@@ITALIC_START@@").replace("</i>", "@@ITALIC_END@@")
-        text = text.replace("<u>", "@@UNDER_START@@").replace("</u>", "@@UNDER_END@@")
-
-        # 2. Escape the whole text for LaTeX (treat %, $, _, {, }, etc.)
-        text = escape_latex(text)
+        from pylatex.utils import escape_latex
 
-        # 3. Rrestore tags converting to LaTex commands
-        text = text.replace("@@BOLD_START@@", "\\textbf{").replace("@@BOLD_END@@", "}")
-        text = text.replace("@@ITALIC_START@@", "\\textit{").replace("@@ITALIC_END@@", "}")
-        text = text.replace("@@UNDER_START@@", "\\underline{").replace("@@UNDER_END@@", "}")
-        
-        # Treat line break
-        text = text.replace("\n", "\n\n")
-
-        return NoEscape(text)
+        # Escape each run for LaTeX (treat %, $, _, {, }, etc.) and treat line break
+        return render_markup(runs, _LATEX_MARKERS,
+                             lambda text: escape_latex(text).replace("\n", "\n\n"))
 
-    def _export_md(self, project: Project, file_path: str) -> bool:
+    def _export_md(self, document: Document, file_path: str) -> bool:
         """Export to Markdown format"""
         try:
             file_path_obj = Path(file_path)
             file_path_obj.parent.mkdir(parents=True, exist_ok=True)
+
+            # Convert runs to Markdown (underline is dropped)
+            def markdown(runs):
+                return render_markup(runs, _MD_MARKERS)
             
             with open(file_path, 'w', encoding='utf-8') as f:
                 # Header
-                f.write(f"# {project.name}\n\n")
-                if project.metadata.get('author'):
-                    f.write(f"**Autor:** {project.metadata['author']}\n\n")
+                f.write(f"# {document.title}\n\n")
+                if document.author:
+                    f.write(f"**Autor:** {document.author}\n\n")
                 
                 # Content
-                for paragraph in project.paragraphs:
-                    content = paragraph.content.strip()
-                    
-                    # Convert internal tags to Markdown
-                    # Replace <b> with **
-                    content = content.replace("<b>", "**").replace("</b>", "**")
-                    # Replace <i> with *
-                    content = content.replace("<i>", "*").replace("</i>", "*")
-                    # Replace <u> (Markdown doesn't support underline natively, usually ignored or HTML)
-                    content = content.replace("<u>", "").replace("</u>", "")
-
-                    if paragraph.type == ParagraphType.TITLE_1:
-                        f.write(f"# {content}\n\n")
+                for block in document.blocks:
+                    if block.kind == 'title1':
+                        f.write(f"# {markdown(block.segments[0].runs)}\n\n")
                     
-                    elif paragraph.type == ParagraphType.TITLE_2:
-                        f.write(f"## {content}\n\n")
+                    elif block.kind == 'title2':
+                        f.write(f"## {markdown(block.segments[0].runs)}\n\n")
                     
-                    elif paragraph.type == ParagraphType.CODE:
+                    elif block.kind == 'code':
                         # Fenced code block
                         f.write("```\n")
-                        f.write(paragraph.content) # Raw content for code (no tag replacement)
+                        f.write(block.source) # Raw content for code (no tag replacement)
                         f.write("\n```\n\n")
                     
-                    elif paragraph.type == ParagraphType.QUOTE:
-                        f.write(f"> {content}\n\n")
+                    elif block.kind == 'latex':
+                        f.write(f"{block.source.strip()}\n\n")
                     
-                    elif paragraph.type == ParagraphType.IMAGE:
-                        meta = paragraph.get_image_metadata()
-                        if meta:
-                            caption = meta.get('caption', '')
-                            path = meta.get('filename', 'image.png')
-                            f.write(f"![{caption}]({path})\n\n")
+                    elif block.kind == 'quote':
+                        f.write(f"> {markdown(block.segments[0].runs)}\n\n")
+                    
+                    elif block.kind == 'image':
+                        caption = block.metadata.get('caption', '')
+                        path = block.metadata.get('filename', 'image.png')
+                        f.write(f"![{caption}]({path})\n\n")
                     
                     else:
-                        # Normal text
-                        f.write(f"{content}\n\n")
+                        # Normal text, one Markdown paragraph per source paragraph
+                        for segment in block.segments:
+                            f.write(f"{markdown(segment.runs)}\n\n")
             
             return True
         except Exception as e:
-            print(f"Error exporting to Markdown: {e}")
+            logger.warning("Error exporting to Markdown: %s", e)
             return False
 
-    def _generate_odt_content(self, project: Project) -> str:
+    def _generate_odt_content(self, document: Document) -> str:
         """Generate content.xml for ODT with proper formatting"""
-        
-        # Collect footnotes and group paragraphs
-        all_footnotes, footnote_map = self._collect_footnotes(project)
-        
-        # Build grouped structure with footnote references for ODT
-        grouped_odt = []
-        current_paragraph_content = []
-        paragraph_starts_with_introduction = False
-        last_was_quote = False
-        
-        for i, paragraph in enumerate(project.paragraphs):
-            # Using the new helper method
-            content = self._format_text_for_odt(paragraph.content)
-            
-            # Handle Code Block for ODT
-            if paragraph.type == ParagraphType.CODE:
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    style = "Introduction" if paragraph_starts_with_introduction else "Normal"
-                    grouped_odt.append({'type': 'content', 'content': combined, 'style': style})
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                # Preserve spaces/tabs for code
-                code_content = paragraph.content
-                code_content = code_content.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-                code_content = code_content.replace("\n", "<text:line-break/>")
-                # ODT collapses spaces, use text:s for multiple spaces
-                code_content = code_content.replace("  ", "<text:s text:c=\"2\"/>")
-                code_content = code_content.replace("\t", "<text:tab/>")
-                
-                grouped_odt.append({'type': 'code', 'content': code_content})
-                last_was_quote = False
-
-            if paragraph.type == ParagraphType.TITLE_1:
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    style = "Introduction" if paragraph_starts_with_introduction else "Normal"
-                    grouped_odt.append({'type': 'content', 'content': combined, 'style': style})
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                grouped_odt.append({'type': 'title1', 'content': content})
-                last_was_quote = False
-            
-            elif paragraph.type == ParagraphType.TITLE_2:
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    style = "Introduction" if paragraph_starts_with_introduction else "Normal"
-                    grouped_odt.append({'type': 'content', 'content': combined, 'style': style})
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                grouped_odt.append({'type': 'title2', 'content': content})
-                last_was_quote = False
-            
-            elif paragraph.type == ParagraphType.QUOTE:
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    style = "Introduction" if paragraph_starts_with_introduction else "Normal"
-                    grouped_odt.append({'type': 'content', 'content': combined, 'style': style})
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                grouped_odt.append({'type': 'quote', 'content': content})
-                last_was_quote = True
-                
-            elif paragraph.type == ParagraphType.EPIGRAPH:
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    style = "Introduction" if paragraph_starts_with_introduction else "Normal"
-                    grouped_odt.append({'type': 'content', 'content': combined, 'style': style})
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                grouped_odt.append({'type': 'epigraph', 'content': content})
-                last_was_quote = True
-            
-            elif paragraph.type == ParagraphType.IMAGE:
-                # Write accumulated content first
-                if current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    style = "Introduction" if paragraph_starts_with_introduction else "Normal"
-                    grouped_odt.append({'type': 'content', 'content': combined, 'style': style})
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                # Add image to grouped list
-                img_metadata = paragraph.get_image_metadata()
-                if img_metadata:
-                    grouped_odt.append({'type': 'image', 'metadata': img_metadata})
-                last_was_quote = False
-            
-            elif paragraph.type in [ParagraphType.INTRODUCTION, ParagraphType.ARGUMENT, ParagraphType.CONCLUSION, ParagraphType.ARGUMENT_RESUMPTION]:
-                should_start_new = (
-                    paragraph.type == ParagraphType.INTRODUCTION or
-                    paragraph.type == ParagraphType.ARGUMENT_RESUMPTION or
-                    last_was_quote or
-                    not current_paragraph_content
-                )
-                
-                if should_start_new and current_paragraph_content:
-                    combined = " ".join(current_paragraph_content)
-                    style = "Introduction" if paragraph_starts_with_introduction else "Normal"
-                    grouped_odt.append({'type': 'content', 'content': combined, 'style': style})
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                if not current_paragraph_content:
-                    if paragraph.type == ParagraphType.INTRODUCTION or paragraph.type == ParagraphType.ARGUMENT_RESUMPTION:
-                        paragraph_starts_with_introduction = True
-                    elif last_was_quote:
-                        paragraph_starts_with_introduction = False
-                
-                # Add ODT footnote references
-                if paragraph.id in footnote_map:
-                    for footnote_num in footnote_map[paragraph.id]:
-                        footnote_text = all_footnotes[footnote_num - 1]
-                        content += f'<text:note text:id="ftn{footnote_num}" text:note-class="footnote"><text:note-citation>{footnote_num}</text:note-citation><text:note-body><text:p text:style-name="Footnote">.{footnote_text}</text:p></text:note-body></text:note>'
-                
-                current_paragraph_content.append(content.strip())
-                
-                next_is_new = False
-                if i + 1 < len(project.paragraphs):
-                    next_p = project.paragraphs[i + 1]
-                    if next_p.type in [ParagraphType.INTRODUCTION, ParagraphType.TITLE_1, 
-                                      ParagraphType.TITLE_2, ParagraphType.QUOTE]:
-                        next_is_new = True
-                else:
-                    next_is_new = True
-                
-                if next_is_new:
-                    combined = " ".join(current_paragraph_content)
-                    style = "Introduction" if paragraph_starts_with_introduction else "Normal"
-                    grouped_odt.append({'type': 'content', 'content': combined, 'style': style})
-                    current_paragraph_content = []
-                    paragraph_starts_with_introduction = False
-                
-                last_was_quote = False
-        
-        # Write remaining
-        if current_paragraph_content:
-            combined = " ".join(current_paragraph_content)
-            style = "Introduction" if paragraph_starts_with_introduction else "Normal"
-            grouped_odt.append({'type': 'content', 'content': combined, 'style': style})
+
+        # ODT footnote references carry the footnote body
+        def note(number):
+            footnote_text = self._format_runs_for_odt(document.footnotes[number - 1])
+            return f'<text:note text:id="ftn{number}" text:note-class="footnote"><text:note-citation>{number}</text:note-citation><text:note-body><text:p text:style-name="Footnote">{footnote_text}</text:p></text:note-body></text:note>'
         
         # Generate XML
         content_xml = '''<?xml version="1.0" encoding="UTF-8"?>
@@ -1565,23 +1301,23 @@ class ExportService:
 <office:text>'''
 
         # Project title
-        content_xml += f'<text:p text:style-name="Title">{project.name}</text:p>\n'
+        title = self._format_runs_for_odt([(document.title, frozenset())])
+        content_xml += f'<text:p text:style-name="Title">{title}</text:p>\n'
         
-        # Write grouped content
-        for item in grouped_odt:
-            if item['type'] == 'title1':
-                content_xml += f'<text:p text:style-name="Title1">{item["content"]}</text:p>\n'
-            elif item['type'] == 'code':
-                content_xml += f'<text:p text:style-name="CodeBlock">{item["content"]}</text:p>\n'
-            elif item['type'] == 'title2':
-                content_xml += f'<text:p text:style-name="Title2">{item["content"]}</text:p>\n'
-            elif item['type'] == 'quote':
-                content_xml += f'<text:p text:style-name="Quote">{item["content"]}</text:p>\n'
-            elif item['type'] == 'epigraph':
-                content_xml += f'<text:p text:style-name="Epigraph">{item["content"]}</text:p>\n'
-            elif item['type'] == 'image':
+        # Write blocks
+        for block in document.blocks:
+            if block.kind == 'code':
+                # Preserve spaces/tabs for code
+                code_content = block.source
+                code_content = code_content.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+                code_content = code_content.replace("\n", "<text:line-break/>")
+                # ODT collapses spaces, use text:s for multiple spaces
+                code_content = code_content.replace("  ", "<text:s text:c=\"2\"/>")
+                code_content = code_content.replace("\t", "<text:tab/>")
+                content_xml += f'<text:p text:style-name="CodeBlock">{code_content}</text:p>\n'
+            elif block.kind == 'image':
                 # Add actual image to ODT
-                metadata = item['metadata']
+                metadata = block.metadata
                 filename = metadata.get('filename', 'image')
                 original_size = metadata.get('original_size', (800, 600))
                 width_percent = metadata.get('width_percent', 80.0)
@@ -1617,9 +1353,15 @@ class ExportService:
                 # Add caption if exists
                 if caption:
                     content_xml += f'<text:p text:style-name="ImageCaption">{caption}</text:p>\n'
-                    
-            elif item['type'] == 'content':
-                content_xml += f'<text:p text:style-name="{item["style"]}">{item["content"]}</text:p>\n'
+
+            elif isinstance(block, TextBlock):
+                if block.kind == 'text':
+                    style = "Introduction" if block.indent else "Normal"
+                else:
+                    style = {'title1': 'Title1', 'title2': 'Title2',
+                             'quote': 'Quote', 'epigraph': 'Epigraph'}[block.kind]
+                text = self._block_text(block, self._format_runs_for_odt, note)
+                content_xml += f'<text:p text:style-name="{style}">{text}</text:p>\n'
         
         content_xml += '''</office:text>
 </office:body>
@@ -1627,6 +1369,7 @@ class ExportService:
         
         return content_xml
 
+
     def _create_manifest(self, file_path: Path, image_files: list = None):
         """Create manifest.xml for ODT"""
         manifest_xml = '''<?xml version="1.0" encoding="UTF-8"?>
@@ -1750,9 +1493,15 @@ class ExportService:
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(meta_xml)
 
-    def _export_pdf(self, project: Project, file_path: str) -> bool:
+    def _export_pdf(self, document: Document, file_path: str) -> bool:
         """Export to PDF format"""
         try:
+            from reportlab.lib.pagesizes import A4
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.units import cm
+            from reportlab.platypus import SimpleDocTemplate, Paragraph as RLParagraph, Spacer, Image as RLImage
+            from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+
             # Ensure parent directory exists
             file_path_obj = Path(file_path)
             file_path_obj.parent.mkdir(parents=True, exist_ok=True)
@@ -1858,154 +1607,30 @@ class ExportService:
                 alignment=TA_JUSTIFY
             )
             
-            # Collect footnotes and group paragraphs (with PDF-specific footnote formatting)
-            all_footnotes, footnote_map = self._collect_footnotes(project)
-            
-            # Build PDF-specific grouped structure
-            grouped_pdf = []
-            current_paragraph_content = []
-            current_style = None
-            paragraph_starts_with_introduction = False
-            last_was_quote = False
-            
-            for i, paragraph in enumerate(project.paragraphs):
-                # Using new method for PDF
-                content = self._format_text_for_pdf(paragraph.content)
-                
-                if paragraph.type == ParagraphType.TITLE_1:
-                    if current_paragraph_content:
-                        combined = " ".join(current_paragraph_content)
-                        grouped_pdf.append({'type': 'content', 'content': combined, 'style': current_style})
-                        current_paragraph_content = []
-                        current_style = None
-                        paragraph_starts_with_introduction = False
-                    
-                    grouped_pdf.append({'type': 'title1', 'content': content})
-                    last_was_quote = False
-                
-                elif paragraph.type == ParagraphType.TITLE_2:
-                    if current_paragraph_content:
-                        combined = " ".join(current_paragraph_content)
-                        grouped_pdf.append({'type': 'content', 'content': combined, 'style': current_style})
-                        current_paragraph_content = []
-                        current_style = None
-                        paragraph_starts_with_introduction = False
-                    
-                    grouped_pdf.append({'type': 'title2', 'content': content})
-                    last_was_quote = False
-                
-                elif paragraph.type == ParagraphType.QUOTE:
-                    if current_paragraph_content:
-                        combined = " ".join(current_paragraph_content)
-                        grouped_pdf.append({'type': 'content', 'content': combined, 'style': current_style})
-                        current_paragraph_content = []
-                        current_style = None
-                        paragraph_starts_with_introduction = False
-                    
-                    grouped_pdf.append({'type': 'quote', 'content': content})
-                    last_was_quote = True
-                
-                elif paragraph.type == ParagraphType.EPIGRAPH:
-                    if current_paragraph_content:
-                        combined = " ".join(current_paragraph_content)
-                        grouped_pdf.append({'type': 'content', 'content': combined, 'style': current_style})
-                        current_paragraph_content = []
-                        current_style = None
-                        paragraph_starts_with_introduction = False
-                    
-                    grouped_pdf.append({'type': 'epigraph', 'content': content})
-                    last_was_quote = True
-                
-                elif paragraph.type == ParagraphType.IMAGE:
-                    if current_paragraph_content:
-                        combined = " ".join(current_paragraph_content)
-                        grouped_pdf.append({'type': 'content', 'content': combined, 'style': current_style})
-                        current_paragraph_content = []
-                        current_style = None
-                        paragraph_starts_with_introduction = False
-                    
-                    # Add image to grouped list
-                    img_metadata = paragraph.get_image_metadata()
-                    if img_metadata:
-                        grouped_pdf.append({'type': 'image', 'metadata': img_metadata})
-                    last_was_quote = False
-                
-                elif paragraph.type in [ParagraphType.INTRODUCTION, ParagraphType.ARGUMENT, ParagraphType.CONCLUSION, ParagraphType.ARGUMENT_RESUMPTION]:
-                    should_start_new = (
-                        paragraph.type == ParagraphType.INTRODUCTION or
-                        paragraph.type == ParagraphType.ARGUMENT_RESUMPTION or
-                        last_was_quote or
-                        not current_paragraph_content
-                    )
-                    
-                    if should_start_new and current_paragraph_content:
-                        combined = " ".join(current_paragraph_content)
-                        grouped_pdf.append({'type': 'content', 'content': combined, 'style': current_style})
-                        current_paragraph_content = []
-                        current_style = None
-                        paragraph_starts_with_introduction = False
-                    
-                    if not current_paragraph_content:
-                        if paragraph.type == ParagraphType.INTRODUCTION or paragraph.type == ParagraphType.ARGUMENT_RESUMPTION:
-                            paragraph_starts_with_introduction = True
-                            current_style = introduction_style
-                        elif last_was_quote:
-                            paragraph_starts_with_introduction = False
-                            current_style = normal_style
-                        else:
-                            if current_style is None:
-                                current_style = normal_style
-                    
-                    # Add PDF footnote references
-                    if paragraph.id in footnote_map:
-                        for footnote_num in footnote_map[paragraph.id]:
-                            content += f"<sup>{footnote_num}</sup>"
-                    
-                    current_paragraph_content.append(content)
-                    
-                    next_is_new = False
-                    if i + 1 < len(project.paragraphs):
-                        next_p = project.paragraphs[i + 1]
-                        if next_p.type in [ParagraphType.INTRODUCTION, ParagraphType.TITLE_1, 
-                                          ParagraphType.TITLE_2, ParagraphType.QUOTE]:
-                            next_is_new = True
-                    else:
-                        next_is_new = True
-                    
-                    if next_is_new:
-                        combined = " ".join(current_paragraph_content)
-                        grouped_pdf.append({'type': 'content', 'content': combined, 'style': current_style})
-                        current_paragraph_content = []
-                        current_style = None
-                        paragraph_starts_with_introduction = False
-                    
-                    last_was_quote = False
-            
-            # Write remaining
-            if current_paragraph_content:
-                combined = " ".join(current_paragraph_content)
-                grouped_pdf.append({'type': 'content', 'content': combined, 'style': current_style})
+            # PDF footnote references
+            def note(number):
+                return f"<sup>{number}</sup>"
             
             # Build story
             story = []
-            story.append(RLParagraph(project.name, title_style))
+            story.append(RLParagraph(document.title, title_style))
             story.append(Spacer(1, 20))
             
-            # Write grouped content
-            for item in grouped_pdf:
-                if item['type'] == 'title1':
-                    story.append(RLParagraph(item['content'], title1_style))
-                elif item['type'] == 'title2':
-                    story.append(RLParagraph(item['content'], title2_style))
-                elif item['type'] == 'quote':
-                    story.append(RLParagraph(item['content'], quote_style))
-                elif item['type'] == 'epigraph':
-                    story.append(RLParagraph(item['content'], epigraph_style))
-                elif item['type'] == 'image':
+            # Write blocks
+            for block in document.blocks:
+                if block.kind == 'title1':
+                    story.append(RLParagraph(self._block_text(block, self._format_runs_for_pdf, note), title1_style))
+                elif block.kind == 'title2':
+                    story.append(RLParagraph(self._block_text(block, self._format_runs_for_pdf, note), title2_style))
+                elif block.kind == 'quote':
+                    story.append(RLParagraph(self._block_text(block, self._format_runs_for_pdf, note), quote_style))
+                elif block.kind == 'epigraph':
+                    story.append(RLParagraph(self._block_text(block, self._format_runs_for_pdf, note), epigraph_style))
+                elif block.kind == 'image':
                     # Add image to PDF
+                    metadata = block.metadata
                     try:
-                        metadata = item['metadata']
-                        img_path = Path(metadata['path'])
+                        img_path = block.path
                         
                         if img_path.exists():
                             # Get metadata
@@ -2057,21 +1682,21 @@ class ExportService:
                                 story.append(RLParagraph(caption, caption_style))
                                 story.append(Spacer(1, 12))
                     except Exception as e:
-                        print(_("Erro ao adicionar imagem ao PDF: {}").format(e))
+                        logger.warning(_("Erro ao adicionar imagem ao PDF: {}").format(e))
                         # Add placeholder text if image fails
                         story.append(RLParagraph(f"[Image: {metadata.get('filename', 'image')}]", normal_style))
                 
-                elif item['type'] == 'content':
-                    story.append(RLParagraph(item['content'], item['style']))
+                elif block.kind == 'text':
+                    style = introduction_style if block.indent else normal_style
+                    story.append(RLParagraph(self._block_text(block, self._format_runs_for_pdf, note), style))
             
             # Add footnotes
-            if all_footnotes:
+            if document.footnotes:
                 story.append(Spacer(1, 20))
                 story.append(RLParagraph(_("Notas de rodapé:"), title2_style))
-                for i, footnote_text in enumerate(all_footnotes):
+                for i, footnote in enumerate(document.footnotes):
                     # Format footnote text too
-                    formatted_footnote = self._format_text_for_pdf(footnote_text)
-                    footnote_content = f"{i + 1}. {formatted_footnote}"
+                    footnote_content = f"{i + 1}. {self._format_runs_for_pdf(footnote)}"
                     story.append(RLParagraph(footnote_content, footnote_style))
             
             # Build PDF
@@ -2079,24 +1704,26 @@ class ExportService:
             return True
             
         except OSError as e:
-            print(_("Erro de arquivo ao exportar para PDF: {}").format(e))
+            logger.warning(_("Erro de arquivo ao exportar para PDF: {}").format(e))
             return False
         except Exception as e:
-            print(_("Erro inesperado ao exportar para PDF: {}: {}").format(type(e).__name__, e))
-            import traceback
-            traceback.print_exc()
+            logger.exception(_("Erro inesperado ao exportar para PDF: {}: {}").format(type(e).__name__, e))
             return False
 
-    def _export_latex(self, project: Project, file_path: str) -> bool:
+    def _export_latex(self, document: Document, file_path: str) -> bool:
         """Export for LaTeX format (.tex) com regras ABNT e tamanhos de fonte corrigidos"""
         try:
+            from pylatex import Document as LatexDocument, Section, Subsection, Command, Package, \
+                                Figure, NoEscape
+            from pylatex.base_classes import Environment
+
             file_path_obj = Path(file_path)
             file_path_obj.parent.mkdir(parents=True, exist_ok=True)
 
             # 1. Configuração do Documento
             # IMPORTANTE: Adicionado '12pt' e 'a4paper' para base correta ABNT
             geometry_options = {"tmargin": "3cm", "lmargin": "3cm", "rmargin": "2cm", "bmargin": "2cm"}
-            doc = Document(
+            doc = LatexDocument(
                 documentclass='article',
                 document_options=['12pt', 'a4paper'], 
                 geometry_options=geometry_options
@@ -2134,66 +1761,50 @@ class ExportService:
                 _latex_name = 'citacao'
 
             # Metadata
-            doc.preamble.append(Command('title', project.name))
-            if project.metadata.get('author'):
-                doc.preamble.append(Command('author', project.metadata.get('author')))
+            doc.preamble.append(Command('title', document.title))
+            if document.author:
+                doc.preamble.append(Command('author', document.author))
             doc.preamble.append(Command('date', NoEscape(r'\today')))
             
             doc.append(NoEscape(r'\maketitle'))
 
-            # --- BUFFER DE TEXTO ---
-            text_buffer = []
+            # Notas de rodapé ficam no ponto em que são referenciadas
+            def note(number):
+                return r'\footnote{' + self._format_runs_for_latex(document.footnotes[number - 1]) + r'}'
 
-            def flush_buffer():
-                """Escreve o texto acumulado no documento"""
-                if text_buffer:
-                    full_text = " ".join([str(t) for t in text_buffer])
-                    doc.append(NoEscape(full_text))
-                    doc.append(NewLine())
-                    text_buffer.clear()
+            def text(block):
+                return NoEscape(self._block_text(block, self._format_runs_for_latex, note))
 
-            for paragraph in project.paragraphs:
+            for block in document.blocks:
                 
-                # Agrupa textos corridos
-                if paragraph.type in [ParagraphType.INTRODUCTION, ParagraphType.ARGUMENT, 
-                                     ParagraphType.CONCLUSION, ParagraphType.ARGUMENT_RESUMPTION]:
-                    
-                    chunk = self._format_text_for_latex(paragraph.content)
-                    
-                    if hasattr(paragraph, 'footnotes') and paragraph.footnotes:
-                        for note in paragraph.footnotes:
-                            note_fmt = self._format_text_for_latex(note)
-                            chunk += NoEscape(r'\footnote{' + note_fmt + r'}')
-                    
-                    text_buffer.append(chunk)
-                    continue
-
-                # --- Elementos de Quebra ---
-                flush_buffer()
+                if block.kind == 'text':
+                    # Parágrafo TAC: recuo apenas quando aberto por introdução ou retomada
+                    prefix = '' if block.indent else r'\noindent '
+                    doc.append(NoEscape(prefix + text(block)))
+                    doc.append(NoEscape(r'\par'))
 
-                if paragraph.type == ParagraphType.TITLE_1:
-                    doc.append(Section(self._format_text_for_latex(paragraph.content)))
+                elif block.kind == 'title1':
+                    doc.append(Section(text(block)))
                 
-                elif paragraph.type == ParagraphType.TITLE_2:
-                    doc.append(Subsection(self._format_text_for_latex(paragraph.content)))
+                elif block.kind == 'title2':
+                    doc.append(Subsection(text(block)))
                 
-                elif paragraph.type == ParagraphType.QUOTE:
+                elif block.kind == 'quote':
                     # Instancia a classe CitacaoABNT
                     citacao = CitacaoABNT()
-                    citacao.append(self._format_text_for_latex(paragraph.content))
+                    citacao.append(text(block))
                     doc.append(citacao)
                     
-                elif paragraph.type == ParagraphType.EPIGRAPH:
-                    formatted = self._format_text_for_latex(paragraph.content)
-                    doc.append(NoEscape(r'\begin{flushright}\textit{' + formatted + r'}\end{flushright}'))
+                elif block.kind == 'epigraph':
+                    doc.append(NoEscape(r'\begin{flushright}\textit{' + text(block) + r'}\end{flushright}'))
                 
-                elif paragraph.type == ParagraphType.CODE:
+                elif block.kind == 'code':
                     doc.append(NoEscape(r'\begin{lstlisting}'))
-                    doc.append(NoEscape(paragraph.content))
+                    doc.append(NoEscape(block.source))
                     doc.append(NoEscape(r'\end{lstlisting}'))
                 
-                elif paragraph.type == ParagraphType.LATEX:
-                    content = paragraph.content.strip()
+                elif block.kind == 'latex':
+                    content = block.source.strip()
                     if content:
                         if content.startswith('\\begin') or content.startswith('$$') or content.startswith('\\['):
                             doc.append(NoEscape(content))
@@ -2202,27 +1813,23 @@ class ExportService:
                             doc.append(NoEscape(content))
                             doc.append(NoEscape(r'\end{equation}'))
 
-                elif paragraph.type == ParagraphType.IMAGE:
-                    img_metadata = paragraph.get_image_metadata()
-                    if img_metadata and Path(img_metadata['path']).exists():
+                elif block.kind == 'image':
+                    img_metadata = block.metadata
+                    if block.path.exists():
                         with doc.create(Figure(position='h!')) as pic:
                             width_str = r'0.8\textwidth'
                             if 'width_percent' in img_metadata:
                                 width_str = f"{img_metadata['width_percent']/100:.2f}\\textwidth"
                             
-                            pic.add_image(img_metadata['path'], width=NoEscape(width_str))
+                            pic.add_image(str(block.path), width=NoEscape(width_str))
                             
                             if img_metadata.get('caption'):
                                 pic.add_caption(img_metadata['caption'])
 
-            flush_buffer()
-
             doc.generate_tex(str(file_path_obj.with_suffix('')))
             
             return True
 
         except Exception as e:
-            print(_("Erro inesperado ao exportar para LaTeX: {}: {}").format(type(e).__name__, e))
-            import traceback
-            traceback.print_exc()
+            logger.exception(_("Erro inesperado ao exportar para LaTeX: {}: {}").format(type(e).__name__, e))
             return False
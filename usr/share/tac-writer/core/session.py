@@ -0,0 +1,113 @@
+"""
+TAC Session
+Snapshot of the last open project, shown at launch while the database
+is still being read
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Project, Paragraph
+
+logger = logging.getLogger(__name__)
+
+
+class SessionSnapshot:
+    """
+    Compact copy of what was on screen when the window was closed.
+
+    Only the paragraphs around the first visible one are stored, together
+    with the paragraph count (for placeholders) and the sidebar entries.
+    The project is always loaded again from the database, which replaces
+    everything taken from the snapshot except the paragraphs edited before
+    it arrived.
+    """
+
+    VERSION = 1
+
+    # Paragraphs stored before and after the first visible one
+    PARAGRAPHS_BEFORE = 5
+    PARAGRAPHS_AFTER = 30
+
+    def __init__(self, cache_dir: Path):
+        self.path = Path(cache_dir) / 'session.json'
+
+    def save(self, project: Project, first_index: int, scroll_offset: float,
+             projects: List[Dict[str, Any]]) -> bool:
+        """Write the snapshot of the open project and the sidebar"""
+        count = len(project.paragraphs)
+        first_index = max(0, min(first_index, count - 1))
+        start = max(0, first_index - self.PARAGRAPHS_BEFORE)
+        end = min(count, first_index + self.PARAGRAPHS_AFTER)
+
+        data = {
+            'version': self.VERSION,
+            'saved_at': datetime.now().isoformat(),
+            'project': {
+                'id': project.id,
+                'name': project.name,
+                'created_at': project.created_at.isoformat(),
+                'modified_at': project.modified_at.isoformat(),
+                'metadata': project.metadata.copy(),
+                'document_formatting': project.document_formatting.copy(),
+            },
+            'paragraph_count': count,
+            'first_index': first_index,
+            'scroll_offset': scroll_offset,
+            'start': start,
+            'paragraphs': [p.to_dict() for p in project.paragraphs[start:end]],
+            'projects': projects,
+        }
+
+        temp_path = self.path.with_suffix('.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(temp_path, self.path)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Error writing session snapshot: %s", e)
+            return False
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Read the snapshot, or None if there is no usable one"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != self.VERSION:
+            return None
+        if not isinstance(data.get('project'), dict) or not isinstance(data.get('paragraphs'), list):
+            return None
+        if not isinstance(data.get('projects'), list):
+            data['projects'] = None
+        return data
+
+    def clear(self) -> None:
+        """Forget the snapshot (e.g. when no project is open at close)"""
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    @staticmethod
+    def restore(data: Dict[str, Any]) -> Tuple[Project, List[Optional[Paragraph]]]:
+        """
+        Rebuild the project shell and its paragraph slots from a snapshot.
+
+        Slots outside the stored range are None.
+        """
+        project = Project.from_dict(data['project'])
+        count = max(0, int(data.get('paragraph_count', 0)))
+        slots: List[Optional[Paragraph]] = [None] * count
+
+        start = int(data.get('start', 0))
+        for offset, p_data in enumerate(data['paragraphs']):
+            if 0 <= start + offset < count:
+                slots[start + offset] = Paragraph.from_dict(p_data)
+        return project, slots
@@ -0,0 +1,144 @@
+"""
+TAC Spell Dictionaries
+Discovery of the installed enchant dictionaries, cached between launches
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from utils.helpers import DependencyHelper
+
+logger = logging.getLogger(__name__)
+
+ENCHANT_AVAILABLE = DependencyHelper.is_available('enchant')
+
+# Languages offered by the editor (Arch Fix: test both 'pt_BR' and 'pt-BR')
+TARGET_LANGUAGES = ['pt_BR', 'pt-BR', 'en_US', 'en-US', 'en_GB', 'es_ES', 'fr_FR', 'de_DE', 'it_IT']
+
+# Where enchant providers and their dictionaries are installed; a change in
+# any of these directories invalidates the cached discovery
+_WATCHED_PATTERNS = [
+    '/usr/lib/enchant*', '/usr/lib/*/enchant*', '/usr/lib64/enchant*',
+    '/usr/share/enchant*', '/usr/share/hunspell', '/usr/share/myspell',
+    '/usr/share/myspell/dicts', '/usr/share/aspell', '/usr/lib/aspell*',
+    '/usr/lib/*/aspell*', '/usr/share/nuspell', '/usr/share/voikko',
+    '~/.config/enchant', '~/.local/share/hunspell',
+]
+
+DiscoveryCallback = Callable[[List[str]], None]
+
+
+class DictionaryDiscovery:
+    """
+    Finds which TARGET_LANGUAGES have an installed dictionary.
+
+    The result is cached in the cache directory together with a fingerprint
+    of the enchant provider and dictionary directories, so a launch only has
+    to read the cache; revalidate() checks the fingerprint off the main
+    thread and runs enchant again only when something was installed or
+    removed.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_dir: Path):
+        self.cache_file = Path(cache_dir) / 'spell_dictionaries.json'
+
+    def load_cached(self) -> Optional[List[str]]:
+        """Languages found by the last discovery, or None if never run"""
+        data = self._read_cache()
+        return list(data['languages']) if data else None
+
+    def revalidate(self, callback: DiscoveryCallback) -> None:
+        """
+        Refresh the cache in a background thread.
+
+        callback(languages) runs on that thread, and only when the list of
+        available languages differs from the cached one.
+        """
+        threading.Thread(target=self._revalidate, args=(callback,), daemon=True).start()
+
+    def _revalidate(self, callback: DiscoveryCallback) -> None:
+        cached = self._read_cache()
+        fingerprint = self.fingerprint()
+        if cached and cached.get('fingerprint') == fingerprint:
+            return
+
+        try:
+            providers, languages = self.discover()
+        except Exception as e:
+            logger.warning("Error discovering spell check dictionaries: %s", e)
+            return
+
+        self._write_cache({
+            'version': self.CACHE_VERSION,
+            'fingerprint': fingerprint,
+            'providers': providers,
+            'languages': languages,
+        })
+
+        if not cached or cached.get('languages') != languages:
+            callback(languages)
+
+    def fingerprint(self) -> str:
+        """Hash of the provider and dictionary directories and their mtimes"""
+        entries = []
+        for pattern in _WATCHED_PATTERNS:
+            for path in sorted(glob.glob(os.path.expanduser(pattern))):
+                try:
+                    entries.append(f"{path}:{os.stat(path).st_mtime_ns}")
+                except OSError:
+                    continue
+        for variable in ('ENCHANT_CONFIG_DIR', 'DICPATH'):
+            entries.append(f"{variable}={os.environ.get(variable, '')}")
+        return hashlib.sha1("\n".join(entries).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def discover():
+        """Ask enchant for its providers and the installed target languages"""
+        if not ENCHANT_AVAILABLE:
+            return [], []
+
+        import enchant
+
+        # A private broker: the shared one is used by the spell service
+        broker = enchant.Broker()
+        providers = sorted(provider.name for provider in broker.describe())
+
+        languages = []
+        for language in TARGET_LANGUAGES:
+            try:
+                if broker.dict_exists(language):
+                    normalized = language.replace('-', '_')
+                    if normalized not in languages:
+                        languages.append(normalized)
+            except Exception as e:
+                logger.warning("Error checking dictionary %s: %s", language, e)
+        return providers, languages
+
+    def _read_cache(self) -> Optional[dict]:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != self.CACHE_VERSION:
+            return None
+        if not isinstance(data.get('languages'), list):
+            return None
+        return data
+
+    def _write_cache(self, data: dict) -> None:
+        temp_file = self.cache_file.with_suffix('.tmp')
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            logger.warning("Error writing spell dictionary cache: %s", e)
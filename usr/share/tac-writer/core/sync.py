@@ -0,0 +1,903 @@
+"""
+TAC Sync
+Sync engine and the storage backends it runs on (Dropbox, a local or
+network folder, memory)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .changelog import (CHANGESET_VERSION, acknowledge, build_changeset, changeset_name,
+                        decode_changeset, encode_changeset, has_changes, log_head,
+                        materialize, parse_changeset_name, prune_echoes)
+from .merkle import build_tree
+from utils.tracing import span, traced
+
+DROPBOX_APP_KEY = "x3h06acjg6fhbmq"
+
+# Passed as if_revision: write whatever the remote holds
+ANY_REVISION = object()
+
+# Size of the pieces large files are streamed in (also the Dropbox upload
+# session chunk, which must stay a multiple of 4 MiB)
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class RevisionConflict(Exception):
+    """The remote file changed since the revision a conditional write expected"""
+
+
+class SyncCancelled(Exception):
+    """The sync was cancelled by the user"""
+
+
+class Transfer:
+    """
+    Progress reporting and cancellation of a sync run.
+
+    progress(stage, done, total) is called from the sync thread while the
+    snapshot is uploaded ('upload', bytes of the database read) or
+    downloaded ('download', compressed bytes received; total 0 if
+    unknown). Setting cancel_event stops the run at the next chunk.
+    """
+
+    def __init__(self, progress: Optional[Callable[[str, int, int], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
+        self.progress = progress
+        self.cancel_event = cancel_event or threading.Event()
+
+    def check(self) -> None:
+        if self.cancel_event.is_set():
+            raise SyncCancelled()
+
+    def report(self, stage: str, done: int, total: int) -> None:
+        if self.progress is not None:
+            self.progress(stage, done, total)
+
+
+def compress_file(path, transfer: Transfer) -> Iterator[bytes]:
+    """Gzip-compressed content of a file, in chunks of CHUNK_SIZE"""
+    total = os.path.getsize(path)
+    done = 0
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = bytearray()
+    with open(path, 'rb') as f:
+        while True:
+            transfer.check()
+            block = f.read(CHUNK_SIZE // 4)
+            if not block:
+                break
+            pending += compressor.compress(block)
+            done += len(block)
+            transfer.report('upload', done, total)
+            while len(pending) >= CHUNK_SIZE:
+                yield bytes(pending[:CHUNK_SIZE])
+                del pending[:CHUNK_SIZE]
+    pending += compressor.flush()
+    for start in range(0, len(pending), CHUNK_SIZE):
+        yield bytes(pending[start:start + CHUNK_SIZE])
+
+
+def write_chunks(chunks: Iterable[bytes], path, transfer: Transfer, total: int = 0,
+                 compressed: bool = True) -> None:
+    """Write downloaded chunks to a file, decompressing gzip on the fly"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if compressed else None
+    done = 0
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            transfer.check()
+            f.write(decompressor.decompress(chunk) if decompressor else chunk)
+            done += len(chunk)
+            transfer.report('download', done, total)
+        if decompressor:
+            f.write(decompressor.flush())
+            if not decompressor.eof:
+                raise ValueError("Snapshot remoto incompleto")
+
+
+class RemoteEntry:
+    """A file on a backend"""
+
+    __slots__ = ('path', 'revision', 'size')
+
+    def __init__(self, path: str, revision: str, size: int):
+        self.path = path
+        # Opaque token that changes whenever the file is rewritten
+        self.revision = revision
+        self.size = size
+
+
+class SyncBackend:
+    """
+    Remote file store used by the sync engine.
+
+    Paths are absolute ('/changes/device/file'), with '/' as separator.
+    put() is a compare-and-swap when if_revision is given: None requires
+    the file not to exist, a revision requires the file to still have it;
+    otherwise RevisionConflict is raised and nothing is written.
+    """
+
+    # Identifies the remote, so sync state is not reused across remotes
+    location = ''
+
+    def stat(self, path: str) -> Optional[RemoteEntry]:
+        raise NotImplementedError
+
+    def get(self, path: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def put(self, path: str, data: bytes, if_revision=ANY_REVISION) -> RemoteEntry:
+        raise NotImplementedError
+
+    def list(self, folder: str) -> List[RemoteEntry]:
+        """Files under folder, recursively; empty if it does not exist"""
+        raise NotImplementedError
+
+    def delete(self, path: str) -> None:
+        """Remove a file; a missing file is not an error"""
+        raise NotImplementedError
+
+    def get_chunks(self, path: str) -> Optional[Iterator[bytes]]:
+        """Content of a large file as an iterator of chunks, or None if it does not exist"""
+        data = self.get(path)
+        return None if data is None else iter([data])
+
+    def put_chunks(self, path: str, chunks: Iterable[bytes], if_revision=ANY_REVISION) -> RemoteEntry:
+        """Write a large file from an iterator of chunks"""
+        return self.put(path, b''.join(chunks), if_revision)
+
+
+class MemoryBackend(SyncBackend):
+    """
+    Backend kept in a dict, for tests and for profiling the sync offline.
+
+    latency (seconds) is added to every call to mimic a network round
+    trip; bytes_in and bytes_out count what was transferred.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.location = f"memory:{id(self):x}"
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._files: Dict[str, tuple] = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def stat(self, path):
+        self._wait()
+        with self._lock:
+            item = self._files.get(path)
+            return RemoteEntry(path, item[1], len(item[0])) if item else None
+
+    def get(self, path):
+        self._wait()
+        with self._lock:
+            item = self._files.get(path)
+        if item is None:
+            return None
+        self.bytes_in += len(item[0])
+        return item[0]
+
+    def put(self, path, data, if_revision=ANY_REVISION):
+        self._wait()
+        with self._lock:
+            current = self._files.get(path)
+            if if_revision is not ANY_REVISION and (current[1] if current else None) != if_revision:
+                raise RevisionConflict(path)
+            self._counter += 1
+            revision = str(self._counter)
+            self._files[path] = (bytes(data), revision)
+        self.bytes_out += len(data)
+        return RemoteEntry(path, revision, len(data))
+
+    def list(self, folder):
+        self._wait()
+        prefix = folder.rstrip('/') + '/'
+        with self._lock:
+            return [RemoteEntry(path, revision, len(data))
+                    for path, (data, revision) in sorted(self._files.items()) if path.startswith(prefix)]
+
+    def delete(self, path):
+        self._wait()
+        with self._lock:
+            self._files.pop(path, None)
+
+
+class LocalFolderBackend(SyncBackend):
+    """
+    Backend on a folder: a local directory, a mounted NAS share or a
+    folder kept in sync by another client.
+
+    Files are written to a temporary name and renamed into place, so
+    readers never see a partial file and every write changes the inode
+    that the revision is built from. Conditional writes hold a lock file
+    next to the target, which also works between machines on a share.
+    """
+
+    LOCK_TIMEOUT = 10.0
+    # A lock older than this was left by a process that died
+    LOCK_STALE = 60.0
+
+    def __init__(self, root):
+        self.root = Path(root).expanduser()
+        self.location = f"folder:{self.root.resolve()}"
+
+    def _local(self, path: str) -> Path:
+        parts = [part for part in path.strip('/').split('/') if part]
+        if not parts or any(part in ('.', '..') for part in parts):
+            raise ValueError(f"Caminho remoto inválido: {path}")
+        return self.root.joinpath(*parts)
+
+    def _path(self, local: Path) -> str:
+        return '/' + local.relative_to(self.root).as_posix()
+
+    @staticmethod
+    def _entry(path: str, st: os.stat_result) -> RemoteEntry:
+        return RemoteEntry(path, f"{st.st_mtime_ns:x}-{st.st_size:x}-{st.st_ino:x}", st.st_size)
+
+    def stat(self, path):
+        try:
+            return self._entry(path, self._local(path).stat())
+        except FileNotFoundError:
+            return None
+
+    def get(self, path):
+        try:
+            return self._local(path).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def get_chunks(self, path):
+        try:
+            f = open(self._local(path), 'rb')
+        except FileNotFoundError:
+            return None
+        return self._read_chunks(f)
+
+    @staticmethod
+    def _read_chunks(f):
+        with f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def put(self, path, data, if_revision=ANY_REVISION):
+        return self._write(path, lambda temp: temp.write_bytes(data), if_revision)
+
+    def put_chunks(self, path, chunks, if_revision=ANY_REVISION):
+        def fill(temp):
+            with open(temp, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        return self._write(path, fill, if_revision)
+
+    def _write(self, path, fill, if_revision):
+        target = self._local(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            fill(temp)
+            if if_revision is ANY_REVISION:
+                os.replace(temp, target)
+            else:
+                with self._locked(target):
+                    current = self.stat(path)
+                    if (current.revision if current else None) != if_revision:
+                        raise RevisionConflict(path)
+                    os.replace(temp, target)
+        finally:
+            if temp.exists():
+                temp.unlink()
+        return self._entry(path, target.stat())
+
+    def _locked(self, target: Path):
+        lock_path = target.with_name(f".{target.name}.lock")
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return _LockFile(lock_path)
+            except FileExistsError:
+                try:
+                    if time.time() - lock_path.stat().st_mtime > self.LOCK_STALE:
+                        lock_path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Pasta de sincronização bloqueada: {lock_path}")
+                time.sleep(0.05)
+
+    def list(self, folder):
+        base = self._local(folder) if folder.strip('/') else self.root
+        if not base.is_dir():
+            return []
+        entries = []
+        for directory, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            for filename in sorted(filenames):
+                if filename.startswith('.'):
+                    continue
+                local = Path(directory) / filename
+                try:
+                    entries.append(self._entry(self._path(local), local.stat()))
+                except FileNotFoundError:
+                    continue
+        return entries
+
+    def delete(self, path):
+        try:
+            self._local(path).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class _LockFile:
+    def __init__(self, path: Path):
+        self.path = path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class DropboxBackend(SyncBackend):
+    """Backend on the Dropbox app folder; revisions are Dropbox file revs"""
+
+    location = 'dropbox:'
+
+    # Attempts per upload request before giving up
+    RETRIES = 3
+
+    def __init__(self, dbx):
+        self.dbx = dbx
+
+    @classmethod
+    def connect(cls, refresh_token: str, app_key: str = DROPBOX_APP_KEY) -> 'DropboxBackend':
+        import dropbox
+        return cls(dropbox.Dropbox(oauth2_refresh_token=refresh_token, app_key=app_key))
+
+    @staticmethod
+    def _lookup_error(error):
+        """The LookupError/WriteError inside an ApiError, if any"""
+        from dropbox.exceptions import ApiError
+        if not isinstance(error, ApiError):
+            return None
+        err = error.error
+        if hasattr(err, 'is_path') and err.is_path():
+            reason = err.get_path()
+            return getattr(reason, 'reason', reason)
+        if hasattr(err, 'is_path_lookup') and err.is_path_lookup():
+            return err.get_path_lookup()
+        return None
+
+    @classmethod
+    def _not_found(cls, error) -> bool:
+        reason = cls._lookup_error(error)
+        return reason is not None and hasattr(reason, 'is_not_found') and reason.is_not_found()
+
+    @classmethod
+    def _conflict(cls, error) -> bool:
+        reason = cls._lookup_error(error)
+        return reason is not None and hasattr(reason, 'is_conflict') and reason.is_conflict()
+
+    @staticmethod
+    def _entry(metadata) -> RemoteEntry:
+        return RemoteEntry(metadata.path_display, metadata.rev, metadata.size)
+
+    def stat(self, path):
+        from dropbox.files import FileMetadata
+        try:
+            metadata = self.dbx.files_get_metadata(path)
+        except Exception as e:
+            if self._not_found(e):
+                return None
+            raise
+        return self._entry(metadata) if isinstance(metadata, FileMetadata) else None
+
+    def get(self, path):
+        try:
+            _metadata, response = self.dbx.files_download(path)
+            return response.content
+        except Exception as e:
+            if self._not_found(e):
+                return None
+            raise
+
+    def get_chunks(self, path):
+        try:
+            _metadata, response = self.dbx.files_download(path)
+        except Exception as e:
+            if self._not_found(e):
+                return None
+            raise
+        return self._response_chunks(response)
+
+    @staticmethod
+    def _response_chunks(response):
+        try:
+            yield from response.iter_content(CHUNK_SIZE)
+        finally:
+            response.close()
+
+    @staticmethod
+    def _write_mode(if_revision):
+        from dropbox.files import WriteMode
+        if if_revision is ANY_REVISION:
+            return WriteMode('overwrite')
+        if if_revision is None:
+            return WriteMode('add')
+        return WriteMode('update', if_revision)
+
+    def put(self, path, data, if_revision=ANY_REVISION):
+        try:
+            # autorename off: a conflict must fail instead of creating a copy
+            return self._entry(self.dbx.files_upload(data, path, mode=self._write_mode(if_revision),
+                                                     autorename=False))
+        except Exception as e:
+            if self._conflict(e):
+                raise RevisionConflict(path) from e
+            raise
+
+    def put_chunks(self, path, chunks, if_revision=ANY_REVISION):
+        """
+        Upload through an upload session, one chunk per request, so the
+        file never has to fit in memory or in a single call. A chunk whose
+        request failed is sent again from the offset the server reports.
+        """
+        from dropbox.files import CommitInfo, UploadSessionCursor
+
+        chunks = iter(chunks)
+        chunk = next(chunks, b'')
+        following = next(chunks, None)
+        if following is None:
+            return self.put(path, chunk, if_revision)
+
+        session = self._retry(lambda: self.dbx.files_upload_session_start(chunk))
+        cursor = UploadSessionCursor(session.session_id, len(chunk))
+        while following is not None:
+            chunk, following = following, next(chunks, None)
+            if following is not None:
+                self._append(chunk, cursor)
+
+        commit = CommitInfo(path=path, mode=self._write_mode(if_revision), autorename=False)
+        try:
+            metadata = self._retry(lambda: self.dbx.files_upload_session_finish(chunk, cursor, commit))
+        except Exception as e:
+            if self._conflict(e):
+                raise RevisionConflict(path) from e
+            raise
+        return self._entry(metadata)
+
+    def _append(self, chunk: bytes, cursor) -> None:
+        from dropbox.exceptions import ApiError
+        for attempt in range(self.RETRIES):
+            try:
+                self.dbx.files_upload_session_append_v2(chunk, cursor)
+                break
+            except ApiError as e:
+                err = e.error
+                if not (hasattr(err, 'is_incorrect_offset') and err.is_incorrect_offset()):
+                    raise
+                # The previous attempt reached the server after all
+                correct = err.get_incorrect_offset().correct_offset
+                if correct != cursor.offset + len(chunk):
+                    raise
+                break
+            except Exception as e:
+                if attempt == self.RETRIES - 1 or not self._transient(e):
+                    raise
+                time.sleep(2 ** attempt)
+        cursor.offset += len(chunk)
+
+    def _retry(self, call):
+        for attempt in range(self.RETRIES):
+            try:
+                return call()
+            except Exception as e:
+                if attempt == self.RETRIES - 1 or not self._transient(e):
+                    raise
+                time.sleep(2 ** attempt)
+
+    @staticmethod
+    def _transient(error) -> bool:
+        """Network and server errors worth retrying"""
+        from dropbox.exceptions import InternalServerError, RateLimitError
+        from requests.exceptions import ConnectionError, Timeout
+        return isinstance(error, (InternalServerError, RateLimitError, ConnectionError, Timeout))
+
+    def list(self, folder):
+        from dropbox.files import FileMetadata
+        try:
+            result = self.dbx.files_list_folder(folder, recursive=True)
+        except Exception as e:
+            if self._not_found(e):
+                return []
+            raise
+        entries = []
+        while True:
+            entries.extend(self._entry(entry) for entry in result.entries if isinstance(entry, FileMetadata))
+            if not result.has_more:
+                return entries
+            result = self.dbx.files_list_folder_continue(result.cursor)
+
+    def delete(self, path):
+        try:
+            self.dbx.files_delete_v2(path)
+        except Exception as e:
+            if not self._not_found(e):
+                raise
+
+
+def create_backend(config) -> Optional[SyncBackend]:
+    """Backend chosen in the settings, or None if it is not set up"""
+    if config.get('sync_backend') == 'folder':
+        folder = config.get('sync_folder')
+        return LocalFolderBackend(folder) if folder else None
+    refresh_token = config.get('dropbox_refresh_token')
+    if not refresh_token:
+        return None
+    try:
+        return DropboxBackend.connect(refresh_token)
+    except ImportError:
+        return None
+
+
+class SyncEngine:
+    """
+    Incremental sync of the local database with a backend.
+
+    The remote holds a full database snapshot, a manifest naming that
+    snapshot and the last changeset of each device it includes, and one
+    folder of changesets per device. A sync downloads only the changesets
+    newer than this device's watermarks, merges them three-way (base
+    snapshot of the last sync plus the changesets rebuilds the remote
+    state locally), and uploads one changeset with the local changes. The
+    full snapshot is transferred only to bootstrap a device, when
+    changesets it needs were compacted away, or to compact the changeset
+    folder.
+
+    Snapshots are gzip-compressed and streamed in chunks both ways; they
+    are uploaded under a new name and only become current when
+    the manifest is replaced with a conditional write, so two devices
+    publishing at once cannot leave a manifest that describes the other's
+    snapshot; the loser starts over from the new remote state.
+
+    A run first compares a fingerprint of the remote (revisions of the
+    manifest and of the other devices' changesets) with the state the
+    last run read: when neither side changed since, nothing is downloaded
+    or merged. Only what a run actually read goes into the fingerprint,
+    so changes uploaded by others while it ran are picked up next time.
+    """
+
+    MANIFEST_PATH = '/tac_writer.manifest.json'
+    SNAPSHOTS_DIR = '/snapshots'
+    CHANGES_DIR = '/changes'
+    # Snapshot of remotes written before the manifest named it
+    LEGACY_SNAPSHOT_PATH = '/tac_writer.db'
+
+    # Changeset files kept on the remote before they are folded into the snapshot
+    COMPACT_AFTER = 64
+    # Runs restarted after losing a race for the manifest
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, project_manager, backend: SyncBackend, transfer: Optional[Transfer] = None):
+        self.project_manager = project_manager
+        self.transfer = transfer or Transfer()
+        self.config = project_manager.config
+        self.backend = backend
+        self.db_path = Path(project_manager.db_path)
+        self.base_path = Path(project_manager.sync_base_path)
+
+        self.device_id = self.config.get('sync_device_id') or ''
+        self.uploaded_clock = int(self.config.get('sync_uploaded_clock', 0) or 0)
+        applied = self.config.get('sync_applied_clocks')
+        self.applied = dict(applied) if isinstance(applied, dict) else None
+        self.fingerprint = self.config.get('sync_remote_fingerprint') or ''
+        # Remote state read during this run
+        self._seen_manifest = None
+        self._seen_changes: List[RemoteEntry] = []
+        if not self.device_id or self.config.get('sync_remote') != backend.location:
+            # New remote: start a fresh changeset chain under a new id, the
+            # watermarks of another remote mean nothing here
+            self.device_id = uuid.uuid4().hex
+            self.uploaded_clock = 0
+            self.applied = None
+            self.fingerprint = ''
+            self.config.set('sync_device_id', self.device_id)
+
+    @traced('SyncEngine.run', 'sync')
+    def run(self) -> Dict:
+        """Sync once; returns a summary of what was exchanged"""
+        result = {'bootstrap': False, 'received': 0, 'sent': 0, 'compacted': False,
+                  'skipped': False, 'merge': None}
+        if self._is_idle():
+            result['skipped'] = True
+            return result
+        # Cleared until the run completes, so a failed run is never skipped over
+        self.fingerprint = ''
+        try:
+            for attempt in range(self.MAX_ATTEMPTS):
+                try:
+                    self._run_once(result)
+                    self.fingerprint = self._fingerprint(self._seen_manifest, self._seen_changes)
+                    return result
+                except RevisionConflict:
+                    if attempt == self.MAX_ATTEMPTS - 1:
+                        raise
+        finally:
+            self._save_state()
+
+    def _run_once(self, result: Dict) -> None:
+        if self.applied is None or not self.base_path.exists():
+            self._bootstrap(result)
+
+        chains = self._remote_changesets()
+        if chains is None:
+            # A changeset this device needs was compacted into the snapshot
+            self._bootstrap(result)
+            chains = self._remote_changesets() or {}
+
+        self._exchange(chains, result)
+
+        if self._changeset_count() > self.COMPACT_AFTER:
+            self._compact()
+            result['compacted'] = True
+
+    # Steps
+
+    @traced('SyncEngine._bootstrap', 'sync')
+    def _bootstrap(self, result: Dict) -> None:
+        """
+        Merge the full remote snapshot. The merged database is published as
+        the new snapshot only if it differs from the remote one; otherwise
+        the downloaded snapshot simply becomes the base.
+        """
+        temp_path = self.db_path.with_suffix('.temp_sync.db')
+        manifest, revision = self._read_manifest()
+        try:
+            unchanged = False
+            snapshot = manifest.get('snapshot', self.LEGACY_SNAPSHOT_PATH)
+            with span('SyncEngine.download_snapshot', 'sync'):
+                chunks = self.backend.get_chunks(snapshot)
+                if chunks is not None:
+                    write_chunks(chunks, temp_path, self.transfer, manifest.get('snapshot_size', 0),
+                                 compressed=snapshot.endswith('.gz'))
+            self.transfer.check()
+            if chunks is not None:
+                base = str(self.base_path) if self.base_path.exists() else None
+                result['merge'] = self.project_manager.merge_database(str(temp_path), base)
+                unchanged = build_tree(self.db_path).root == build_tree(temp_path).root
+            elif 'snapshot' in manifest:
+                # Replaced by a newer snapshot while we read the manifest
+                raise RevisionConflict(snapshot)
+
+            applied = dict(self.applied or {})
+            for device, clock in manifest.get('includes', {}).items():
+                if device != self.device_id:
+                    applied[device] = max(clock, applied.get(device, 0))
+            self.applied = applied
+
+            if unchanged:
+                # Everything logged so far is already in the remote snapshot
+                acknowledge(self.db_path, log_head(self.db_path))
+                temp_path.replace(self.base_path)
+            else:
+                self._publish_snapshot(manifest, revision)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        result['bootstrap'] = True
+
+    @traced('SyncEngine._exchange', 'sync')
+    def _exchange(self, chains: Dict[str, List], result: Dict) -> None:
+        """Apply the remote changesets, then upload the local one"""
+        changesets = []
+        with span('SyncEngine.download_changesets', 'sync'):
+            for device, entries in chains.items():
+                for _previous, _clock, path in entries:
+                    data = self.backend.get(path)
+                    if data is None:
+                        # Compacted away since it was listed
+                        raise RevisionConflict(path)
+                    changesets.append(decode_changeset(data))
+        changesets.sort(key=lambda c: (c.get('created_at', ''), c['device'], c['clock']))
+        self.transfer.check()
+
+        if changesets:
+            remote_path = self.db_path.with_suffix('.sync_remote.db')
+            try:
+                with span('SyncEngine.materialize', 'sync'):
+                    materialize(self.base_path, changesets, remote_path)
+                result['merge'] = self.project_manager.merge_database(str(remote_path), str(self.base_path))
+            finally:
+                if remote_path.exists():
+                    remote_path.unlink()
+            prune_echoes(self.db_path, changesets)
+            for changeset in changesets:
+                self.applied[changeset['device']] = max(self.applied.get(changeset['device'], 0),
+                                                        changeset['clock'])
+            result['received'] = len(changesets)
+
+        if not changesets and not has_changes(self.db_path, self.uploaded_clock):
+            return  # Nothing on either side
+
+        snapshot_path = self.project_manager.create_database_snapshot(self.db_path.with_suffix('.sync_base.tmp'))
+        try:
+            changeset = build_changeset(snapshot_path, self.device_id, self.uploaded_clock)
+            if changeset is not None:
+                path = f"{self.CHANGES_DIR}/{self.device_id}/{changeset_name(changeset)}"
+                with span('SyncEngine.upload_changeset', 'sync'):
+                    self.backend.put(path, encode_changeset(changeset), if_revision=None)
+                self.uploaded_clock = changeset['clock']
+                acknowledge(self.db_path, changeset['clock'])
+                result['sent'] = sum(len(rows) for rows in changeset['upserts'].values()) + \
+                    sum(len(ids) for ids in changeset['deletes'].values())
+            snapshot_path.replace(self.base_path)
+        finally:
+            if snapshot_path.exists():
+                snapshot_path.unlink()
+
+    def _publish_snapshot(self, manifest: Dict, revision: Optional[str]) -> None:
+        """
+        Upload the local database as the remote snapshot and make it the
+        base. Raises RevisionConflict if the manifest changed since it was
+        read at revision.
+        """
+        snapshot_path = self.project_manager.create_database_snapshot(self.db_path.with_suffix('.sync_base.tmp'))
+        path = f"{self.SNAPSHOTS_DIR}/{self.device_id}-{uuid.uuid4().hex[:8]}.db.gz"
+        try:
+            head = log_head(snapshot_path)
+            with span('SyncEngine.upload_snapshot', 'sync'):
+                uploaded = self.backend.put_chunks(path, compress_file(snapshot_path, self.transfer))
+            includes = dict(self.applied)
+            includes[self.device_id] = head
+            data = json.dumps({
+                'version': CHANGESET_VERSION,
+                'snapshot': path,
+                'snapshot_size': uploaded.size,
+                'includes': includes,
+                'created_at': datetime.now().isoformat(),
+            }).encode('utf-8')
+            try:
+                written = self.backend.put(self.MANIFEST_PATH, data, if_revision=revision)
+            except RevisionConflict:
+                self.backend.delete(path)
+                raise
+
+            self._seen_manifest = written.revision
+            previous = manifest.get('snapshot', self.LEGACY_SNAPSHOT_PATH)
+            if previous != path:
+                self.backend.delete(previous)
+            acknowledge(self.db_path, head)
+            self.uploaded_clock = head
+            snapshot_path.replace(self.base_path)
+        finally:
+            if snapshot_path.exists():
+                snapshot_path.unlink()
+
+    @traced('SyncEngine._compact', 'sync')
+    def _compact(self) -> None:
+        """Fold every changeset into a new snapshot and delete them"""
+        manifest, revision = self._read_manifest()
+        self._publish_snapshot(manifest, revision)
+        includes = dict(self.applied)
+        includes[self.device_id] = self.uploaded_clock
+        for entry in self.backend.list(self.CHANGES_DIR):
+            device, parsed = self._parse_path(entry.path)
+            if parsed is not None and parsed[1] <= includes.get(device, 0):
+                self.backend.delete(entry.path)
+                self._seen_changes = [seen for seen in self._seen_changes if seen.path != entry.path]
+
+    # Remote state
+
+    def remote_fingerprint(self) -> str:
+        """Fingerprint of the remote as it is now"""
+        manifest = self.backend.stat(self.MANIFEST_PATH)
+        return self._fingerprint(manifest.revision if manifest else None, self.backend.list(self.CHANGES_DIR))
+
+    def _fingerprint(self, manifest_revision: Optional[str], changes: List[RemoteEntry]) -> str:
+        """Digest of the manifest revision and the changesets of other devices"""
+        digest = hashlib.sha1((manifest_revision or '').encode('utf-8'))
+        for entry in sorted(changes, key=lambda e: e.path):
+            if self._parse_path(entry.path)[0] != self.device_id:
+                digest.update(f"\n{entry.path}:{entry.revision}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _is_idle(self) -> bool:
+        """True if no local change is pending and the remote is as the last run left it"""
+        if self.applied is None or not self.fingerprint or not self.base_path.exists():
+            return False
+        if has_changes(self.db_path, self.uploaded_clock):
+            return False
+        with span('SyncEngine.remote_fingerprint', 'sync'):
+            return self.remote_fingerprint() == self.fingerprint
+
+    def _read_manifest(self):
+        """The manifest and its revision (None if there is no manifest)"""
+        entry = self.backend.stat(self.MANIFEST_PATH)
+        if entry is None:
+            return {}, None
+        # Read after stat: the data is at least as new as the revision, so
+        # a conditional write based on it can only fail spuriously
+        data = self.backend.get(self.MANIFEST_PATH)
+        try:
+            manifest = json.loads(data.decode('utf-8')) if data else {}
+        except ValueError:
+            manifest = {}
+        return (manifest if isinstance(manifest, dict) else {}), entry.revision
+
+    def _parse_path(self, path: str):
+        parts = path.strip('/').split('/')
+        if len(parts) != 3 or '/' + parts[0] != self.CHANGES_DIR:
+            return None, None
+        return parts[1], parse_changeset_name(parts[2])
+
+    def _remote_changesets(self) -> Optional[Dict[str, List]]:
+        """
+        Changesets of other devices newer than the watermarks, per device
+        and in order, or None if a device's chain has a gap.
+        """
+        chains: Dict[str, List] = {}
+        manifest, self._seen_manifest = self._read_manifest()
+        includes = manifest.get('includes', {})
+        self._seen_changes = self.backend.list(self.CHANGES_DIR)
+        for entry in self._seen_changes:
+            device, parsed = self._parse_path(entry.path)
+            if parsed is None or device == self.device_id:
+                continue
+            if parsed[1] > self.applied.get(device, 0):
+                chains.setdefault(device, []).append((parsed[0], parsed[1], entry.path))
+
+        for device, entries in chains.items():
+            entries.sort(key=lambda item: item[1])
+            expected = self.applied.get(device, 0)
+            for previous, clock, _path in entries:
+                if previous != expected:
+                    return None
+                expected = clock
+
+        # Changes another device folded into the snapshot, with no
+        # changesets left to reach them
+        for device, clock in includes.items():
+            if device == self.device_id or clock <= self.applied.get(device, 0):
+                continue
+            entries = chains.get(device)
+            if not entries or entries[-1][1] < clock:
+                return None
+        return chains
+
+    def _changeset_count(self) -> int:
+        return sum(1 for entry in self.backend.list(self.CHANGES_DIR)
+                   if self._parse_path(entry.path)[1] is not None)
+
+    def _save_state(self) -> None:
+        # Runs on the sync worker: the config only gets copies, which the
+        # main loop may serialize while this engine keeps running
+        self.config.update({
+            'sync_remote': self.backend.location,
+            'sync_uploaded_clock': self.uploaded_clock,
+            'sync_applied_clocks': dict(self.applied) if self.applied is not None else None,
+            'sync_remote_fingerprint': self.fingerprint,
+        })
+        self.config.save()
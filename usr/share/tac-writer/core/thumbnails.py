@@ -0,0 +1,145 @@
+"""
+TAC Thumbnails
+Downscaled previews of image paragraphs, generated off the main thread
+and cached on disk
+"""
+
+import hashlib
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.helpers import DependencyHelper
+
+logger = logging.getLogger(__name__)
+
+# Pillow is imported by the worker thread on first use
+IMAGE_PROCESSING_AVAILABLE = DependencyHelper.is_available('PIL')
+
+ThumbnailCallback = Callable[[Optional[Path], Optional[str]], None]
+
+
+class ThumbnailCache:
+    """
+    Disk cache of image thumbnails keyed by source path, mtime and size.
+
+    Thumbnails are generated by a single background worker. Callbacks
+    passed to request() run on that worker thread; UI callers must hop
+    back to the main loop themselves (e.g. with GLib.idle_add).
+    """
+
+    # Generated thumbnails kept on disk before the oldest are pruned
+    MAX_FILES = 2000
+
+    def __init__(self, cache_dir: Path):
+        self.directory = Path(cache_dir) / 'thumbnails'
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._queue = queue.Queue()
+        self._pending: Dict[str, List[ThumbnailCallback]] = {}
+        self._lock = threading.Lock()
+        self._worker = None
+        self._generated = 0
+
+    def _thumbnail_path(self, source: Path, height: int) -> Optional[Path]:
+        """Cache file for a source image, or None if the source is missing"""
+        try:
+            stat = source.stat()
+        except OSError:
+            return None
+        key = f"{source.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{height}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.directory / f"{digest}.png"
+
+    def lookup(self, source, height: int) -> Optional[Path]:
+        """Return the cached thumbnail if it was already generated"""
+        thumbnail = self._thumbnail_path(Path(source), height)
+        if thumbnail and thumbnail.exists():
+            return thumbnail
+        return None
+
+    def request(self, source, height: int, callback: ThumbnailCallback) -> None:
+        """Generate a thumbnail in the background and pass its path to callback"""
+        source = Path(source)
+        thumbnail = self._thumbnail_path(source, height)
+        if thumbnail is None:
+            callback(None, "not found")
+            return
+
+        key = str(thumbnail)
+        with self._lock:
+            if key in self._pending:
+                # Already queued: just wait for the same result
+                self._pending[key].append(callback)
+                return
+            self._pending[key] = [callback]
+            self._queue.put((key, source, thumbnail, height))
+
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            key, source, thumbnail, height = self._queue.get()
+            error = None
+            try:
+                if not thumbnail.exists():
+                    self._generate(source, thumbnail, height)
+            except Exception as e:
+                error = str(e)
+
+            with self._lock:
+                callbacks = self._pending.pop(key, [])
+            for callback in callbacks:
+                try:
+                    callback(None if error else thumbnail, error)
+                except Exception as e:
+                    logger.exception("Error in thumbnail callback: %s", e)
+
+    def _generate(self, source: Path, thumbnail: Path, height: int) -> None:
+        """Decode, downscale and store a thumbnail (worker thread)"""
+        temp_path = thumbnail.with_suffix('.tmp')
+
+        if IMAGE_PROCESSING_AVAILABLE:
+            from PIL import Image as PILImage, ImageOps
+            with PILImage.open(source) as image:
+                # Let JPEG decoding skip detail we would throw away anyway
+                image.draft('RGB', (height * 4, height))
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((height * 4, height))
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA')
+                image.save(temp_path, 'PNG')
+        else:
+            import gi
+            gi.require_version('GdkPixbuf', '2.0')
+            from gi.repository import GdkPixbuf
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(str(source), -1, height, True)
+            pixbuf.savev(str(temp_path), 'png', [], [])
+
+        os.replace(temp_path, thumbnail)
+
+        self._generated += 1
+        if self._generated % 50 == 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Remove the least recently written thumbnails beyond MAX_FILES"""
+        try:
+            files: List[Tuple[float, Path]] = [
+                (entry.stat().st_mtime, entry) for entry in self.directory.glob('*.png')
+            ]
+        except OSError:
+            return
+        if len(files) <= self.MAX_FILES:
+            return
+        files.sort()
+        for _mtime, entry in files[:len(files) - self.MAX_FILES]:
+            try:
+                entry.unlink()
+            except OSError:
+                pass
@@ -7,7 +7,6 @@ GTK4 + libadwaita academic text writing assistant
 
 import sys
 import os
-import traceback
 import warnings
 from pathlib import Path
 
@@ -44,6 +43,14 @@ if str(app_dir) not in sys.path:
 
 # Import modules
 from utils.i18n import _
+from utils import tracing
+
+# Leveled logging: TAC_DEBUG shows debug messages, otherwise warnings and up
+logging.basicConfig(
+    level=logging.DEBUG if os.environ.get('TAC_DEBUG') else logging.WARNING,
+    format='%(levelname)s %(name)s: %(message)s'
+)
+logger = logging.getLogger(__name__)
 
 try:
     import gi
@@ -51,8 +58,8 @@ try:
     gi.require_version('Adw', '1')
     from gi.repository import Gtk, Adw
 except ImportError as e:
-    print(_("Erro: Dependências necessárias não encontradas: {}").format(e))
-    print(_("Por favor instale: python3-gi python3-gi-cairo gir1.2-gtk-4.0 gir1.2-adwaita-1"))
+    logger.error(_("Erro: Dependências necessárias não encontradas: {}").format(e))
+    logger.error(_("Por favor instale: python3-gi python3-gi-cairo gir1.2-gtk-4.0 gir1.2-adwaita-1"))
     sys.exit(1)
 
 
@@ -60,12 +67,12 @@ def check_dependencies():
     """Check if required GTK version is available"""
     try:
         if Gtk.get_major_version() < 4:
-            print(_("Erro: GTK 4.0 ou superior é necessário"))
+            logger.error(_("Erro: GTK 4.0 ou superior é necessário"))
             return False
         return True
         
     except Exception as e:
-        print(_("Erro ao verificar dependências: {}").format(e))
+        logger.exception(_("Erro ao verificar dependências: {}").format(e))
         return False
 
 
@@ -77,17 +84,23 @@ def main():
             return 1
         
         # Import and run application
-        from application import TacApplication
-        
-        app = TacApplication()
-        return app.run(sys.argv)
+        with tracing.span('import application', 'startup'):
+            from application import TacApplication
+
+        with tracing.span('TacApplication()', 'startup'):
+            app = TacApplication()
+        try:
+            return app.run(sys.argv)
+        finally:
+            trace_path = tracing.dump_on_exit()
+            if trace_path:
+                logger.warning(_("Rastreamento salvo em {}").format(trace_path))
         
     except KeyboardInterrupt:
-        print("\n" + _("Aplicação interrompida pelo usuário."))
+        logger.warning(_("Aplicação interrompida pelo usuário."))
         return 0
     except Exception as e:
-        print(_("Erro crítico durante a inicialização: {}").format(e))
-        traceback.print_exc()
+        logger.exception(_("Erro crítico durante a inicialização: {}").format(e))
         return 1
 
 
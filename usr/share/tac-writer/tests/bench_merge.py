@@ -0,0 +1,147 @@
+"""
+Benchmark of DatabaseMerger: the set-based merge against merging every
+changed project row by row, on a synthetic library.
+
+    python3 tests/bench_merge.py [--projects 200] [--paragraphs 500]
+
+Both merges start from copies of the same local database; the script
+reports their times and checks that they leave the same rows.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import gi_stub  # noqa: E402
+gi_stub.install()
+
+from core.merger import DatabaseMerger, snapshot_database  # noqa: E402
+
+
+class RowByRowMerger(DatabaseMerger):
+    """Loads and merges every changed project in Python"""
+
+    def _classify(self, conn, changed, has_base, project_columns, paragraph_columns):
+        return [], [], list(changed)
+
+
+def create_database(directory: Path) -> Path:
+    """Empty database with the application schema (tables, indexes, change log)"""
+    for variable in ('XDG_DATA_HOME', 'XDG_CONFIG_HOME', 'XDG_CACHE_HOME'):
+        os.environ[variable] = str(directory / variable.lower())
+    os.environ['HOME'] = str(directory)
+    from core.services import ProjectManager
+    return Path(ProjectManager().db_path)
+
+
+def timestamp(offset: int) -> str:
+    return (datetime(2026, 1, 1) + timedelta(seconds=offset)).isoformat()
+
+
+def fill(db_path: Path, projects: int, paragraphs: int) -> list:
+    """Add projects of paragraphs; returns the project ids"""
+    ids = [str(uuid.uuid4()) for _ in range(projects)]
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO projects (id, name, created_at, modified_at, metadata, document_formatting) "
+            "VALUES (?, ?, ?, ?, '{}', '{}')",
+            [(pid, f"Projeto {i}", timestamp(0), timestamp(0)) for i, pid in enumerate(ids)]
+        )
+        conn.executemany(
+            'INSERT INTO paragraphs (id, project_id, type, content, created_at, modified_at, "order", '
+            "formatting, footnotes) VALUES (?, ?, 'argument', ?, ?, ?, ?, '{}', '[]')",
+            [(str(uuid.uuid4()), pid, f"Parágrafo {n} " * 20, timestamp(0), timestamp(0), n)
+             for pid in ids for n in range(paragraphs)]
+        )
+    return ids
+
+
+def edit(db_path: Path, project_ids: list, every: int, when: int, label: str) -> None:
+    """Rewrite every n-th paragraph of the projects and append one paragraph to each"""
+    with sqlite3.connect(db_path) as conn:
+        for pid in project_ids:
+            conn.execute(
+                'UPDATE paragraphs SET content = ? || content, modified_at = ? '
+                'WHERE project_id = ? AND "order" % ? = 0',
+                (label, timestamp(when), pid, every)
+            )
+            conn.execute(
+                'INSERT INTO paragraphs (id, project_id, type, content, created_at, modified_at, "order", '
+                "formatting, footnotes) SELECT ?, ?, 'argument', ?, ?, ?, COUNT(*), '{}', '[]' "
+                'FROM paragraphs WHERE project_id = ?',
+                (str(uuid.uuid4()), pid, label, timestamp(when), timestamp(when), pid)
+            )
+            conn.execute("UPDATE projects SET modified_at = ? WHERE id = ?", (timestamp(when), pid))
+
+
+def delete(db_path: Path, project_ids: list) -> None:
+    with sqlite3.connect(db_path) as conn:
+        for pid in project_ids:
+            conn.execute("DELETE FROM paragraphs WHERE project_id = ?", (pid,))
+            conn.execute("DELETE FROM projects WHERE id = ?", (pid,))
+
+
+def rows(db_path: Path) -> tuple:
+    with sqlite3.connect(db_path) as conn:
+        return (
+            conn.execute("SELECT id, name, modified_at FROM projects ORDER BY id").fetchall(),
+            conn.execute("SELECT id, project_id, type, content FROM paragraphs ORDER BY id").fetchall(),
+        )
+
+
+def run(merger_class, local: Path, base, remote: Path, target: Path):
+    snapshot_database(local, target)
+    start = time.perf_counter()
+    stats = merger_class(str(target), str(base) if base else None).merge(str(remote))
+    return time.perf_counter() - start, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--paragraphs', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        local = create_database(tmp)
+        ids = fill(local, args.projects, args.paragraphs)
+        base = snapshot_database(local, tmp / 'base.db')
+        remote = snapshot_database(local, tmp / 'remote.db')
+
+        # Remote: a tenth of the projects edited, some new, some deleted
+        tenth = max(1, len(ids) // 10)
+        edit(remote, ids[:tenth], 5, 60, "B ")
+        fill(remote, tenth, args.paragraphs)
+        delete(remote, ids[-2:])
+        # Local: a few projects edited, half of them also edited remotely
+        edit(local, ids[tenth - 2:tenth + 2], 7, 30, "A ")
+        # Backup import: a later copy of the whole library, no base
+        backup = snapshot_database(remote, tmp / 'backup.db')
+        edit(backup, ids[tenth:2 * tenth], 3, 90, "C ")
+
+        print(f"{len(ids)} projects x {args.paragraphs} paragraphs")
+        for label, base_path, other in (("sync (three-way)", base, remote), ("backup import", None, backup)):
+            slow, slow_stats = run(RowByRowMerger, local, base_path, other, tmp / 'row.db')
+            fast, fast_stats = run(DatabaseMerger, local, base_path, other, tmp / 'set.db')
+            same = rows(tmp / 'row.db') == rows(tmp / 'set.db')
+            print(f"{label}: row by row {slow:.3f} s, set-based {fast:.3f} s "
+                  f"({slow / fast:.1f}x), same rows: {same}")
+            for key in ('projects_added', 'projects_updated', 'projects_deleted',
+                        'paragraphs_added', 'paragraphs_updated', 'paragraphs_deleted'):
+                print(f"  {key}: {slow_stats[key]} / {fast_stats[key]}")
+            print(f"  conflicts: {len(slow_stats['conflicts'])} / {len(fast_stats['conflicts'])}")
+
+
+if __name__ == '__main__':
+    main()
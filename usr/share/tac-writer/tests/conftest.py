@@ -0,0 +1,35 @@
+"""
+Shared fixtures: the application directory on sys.path, a gi stand-in
+where PyGObject is missing, and project managers with their own data dirs
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parent.parent
+TESTS_DIR = Path(__file__).resolve().parent
+for path in (str(APP_DIR), str(TESTS_DIR)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import gi_stub  # noqa: E402
+
+gi_stub.install()
+
+
+@pytest.fixture
+def make_manager(tmp_path, monkeypatch):
+    """Factory of ProjectManagers, one data/config/cache dir each (a device)"""
+    from core.services import ProjectManager
+
+    def make(name: str) -> ProjectManager:
+        root = tmp_path / name
+        # Backups go to the documents folder under the home directory
+        monkeypatch.setenv('HOME', str(root))
+        for variable in ('XDG_DATA_HOME', 'XDG_CONFIG_HOME', 'XDG_CACHE_HOME'):
+            monkeypatch.setenv(variable, str(root / variable.lower()))
+        return ProjectManager()
+
+    return make
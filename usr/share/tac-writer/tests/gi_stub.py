@@ -0,0 +1,69 @@
+"""
+Stand-in for PyGObject, so modules that import gi can be loaded where
+GTK is not installed. Every attribute of gi.repository is a placeholder
+class that accepts any call, subclassing and attribute access.
+"""
+
+import sys
+import types
+
+
+class _StubMeta(type):
+    def __getattr__(cls, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _stub(name)
+
+    def __or__(cls, other):
+        return cls
+
+    __ror__ = __and__ = __rand__ = __or__
+
+
+class _Stub(metaclass=_StubMeta):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __init_subclass__(cls, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _stub(name)()
+
+    def __call__(self, *args, **kwargs):
+        return _stub('result')()
+
+    def __bool__(self):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+
+def _stub(name):
+    return _StubMeta(name, (_Stub,), {})
+
+
+class _Repository(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        namespace = _stub(name)
+        setattr(self, name, namespace)
+        return namespace
+
+
+def install() -> None:
+    """Register the stub as gi unless the real PyGObject is importable"""
+    try:
+        import gi  # noqa: F401
+        return
+    except ImportError:
+        pass
+    gi = types.ModuleType('gi')
+    gi.require_version = lambda namespace, version: None
+    gi.repository = _Repository('gi.repository')
+    sys.modules['gi'] = gi
+    sys.modules['gi.repository'] = gi.repository
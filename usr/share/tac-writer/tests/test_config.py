@@ -0,0 +1,21 @@
+"""Saving the configuration never leaves config.json truncated"""
+
+import json
+
+from core.config import Config
+
+
+def test_failed_save_keeps_the_previous_file(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    for variable in ('XDG_DATA_HOME', 'XDG_CONFIG_HOME', 'XDG_CACHE_HOME'):
+        monkeypatch.setenv(variable, str(tmp_path / variable.lower()))
+    config = Config()
+    config.set('dropbox_refresh_token', 'token')
+    assert config.save()
+
+    # Serialization fails halfway, as when another thread resizes a dict
+    config.set('sync_applied_clocks', {'device': object()})
+    assert not config.save()
+
+    saved = json.loads(config.config_file.read_text(encoding='utf-8'))
+    assert saved['dropbox_refresh_token'] == 'token'
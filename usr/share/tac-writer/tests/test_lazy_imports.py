@@ -0,0 +1,51 @@
+"""Optional dependencies stay unimported until a feature needs them"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+TESTS_DIR = Path(__file__).resolve().parent
+
+# Spell checking, export, image, AI and sync libraries
+OPTIONAL_MODULES = ('enchant', 'reportlab', 'odf', 'pylatex', 'PIL', 'requests', 'pypdf', 'dropbox')
+
+# Wall-clock limit for importing the modules loaded before the first window.
+# Generous, so only a heavy import slipping back into startup fails it
+STARTUP_IMPORT_BUDGET = 3.0
+
+SCRIPT = """
+import sys
+import time
+sys.path[:0] = {paths!r}
+import gi_stub
+gi_stub.install()
+start = time.perf_counter()
+import application, ui.main_window, ui.dialogs, ui.components, ui.sync_scheduler
+import core.services, core.ai_assistant, core.sync, core.thumbnails
+print('seconds:', time.perf_counter() - start)
+print('imported:', *[name for name in {modules!r} if name in sys.modules])
+"""
+
+
+def run_startup_imports(tmp_path):
+    """Import the startup modules in a fresh interpreter; returns its output lines"""
+    # Installed stand-ins, so the probes find them and any import would show
+    for name in OPTIONAL_MODULES:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / '__init__.py').write_text('')
+
+    script = SCRIPT.format(paths=[str(tmp_path), str(TESTS_DIR), str(APP_DIR)], modules=OPTIONAL_MODULES)
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, cwd=tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    return result.stdout.splitlines()
+
+
+def test_startup_does_not_import_optional_dependencies(tmp_path):
+    assert run_startup_imports(tmp_path)[-1] == 'imported:'
+
+
+def test_startup_imports_fit_the_time_budget(tmp_path):
+    seconds = float(run_startup_imports(tmp_path)[-2].split()[1])
+    assert seconds < STARTUP_IMPORT_BUDGET
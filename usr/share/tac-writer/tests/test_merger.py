@@ -0,0 +1,68 @@
+"""DatabaseMerger: the set-based paths against merging every project row by row"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from bench_merge import RowByRowMerger, delete, edit, fill, rows, timestamp
+from core.merger import DatabaseMerger, snapshot_database
+from core.merkle import MerkleCache, build_tree
+
+STAT_KEYS = ('projects_added', 'projects_updated', 'projects_deleted',
+             'paragraphs_added', 'paragraphs_updated', 'paragraphs_deleted')
+
+
+@pytest.mark.parametrize('with_base', [True, False])
+def test_set_based_merge_matches_row_by_row(make_manager, tmp_path, with_base):
+    local = Path(make_manager('a').db_path)
+    ids = fill(local, 12, 20)
+    base = snapshot_database(local, tmp_path / 'base.db')
+    remote = snapshot_database(local, tmp_path / 'remote.db')
+
+    edit(remote, ids[:4], 3, 60, "B ")
+    fill(remote, 2, 20)
+    delete(remote, ids[-2:])
+    edit(local, ids[2:6], 4, 30 if with_base else 90, "A ")
+
+    results = {}
+    for merger_class in (RowByRowMerger, DatabaseMerger):
+        target = snapshot_database(local, tmp_path / f'{merger_class.__name__}.db')
+        stats = merger_class(str(target), str(base) if with_base else None).merge(str(remote))
+        results[merger_class] = rows(target), stats
+
+    (slow_rows, slow), (fast_rows, fast) = results[RowByRowMerger], results[DatabaseMerger]
+    assert fast_rows == slow_rows
+    assert [fast[key] for key in STAT_KEYS] == [slow[key] for key in STAT_KEYS]
+    assert sorted(fast['projects_changed']) == sorted(slow['projects_changed'])
+    assert len(fast['conflicts']) == len(slow['conflicts'])
+    if with_base:
+        assert fast['conflicts'] and fast['projects_deleted'] == 2
+
+
+def test_field_wise_merge_gives_the_paragraph_a_new_version(make_manager, tmp_path):
+    local = Path(make_manager('a').db_path)
+    project_id = fill(local, 1, 1)[0]
+    base = snapshot_database(local, tmp_path / 'base.db')
+    remote = snapshot_database(local, tmp_path / 'remote.db')
+
+    # Remote (newer) rewrites the content, local (older) the formatting
+    edit(remote, [project_id], 1, 90, "B ")
+    with sqlite3.connect(local) as conn:
+        conn.execute("UPDATE paragraphs SET formatting = '{\"bold\": true}', modified_at = ? "
+                     "WHERE project_id = ? AND \"order\" = 0", (timestamp(30), project_id))
+
+    cache = MerkleCache()
+    build_tree(remote, cache)
+    DatabaseMerger(str(local), str(base)).merge(str(remote))
+
+    query = 'SELECT modified_at FROM paragraphs WHERE project_id = ? AND "order" = 0'
+    with sqlite3.connect(local) as conn:
+        merged_at = conn.execute(query, (project_id,)).fetchone()[0]
+    with sqlite3.connect(remote) as conn:
+        remote_at = conn.execute(query, (project_id,)).fetchone()[0]
+    assert merged_at > remote_at
+
+    # The cached remote hashes must not stand in for the merged paragraph
+    local_tree, remote_tree = build_tree(local, cache), build_tree(remote, cache)
+    assert local_tree.projects[project_id].hash != remote_tree.projects[project_id].hash
@@ -0,0 +1,128 @@
+"""SyncEngine between devices with real ProjectManagers"""
+
+from datetime import datetime
+from pathlib import Path
+
+from core.merger import rebase_edits
+from core.models import ParagraphType
+from core.sync import MemoryBackend, SyncEngine
+
+
+def test_engine_uses_project_manager_paths(make_manager):
+    manager = make_manager('a')
+    engine = SyncEngine(manager, MemoryBackend())
+
+    assert isinstance(manager.sync_base_path, Path)
+    assert engine.base_path == manager.sync_base_path
+    assert engine.db_path == Path(manager.db_path)
+
+
+def sync(manager, backend):
+    return SyncEngine(manager, backend).run()
+
+
+def texts(manager, project_id):
+    project = manager.load_project(project_id)
+    return [paragraph.content for paragraph in project.paragraphs] if project else None
+
+
+def test_two_devices_converge(make_manager):
+    backend = MemoryBackend()
+    device_a, device_b = make_manager('a'), make_manager('b')
+
+    project = device_a.create_project("Ensaio")
+    project.add_paragraph(ParagraphType.INTRODUCTION, "Primeiro")
+    project.add_paragraph(ParagraphType.ARGUMENT, "Segundo")
+    device_a.save_project(project)
+
+    first = sync(device_a, backend)
+    assert first['bootstrap'] and not first['skipped']
+
+    received = sync(device_b, backend)
+    assert received['bootstrap']
+    assert texts(device_b, project.id) == ["Primeiro", "Segundo"]
+
+    # An edit on B reaches A as a changeset, without a snapshot download
+    copy = device_b.load_project(project.id)
+    copy.paragraphs[1].update_content("Segundo, revisto")
+    copy.add_paragraph(ParagraphType.CONCLUSION, "Terceiro")
+    device_b.save_project(copy)
+    sent = sync(device_b, backend)
+    assert sent['sent'] > 0 and not sent['bootstrap']
+
+    merged = sync(device_a, backend)
+    assert merged['received'] == 1 and not merged['bootstrap']
+    assert texts(device_a, project.id) == ["Primeiro", "Segundo, revisto", "Terceiro"]
+
+    # Both sides settle: nothing left to send back
+    assert sync(device_b, backend)['sent'] == 0
+    assert texts(device_b, project.id) == texts(device_a, project.id)
+
+
+def test_idle_run_is_skipped(make_manager):
+    backend = MemoryBackend()
+    device_a, device_b = make_manager('a'), make_manager('b')
+    project = device_a.create_project("Ensaio")
+    project.add_paragraph(ParagraphType.INTRODUCTION, "Texto")
+    device_a.save_project(project)
+    sync(device_a, backend)
+    sync(device_b, backend)
+    sync(device_a, backend)
+
+    bytes_in = backend.bytes_in
+    result = sync(device_a, backend)
+    assert result['skipped']
+    assert backend.bytes_in == bytes_in
+
+    # A local save ends the idle state
+    project = device_a.load_project(project.id)
+    project.paragraphs[0].update_content("Texto novo")
+    device_a.save_project(project)
+    assert not sync(device_a, backend)['skipped']
+
+    # So does a changeset uploaded by another device
+    assert sync(device_a, backend)['skipped']
+    sync(device_b, backend)
+    copy = device_b.load_project(project.id)
+    copy.add_paragraph(ParagraphType.ARGUMENT, "De B")
+    device_b.save_project(copy)
+    sync(device_b, backend)
+    result = sync(device_a, backend)
+    assert not result['skipped']
+    assert texts(device_a, project.id) == ["Texto novo", "De B"]
+
+
+def test_edits_made_during_a_merge_are_rebased(make_manager):
+    backend = MemoryBackend()
+    device_a, device_b = make_manager('a'), make_manager('b')
+    project = device_a.create_project("Ensaio")
+    for text in ("Um", "Dois", "Três"):
+        project.add_paragraph(ParagraphType.ARGUMENT, text)
+    device_a.save_project(project)
+    other = device_a.create_project("Outro")
+    device_a.save_project(other)
+    sync(device_a, backend)
+    sync(device_b, backend)
+
+    # A has the project open: saved now, then edited without saving
+    opened = device_a.load_project(project.id)
+    saved_at = datetime.now()
+    base_ids = [p.id for p in opened.paragraphs]
+
+    copy = device_b.load_project(project.id)
+    copy.paragraphs[0].update_content("Um, de B")
+    copy.add_paragraph(ParagraphType.ARGUMENT, "Quatro, de B")
+    device_b.save_project(copy)
+    sync(device_b, backend)
+
+    opened.paragraphs[1].update_content("Dois, de A")
+    opened.add_paragraph(ParagraphType.ARGUMENT, "Entre, de A", position=2)
+    opened.remove_paragraph(base_ids[2])
+
+    merge = sync(device_a, backend)['merge']
+    assert merge['projects_changed'] == [project.id]
+
+    # Saving the open copy as is would revert B; rebased, both sides' edits survive
+    rebased = rebase_edits(device_a.load_project(project.id), opened, saved_at, base_ids)
+    device_a.save_project(rebased)
+    assert texts(device_a, project.id) == ["Um, de B", "Dois, de A", "Entre, de A", "Quatro, de B"]
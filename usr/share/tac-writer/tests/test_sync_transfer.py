@@ -0,0 +1,127 @@
+"""Chunked snapshot transfers: round trips, progress and cancellation"""
+
+import os
+import threading
+
+import pytest
+
+import core.sync as sync_module
+from core.models import ParagraphType
+from core.sync import (LocalFolderBackend, MemoryBackend, SyncCancelled, SyncEngine, Transfer,
+                       compress_file, write_chunks)
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    """Chunks of 64 KiB, so a small file already spans several"""
+    monkeypatch.setattr(sync_module, 'CHUNK_SIZE', 64 * 1024)
+
+
+@pytest.fixture(params=['memory', 'folder'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBackend()
+    return LocalFolderBackend(tmp_path / 'remote')
+
+
+def leftovers(folder):
+    """Temporary files under folder"""
+    return sorted(str(path) for path in folder.rglob('*')
+                  if 'tmp' in path.name or 'temp' in path.name)
+
+
+def cancel_on(stage):
+    """Transfer that cancels itself at the first progress report of stage"""
+    reports = []
+    event = threading.Event()
+
+    def progress(report_stage, done, total):
+        reports.append((report_stage, done, total))
+        if report_stage == stage:
+            event.set()
+
+    return Transfer(progress, event), reports
+
+
+def test_chunked_round_trip_reports_progress(backend, tmp_path):
+    source = tmp_path / 'source.db'
+    source.write_bytes(os.urandom(300 * 1024) + b'\0' * (700 * 1024))
+    reports = []
+    transfer = Transfer(lambda *report: reports.append(report))
+
+    entry = backend.put_chunks('/snapshots/test.db.gz', compress_file(source, transfer))
+    uploads = [report for report in reports if report[0] == 'upload']
+    assert len(uploads) > 1
+    assert [done for _stage, done, _total in uploads] == sorted(done for _stage, done, _total in uploads)
+    assert uploads[-1][1:] == (source.stat().st_size, source.stat().st_size)
+    assert entry.size < source.stat().st_size
+
+    chunks = list(backend.get_chunks('/snapshots/test.db.gz'))
+    assert sum(len(chunk) for chunk in chunks) == entry.size
+    target = tmp_path / 'target.db'
+    write_chunks(iter(chunks), target, transfer, entry.size)
+    assert target.read_bytes() == source.read_bytes()
+    downloads = [report for report in reports if report[0] == 'download']
+    assert downloads[-1][1:] == (entry.size, entry.size)
+
+    assert backend.get_chunks('/snapshots/missing.db.gz') is None
+
+
+def test_cancelled_upload_writes_nothing(backend, tmp_path):
+    source = tmp_path / 'source.db'
+    source.write_bytes(os.urandom(512 * 1024))
+    transfer, _reports = cancel_on('upload')
+
+    with pytest.raises(SyncCancelled):
+        backend.put_chunks('/snapshots/test.db.gz', compress_file(source, transfer))
+
+    assert backend.stat('/snapshots/test.db.gz') is None
+    assert backend.list('/') == []
+    if isinstance(backend, LocalFolderBackend):
+        assert leftovers(backend.root) == []
+
+
+def project_with_text(manager, paragraphs=200):
+    project = manager.create_project("Ensaio")
+    for index in range(paragraphs):
+        project.add_paragraph(ParagraphType.ARGUMENT, f"Parágrafo {index} " + "texto " * 40)
+    manager.save_project(project)
+    return project
+
+
+def test_engine_cancelled_upload_cleans_up(make_manager, backend):
+    manager = make_manager('a')
+    project_with_text(manager)
+    transfer, reports = cancel_on('upload')
+
+    with pytest.raises(SyncCancelled):
+        SyncEngine(manager, backend, transfer).run()
+
+    assert reports
+    assert backend.list('/') == []
+    assert not manager.sync_base_path.exists()
+    assert leftovers(manager.config.data_dir) == []
+    if isinstance(backend, LocalFolderBackend):
+        assert leftovers(backend.root) == []
+
+    # The next run starts over and publishes the snapshot
+    result = SyncEngine(manager, backend).run()
+    assert result['bootstrap'] and manager.sync_base_path.exists()
+
+
+def test_engine_cancelled_download_cleans_up(make_manager, backend):
+    device_a, device_b = make_manager('a'), make_manager('b')
+    project = project_with_text(device_a)
+    SyncEngine(device_a, backend).run()
+    transfer, reports = cancel_on('download')
+
+    with pytest.raises(SyncCancelled):
+        SyncEngine(device_b, backend, transfer).run()
+
+    assert any(stage == 'download' for stage, _done, _total in reports)
+    assert not device_b.sync_base_path.exists()
+    assert leftovers(device_b.config.data_dir) == []
+    assert device_b.load_project(project.id) is None
+
+    SyncEngine(device_b, backend).run()
+    assert len(device_b.load_project(project.id).paragraphs) == len(project.paragraphs)
@@ -7,29 +7,70 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
+import logging
 import re
+import threading
 
-from gi.repository import Gtk, Adw, GObject, Gdk, GLib, Pango, Graphene
+from gi.repository import Gtk, Adw, GObject, Gdk, Gio, GLib, Pango, Graphene
 from datetime import datetime
 
 from core.models import Paragraph, ParagraphType, DEFAULT_TEMPLATES
 from core.services import ProjectManager
+from core.history import InlineFormatOp, FootnoteEditOp
+from core.markup import INLINE_TAGS, serialize_markup
 from utils.helpers import TextHelper, FormatHelper
 from utils.i18n import _
+from .spell_service import SPELL_CHECK_AVAILABLE, get_spell_service
+
+logger = logging.getLogger(__name__)
 
 _CURRENT_DRAG_ID = None
 
-# Try to load PyGTKSpellcheck
-try:
-    import gtkspellcheck
-    SPELL_CHECK_AVAILABLE = True
-    print("PyGTKSpellcheck available - spell checking enabled", flush=True)
-except ImportError:
-    SPELL_CHECK_AVAILABLE = False
-    print("PyGTKSpellcheck not available - spell checking disabled", flush=True)
+# Delay before buffer edits are serialized into the paragraph model
+CONTENT_FLUSH_DELAY_MS = 400
+
 
-# Global CSS provider cache
+# Shared CSS providers, installed once on the display and selected per
+# widget with a style class (instead of one provider per widget)
 _css_cache = {}
+_display_css = {}
+
+# Style of the text view of special paragraph types: (class name, CSS)
+_TYPE_CSS = {
+    ParagraphType.LATEX: ('latex-view', """
+        .latex-view {
+            font-family: 'Monospace';
+            background-color: alpha(@theme_fg_color, 0.05);
+            border-radius: 4px;
+            padding: 6px;
+        }
+        """),
+    ParagraphType.CODE: ('code-view', """
+        .code-view {
+            font-family: 'Monospace';
+            background-color: #f3f3f3;
+            color: #2e3436;
+            border: 1px solid alpha(#000000, 0.1);
+            border-radius: 4px;
+            padding: 8px;
+        }
+        """),
+}
+
+
+def ensure_display_css(key: str, css: str) -> None:
+    """Install a CSS snippet on the default display once per key"""
+    if key in _display_css:
+        return
+    display = Gdk.Display.get_default()
+    if not display:
+        return
+    css_provider = Gtk.CssProvider()
+    css_provider.load_from_data(css.encode())
+    Gtk.StyleContext.add_provider_for_display(
+        display, css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+    )
+    _display_css[key] = css_provider
 
 
 def get_cached_css_provider(font_family: str, font_size: int) -> dict:
@@ -37,17 +78,16 @@ def get_cached_css_provider(font_family: str, font_size: int) -> dict:
     key = f"{font_family}_{font_size}"
     
     if key not in _css_cache:
-        css_provider = Gtk.CssProvider()
-        class_name = f'paragraph-text-view-{key.replace(" ", "_").replace("\'", "")}'
+        class_name = f'paragraph-text-view-{re.sub(r"[^A-Za-z0-9_-]", "_", key)}'
         css = f"""
         .{class_name} {{
             font-family: '{font_family}';
             font-size: {font_size}pt;
         }}
         """
-        css_provider.load_from_data(css.encode())
+        ensure_display_css(class_name, css)
         _css_cache[key] = {
-            'provider': css_provider,
+            'provider': _display_css.get(class_name),
             'class_name': class_name
         }
     
@@ -363,7 +403,7 @@ class PomodoroDialog(Adw.Window):
                 Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
             )
         except Exception as e:
-            print(_("Erro ao configurar estilos do Pomodoro: {}").format(e))
+            logger.warning(_("Erro ao configurar estilos do Pomodoro: {}").format(e))
     
     def _update_display(self):
         """Update dialog display with current timer information"""
@@ -475,126 +515,6 @@ class PomodoroDialog(Adw.Window):
         self.present()
 
 
-class SpellCheckHelper:
-    """Helper class for spell checking functionality using PyGTKSpellcheck"""
-
-    def __init__(self, config=None):
-        self.config = config
-        self.available_languages = []
-        self.spell_checkers = {}
-        self._load_available_languages()
-
-    def _load_available_languages(self):
-        """Load available spell check languages"""
-        if not SPELL_CHECK_AVAILABLE:
-            return
-
-        try:
-            import enchant
-            # Try to list the sayings that the enchant actually sees
-            try:
-                broker = enchant.Broker()
-                dicts = broker.list_dicts()
-                print(f"DEBUG: Dicionários brutos encontrados pelo Enchant: {[d[0] for d in dicts]}", flush=True)
-            except:
-                pass
-
-            self.available_languages = []
-            # Expanded list to try to catch variations
-            candidates = ['pt_BR', 'pt-BR', 'pt', 'en_US', 'en-US', 'en', 'es_ES', 'es']
-            
-            for lang in candidates:
-                try:
-                    if enchant.dict_exists(lang):
-                        self.available_languages.append(lang)
-                except Exception as e:
-                    print(f"Error checking dictionary {lang}: {e}", flush=True)
-
-        except ImportError as e:
-            print(f"Enchant not available for spell checking: {e}", flush=True)
-
-    def setup_spell_check(self, text_view, language=None):
-        """Setup spell checking for a TextView using PyGTKSpellcheck"""
-        if not SPELL_CHECK_AVAILABLE:
-            print("DEBUG: Spell check not available (module import failed)", flush=True)
-            return None
-
-        try:
-            # Determine the language
-            if language:
-                target_lang = language
-            elif self.config:
-                target_lang = self.config.get_spell_check_language()
-            else:
-                target_lang = 'pt_BR'
-
-            print(f"DEBUG: Configurando SpellChecker para TextView {id(text_view)} com idioma '{target_lang}'", flush=True)
-
-            spell_checker = None
-            
-            # Tenta criar com o idioma exato (SEM O ARGUMENTO enable=True)
-            try:
-                spell_checker = gtkspellcheck.SpellChecker(text_view, language=target_lang)
-            except Exception as e1:
-                print(f"DEBUG: Falha inicial com '{target_lang}': {e1}", flush=True)
-                
-                # Try common variations on Linux/Arch
-                alternatives = []
-                if '_' in target_lang:
-                    alternatives.append(target_lang.replace('_', '-')) # pt_BR -> pt-BR
-                elif '-' in target_lang:
-                    alternatives.append(target_lang.replace('-', '_')) # pt-BR -> pt_BR
-                
-                # Tenta só o código do idioma (ex: pt)
-                base_lang = target_lang.split('_')[0].split('-')[0]
-                if base_lang != target_lang:
-                    alternatives.append(base_lang)
-
-                for alt in alternatives:
-                    try:
-                        print(f"DEBUG: Tentando alternativa '{alt}'...", flush=True)
-                        # WITHOUT THE enable=True ARGUMENT HERE TOO
-                        spell_checker = gtkspellcheck.SpellChecker(text_view, language=alt)
-                        print(f"DEBUG: Sucesso com '{alt}'!", flush=True)
-                        break
-                    except Exception as e_alt:
-                        print(f"DEBUG: Falha com alternativa '{alt}': {e_alt}", flush=True)
-                        continue
-
-            if spell_checker:
-                # Force enable NOW, after creation
-                spell_checker.enabled = True
-                
-                checker_id = id(text_view)
-                self.spell_checkers[checker_id] = spell_checker
-                print(f"DEBUG: SpellChecker ANEXADO com sucesso. Idioma: {spell_checker.language}. Ativado: {spell_checker.enabled}", flush=True)
-                return spell_checker
-            else:
-                print("DEBUG: Não foi possível inicializar o SpellChecker com nenhum idioma compatível.", flush=True)
-                return None
-
-        except Exception as e:
-            print(f"DEBUG: Erro fatal no setup_spell_check: {e}", flush=True)
-            import traceback
-            traceback.print_exc()
-            return None
-
-    def enable_spell_check(self, text_view, enabled=True):
-        """Enable or disable spell checking for a TextView"""
-        if not SPELL_CHECK_AVAILABLE:
-            return
-
-        try:
-            checker_id = id(text_view)
-            spell_checker = self.spell_checkers.get(checker_id)
-
-            if spell_checker:
-                spell_checker.enabled = enabled
-                print(f"DEBUG: Spell check alternado para {enabled} no widget {checker_id}", flush=True)
-        except Exception as e:
-            print(f"Error toggling spell check: {e}", flush=True)
-
-
 class WelcomeView(Gtk.Box):
     """Welcome view shown when no project is open"""
 
@@ -738,9 +658,9 @@ class WelcomeView(Gtk.Box):
             try:
                 Gio.AppInfo.launch_default_for_uri(wiki_url, None)
             except Exception as e:
-                print(_("Não foi possível abrir URL da wiki: {}").format(e))
+                logger.warning(_("Não foi possível abrir URL da wiki: {}").format(e))
         except Exception as e:
-            print(_("Erro ao lançar navegador: {}").format(e))
+            logger.warning(_("Erro ao lançar navegador: {}").format(e))
 
     def _create_recent_section(self):
         """Create recent projects section"""
@@ -748,6 +668,29 @@ class WelcomeView(Gtk.Box):
         pass
 
 
+class ProjectListItem(GObject.Object):
+    """List model item wrapping a project entry of the sidebar"""
+
+    __gtype_name__ = 'TacProjectListItem'
+
+    def __init__(self, project_info: dict):
+        super().__init__()
+        self.project_info = project_info
+        self.project_id = project_info['id']
+        # Prebuilt so filtering does not lowercase every row per keystroke
+        self.search_key = "\n".join((
+            project_info.get('name', ''), project_info.get('description', '')
+        )).lower()
+        self.signature = self.make_signature(project_info)
+
+    @staticmethod
+    def make_signature(project_info: dict) -> tuple:
+        """Values shown in the row; a different signature means a rebind"""
+        stats = project_info.get('statistics', {})
+        return (project_info.get('name'), project_info.get('modified_at'),
+                stats.get('total_words'), stats.get('total_paragraphs'))
+
+
 class ProjectListWidget(Gtk.Box):
     """Widget for displaying and selecting projects"""
 
@@ -757,10 +700,19 @@ class ProjectListWidget(Gtk.Box):
         'project-selected': (GObject.SIGNAL_RUN_FIRST, None, (object,)),
     }
 
-    def __init__(self, project_manager: ProjectManager, **kwargs):
+    def __init__(self, project_manager: ProjectManager, projects=None, **kwargs):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, **kwargs)
         self.project_manager = project_manager
         self.set_vexpand(True)
+        self._refresh_thread = None
+
+        # Sidebar model: keyed items, filtered without touching the rows
+        self.project_store = Gio.ListStore(item_type=ProjectListItem)
+        self._items_by_id = {}
+        self._bound_rows = {}
+        self._filter_text = ""
+        self.project_filter = Gtk.CustomFilter.new(self._filter_project)
+        self.filter_model = Gtk.FilterListModel(model=self.project_store, filter=self.project_filter)
 
         # Search entry
         self.search_entry = Gtk.SearchEntry()
@@ -779,72 +731,130 @@ class ProjectListWidget(Gtk.Box):
         scrolled.set_vexpand(True)
 
         # Project list
-        self.project_list = Gtk.ListBox()
-        self.project_list.set_selection_mode(Gtk.SelectionMode.SINGLE)
-        self.project_list.connect('row-activated', self._on_project_activated)
-        self.project_list.set_filter_func(self._filter_projects)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect('setup', self._on_row_setup)
+        factory.connect('bind', self._on_row_bind)
+        factory.connect('unbind', self._on_row_unbind)
+
+        selection = Gtk.SingleSelection(model=self.filter_model)
+        selection.set_autoselect(False)
+        selection.set_can_unselect(True)
+
+        self.project_list = Gtk.ListView(model=selection, factory=factory)
+        self.project_list.set_single_click_activate(True)
+        self.project_list.add_css_class("project-list")
+        self.project_list.connect('activate', self._on_project_activated)
 
         scrolled.set_child(self.project_list)
         self.append(scrolled)
 
-        # Load projects
-        self.refresh_projects()
+        # Load projects (entries restored from a session snapshot are
+        # shown as they are and reconciled with the database later)
+        self.refresh_projects(projects)
 
-    def refresh_projects(self):
-        """Refresh the project list"""
-        # Clear existing projects
-        child = self.project_list.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            self.project_list.remove(child)
-            child = next_child
+    def refresh_projects(self, projects=None):
+        """
+        Sync the project list with the database (or the given entries).
 
-        # Load projects
-        projects = self.project_manager.list_projects()
+        Only the differences are applied to the model: removed projects are
+        dropped, changed ones replaced, and moved or new ones inserted at
+        their position, so unchanged rows stay bound.
+        """
+        if projects is None:
+            projects = self.project_manager.list_projects()
+        new_ids = [project_info['id'] for project_info in projects]
+        wanted = set(new_ids)
+
+        # Removed projects (backwards so positions stay valid)
+        current_ids = [self.project_store.get_item(i).project_id
+                       for i in range(self.project_store.get_n_items())]
+        for position in range(len(current_ids) - 1, -1, -1):
+            if current_ids[position] not in wanted:
+                self.project_store.remove(position)
+                self._items_by_id.pop(current_ids[position], None)
+                del current_ids[position]
+
+        for position, project_info in enumerate(projects):
+            project_id = project_info['id']
+            item = self._items_by_id.get(project_id)
+            if item is not None and item.signature != ProjectListItem.make_signature(project_info):
+                # Updated: a fresh item makes the view rebind only this row
+                item = None
+            if item is None:
+                item = ProjectListItem(project_info)
+                self._items_by_id[project_id] = item
+
+            if position < len(current_ids) and current_ids[position] == project_id:
+                if self.project_store.get_item(position) is not item:
+                    self.project_store.splice(position, 1, [item])
+                continue
+
+            # Inserted or reordered
+            if project_id in current_ids[position:]:
+                old_position = current_ids.index(project_id, position)
+                self.project_store.remove(old_position)
+                del current_ids[old_position]
+            self.project_store.insert(position, item)
+            current_ids.insert(position, project_id)
+
+    def refresh_projects_async(self):
+        """Query the project list on a worker thread, then sync the model"""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+
+        def worker():
+            projects = self.project_manager.list_projects()
+
+            def apply():
+                self.refresh_projects(projects)
+                return False
+            GLib.idle_add(apply)
+
+        self._refresh_thread = threading.Thread(target=worker, name='project-list', daemon=True)
+        self._refresh_thread.start()
+
+    def get_project_entries(self):
+        """The project entries currently in the list"""
+        return [self.project_store.get_item(i).project_info
+                for i in range(self.project_store.get_n_items())]
 
-        for project_info in projects:
-            row = self._create_project_row(project_info)
-            self.project_list.append(row)
-            
     def update_project_statistics(self, project_id: str, stats: dict):
         """Update statistics for a specific project without full refresh"""
-        child = self.project_list.get_first_child()
-        while child:
-            if hasattr(child, 'project_info') and child.project_info['id'] == project_id:
-                # Update the project info
-                child.project_info['statistics'] = stats
-                
-                # Update the stats label if it exists
-                if hasattr(child, 'stats_label'):
-                    words = stats.get('total_words', 0)
-                    paragraphs = stats.get('total_paragraphs', 0)
-                    stats_text = FormatHelper.format_project_stats(words, paragraphs)
-                    child.stats_label.set_text(stats_text)
-                break
-            child = child.get_next_sibling()
+        item = self._items_by_id.get(project_id)
+        if item is None:
+            return
 
-    def _create_project_row(self, project_info):
-        """Create a row for a project"""
-        row = Gtk.ListBoxRow()
-        row.project_info = project_info
+        # Update the project info
+        item.project_info['statistics'] = stats
+        item.signature = ProjectListItem.make_signature(item.project_info)
 
-        # Main box
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
-        box.set_margin_start(12)
-        box.set_margin_end(12)
-        box.set_margin_top(8)
-        box.set_margin_bottom(8)
+        # Update the stats label if the row is visible
+        row = self._bound_rows.get(project_id)
+        if row is not None:
+            words = stats.get('total_words', 0)
+            paragraphs = stats.get('total_paragraphs', 0)
+            stats_text = FormatHelper.format_project_stats(words, paragraphs)
+            if row.stats_label.get_text() != stats_text:
+                row.stats_label.set_text(stats_text)
+
+    def _on_row_setup(self, factory, list_item):
+        """Create a recyclable row for a project"""
+        row = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        row.project_info = None
+        row.set_margin_start(12)
+        row.set_margin_end(12)
+        row.set_margin_top(8)
+        row.set_margin_bottom(8)
 
         # Header with name and date
         header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
 
         # Project name
-        name_label = Gtk.Label()
-        name_label.set_text(project_info['name'])
-        name_label.set_halign(Gtk.Align.START)
-        name_label.set_ellipsize(3)
-        name_label.add_css_class("heading")
-        header_box.append(name_label)
+        row.name_label = Gtk.Label()
+        row.name_label.set_halign(Gtk.Align.START)
+        row.name_label.set_ellipsize(3)
+        row.name_label.add_css_class("heading")
+        header_box.append(row.name_label)
 
         # Spacer
         spacer = Gtk.Box()
@@ -861,7 +871,7 @@ class ProjectListWidget(Gtk.Box):
         edit_button.set_tooltip_text(_("Renomear projeto"))
         edit_button.add_css_class("flat")
         edit_button.add_css_class("circular")
-        edit_button.connect('clicked', lambda b: self._on_edit_project(project_info))
+        edit_button.connect('clicked', lambda b: row.project_info and self._on_edit_project(row.project_info))
         actions_box.append(edit_button)
 
         # Delete button
@@ -870,40 +880,25 @@ class ProjectListWidget(Gtk.Box):
         delete_button.set_tooltip_text(_("Excluir projeto"))
         delete_button.add_css_class("flat")
         delete_button.add_css_class("circular")
-        delete_button.connect('clicked', lambda b: self._on_delete_project(project_info))
+        delete_button.connect('clicked', lambda b: row.project_info and self._on_delete_project(row.project_info))
         actions_box.append(delete_button)
 
         header_box.append(actions_box)
 
         # Modification date
-        if project_info.get('modified_at'):
-            try:
-                modified_dt = datetime.fromisoformat(project_info['modified_at'])
-                date_label = Gtk.Label()
-                date_label.set_text(FormatHelper.format_datetime(modified_dt, 'short'))
-                date_label.add_css_class("caption")
-                date_label.add_css_class("dim-label")
-                header_box.append(date_label)
-            except (ValueError, TypeError):
-                pass
+        row.date_label = Gtk.Label()
+        row.date_label.add_css_class("caption")
+        row.date_label.add_css_class("dim-label")
+        header_box.append(row.date_label)
 
-        box.append(header_box)
+        row.append(header_box)
 
         # Statistics
-        stats = project_info.get('statistics', {})
-        if stats:
-            stats_label = Gtk.Label()
-            words = stats.get('total_words', 0)
-            paragraphs = stats.get('total_paragraphs', 0)
-            stats_text = FormatHelper.format_project_stats(words, paragraphs)
-            stats_label.set_text(stats_text)
-            stats_label.set_halign(Gtk.Align.START)
-            stats_label.add_css_class("caption")
-            stats_label.add_css_class("dim-label")
-            box.append(stats_label)
-            
-            # Store reference to stats label for easy updating
-            row.stats_label = stats_label
+        row.stats_label = Gtk.Label()
+        row.stats_label.set_halign(Gtk.Align.START)
+        row.stats_label.add_css_class("caption")
+        row.stats_label.add_css_class("dim-label")
+        row.append(row.stats_label)
 
         # Setup hover effect
         hover_controller = Gtk.EventControllerMotion()
@@ -911,30 +906,68 @@ class ProjectListWidget(Gtk.Box):
         hover_controller.connect('leave', lambda c: actions_box.set_visible(False))
         row.add_controller(hover_controller)
 
-        row.set_child(box)
-        return row
+        list_item.set_child(row)
 
-    def _on_project_activated(self, listbox, row):
+    def _on_row_bind(self, factory, list_item):
+        """Show a project in a recycled row"""
+        item = list_item.get_item()
+        project_info = item.project_info
+        row = list_item.get_child()
+        row.project_info = project_info
+        self._bound_rows[item.project_id] = row
+
+        row.name_label.set_text(project_info['name'])
+
+        date_text = ""
+        if project_info.get('modified_at'):
+            try:
+                modified_dt = datetime.fromisoformat(project_info['modified_at'])
+                date_text = FormatHelper.format_datetime(modified_dt, 'short')
+            except (ValueError, TypeError):
+                pass
+        row.date_label.set_text(date_text)
+        row.date_label.set_visible(bool(date_text))
+
+        stats = project_info.get('statistics', {})
+        if stats:
+            words = stats.get('total_words', 0)
+            paragraphs = stats.get('total_paragraphs', 0)
+            row.stats_label.set_text(FormatHelper.format_project_stats(words, paragraphs))
+        row.stats_label.set_visible(bool(stats))
+
+    def _on_row_unbind(self, factory, list_item):
+        """Forget a row that scrolled out of view"""
+        item = list_item.get_item()
+        row = list_item.get_child()
+        if item is not None and self._bound_rows.get(item.project_id) is row:
+            del self._bound_rows[item.project_id]
+        row.project_info = None
+
+    def _on_project_activated(self, list_view, position):
         """Handle project activation"""
-        if row and hasattr(row, 'project_info'):
-            self.emit('project-selected', row.project_info)
+        item = self.filter_model.get_item(position)
+        if item is not None:
+            self.emit('project-selected', item.project_info)
 
     def _on_search_changed(self, search_entry):
         """Handle search text change"""
-        self.project_list.invalidate_filter()
+        previous = self._filter_text
+        self._filter_text = search_entry.get_text().lower()
+
+        # Tell the filter model which rows can be skipped when re-filtering
+        if previous in self._filter_text:
+            change = Gtk.FilterChange.MORE_STRICT
+        elif self._filter_text in previous:
+            change = Gtk.FilterChange.LESS_STRICT
+        else:
+            change = Gtk.FilterChange.DIFFERENT
+        self.project_filter.changed(change)
 
-    def _filter_projects(self, row):
+    def _filter_project(self, item):
         """Filter projects based on search text"""
-        search_text = self.search_entry.get_text().lower()
-        if not search_text:
+        if not self._filter_text:
             return True
-
-        if hasattr(row, 'project_info'):
-            project_name = row.project_info.get('name', '').lower()
-            project_desc = row.project_info.get('description', '').lower()
-            return search_text in project_name or search_text in project_desc
-
-        return True
+        return self._filter_text in item.search_key
 
     def _on_edit_project(self, project_info):
         """Handle project rename"""
@@ -1019,6 +1052,7 @@ class ParagraphEditor(Gtk.Box):
         'content-changed': (GObject.SIGNAL_RUN_FIRST, None, ()),
         'remove-requested': (GObject.SIGNAL_RUN_FIRST, None, (str,)),
         'paragraph-reorder': (GObject.SIGNAL_RUN_FIRST, None, (str, str, str)),
+        'history-operation': (GObject.SIGNAL_RUN_FIRST, None, (object,)),
     }
 
     def __init__(self, paragraph: Paragraph, config=None, **kwargs):
@@ -1034,11 +1068,20 @@ class ParagraphEditor(Gtk.Box):
         
         # Spell check components - initialize once
         self.spell_checker = None
-        self.spell_helper = None
         self._spell_check_setup = False
         
         # Footnote badge reference
         self.footnote_badge = None
+        self._footnotes_before_edit = []
+
+        # Buffer edits are serialized into paragraph.content lazily
+        self._content_dirty = False
+        self._flush_timeout_id = None
+
+        # Paragraph whose style classes are applied (see rebind)
+        self._styled_paragraph = None
+        self._font_class = None
+        self.spell_button = None
         
         self.set_spacing(8)
         self.add_css_class("card")
@@ -1059,120 +1102,101 @@ class ParagraphEditor(Gtk.Box):
 
     def _on_map(self, widget):
         """Called when widget is mapped to screen (visible)"""
+        if self._styled_paragraph is not self.paragraph:
+            self._apply_type_style()
+
+    def _apply_type_style(self):
+        """Apply the type and font style classes of the current paragraph"""
         try:
             formatting = self.paragraph.formatting
-            
-            # Logic for LaTeX
-            if self.paragraph.type == ParagraphType.LATEX:
-                font_family = 'Monospace'
-                font_size = formatting.get('font_size', 11)
-                
-                # Add specific visual style
-                css_provider = Gtk.CssProvider()
-                css = """
-                .latex-view {
-                    font-family: 'Monospace';
-                    background-color: alpha(@theme_fg_color, 0.05);
-                    border-radius: 4px;
-                    padding: 6px;
-                }
-                """
-                css_provider.load_from_data(css.encode())
-                self.text_view.get_style_context().add_provider(
-                    css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-                )
-                self.text_view.add_css_class("latex-view")
-                
-            # Logic for Code Block
-            elif self.paragraph.type == ParagraphType.CODE:
-                font_family = 'Monospace'
-                font_size = formatting.get('font_size', 10)
-                
-                # Add specific visual style for Code
-                css_provider = Gtk.CssProvider()
-                css = """
-                .code-view {
-                    font-family: 'Monospace';
-                    background-color: #f3f3f3;
-                    color: #2e3436;
-                    border: 1px solid alpha(#000000, 0.1);
-                    border-radius: 4px;
-                    padding: 8px;
-                }
-                """
-
-                css_provider.load_from_data(css.encode())
-                self.text_view.get_style_context().add_provider(
-                    css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-                )
-                self.text_view.add_css_class("code-view")
+            type_css = _TYPE_CSS.get(self.paragraph.type)
 
+            if type_css:
+                # LaTeX and code blocks: monospace with a shared type style
+                class_name, css = type_css
+                ensure_display_css(class_name, css)
+                self.text_view.add_css_class(class_name)
+                font_family = 'Monospace'
+                font_size = formatting.get('font_size', 11 if self.paragraph.type == ParagraphType.LATEX else 10)
             else:
                 # Default type
                 font_family = formatting.get('font_family', 'Adwaita Sans')
                 font_size = formatting.get('font_size', 12)
 
             # Use CSS cache instead of creating individual provider
-            css_cache = get_cached_css_provider(font_family, font_size)
-            self.text_view.add_css_class(css_cache['class_name'])
-
-            # Apply provider globally only once
-            if not hasattr(self.__class__, '_css_applied'):
-                display = Gdk.Display.get_default()
-                if display:
-                    Gtk.StyleContext.add_provider_for_display(
-                        display,
-                        css_cache['provider'],
-                        Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-                    )
-                self.__class__._css_applied = True
+            font_class = get_cached_css_provider(font_family, font_size)['class_name']
+            if font_class != self._font_class:
+                if self._font_class:
+                    self.text_view.remove_css_class(self._font_class)
+                self.text_view.add_css_class(font_class)
+                self._font_class = font_class
 
             self._apply_formatting()
-            
-            # DEBUG: Visual confirmation in terminal ---
-            print(f"DEBUG: ParagraphEditor {self.paragraph.id[:8]} MAPPED (Type: {self.paragraph.type})", flush=True)
+            self._styled_paragraph = self.paragraph
+
+            logger.debug("ParagraphEditor %s styled (type: %s)", self.paragraph.id[:8], self.paragraph.type)
             
         except Exception as e:
-            print(f"Error during paragraph editor initialization: {e}", flush=True)
+            logger.exception("Error during paragraph editor initialization: %s", e)
+
+    def rebind(self, paragraph: Paragraph):
+        """
+        Show another paragraph of the same type in this editor.
+
+        Used by ParagraphEditorPool to recycle editors instead of building
+        new widgets; the editor must have been released first.
+        """
+        self.paragraph = paragraph
+        self._content_dirty = False
+        self._footnotes_before_edit = []
+        self.is_dragging = False
+        self.remove_css_class("dragging")
+
+        self.text_buffer.handler_block(self._changed_handler_id)
+        try:
+            self._set_content_from_storage(paragraph.content)
+        finally:
+            self.text_buffer.handler_unblock(self._changed_handler_id)
 
+        self._update_word_count()
+        self._update_footnote_badge()
+        if self.spell_button is not None:
+            self.spell_button.handler_block(self._spell_toggled_id)
+            self.spell_button.set_active(self.config.get_spell_check_enabled())
+            self.spell_button.handler_unblock(self._spell_toggled_id)
+
+        if self.get_mapped():
+            self._apply_type_style()
 
     def _setup_spell_check(self):
-        """Setup spell check once when text view is ready"""
+        """Attach the shared spell service once the text view is ready"""
         # If LATEX or CODE disable spellcheck
         if self.paragraph.type in [ParagraphType.LATEX, ParagraphType.CODE]:
             return False
-        # DEBUG: Call tracking
-        print(f"DEBUG: Tentando setup spell check para {self.paragraph.id[:8]}...", flush=True)
 
         if self._spell_check_setup or not self.text_view:
             return False # Retorna False para parar o timeout
         
         if not self.config or not self.config.get_spell_check_enabled():
-            print("DEBUG: Spell check desabilitado na config ou config ausente.", flush=True)
             return False
         
         try:
-            # Try to get the helper from the main window, otherwise it will create a new one
-            root = self.get_root()
-            if root and hasattr(root, 'spell_helper'):
-                self.spell_helper = root.spell_helper
-            else:
-                if not hasattr(self, 'local_spell_helper'):
-                    self.local_spell_helper = SpellCheckHelper(self.config)
-                self.spell_helper = self.local_spell_helper
-            
-            self.spell_checker = self.spell_helper.setup_spell_check(self.text_view)
-            
+            self.spell_checker = get_spell_service(self.config).attach(self.text_view)
             if self.spell_checker:
                 self._spell_check_setup = True
-            
         except Exception as e:
-            print(f"Spell check setup failed: {e}", flush=True)
-            import traceback
-            traceback.print_exc()
+            logger.warning("Spell check setup failed: %s", e)
             
         return False
 
+    def release(self):
+        """Store pending edits and release shared resources before the editor is dropped"""
+        self.flush_content()
+        if self.spell_checker:
+            get_spell_service(self.config).detach(self.spell_checker)
+            self.spell_checker = None
+            self._spell_check_setup = False
+
     def _create_header(self):
         """Create paragraph header with type and controls"""
         header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
@@ -1268,7 +1292,7 @@ class ParagraphEditor(Gtk.Box):
             self.spell_button.set_tooltip_text(_("Alternar verificação ortográfica"))
             self.spell_button.add_css_class("flat")
             self.spell_button.set_active(self.config.get_spell_check_enabled())
-            self.spell_button.connect('toggled', self._on_spell_check_toggled)
+            self._spell_toggled_id = self.spell_button.connect('toggled', self._on_spell_check_toggled)
             header_box.append(self.spell_button)
 
         # Word count
@@ -1311,32 +1335,40 @@ class ParagraphEditor(Gtk.Box):
         if not tag:
             return
 
+        # Store pending typing first so the operation only covers the tag
+        self.flush_content()
+        old_content = self.paragraph.content
+
         # Simple toggle logic: if start has tag, remove from whole selection. Else apply.
-        if start.has_tag(tag):
-            self.text_buffer.remove_tag_by_name(tag_name, start, end)
-        else:
+        if not start.has_tag(tag):
             self.text_buffer.apply_tag_by_name(tag_name, start, end)
+        else:
+            self.text_buffer.remove_tag_by_name(tag_name, start, end)
 
         # Forces update for saving tags <b>, <i>, etc.
         self._on_text_changed(self.text_buffer)
+        if self.flush_content():
+            self.emit('history-operation', InlineFormatOp(
+                self.paragraph.id, old_content, self.paragraph.content
+            ))
 
     def _on_spell_check_toggled(self, button):
         """Handle spell check toggle"""
-        if not self.spell_helper or not self.text_view:
+        if not self.text_view:
             return
         
         enabled = button.get_active()
         
+        if self.config:
+            self.config.set_spell_check_enabled(enabled)
+
         if enabled and not self._spell_check_setup:
             self._setup_spell_check()
         elif self.spell_checker:
             try:
-                self.spell_helper.enable_spell_check(self.text_view, enabled)
+                self.spell_checker.set_enabled(enabled)
             except Exception as e:
-                print(_("Erro ao alternar verificação ortográfica: {}").format(e))
-        
-        if self.config:
-            self.config.set_spell_check_enabled(enabled)
+                logger.warning(_("Erro ao alternar verificação ortográfica: {}").format(e))
 
     def _create_text_editor(self):
         """Create the text editing area"""
@@ -1357,7 +1389,7 @@ class ParagraphEditor(Gtk.Box):
         self._set_content_from_storage(self.paragraph.content)
 
         # Connect signal AFTER loading text
-        self.text_buffer.connect('changed', self._on_text_changed)
+        self._changed_handler_id = self.text_buffer.connect('changed', self._on_text_changed)
 
         # Text view
         self.text_view = Gtk.TextView()
@@ -1382,6 +1414,7 @@ class ParagraphEditor(Gtk.Box):
         # Detect focus to create toolbar on demand
         focus_controller = Gtk.EventControllerFocus()
         focus_controller.connect("enter", self._on_focus_enter)
+        focus_controller.connect("leave", self._on_focus_leave)
         self.text_view.add_controller(focus_controller)
 
     def _on_focus_enter(self, controller):
@@ -1392,6 +1425,10 @@ class ParagraphEditor(Gtk.Box):
         if not self._spell_check_setup:
             GLib.idle_add(self._setup_spell_check)
 
+    def _on_focus_leave(self, controller):
+        """Called when text view loses focus"""
+        self.flush_content()
+
     def _ensure_formatting_buttons(self):
         """Create formatting buttons only when needed"""
         if self._formatting_buttons_created:
@@ -1442,7 +1479,7 @@ class ParagraphEditor(Gtk.Box):
         if start_iter.equal(end_iter):
             return ""
 
-        output = []
+        runs = []
         current_iter = start_iter
         
         while not current_iter.is_end():
@@ -1454,25 +1491,14 @@ class ParagraphEditor(Gtk.Box):
             # Get the text from this segment
             text_segment = self.text_buffer.get_text(current_iter, next_iter, False)
             
-            # Check which tags are active at the beginning of this segment
-            tags = current_iter.get_tags()
-            tag_names = [t.get_property('name') for t in tags]
-            
-            # Apply opening tags
-            if 'bold' in tag_names: output.append('<b>')
-            if 'italic' in tag_names: output.append('<i>')
-            if 'underline' in tag_names: output.append('<u>')
-            
-            output.append(text_segment)
-            
-            # Aplicar tags de fechamento (na ordem inversa)
-            if 'underline' in tag_names: output.append('</u>')
-            if 'italic' in tag_names: output.append('</i>')
-            if 'bold' in tag_names: output.append('</b>')
-            
+            # Check which formatting tags are active at the beginning of this segment
+            tag_names = {t.get_property('name') for t in current_iter.get_tags()}
+            runs.append((text_segment, frozenset(name for name, _marker in INLINE_TAGS if name in tag_names)))
+
             current_iter = next_iter
 
-        return "".join(output)
+        # Adjacent runs split by other tags (e.g. spelling marks) are merged
+        return serialize_markup(runs)
 
     def _set_content_from_storage(self, html_content: str):
         """
@@ -1481,6 +1507,14 @@ class ParagraphEditor(Gtk.Box):
         if not self.text_buffer:
             return
 
+        # Loading content is not an edit the user can undo
+        self.text_buffer.begin_irreversible_action()
+        try:
+            self._load_markup(html_content)
+        finally:
+            self.text_buffer.end_irreversible_action()
+
+    def _load_markup(self, html_content: str):
         # Clear current buffer
         self.text_buffer.set_text("")
         
@@ -1546,7 +1580,7 @@ class ParagraphEditor(Gtk.Box):
                 css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
             )
         except Exception as e:
-            print(f"Erro ao carregar estilos DnD: {e}")
+            logger.warning("Erro ao carregar estilos DnD: %s", e)
 
     def _setup_drag_and_drop(self):
         """Setup drag and drop functionality using Global State for stability"""
@@ -1593,7 +1627,7 @@ class ParagraphEditor(Gtk.Box):
             drag_source.set_icon(paintable, icon_x, icon_y)
                 
         except Exception as e:
-            print(f"Erro no drag icon: {e}")
+            logger.warning("Erro no drag icon: %s", e)
 
     def _on_drag_end(self, drag_source, drag, delete_data):
         """End drag operation - Clear global state"""
@@ -1670,12 +1704,48 @@ class ParagraphEditor(Gtk.Box):
 
     def _on_text_changed(self, buffer):
         """Handle text changes"""
+        # Serializing the tags walks the whole buffer, so only mark the
+        # paragraph dirty here and serialize on idle, focus-out or flush
+        self._content_dirty = True
+        if self._flush_timeout_id is None:
+            self._flush_timeout_id = GLib.timeout_add(
+                CONTENT_FLUSH_DELAY_MS, self._on_flush_timeout, priority=GLib.PRIORITY_LOW
+            )
+
+    def _on_flush_timeout(self):
+        """Serialize pending edits once typing settles"""
+        self._flush_timeout_id = None
+        self.flush_content()
+        return False
+
+    def has_pending_changes(self) -> bool:
+        """Whether the buffer has edits not yet stored in the paragraph"""
+        return self._content_dirty
+
+    def flush_content(self) -> bool:
+        """
+        Store pending buffer edits in the paragraph.
+
+        Must be called before anything reads paragraph.content (save,
+        export, search). Returns True if the content changed.
+        """
+        if self._flush_timeout_id is not None:
+            GLib.source_remove(self._flush_timeout_id)
+            self._flush_timeout_id = None
+
+        if not self._content_dirty:
+            return False
+        self._content_dirty = False
+
         # Use method that capture formatting tags
         formatted_text = self._get_content_for_storage()
+        if formatted_text == self.paragraph.content:
+            return False
 
         self.paragraph.update_content(formatted_text)
         self._update_word_count()
         self.emit('content-changed')
+        return True
 
     def _on_remove_clicked(self, button):
         """Handle remove button click"""
@@ -1702,6 +1772,7 @@ class ParagraphEditor(Gtk.Box):
         
     def _on_footnote_clicked(self, button):
         """Handle footnote button click"""
+        self._footnotes_before_edit = list(self.paragraph.footnotes or [])
         dialog = FootnoteDialog(self.get_root(), self.paragraph)
         dialog.connect('footnotes-updated', self._on_footnotes_updated)
         dialog.present()
@@ -1817,8 +1888,15 @@ class ParagraphEditor(Gtk.Box):
 
     def _on_footnotes_updated(self, dialog):
         """Handle footnotes update"""
+        old_footnotes = self._footnotes_before_edit
+        new_footnotes = list(self.paragraph.footnotes or [])
+        self._footnotes_before_edit = new_footnotes
         self._update_footnote_badge()
         self.emit('content-changed')
+        if old_footnotes != new_footnotes:
+            self.emit('history-operation', FootnoteEditOp(
+                self.paragraph.id, old_footnotes, new_footnotes
+            ))
         
     def _update_footnote_badge(self):
         """Update the footnote count badge"""
@@ -1859,7 +1937,6 @@ class TextEditor(Gtk.Box):
         self.config = config
         
         self.spell_checker = None
-        self.spell_helper = SpellCheckHelper(config) if config else None
 
         self.text_buffer = Gtk.TextBuffer()
         self.text_buffer.set_text(initial_text)
@@ -1881,14 +1958,14 @@ class TextEditor(Gtk.Box):
 
     def _setup_spell_check_delayed(self):
         """Setup spell checking after widget is realized"""
-        if not self.spell_helper or not self.text_view:
+        if not self.text_view:
             return False
         
         if self.config and self.config.get_spell_check_enabled():
             try:
-                self.spell_checker = self.spell_helper.setup_spell_check(self.text_view)
+                self.spell_checker = get_spell_service(self.config).attach(self.text_view)
             except Exception as e:
-                print(_("Erro ao configurar verificação ortográfica: {}").format(e))
+                logger.warning(_("Erro ao configurar verificação ortográfica: {}").format(e))
         
         return False
 
@@ -2350,10 +2427,60 @@ class FirstRunTour:
         self.config.set('show_first_run_tutorial', False)
         self.config.save()
 
+class ParagraphItem(GObject.Object):
+    """List model item wrapping a paragraph of the open project"""
+
+    __gtype_name__ = 'TacParagraphItem'
+
+    def __init__(self, paragraph: Paragraph):
+        super().__init__()
+        self.paragraph = paragraph
+
+
+class ParagraphEditorPool:
+    """
+    Released ParagraphEditors kept per paragraph type for reuse.
+
+    The header of an editor depends on the paragraph type, so an editor is
+    only rebound to paragraphs of the type it was built for.
+    """
+
+    # Idle editors kept per type
+    MAX_PER_TYPE = 24
+
+    def __init__(self, create_editor):
+        self._create_editor = create_editor
+        self._free = {}
+
+    def acquire(self, paragraph: Paragraph) -> 'ParagraphEditor':
+        """Return an editor showing paragraph, recycled when possible"""
+        free = self._free.get(paragraph.type)
+        if free:
+            editor = free.pop()
+            editor.rebind(paragraph)
+            return editor
+        return self._create_editor(paragraph)
+
+    def recycle(self, editor: 'ParagraphEditor') -> None:
+        """Take back an editor that was removed from its row"""
+        if editor.get_parent() is not None:
+            return
+        editor.release()
+        free = self._free.setdefault(editor.paragraph.type, [])
+        if len(free) < self.MAX_PER_TYPE:
+            free.append(editor)
+
+    def clear(self) -> None:
+        self._free.clear()
+
+
 class ReorderableParagraphRow(Gtk.Box):
     """
     Wrapper around ParagraphEditor that implements Planify-style 
     fluid drag and drop with expanding landing pads.
+
+    Rows are recycled by the paragraph list view: the editor widget is
+    swapped with set_editor()/clear_editor() on bind/unbind.
     """
     __gtype_name__ = 'TacReorderableParagraphRow'
     
@@ -2362,11 +2489,11 @@ class ReorderableParagraphRow(Gtk.Box):
         'paragraph-reorder': (GObject.SIGNAL_RUN_FIRST, None, (str, str, str)),
     }
 
-    def __init__(self, editor_widget, **kwargs):
+    def __init__(self, editor_widget=None, **kwargs):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, **kwargs)
-        self.editor = editor_widget
-        
-        self.paragraph = editor_widget.paragraph 
+        self.editor = None
+        self.paragraph = None
+        self._placeholder = None
         
         # 1. Pad Superior
         self.top_drop_area = Gtk.Box(height_request=50) 
@@ -2378,7 +2505,8 @@ class ReorderableParagraphRow(Gtk.Box):
         self.append(self.top_revealer)
 
         # 2. O Conteúdo (Editor)
-        self.append(self.editor)
+        self.editor_slot = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self.append(self.editor_slot)
 
         # 3. Pad Inferior
         self.bottom_drop_area = Gtk.Box(height_request=50)
@@ -2394,9 +2522,39 @@ class ReorderableParagraphRow(Gtk.Box):
         self._setup_motion_controller()
         self._setup_css()
 
+        if editor_widget is not None:
+            self.set_editor(editor_widget)
+
+    def set_editor(self, editor_widget):
+        """Show the given editor widget in this row"""
+        self.clear_editor()
+        self.editor = editor_widget
+        self.paragraph = editor_widget.paragraph
+        self.editor_slot.append(editor_widget)
+
+    def show_placeholder(self):
+        """Show an empty card while the paragraph of this row is still loading"""
+        if self._placeholder is None:
+            self._placeholder = Gtk.Box(height_request=96)
+            self._placeholder.add_css_class("card")
+            self._placeholder.add_css_class("dim-label")
+            self._placeholder.paragraph = None
+        self.set_editor(self._placeholder)
+
+    def clear_editor(self):
+        """Detach the current editor widget, leaving an empty row; returns the editor"""
+        self._on_hover_leave(None)
+        editor = self.editor
+        if editor is not None:
+            if hasattr(editor, 'release'):
+                editor.release()
+            self.editor_slot.remove(editor)
+        self.editor = None
+        self.paragraph = None
+        return editor
+
     def _setup_css(self):
-        # Style
-        css_provider = Gtk.CssProvider()
+        # Style (shared by all rows, installed on the display once)
         css = """
         .drop-landing-pad {
             background-color: alpha(@accent_color, 0.1);
@@ -2406,10 +2564,8 @@ class ReorderableParagraphRow(Gtk.Box):
         }
         """
         try:
-            css_provider.load_from_data(css.encode())
-            display = Gdk.Display.get_default()
-            Gtk.StyleContext.add_provider_for_display(display, css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
-        except:
+            ensure_display_css('drop-landing-pad', css)
+        except Exception:
             pass
 
     def _setup_drop_targets(self):
@@ -2433,9 +2589,7 @@ class ReorderableParagraphRow(Gtk.Box):
         self.add_controller(motion_ctrl)
 
     def _on_hover_motion(self, controller, x, y):
-        global _CURRENT_DRAG_ID
-        
-        if _CURRENT_DRAG_ID == self.paragraph.id:
+        if not self.paragraph or _CURRENT_DRAG_ID == self.paragraph.id:
             return
 
         height = self.get_height()
@@ -2460,11 +2614,12 @@ class ReorderableParagraphRow(Gtk.Box):
         return self._handle_drop("after")
 
     def _handle_drop(self, position):
-        global _CURRENT_DRAG_ID
-        
         # Clean visual
         self._on_hover_leave(None)
 
+        if not self.paragraph:
+            return False
+
         dragged_id = _CURRENT_DRAG_ID
         target_id = self.paragraph.id
 
@@ -8,6 +8,7 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GObject, Gio, Gdk, Pango, GLib
 
+import logging
 import os
 import sqlite3
 import threading
@@ -19,23 +20,20 @@ import uuid
 
 from core.models import Project, DEFAULT_TEMPLATES
 from core.services import ProjectManager, ExportService
+from core.assets import file_digest
+from core.sync import DROPBOX_APP_KEY, SyncCancelled
 from core.config import Config
-from utils.helpers import ValidationHelper, FileHelper
+from utils.helpers import ValidationHelper, FileHelper, DependencyHelper, TextHelper
 from utils.i18n import _
+from .sync_scheduler import format_sync_result
 
 import webbrowser
 
-# Try to import Dropbox SDK
-try:
-    import dropbox
-    from dropbox import DropboxOAuth2FlowNoRedirect
-    from dropbox.files import WriteMode
-    from dropbox.exceptions import ApiError
-    DROPBOX_AVAILABLE = True
-except ImportError:
-    DROPBOX_AVAILABLE = False
+logger = logging.getLogger(__name__)
+
+# The Dropbox SDK is imported when a sync starts, not at startup
+DROPBOX_AVAILABLE = DependencyHelper.is_available('dropbox')
 
-DROPBOX_APP_KEY = "x3h06acjg6fhbmq"
 
 def get_system_fonts():
     """Get list of system fonts using multiple fallback methods"""
@@ -501,7 +499,7 @@ class ExportDialog(Adw.Window):
         try:
             default_location.mkdir(parents=True, exist_ok=True)
         except OSError as e:
-            print(_("Aviso: Não foi possível criar diretório padrão de exportação: {}").format(e))
+            logger.warning(_("Aviso: Não foi possível criar diretório padrão de exportação: {}").format(e))
             default_location = documents_dir
         
         self.selected_location = default_location
@@ -830,7 +828,7 @@ class PreferencesDialog(Adw.PreferencesWindow):
             # Fallback for older versions
             Gio.AppInfo.launch_default_for_uri(url, None)
         except Exception as e:
-            print(_("Erro ao abrir wiki: {}").format(e))
+            logger.warning(_("Erro ao abrir wiki: {}").format(e))
 
     def _load_preferences(self):
         """Load preferences from config"""
@@ -859,7 +857,7 @@ class PreferencesDialog(Adw.PreferencesWindow):
             self._update_ai_provider_ui(provider)
             
         except Exception as e:
-            print(_("Erro ao carregar preferências: {}").format(e))
+            logger.warning(_("Erro ao carregar preferências: {}").format(e))
 
     def _on_save_ai_clicked(self, button):
         """Handle manual save of AI settings"""
@@ -887,7 +885,7 @@ class PreferencesDialog(Adw.PreferencesWindow):
             self.add_toast(toast)
             
         except Exception as e:
-            print(_("Erro ao salvar configurações de IA: {}").format(e))
+            logger.warning(_("Erro ao salvar configurações de IA: {}").format(e))
             error_toast = Adw.Toast.new(_("Erro ao salvar configurações"))
             self.add_toast(error_toast)
 
@@ -904,7 +902,7 @@ class PreferencesDialog(Adw.PreferencesWindow):
             else:
                 style_manager.set_color_scheme(Adw.ColorScheme.DEFAULT)
         except Exception as e:
-            print(_("Erro ao alterar tema: {}").format(e))
+            logger.warning(_("Erro ao alterar tema: {}").format(e))
 
     def _on_font_family_changed(self, combo, pspec):
         """Handle font family change"""
@@ -914,7 +912,7 @@ class PreferencesDialog(Adw.PreferencesWindow):
             self.config.set('font_family', selected_font)
             self.config.save()
         except Exception as e:
-            print(_("Erro ao alterar família da fonte: {}").format(e))
+            logger.warning(_("Erro ao alterar família da fonte: {}").format(e))
 
     def _on_font_size_changed(self, spin, pspec):
         """Handle font size change"""
@@ -922,7 +920,7 @@ class PreferencesDialog(Adw.PreferencesWindow):
             self.config.set('font_size', int(spin.get_value()))
             self.config.save()
         except Exception as e:
-            print(_("Erro ao alterar tamanho da fonte: {}").format(e))
+            logger.warning(_("Erro ao alterar tamanho da fonte: {}").format(e))
 
     def _on_auto_save_changed(self, switch, pspec):
         """Handle auto save toggle"""
@@ -930,7 +928,7 @@ class PreferencesDialog(Adw.PreferencesWindow):
             self.config.set('auto_save', switch.get_active())
             self.config.save()
         except Exception as e:
-            print(_("Erro ao alterar salvamento automático: {}").format(e))
+            logger.warning(_("Erro ao alterar salvamento automático: {}").format(e))
 
     def _on_word_wrap_changed(self, switch, pspec):
         """Handle word wrap toggle"""
@@ -938,7 +936,7 @@ class PreferencesDialog(Adw.PreferencesWindow):
             self.config.set('word_wrap', switch.get_active())
             self.config.save()
         except Exception as e:
-            print(_("Erro ao alterar quebra de linha: {}").format(e))
+            logger.warning(_("Erro ao alterar quebra de linha: {}").format(e))
 
 
     def _on_ai_enabled_changed(self, switch, pspec):
@@ -1031,7 +1029,7 @@ class WelcomeDialog(Adw.Window):
                 Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
             )
         except Exception as e:
-            print(_("Erro ao aplicar CSS do diálogo de boas-vindas: {}").format(e))
+            logger.warning(_("Erro ao aplicar CSS do diálogo de boas-vindas: {}").format(e))
 
         main_box.append(headerbar)
 
@@ -1147,7 +1145,7 @@ class WelcomeDialog(Adw.Window):
             self.config.set('show_welcome_dialog', switch.get_active())
             self.config.save()
         except Exception as e:
-            print(_("Erro ao salvar preferência do diálogo de boas-vindas: {}").format(e))
+            logger.warning(_("Erro ao salvar preferência do diálogo de boas-vindas: {}").format(e))
 
     def _on_start_clicked(self, button):
         """Handle start button click"""
@@ -1168,9 +1166,9 @@ class WelcomeDialog(Adw.Window):
             try:
                 Gio.AppInfo.launch_default_for_uri(wiki_url, None)
             except Exception as e:
-                print(_("Não foi possível abrir URL via Gio: {}").format(e))
+                logger.warning(_("Não foi possível abrir URL via Gio: {}").format(e))
         except Exception as e:
-            print(_("Erro ao abrir lançador: {}").format(e))
+            logger.warning(_("Erro ao abrir lançador: {}").format(e))
 
 
 def AboutDialog(parent):
@@ -1273,7 +1271,7 @@ class BackupManagerDialog(Adw.Window):
         try:
             db_info = self.project_manager.get_database_info()
         except Exception as e:
-            print(_("Erro ao obter info do banco de dados: {}").format(e))
+            logger.warning(_("Erro ao obter info do banco de dados: {}").format(e))
             db_info = {
                 'database_path': 'Unknown',
                 'database_size_bytes': 0,
@@ -1338,7 +1336,7 @@ class BackupManagerDialog(Adw.Window):
         try:
             self.backups_list = self.project_manager.list_available_backups()
         except Exception as e:
-            print(_("Erro ao listar backups: {}").format(e))
+            logger.warning(_("Erro ao listar backups: {}").format(e))
             self.backups_list = []
 
         if not self.backups_list:
@@ -1413,7 +1411,7 @@ class BackupManagerDialog(Adw.Window):
                 backup_path = self.project_manager.create_manual_backup()
                 GLib.idle_add(self._backup_created, backup_path, button)
             except Exception as e:
-                print(_("Erro na thread de backup: {}").format(e))
+                logger.warning(_("Erro na thread de backup: {}").format(e))
                 GLib.idle_add(self._backup_created, None, button)
 
         thread = threading.Thread(target=backup_thread, daemon=True)
@@ -1474,16 +1472,46 @@ class BackupManagerDialog(Adw.Window):
                 self._confirm_import(backup_path)
         except GLib.Error as e:
             # Occurs if the user cancels
-            print(f"File selection cancelled or error: {e}")
+            logger.debug("File selection cancelled or error: %s", e)
 
     def _on_restore_backup(self, backup):
         """Handle restore backup button"""
         self._confirm_import(backup['path'])
 
     def _confirm_import(self, backup_path: Path):
+        """Compare the backup with the current database, then ask how to import"""
+        def preview_thread():
+            try:
+                preview = self.project_manager.preview_merge(str(backup_path))
+            except Exception as e:
+                logger.warning(_("Erro ao comparar bancos de dados: {}").format(e))
+                preview = None
+            GLib.idle_add(self._show_import_choice, backup_path, preview)
+
+        threading.Thread(target=preview_thread, daemon=True).start()
+
+    def _format_merge_preview(self, preview) -> str:
+        """Dry-run summary of a merge, for the import confirmation"""
+        if preview is None:
+            return ""
+        if preview.is_empty():
+            return "\n\n" + _("O backup não traz alterações em relação aos projetos atuais.")
+
+        summary = preview.summary()
+        text = "\n\n" + _("Ao mesclar:") + "\n" + _(
+            "• Projetos novos: {}\n"
+            "• Projetos atualizados: {}\n"
+            "• Parágrafos novos: {}, alterados: {}, removidos: {}").format(
+                summary['projects_added'], summary['projects_updated'],
+                summary['paragraphs_added'], summary['paragraphs_updated'], summary['paragraphs_deleted'])
+        if preview.conflicts:
+            names = sorted({c['project_name'] or '' for c in preview.conflicts})
+            text += "\n" + _("• Conflitos (mantida a versão mais recente): {} em {}").format(
+                len(preview.conflicts), ", ".join(names[:3]) + ("…" if len(names) > 3 else ""))
+        return text
+
+    def _show_import_choice(self, backup_path: Path, preview):
         """Show confirmation dialog for import/merge"""
-        # ... (código de validação existente permanece igual) ...
-
         # Show confirmation with options
         dialog = Adw.MessageDialog.new(
             self,
@@ -1491,6 +1519,7 @@ class BackupManagerDialog(Adw.Window):
             _("Você selecionou um banco de dados externo. Escolha como deseja prosseguir:\n\n"
               "• Mesclar: Adiciona projetos novos e atualiza os existentes (Ideal para sincronizar PCs).\n"
               "• Substituir: Apaga tudo atual e coloca o backup no lugar.")
+            + self._format_merge_preview(preview)
         )
 
         dialog.add_response("cancel", _("Cancelar"))
@@ -1505,6 +1534,7 @@ class BackupManagerDialog(Adw.Window):
 
         dialog.connect('response', lambda d, r, path=backup_path: self._import_action_selected(d, r, path))
         dialog.present()
+        return False
 
     def _import_action_selected(self, dialog, response, backup_path):
         dialog.destroy()
@@ -1529,7 +1559,7 @@ class BackupManagerDialog(Adw.Window):
                 stats = self.project_manager.merge_database(str(backup_path))
                 GLib.idle_add(self._merge_finished, True, stats, loading_dialog)
             except Exception as e:
-                print(_("Erro na thread de merge: {}").format(e))
+                logger.warning(_("Erro na thread de merge: {}").format(e))
                 GLib.idle_add(self._merge_finished, False, str(e), loading_dialog)
 
         thread = threading.Thread(target=merge_thread, daemon=True)
@@ -1548,6 +1578,9 @@ class BackupManagerDialog(Adw.Window):
                         stats['projects_updated'],
                         stats['paragraphs_processed']
                     )
+            if stats['conflicts']:
+                msg += "\n" + _("• Conflitos resolvidos pela versão mais recente: {}").format(
+                    len(stats['conflicts']))
             
             success_dialog = Adw.MessageDialog.new(self, _("Sucesso"), msg)
             success_dialog.add_response("ok", _("OK"))
@@ -1592,7 +1625,7 @@ class BackupManagerDialog(Adw.Window):
                 success = self.project_manager.import_database(backup_path)
                 GLib.idle_add(self._import_finished, success, loading_dialog)
             except Exception as e:
-                print(_("Erro na thread de importação: {}").format(e))
+                logger.warning(_("Erro na thread de importação: {}").format(e))
                 GLib.idle_add(self._import_finished, False, loading_dialog)
 
         thread = threading.Thread(target=import_thread, daemon=True)
@@ -1654,7 +1687,7 @@ class BackupManagerDialog(Adw.Window):
                 if success:
                     self._refresh_backups()
             except Exception as e:
-                print(_("Erro ao excluir backup: {}").format(e))
+                logger.warning(_("Erro ao excluir backup: {}").format(e))
         dialog.destroy()
 
 
@@ -1934,7 +1967,7 @@ class ImageDialog(Adw.Window):
                 file_path = file.get_path()
                 self._load_image(file_path)
         except Exception as e:
-            print(_("Erro ao selecionar arquivo: {}").format(e))
+            logger.warning(_("Erro ao selecionar arquivo: {}").format(e))
 
     def _load_image(self, file_path: str):
         """Load and display the selected image"""
@@ -1976,7 +2009,7 @@ class ImageDialog(Adw.Window):
             self.insert_button.set_sensitive(True)
             
         except Exception as e:
-            print(_("Erro ao carregar imagem: {}").format(e))
+            logger.warning(_("Erro ao carregar imagem: {}").format(e))
             # Show error dialog
             error_dialog = Adw.MessageDialog.new(
                 self,
@@ -2026,12 +2059,14 @@ class ImageDialog(Adw.Window):
                 img_filename = dest_filename
                 img_path = str(dest_path)
                 img_original_size = self.original_size
+                img_hash = file_digest(dest_path)
             elif self.edit_mode:
                 # No new image - keep existing image
                 existing_metadata = self.edit_paragraph.get_image_metadata()
                 img_filename = existing_metadata.get('filename')
                 img_path = existing_metadata.get('path')
                 img_original_size = existing_metadata.get('original_size')
+                img_hash = existing_metadata.get('hash', '')
             else:
                 return
 
@@ -2059,7 +2094,8 @@ class ImageDialog(Adw.Window):
                 alignment=alignment,
                 caption=caption,
                 alt_text=alt_text,
-                width_percent=width_percent
+                width_percent=width_percent,
+                content_hash=img_hash
             )
 
             if self.edit_mode:
@@ -2080,9 +2116,7 @@ class ImageDialog(Adw.Window):
 
         except Exception as e:
             error_msg = _("Erro ao atualizar imagem") if self.edit_mode else _("Erro ao inserir imagem")
-            print(f"{error_msg}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("%s: %s", error_msg, e)
 
             error_dialog = Adw.MessageDialog.new(
                 self,
@@ -2145,9 +2179,7 @@ class ImageDialog(Adw.Window):
                 self.position_group.set_visible(True)
 
         except Exception as e:
-            print(_("Erro ao carregar imagem existente: {}").format(e))
-            import traceback
-            traceback.print_exc()
+            logger.exception(_("Erro ao carregar imagem existente: {}").format(e))
 
 class AiPdfDialog(Adw.Window):
     """Dialog for AI PDF Review"""
@@ -2250,7 +2282,7 @@ class AiPdfDialog(Adw.Window):
                 self.file_row.set_title(os.path.basename(self.selected_file_path))
                 self.run_btn.set_sensitive(True)
         except Exception as e:
-            print(f"Error selecting file: {e}")
+            logger.warning("Error selecting file: %s", e)
 
     def _on_run_clicked(self, btn):
         if self.selected_file_path:
@@ -2310,6 +2342,192 @@ class AiResultDialog(Adw.Window):
         scrolled.set_child(text_view)
 
 
+class StatisticsDialog(Adw.Window):
+    """Writing analytics of the open project, updated while it is edited"""
+    __gtype_name__ = 'TacStatisticsDialog'
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(**kwargs)
+        self.set_title(_("Estatísticas de Escrita"))
+        self.set_transient_for(parent)
+        self.set_default_size(520, 640)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self.set_content(box)
+        box.append(Adw.HeaderBar())
+
+        page = Adw.PreferencesPage()
+        page.set_vexpand(True)
+        box.append(page)
+
+        self._rows = {}
+
+        general_group = Adw.PreferencesGroup()
+        general_group.set_title(_("Geral"))
+        page.add(general_group)
+        for key, title in [
+            ('words', _("Palavras")),
+            ('sentences', _("Frases")),
+            ('average_sentence_length', _("Palavras por frase")),
+            ('long_sentences', _("Frases longas (mais de 30 palavras)")),
+            ('reading_time', _("Tempo de leitura")),
+        ]:
+            self._rows[key] = self._add_row(general_group, title)
+
+        readability_group = Adw.PreferencesGroup()
+        readability_group.set_title(_("Legibilidade"))
+        page.add(readability_group)
+        self._rows['reading_ease'] = self._add_row(readability_group, _("Índice de Flesch"))
+        self._rows['lexical_density'] = self._add_row(readability_group, _("Densidade lexical"))
+
+        sections_group = Adw.PreferencesGroup()
+        sections_group.set_title(_("Equilíbrio das Seções"))
+        sections_group.set_description(_("Parcela das palavras em cada tipo de parágrafo TAC"))
+        page.add(sections_group)
+        self._section_bars = {}
+        for key, title in [
+            ('introduction', _("Introdução")),
+            ('argument', _("Argumento")),
+            ('argument_resumption', _("Retomada do Argumento")),
+            ('quote', _("Citação")),
+            ('epigraph', _("Epígrafe")),
+            ('conclusion', _("Conclusão")),
+        ]:
+            row = self._add_row(sections_group, title)
+            level_bar = Gtk.LevelBar()
+            level_bar.set_min_value(0)
+            level_bar.set_max_value(1)
+            level_bar.set_size_request(140, -1)
+            level_bar.set_valign(Gtk.Align.CENTER)
+            row.add_suffix(level_bar)
+            self._rows[key] = row
+            self._section_bars[key] = level_bar
+
+    def _add_row(self, group, title):
+        row = Adw.ActionRow()
+        row.set_title(title)
+        row.set_subtitle("…")
+        group.add(row)
+        return row
+
+    def update(self, result: Dict[str, Any]) -> None:
+        """Show an analytics result"""
+        self._rows['words'].set_subtitle(str(result['words']))
+        self._rows['sentences'].set_subtitle(str(result['sentences']))
+        self._rows['average_sentence_length'].set_subtitle(
+            _("{:.1f} (maior: {})").format(result['average_sentence_length'], result['longest_sentence']))
+        self._rows['long_sentences'].set_subtitle(str(result['long_sentences']))
+        self._rows['reading_time'].set_subtitle(TextHelper.format_reading_time(result['words']))
+
+        ease = result['reading_ease']
+        if ease >= 75:
+            level = _("fácil")
+        elif ease >= 50:
+            level = _("médio")
+        elif ease >= 25:
+            level = _("difícil")
+        else:
+            level = _("muito difícil")
+        self._rows['reading_ease'].set_subtitle("{:.0f} — {}".format(ease, level))
+        self._rows['lexical_density'].set_subtitle("{:.0%}".format(result['lexical_density']))
+
+        for key, level_bar in self._section_bars.items():
+            share = result['section_balance'].get(key, 0.0)
+            level_bar.set_value(share)
+            self._rows[key].set_subtitle(_("{} palavras ({:.0%})").format(result['section_words'].get(key, 0), share))
+
+
+class RepetitionDialog(Adw.Window):
+    """Repeated words and near-duplicate paragraphs found by the local index"""
+    __gtype_name__ = 'TacRepetitionDialog'
+
+    __gsignals__ = {
+        # paragraph_id, start offset, length of the text to select
+        'paragraph-activated': (GObject.SIGNAL_RUN_FIRST, None, (str, int, int)),
+        'scope-changed': (GObject.SIGNAL_RUN_FIRST, None, (bool,)),
+    }
+
+    # Rows listed per group
+    MAX_ROWS = 200
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(**kwargs)
+        self.set_title(_("Repetições e Duplicatas"))
+        self.set_transient_for(parent)
+        self.set_default_size(560, 680)
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self.set_content(box)
+        box.append(Adw.HeaderBar())
+
+        page = Adw.PreferencesPage()
+        page.set_vexpand(True)
+        box.append(page)
+
+        scope_group = Adw.PreferencesGroup()
+        page.add(scope_group)
+        scope_row = Adw.ActionRow()
+        scope_row.set_title(_("Comparar com toda a biblioteca"))
+        scope_row.set_subtitle(_("Procura parágrafos semelhantes também nos outros projetos"))
+        self.library_switch = Gtk.Switch()
+        self.library_switch.set_valign(Gtk.Align.CENTER)
+        self.library_switch.connect('notify::active', self._on_scope_toggled)
+        scope_row.add_suffix(self.library_switch)
+        scope_row.set_activatable_widget(self.library_switch)
+        scope_group.add(scope_row)
+
+        self.words_group = Adw.PreferencesGroup()
+        self.words_group.set_title(_("Palavras Repetidas"))
+        self.words_group.set_description(_("Palavras usadas de novo em um trecho curto do mesmo parágrafo"))
+        page.add(self.words_group)
+
+        self.duplicates_group = Adw.PreferencesGroup()
+        self.duplicates_group.set_title(_("Parágrafos Semelhantes"))
+        page.add(self.duplicates_group)
+
+        self._rows = []
+
+    @property
+    def include_library(self) -> bool:
+        return self.library_switch.get_active()
+
+    def _on_scope_toggled(self, switch, pspec):
+        self.emit('scope-changed', switch.get_active())
+
+    def show_report(self, report: Dict[str, Any]) -> None:
+        """Replace the listed results"""
+        for group, row in self._rows:
+            group.remove(row)
+        self._rows = []
+
+        for position, paragraph_id, words in report['repetitions'][:self.MAX_ROWS]:
+            summary = ", ".join(f"{word} ×{len(spans)}" for word, spans in words[:6])
+            start, end = words[0][1][0]
+            self._add_row(self.words_group, _("Parágrafo {}").format(position + 1),
+                          summary, paragraph_id, start, end - start)
+        if not report['repetitions']:
+            self._add_row(self.words_group, _("Nenhuma repetição encontrada"))
+
+        for position, paragraph_id, other_label, similarity in report['duplicates'][:self.MAX_ROWS]:
+            self._add_row(self.duplicates_group,
+                          _("Parágrafo {} ≈ {}").format(position + 1, other_label),
+                          _("{:.0%} semelhantes").format(similarity), paragraph_id, 0, 0)
+        if not report['duplicates']:
+            self._add_row(self.duplicates_group, _("Nenhum parágrafo semelhante encontrado"))
+
+    def _add_row(self, group, title, subtitle=None, paragraph_id=None, start=0, length=0):
+        row = Adw.ActionRow()
+        row.set_title(GLib.markup_escape_text(title))
+        if subtitle:
+            row.set_subtitle(GLib.markup_escape_text(subtitle))
+        if paragraph_id:
+            row.set_activatable(True)
+            row.add_suffix(Gtk.Image.new_from_icon_name('go-next-symbolic'))
+            row.connect('activated', lambda _row: self.emit('paragraph-activated', paragraph_id, start, length))
+        group.add(row)
+        self._rows.append((group, row))
+
+
 class CloudSyncDialog(Adw.Window):
     """Dialog for Dropbox Cloud Synchronization"""
 
@@ -2329,6 +2547,7 @@ class CloudSyncDialog(Adw.Window):
         
         # Estado inicial
         self.is_connected = False
+        self.is_syncing = False
         
         self._create_ui()
         self._check_existing_connection()
@@ -2428,6 +2647,33 @@ class CloudSyncDialog(Adw.Window):
         
         sync_group.add(self.sync_row)
 
+        # Local folder or NAS share instead of Dropbox
+        self.folder_row = Adw.ActionRow()
+        self.folder_row.set_title(_("Sincronizar com uma pasta"))
+
+        choose_folder_button = Gtk.Button.new_from_icon_name("folder-open-symbolic")
+        choose_folder_button.set_tooltip_text(_("Escolher pasta local ou de rede"))
+        choose_folder_button.set_valign(Gtk.Align.CENTER)
+        choose_folder_button.add_css_class("flat")
+        choose_folder_button.connect("clicked", self._on_choose_folder_clicked)
+        self.folder_row.add_suffix(choose_folder_button)
+
+        self.clear_folder_button = Gtk.Button.new_from_icon_name("edit-clear-symbolic")
+        self.clear_folder_button.set_tooltip_text(_("Voltar a usar o Dropbox"))
+        self.clear_folder_button.set_valign(Gtk.Align.CENTER)
+        self.clear_folder_button.add_css_class("flat")
+        self.clear_folder_button.connect("clicked", self._on_clear_folder_clicked)
+        self.folder_row.add_suffix(self.clear_folder_button)
+
+        sync_group.add(self.folder_row)
+
+        auto_sync_row = Adw.SwitchRow()
+        auto_sync_row.set_title(_("Sincronizar automaticamente"))
+        auto_sync_row.set_subtitle(_("Ao abrir, após salvar e periodicamente."))
+        auto_sync_row.set_active(self.config.get('auto_sync', True))
+        auto_sync_row.connect("notify::active", self._on_auto_sync_toggled)
+        sync_group.add(auto_sync_row)
+
         # Big Sync Button
         self.sync_button = Gtk.Button(label=_("Sincronizar Agora"))
         self.sync_button.set_icon_name("tac-emblem-synchronizing-symbolic")
@@ -2455,7 +2701,7 @@ class CloudSyncDialog(Adw.Window):
             toast = Adw.Toast.new(message)
             self.toast_overlay.add_toast(toast)
         else:
-            print(f"Toast (fallback): {message}")
+            logger.debug("Toast (fallback): %s", message)
 
     def _check_existing_connection(self):
         """Verifica se já existe um token salvo na config"""
@@ -2465,6 +2711,52 @@ class CloudSyncDialog(Adw.Window):
             self.is_connected = True
             self._update_ui_state(connected=True)
             self.sync_row.set_subtitle(_("Pronto para sincronizar."))
+        self._update_folder_state()
+
+    def _uses_folder(self) -> bool:
+        """True if sync goes to a local folder instead of Dropbox"""
+        return self.config.get('sync_backend') == 'folder' and bool(self.config.get('sync_folder'))
+
+    def _update_folder_state(self):
+        """Reflect the chosen sync folder in the UI"""
+        if self._uses_folder():
+            self.folder_row.set_subtitle(self.config.get('sync_folder'))
+            self.clear_folder_button.set_visible(True)
+            self.sync_row.set_title(_("Estado: Sincronizando com pasta"))
+            self.status_icon.set_from_icon_name("tac-emblem-ok-symbolic")
+            self.status_icon.add_css_class("success")
+            self.sync_button.set_sensitive(True)
+            self.sync_button.add_css_class("suggested-action")
+        else:
+            self.folder_row.set_subtitle(_("Nenhuma pasta escolhida; usa o Dropbox."))
+            self.clear_folder_button.set_visible(False)
+            self._update_ui_state(self.is_connected)
+
+    def _on_choose_folder_clicked(self, btn):
+        """Pick the folder to sync with"""
+        file_chooser = Gtk.FileChooserNative.new(
+            _("Escolher Pasta de Sincronização"),
+            self,
+            Gtk.FileChooserAction.SELECT_FOLDER,
+            _("Selecionar"),
+            _("Cancelar")
+        )
+        file_chooser.connect('response', self._on_folder_selected)
+        file_chooser.show()
+
+    def _on_folder_selected(self, dialog, response):
+        if response == Gtk.ResponseType.ACCEPT:
+            folder = dialog.get_file()
+            if folder and folder.get_path():
+                self.config.set('sync_backend', 'folder')
+                self.config.set('sync_folder', folder.get_path())
+                self.config.save()
+                self._update_folder_state()
+
+    def _on_clear_folder_clicked(self, btn):
+        self.config.set('sync_backend', 'dropbox')
+        self.config.save()
+        self._update_folder_state()
 
     def _update_ui_state(self, connected: bool):
         """Atualiza a UI baseada no estado de conexão"""
@@ -2511,7 +2803,8 @@ class CloudSyncDialog(Adw.Window):
              return
 
         try:
-            
+            from dropbox import DropboxOAuth2FlowNoRedirect
+
             self.auth_flow = DropboxOAuth2FlowNoRedirect(
                 DROPBOX_APP_KEY,
                 use_pkce=True,
@@ -2532,7 +2825,7 @@ class CloudSyncDialog(Adw.Window):
 
         except Exception as e:
             self._show_toast(_("Erro ao iniciar autenticação: {}").format(str(e)))
-            print(f"Dropbox Auth Error: {e}")
+            logger.warning("Dropbox Auth Error: %s", e)
 
     def _on_connect_clicked(self, btn):
         """Valida o código colado e obtém os tokens"""
@@ -2563,7 +2856,7 @@ class CloudSyncDialog(Adw.Window):
             GLib.idle_add(self._on_auth_success, btn, refresh_token)
             
         except Exception as e:
-            print(f"Auth Finish Error: {e}")
+            logger.warning("Auth Finish Error: %s", e)
             GLib.idle_add(self._on_auth_failure, btn, str(e))
 
     def _on_auth_success(self, btn, refresh_token):
@@ -2576,6 +2869,7 @@ class CloudSyncDialog(Adw.Window):
         
         self.is_connected = True
         self._update_ui_state(connected=True)
+        self._update_folder_state()
         self._show_toast(_("Conectado com sucesso!"))
         
         self.auth_flow = None
@@ -2593,119 +2887,61 @@ class CloudSyncDialog(Adw.Window):
         
         self.is_connected = False
         self._update_ui_state(connected=False)
+        self._update_folder_state()
         self._show_toast(_("Conta desconectada."))
 
     def _on_sync_now_clicked(self, btn):
         """Lógica de Sincronização"""
-        if not self.is_connected:
-            return
-
-        refresh_token = self.config.get('dropbox_refresh_token')
-        if not refresh_token:
-            self._show_toast(_("Erro: Credenciais não encontradas."))
+        if self.is_syncing:
+            # The button cancels while a sync runs
+            self.parent_window.sync_scheduler.cancel()
+            btn.set_sensitive(False)
             return
 
-        btn.set_sensitive(False)
-        btn.set_label(_("Sincronizando..."))
-        self.sync_row.set_subtitle(_("Sincronização em andamento..."))
-        
-        # Initiate sync thread
-        threading.Thread(target=self._perform_sync, args=(refresh_token, btn), daemon=True).start()
-
+        if not self._uses_folder():
+            if not self.is_connected:
+                return
 
-    def _perform_sync(self, refresh_token, btn):
-        """
-        Execute sync
-        Download -> Merge -> Upload
-        """
-        if not DROPBOX_AVAILABLE:
-            return
+            if not self.config.get('dropbox_refresh_token'):
+                self._show_toast(_("Erro: Credenciais não encontradas."))
+                return
 
-        try:
-            dbx = dropbox.Dropbox(oauth2_refresh_token=refresh_token, app_key=DROPBOX_APP_KEY)
-            
-            local_db_path = self.config.database_path
-            remote_path = "/tac_writer.db"
-            temp_db_path = local_db_path.with_suffix('.temp_sync.db')
-            
-            sync_msg = ""
-            stats = None
+        self.is_syncing = True
+        btn.set_label(_("Cancelar Sincronização"))
+        self.sync_row.set_subtitle(_("Sincronização em andamento..."))
 
-            # 1. Try to download remote file
-            remote_exists = False
-            try:
-                # Download to temp. file
-                dbx.files_download_to_file(str(temp_db_path), remote_path)
-                remote_exists = True
-                print("Download do Dropbox concluído.")
-            except ApiError as e:
-                # If "file not found", proceed to initial upload
-                if e.error.is_path() and e.error.get_path().is_not_found():
-                    print("Arquivo não encontrado no Dropbox. Iniciando primeiro upload.")
-                    remote_exists = False
-                else:
-                    raise e
-
-            # 2. Execute Merge (if something was downloaded)
-            if remote_exists:
-                # Use ProjectManager to access merge logic
-                stats = self.parent_window.project_manager.merge_database(str(temp_db_path))
-                
-                # Remove temporary file
-                if temp_db_path.exists():
-                    os.remove(temp_db_path)
-                
-                if stats['projects_added'] > 0 or stats['projects_updated'] > 0:
-                    sync_msg = _("Sincronizado: +{} novos, {} atualizados.").format(
-                        stats['projects_added'], stats['projects_updated']
-                    )
-                else:
-                    sync_msg = _("Sincronização concluída (sem alterações remotas).")
-            else:
-                sync_msg = _("Primeiro upload para a nuvem realizado.")
-
-            # 3. Upload from local (Overwrite)
-            with open(local_db_path, "rb") as f:
-                dbx.files_upload(
-                    f.read(), 
-                    remote_path, 
-                    mode=WriteMode('overwrite')
-                )
-            print("Upload para o Dropbox concluído.")
+        # Runs through the window's scheduler, so it never overlaps a background sync
+        self.parent_window.sync_scheduler.sync_now(
+            lambda result, error: self._on_sync_finished(btn, result, error),
+            progress=self.sync_row.set_subtitle
+        )
 
-            # Finalize with sucess
-            GLib.idle_add(self._on_sync_finished, btn, True, sync_msg)
-            
-        except Exception as e:
-            print(f"Erro de Sync: {e}")
-            
-            try:
-                temp_path = self.config.database_path.with_suffix('.temp_sync.db')
-                if temp_path.exists():
-                    os.remove(temp_path)
-            except:
-                pass
-                
-            GLib.idle_add(self._on_sync_finished, btn, False, str(e))
+    def _on_auto_sync_toggled(self, switch_row, pspec):
+        self.config.set('auto_sync', switch_row.get_active())
+        self.config.save()
+        if switch_row.get_active():
+            self.parent_window.sync_scheduler.notify_saved()
+        else:
+            self.parent_window.sync_scheduler.stop()
 
-    def _on_sync_finished(self, btn, success, message):
+    def _on_sync_finished(self, btn, result, error):
         """Callback de finalização do sync"""
+        self.is_syncing = False
         btn.set_sensitive(True)
         btn.set_label(_("Sincronizar Agora"))
-        
-        if success:
+
+        if isinstance(error, SyncCancelled):
+            self.sync_row.set_subtitle(_("Sincronização cancelada"))
+        elif error is None and result is not None:
             timestamp = datetime.now().strftime("%d/%m %H:%M")
             self.sync_row.set_subtitle(_("Última sincronização: {}").format(timestamp))
-            self._show_toast(message)
-            
-            # Reload project list in main window
-            if hasattr(self.parent_window, 'project_list'):
-                self.parent_window.project_list.refresh_projects()
-                
-            
+            self._show_toast(format_sync_result(result))
+        elif error is None:
+            self.sync_row.set_subtitle(_("Erro na última sincronização"))
+            self._show_toast(_("Biblioteca 'dropbox' não instalada."))
         else:
             self.sync_row.set_subtitle(_("Erro na última sincronização"))
-            self._show_toast(_("Erro: {}").format(message))
+            self._show_toast(_("Erro: {}").format(error))
 
 class ReferencesDialog(Adw.Window):
     """Dialog for managing bibliographic references"""
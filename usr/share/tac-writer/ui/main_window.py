@@ -7,8 +7,14 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
+from collections import OrderedDict, deque
+from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Optional
+import logging
 import re
+import threading
+import time
 
 from gi.repository import Gtk, Adw, Gio, GLib, Gdk
 
@@ -16,11 +22,46 @@ from core.models import Project, ParagraphType
 from core.services import ProjectManager, ExportService
 from core.config import Config
 from core.ai_assistant import WritingAiAssistant
+from core.analytics import AnalyticsEngine
+from core.repetition import RepetitionIndex
+from core.history import (
+    ProjectHistory, InsertParagraphOp, RemoveParagraphOp, MoveParagraphOp, ReplaceParagraphOp,
+    ContentChangeOp, CompositeOp
+)
+from core.merger import rebase_edits
+from core.search import SearchIndex, SearchOptions
+from core.session import SessionSnapshot
+from core.thumbnails import ThumbnailCache
+from core.assets import image_path
 from utils.helpers import FormatHelper
 from utils.i18n import _
-from .components import WelcomeView, ParagraphEditor, ProjectListWidget, SpellCheckHelper, PomodoroTimer, FirstRunTour, ReorderableParagraphRow
-from .dialogs import NewProjectDialog, ExportDialog, PreferencesDialog, AboutDialog, WelcomeDialog, BackupManagerDialog, ImageDialog, CloudSyncDialog, ReferencesDialog
+from utils.tracing import span, traced
+from .update_scheduler import UpdateScheduler
+from .sync_scheduler import SyncScheduler
+from .spell_service import get_spell_service
+from .components import (
+    WelcomeView, ParagraphEditor, ProjectListWidget, PomodoroTimer, FirstRunTour,
+    ReorderableParagraphRow, ParagraphItem, ParagraphEditorPool
+)
+from .dialogs import NewProjectDialog, ExportDialog, PreferencesDialog, AboutDialog, WelcomeDialog, BackupManagerDialog, ImageDialog, CloudSyncDialog, ReferencesDialog, StatisticsDialog, RepetitionDialog
 
+logger = logging.getLogger(__name__)
+
+# Thumbnails are generated at twice the 200 px preview height for HiDPI screens
+THUMBNAIL_HEIGHT = 400
+
+# Time spent adding loaded paragraphs to the list per main loop iteration
+# (about half a 60 Hz frame), and the initial/minimum estimate of the cost
+# of adding one paragraph used to size each chunk
+LOAD_FRAME_BUDGET_S = 0.008
+LOAD_ITEM_COST_GUESS = 0.0005
+LOAD_ITEM_COST_MIN = 0.00002
+
+# Projects whose scroll position is remembered
+MAX_SCROLL_POSITIONS = 50
+
+# Seconds the window waits on close for a cancelled sync run to stop
+SYNC_ABORT_TIMEOUT = 5.0
 
 
 class MainWindow(Adw.ApplicationWindow):
@@ -37,11 +78,26 @@ class MainWindow(Adw.ApplicationWindow):
         # Store references
         self.project_manager = project_manager
         self.config = config
-        self.export_service = ExportService()
+        self.export_service = ExportService(config.data_dir)
         self.current_project: Project = None
 
-        # Shared spell check helper
-        self.spell_helper = SpellCheckHelper(config) if config else None
+        # Structural undo/redo history for the open project
+        self.history = ProjectHistory(config.get('undo_history_budget_kb', 2048) * 1024)
+
+        # What was on screen at the last close, shown before the database is read
+        self.session = SessionSnapshot(config.cache_dir)
+        self._session_snapshot = self.session.load() if config.get('restore_session', True) else None
+        self._restoring_session = False
+        # Snapshot paragraphs by id (editable while the project loads) and when they were shown
+        self._snapshot_paragraphs: Dict[str, object] = {}
+        self._restored_at = datetime.now()
+
+        # Image previews: disk thumbnails plus a bounded texture cache
+        self.thumbnails = ThumbnailCache(config.cache_dir)
+        self._thumbnail_textures: OrderedDict = OrderedDict()
+
+        # Shared spell check service
+        self.spell_service = get_spell_service(config)
 
         # Pomodoro Timer
         self.pomodoro_dialog = None
@@ -54,17 +110,67 @@ class MainWindow(Adw.ApplicationWindow):
         # Search state
         self.search_entry: Optional[Gtk.SearchEntry] = None
         self.search_next_button: Optional[Gtk.Button] = None
+        self.replace_entry: Optional[Gtk.Entry] = None
         self.search_query: str = ""
+        self.search_options = SearchOptions()
+        self.search_index = SearchIndex()
+        self._search_matches = []
+        self._search_matches_by_id: Dict[str, list] = {}
         self._search_state = {'paragraph_index': -1, 'offset': -1}
 
-        # Scroll and loading state
-        self._is_loading_paragraphs = False
-        self._pending_scroll_to_bottom = False
-        self._preserved_scroll_position = None
+        # Virtualized paragraph list state
+        self.paragraph_store: Optional[Gio.ListStore] = None
+        self.paragraph_list_view: Optional[Gtk.ListView] = None
+        self._paragraph_items: Dict[str, ParagraphItem] = {}
+        self._bound_rows: Dict[str, ReorderableParagraphRow] = {}
+        self._pending_highlight = None
+
+        # Progressive project loading: the project being streamed in by the
+        # loader thread, its paragraph slots (None until decoded) and the
+        # decoded batches waiting to be added to the list
+        self._load_generation = 0
+        self._loading_project = None
+        self._loading_slots: Optional[list] = None
+        self._loading_remaining = 0
+        self._loaded_batches = deque()
+        self._load_drain_id = None
+        self._load_item_cost = LOAD_ITEM_COST_GUESS
+
+        # Released paragraph editors, rebound instead of rebuilt (also across projects)
+        self.editor_pool = ParagraphEditorPool(self._new_paragraph_editor)
 
         # Auto-save timer tracking
         self.auto_save_timeout_id = None
         self.auto_save_pending = False
+        self._auto_save_deadline = 0
+
+        # When the current project last matched the database, and its paragraphs then
+        self._saved_at = datetime.now()
+        self._saved_paragraph_ids: List[str] = []
+        # Saves held back while a sync run writes the database
+        self._save_after_sync = False
+        self._deferred_saves: Dict[str, tuple] = {}
+
+        # Coalesced repaints of the statistics shown in header and sidebar
+        self.update_scheduler = UpdateScheduler(self, config.get('ui_update_interval_ms', 0))
+        self.update_scheduler.register('header', self._repaint_header_stats)
+        self.update_scheduler.register('sidebar', self._repaint_sidebar_stats)
+        self.update_scheduler.register('analytics', self._submit_analytics)
+        self._stats_cache = None
+
+        # Writing analytics, computed on a worker while the statistics dialog is open
+        self.analytics = AnalyticsEngine(config.get_spell_check_language() or 'pt_BR')
+        self.statistics_dialog = None
+
+        # Local repetition / near-duplicate index, fed on a worker thread
+        self.update_scheduler.register('repetitions', self._refresh_repetitions)
+        self.repetition_index = RepetitionIndex()
+        self.repetition_dialog = None
+        self._repetition_thread = None
+        self._repetition_rerun = None
+
+        # Background cloud sync, reported on the header cloud button
+        self.sync_scheduler = SyncScheduler(self, self._on_sync_status, self._on_sync_finished)
 
         # UI components
         self.header_bar = None
@@ -80,6 +186,10 @@ class MainWindow(Adw.ApplicationWindow):
         self._setup_actions()
         self._setup_keyboard_shortcuts()
         self._restore_window_state()
+        if self._session_snapshot:
+            self._restore_session(self._session_snapshot)
+
+        self.sync_scheduler.start()
 
         # Show welcome dialog if enabled
         GLib.timeout_add(500, self._maybe_show_welcome_dialog)
@@ -223,10 +333,49 @@ class MainWindow(Adw.ApplicationWindow):
         self.search_next_button.connect("clicked", self._on_search_next_clicked)
         search_box.append(self.search_next_button)
 
+        search_options_button = Gtk.MenuButton()
+        search_options_button.set_icon_name('tac-preferences-system-symbolic')
+        search_options_button.set_tooltip_text(_("Opções de pesquisa e substituição"))
+        search_options_button.add_css_class("flat")
+        search_options_button.set_popover(self._create_search_options_popover())
+        search_box.append(search_options_button)
+
         self.header_bar.pack_end(search_box)
 
         
 
+    def _create_search_options_popover(self) -> Gtk.Popover:
+        """Popover with the search modes and replace-all"""
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_margin_top(12)
+        box.set_margin_bottom(12)
+        box.set_margin_start(12)
+        box.set_margin_end(12)
+
+        for label, option in ((_("Diferenciar maiúsculas"), 'case_sensitive'),
+                              (_("Ignorar acentos"), 'accent_insensitive'),
+                              (_("Palavra inteira"), 'whole_word'),
+                              (_("Expressão regular"), 'regex')):
+            check = Gtk.CheckButton(label=label)
+            check.set_active(getattr(self.search_options, option))
+            check.connect('toggled', self._on_search_option_toggled, option)
+            box.append(check)
+
+        box.append(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL))
+
+        self.replace_entry = Gtk.Entry()
+        self.replace_entry.set_placeholder_text(_("Substituir por..."))
+        self.replace_entry.connect('activate', self._on_replace_all_clicked)
+        box.append(self.replace_entry)
+
+        replace_button = Gtk.Button(label=_("Substituir tudo"))
+        replace_button.connect('clicked', self._on_replace_all_clicked)
+        box.append(replace_button)
+
+        popover = Gtk.Popover()
+        popover.set_child(box)
+        return popover
+
     def _setup_menu(self, menu_button):
         """Setup the main menu"""
         menu_model = Gio.Menu()
@@ -235,6 +384,8 @@ class MainWindow(Adw.ApplicationWindow):
         file_section = Gio.Menu()
         file_section.append(_("Exportar Projeto..."), "app.export_project")
         file_section.append(_("Gerenciador de Backups..."), "win.backup_manager")
+        file_section.append(_("Estatísticas de Escrita..."), "win.statistics")
+        file_section.append(_("Repetições e Duplicatas..."), "win.repetitions")
         menu_model.append_section(None, file_section)
 
         # Edit section
@@ -252,6 +403,7 @@ class MainWindow(Adw.ApplicationWindow):
         help_section = Gio.Menu()
         help_section.append(_("Guia de Boas-vindas"), "win.show_welcome")
         help_section.append(_("Revisão de texto por IA"), "app.ai_assistant")
+        help_section.append(_("Rastreamento de desempenho"), "app.dump_trace")
         help_section.append(_("Sobre o TAC"), "app.about")
         menu_model.append_section(None, help_section)
 
@@ -291,7 +443,8 @@ class MainWindow(Adw.ApplicationWindow):
         sidebar_box.append(sidebar_header)
 
         # Project list
-        self.project_list = ProjectListWidget(self.project_manager)
+        snapshot_projects = self._session_snapshot.get('projects') if self._session_snapshot else None
+        self.project_list = ProjectListWidget(self.project_manager, snapshot_projects)
         self.project_list.connect('project-selected', self._on_project_selected)
         sidebar_box.append(self.project_list)
 
@@ -308,6 +461,8 @@ class MainWindow(Adw.ApplicationWindow):
             ('undo', self._action_undo),
             ('redo', self._action_redo),
             ('backup_manager', self._action_backup_manager),
+            ('statistics', self._action_statistics),
+            ('repetitions', self._action_repetitions),
             ('new_project', self._action_new_project, 's'),
         ]
 
@@ -357,22 +512,33 @@ class MainWindow(Adw.ApplicationWindow):
         self.main_stack.set_visible_child_name("welcome")
         self._update_header_for_view("welcome")
 
-    def _show_editor_view(self):
-        """Show the editor view"""
-        if not self.current_project:
+    def _show_editor_view(self, scroll_index: int = 0):
+        """Show the editor view (of the current project or the one loading)"""
+        project = self.current_project or self._loading_project
+        if not project:
             return
 
-        # Remove existing editor view if any
         editor_page = self.main_stack.get_child_by_name("editor")
-        if editor_page:
-            self.main_stack.remove(editor_page)
+        if not editor_page:
+            # Create editor view only if it doesn't exist
+            self.editor_view = self._create_editor_view()
+            self.main_stack.add_named(self.editor_view, "editor")
+        else:
+            # Reuse the list view: its rows and the pooled editors are
+            # rebound to the paragraphs of the new project
+            self.editor_view = editor_page
+            self._refresh_paragraphs()
+            self._update_add_paragraph_menu(project)
+
+        n_items = self.paragraph_store.get_n_items()
+        if n_items > 0:
+            self.paragraph_list_view.scroll_to(min(scroll_index, n_items - 1), Gtk.ListScrollFlags.NONE, None)
 
-        # Create new editor view
-        self.editor_view = self._create_editor_view()
-        self.main_stack.add_named(self.editor_view, "editor")
         self.main_stack.set_visible_child_name("editor")
         self._update_header_for_view("editor")
+        self.search_index.clear()
         self._reset_search_state()
+        self._run_search()
 
     def _create_editor_view(self) -> Gtk.Widget:
         """Create the editor view for current project"""
@@ -387,15 +553,25 @@ class MainWindow(Adw.ApplicationWindow):
         self.editor_scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         self.editor_scrolled.set_vexpand(True)
 
-        # Paragraphs container
-        self.paragraphs_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        self.paragraphs_box.set_spacing(12)
-        self.paragraphs_box.set_margin_start(20)
-        self.paragraphs_box.set_margin_end(20)
-        self.paragraphs_box.set_margin_top(20)
-        self.paragraphs_box.set_margin_bottom(20)
+        # Paragraphs list: only visible rows own live editor widgets
+        self.paragraph_store = Gio.ListStore(item_type=ParagraphItem)
+        self._paragraph_items = {}
+        self._bound_rows = {}
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect('setup', self._on_paragraph_row_setup)
+        factory.connect('bind', self._on_paragraph_row_bind)
+        factory.connect('unbind', self._on_paragraph_row_unbind)
 
-        self.editor_scrolled.set_child(self.paragraphs_box)
+        self.paragraph_list_view = Gtk.ListView(
+            model=Gtk.NoSelection(model=self.paragraph_store),
+            factory=factory
+        )
+        self.paragraph_list_view.add_css_class("paragraph-list")
+        self.paragraph_list_view.set_margin_top(14)
+        self.paragraph_list_view.set_margin_bottom(14)
+
+        self.editor_scrolled.set_child(self.paragraph_list_view)
         editor_box.append(self.editor_scrolled)
 
         # Add existing paragraphs
@@ -429,8 +605,21 @@ class MainWindow(Adw.ApplicationWindow):
         self.add_button.set_label(_("Adicionar Parágrafo"))
         self.add_button.set_icon_name('tac-list-add-symbolic')
         self.add_button.add_css_class("suggested-action")
+        self._update_add_paragraph_menu(self.current_project or self._loading_project)
+        toolbar_box.append(self.add_button)
+        
+        # Add image button
+        image_button = Gtk.Button()
+        image_button.set_label(_("Inserir Imagem"))
+        image_button.set_icon_name('insert-image-symbolic')
+        image_button.set_tooltip_text(_("Inserir Imagem (Ctrl+Alt+I)"))
+        image_button.set_action_name('win.insert_image')
+        toolbar_box.append(image_button)
 
-        # Create menu model
+        return toolbar_box
+
+    def _update_add_paragraph_menu(self, project) -> None:
+        """Offer the paragraph types available for the project type"""
         menu_model = Gio.Menu()
         paragraph_types = [
             (_("Título 1"), ParagraphType.TITLE_1),
@@ -444,28 +633,17 @@ class MainWindow(Adw.ApplicationWindow):
         ]
 
         # Add LaTex condition
-        if self.current_project and self.current_project.metadata.get('type') == 'latex':
+        if project and project.metadata.get('type') == 'latex':
             paragraph_types.append((_("Equação LaTeX"), ParagraphType.LATEX))
 
         # Add Code condition (IT Essay)
-        if self.current_project and self.current_project.metadata.get('type') == 'it_essay':
+        if project and project.metadata.get('type') == 'it_essay':
             paragraph_types.append((_("Bloco de Código"), ParagraphType.CODE))
             
         for label, ptype in paragraph_types:
             menu_model.append(label, f"win.add_paragraph('{ptype.value}')")
 
         self.add_button.set_menu_model(menu_model)
-        toolbar_box.append(self.add_button)
-        
-        # Add image button
-        image_button = Gtk.Button()
-        image_button.set_label(_("Inserir Imagem"))
-        image_button.set_icon_name('insert-image-symbolic')
-        image_button.set_tooltip_text(_("Inserir Imagem (Ctrl+Alt+I)"))
-        image_button.set_action_name('win.insert_image')
-        toolbar_box.append(image_button)
-
-        return toolbar_box
     
     def _create_navigation_buttons(self) -> Gtk.Widget:
         """Create floating navigation buttons for quick scrolling"""
@@ -500,152 +678,137 @@ class MainWindow(Adw.ApplicationWindow):
 
     def _on_scroll_to_top(self, button):
         """Scroll to the top of the project"""
-        if hasattr(self, 'editor_scrolled'):
-            adjustment = self.editor_scrolled.get_vadjustment()
-            adjustment.set_value(adjustment.get_lower())
+        if self.paragraph_store and self.paragraph_store.get_n_items() > 0:
+            self.paragraph_list_view.scroll_to(0, Gtk.ListScrollFlags.NONE, None)
 
     def _on_scroll_to_bottom(self, button):
         """Scroll to the bottom of the project"""
-        # If loading, scroll after
-        if self._is_loading_paragraphs:
-            self._pending_scroll_to_bottom = True
-            # Optional: Show a quick warning or change the cursor
-            self._show_toast(_("Carregando restante do documento..."), Adw.ToastPriority.LOW)
-            
-            # Force scroll to current point immediately too
-            if hasattr(self, 'editor_scrolled'):
-                adjustment = self.editor_scrolled.get_vadjustment()
-                adjustment.set_value(adjustment.get_upper())
-            return
+        if self.paragraph_store and self.paragraph_store.get_n_items() > 0:
+            last_index = self.paragraph_store.get_n_items() - 1
+            self.paragraph_list_view.scroll_to(last_index, Gtk.ListScrollFlags.NONE, None)
 
-        # Default behavior if everything has already loaded
-        if hasattr(self, 'editor_scrolled'):
-            adjustment = self.editor_scrolled.get_vadjustment()
-            adjustment.set_value(adjustment.get_upper() - adjustment.get_page_size())
+    @traced('MainWindow._refresh_paragraphs', 'render')
+    def _refresh_paragraphs(self, stale_ids=()):
+        """
+        Sync the paragraph list model with the current project.
 
-    def _refresh_paragraphs(self):
-        """Refresh paragraphs display with optimized loading"""
-        if not self.current_project:
+        Items are keyed by paragraph id and reused when the paragraph object
+        is unchanged, so only the changed range of the model is spliced and
+        rebound. Paragraph ids in stale_ids are always rebound. While a
+        project is loading, paragraphs not decoded yet get placeholder items.
+        """
+        if self.paragraph_store is None:
+            return
+        if self.current_project:
+            paragraphs = self.current_project.paragraphs
+        elif self._loading_slots is not None:
+            paragraphs = self._loading_slots
+        else:
             return
-    
-        # Save scroll position before any changes
-        if hasattr(self, 'editor_scrolled') and self.editor_scrolled:
-            vadj = self.editor_scrolled.get_vadjustment()
-            # Só salvamos se não estivermos já no topo (0)
-            if vadj.get_value() > 0:
-                self._preserved_scroll_position = vadj.get_value()
-            else:
-                self._preserved_scroll_position = None
-
-        # Cleans up old widgets that are no longer in the project
-        existing_widgets = {}
-        child = self.paragraphs_box.get_first_child()
-        while child:
-            if hasattr(child, 'paragraph') and hasattr(child.paragraph, 'id'):
-                existing_widgets[child.paragraph.id] = child
-            child = child.get_next_sibling()
-
-        current_paragraph_ids = {p.id for p in self.current_project.paragraphs}
-    
-        for paragraph_id, widget in list(existing_widgets.items()):
-            if paragraph_id not in current_paragraph_ids:
-                self.paragraphs_box.remove(widget)
-                del existing_widgets[paragraph_id]
-    
-        # Removes all from view to reorder/reinsert correctly
-        child = self.paragraphs_box.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            self.paragraphs_box.remove(child)
-            child = next_child
-    
-        self._paragraphs_to_add = list(self.current_project.paragraphs)
-        self._existing_widgets = existing_widgets
-        
-        # Reset control flags
-        self._is_loading_paragraphs = True
-        self._pending_scroll_to_bottom = False
 
-        # Start batch processing
-        GLib.idle_add(self._process_paragraph_batch)
+        old_items = [self.paragraph_store.get_item(i) for i in range(self.paragraph_store.get_n_items())]
 
-    def _process_paragraph_batch(self):
-        """Process a batch of paragraphs for asynchronous loading"""
-        # PERFORMANCE SETUP
-        BATCH_SIZE = 10 
-        
-        count = 0
-        while self._paragraphs_to_add and count < BATCH_SIZE:
-            paragraph = self._paragraphs_to_add.pop(0)
-            
-            # Widget creation/reuse logic
-            row_widget = None
-            if paragraph.id in self._existing_widgets:
-                row_widget = self._existing_widgets[paragraph.id]
-            else:
-                editor_widget = None 
-
-                # Use 'editor_widget' instead of 'widget
-                if paragraph.type == ParagraphType.IMAGE:
-                    editor_widget = self._create_image_widget(paragraph)
-                    # Ensures image widget has paragraph reference
-                    if not hasattr(editor_widget, 'paragraph'):
-                        editor_widget.paragraph = paragraph
+        new_items = []
+        items_by_id = {}
+        for index, paragraph in enumerate(paragraphs):
+            if paragraph is None:
+                if index < len(old_items) and old_items[index].paragraph is None:
+                    new_items.append(old_items[index])
                 else:
-                    editor_widget = ParagraphEditor(paragraph, config=self.config)
-                    editor_widget.connect('content-changed', self._on_paragraph_changed)
-                    editor_widget.connect('remove-requested', self._on_paragraph_remove_requested)
-
-                # Now editor_widget is no longer None
-                from ui.components import ReorderableParagraphRow 
-                row_widget = ReorderableParagraphRow(editor_widget)
-
-                # Connect Row Signal 
-                row_widget.connect('paragraph-reorder', self._on_paragraph_reorder)
-                
-                self._existing_widgets[paragraph.id] = row_widget
-            
-            self.paragraphs_box.append(row_widget)
-            count += 1
-
-        # TERMINATION CHECK
-        if not self._paragraphs_to_add:
-            self._is_loading_paragraphs = False
-            
-            # FIX: Restore scrolling ONLY when everything is loaded
-            if self._preserved_scroll_position is not None:
-                GLib.idle_add(self._restore_scroll_position, priority=GLib.PRIORITY_LOW)
-            
-            elif self._pending_scroll_to_bottom:
-                GLib.idle_add(self._execute_pending_scroll)
-                self._pending_scroll_to_bottom = False
-                
-            return False
-
-        return True
-
-    def _restore_scroll_position(self):
-        """Helper to restore scroll position after refresh"""
-        if hasattr(self, 'editor_scrolled') and self._preserved_scroll_position is not None:
-            adj = self.editor_scrolled.get_vadjustment()
-            adj.set_value(self._preserved_scroll_position)
-            
-            # Clears the preserved position to avoid unwanted future jumps
-            self._preserved_scroll_position = None
-        return False
+                    new_items.append(ParagraphItem(None))
+                continue
+            item = self._paragraph_items.get(paragraph.id)
+            if item is None or item.paragraph is not paragraph or paragraph.id in stale_ids:
+                item = ParagraphItem(paragraph)
+            new_items.append(item)
+            items_by_id[paragraph.id] = item
+        self._paragraph_items = items_by_id
+
+        # Only splice the range between the common prefix and suffix
+        prefix = 0
+        limit = min(len(old_items), len(new_items))
+        while prefix < limit and old_items[prefix] is new_items[prefix]:
+            prefix += 1
+
+        suffix = 0
+        while (suffix < limit - prefix and
+               old_items[len(old_items) - 1 - suffix] is new_items[len(new_items) - 1 - suffix]):
+            suffix += 1
+
+        removed = len(old_items) - prefix - suffix
+        added = new_items[prefix:len(new_items) - suffix]
+        if removed or added:
+            self.paragraph_store.splice(prefix, removed, added)
+
+    def _create_paragraph_widget(self, paragraph):
+        """Get the editor widget shown for a paragraph"""
+        if paragraph.type == ParagraphType.IMAGE:
+            editor_widget = self._create_image_widget(paragraph)
+            # Ensures image widget has paragraph reference
+            if not hasattr(editor_widget, 'paragraph'):
+                editor_widget.paragraph = paragraph
+        else:
+            editor_widget = self.editor_pool.acquire(paragraph)
+        return editor_widget
+
+    def _new_paragraph_editor(self, paragraph):
+        """Build a paragraph editor (when the pool has none to recycle)"""
+        editor_widget = ParagraphEditor(paragraph, config=self.config)
+        editor_widget.connect('content-changed', self._on_paragraph_changed)
+        editor_widget.connect('remove-requested', self._on_paragraph_remove_requested)
+        editor_widget.connect('history-operation', self._on_paragraph_history_operation)
+        return editor_widget
+
+    def _on_paragraph_row_setup(self, factory, list_item):
+        """Create an empty, recyclable paragraph row"""
+        row_widget = ReorderableParagraphRow()
+        row_widget.set_margin_start(20)
+        row_widget.set_margin_end(20)
+        row_widget.set_margin_top(6)
+        row_widget.set_margin_bottom(6)
+        row_widget.connect('paragraph-reorder', self._on_paragraph_reorder)
 
-    def _execute_pending_scroll(self):
-        """Helper to execute the final scroll after loading is complete"""
-        if hasattr(self, 'editor_scrolled'):
-            adjustment = self.editor_scrolled.get_vadjustment()
-            adjustment.set_value(adjustment.get_upper() - adjustment.get_page_size())
-        return False    
+        list_item.set_activatable(False)
+        list_item.set_selectable(False)
+        list_item.set_child(row_widget)
+
+    def _on_paragraph_row_bind(self, factory, list_item):
+        """Attach an editor for the paragraph that scrolled into view"""
+        paragraph = list_item.get_item().paragraph
+        row_widget = list_item.get_child()
+        if paragraph is None:
+            # Not decoded yet: replaced by the real item once it arrives
+            row_widget.show_placeholder()
+            return
+        with span('paragraph.bind', 'render', type=paragraph.type.value):
+            row_widget.set_editor(self._create_paragraph_widget(paragraph))
+        self._bound_rows[paragraph.id] = row_widget
+
+        if paragraph.id in self._search_matches_by_id:
+            self._apply_search_highlights(row_widget)
+
+        if self._pending_highlight and self._pending_highlight[0] == paragraph.id:
+            GLib.idle_add(self._apply_pending_highlight)
+
+    def _on_paragraph_row_unbind(self, factory, list_item):
+        """Release the editor of a row that scrolled out of view"""
+        row_widget = list_item.get_child()
+        if row_widget.paragraph and self._bound_rows.get(row_widget.paragraph.id) is row_widget:
+            del self._bound_rows[row_widget.paragraph.id]
+        editor = row_widget.clear_editor()
+        if isinstance(editor, ParagraphEditor):
+            self.editor_pool.recycle(editor)
+
+    def _get_paragraph_index(self, paragraph_id: str) -> int:
+        """Position of a paragraph in the current project, or -1"""
+        if self.current_project:
+            for index, paragraph in enumerate(self.current_project.paragraphs):
+                if paragraph.id == paragraph_id:
+                    return index
+        return -1
 
-    
     def _create_image_widget(self, paragraph):
         """Create widget to display an image paragraph"""
-        from pathlib import Path
-        
         metadata = paragraph.get_image_metadata()
         
         # Container principal
@@ -672,42 +835,22 @@ class MainWindow(Adw.ApplicationWindow):
         else:
             image_container.set_halign(Gtk.Align.START)
         
-        img_path_str = metadata.get('path', '')
         img_filename = metadata.get('filename', 'desconhecido.jpg')
-        img_path = Path(img_path_str)
+        # Inserted on another computer: look in this computer's images folder
+        img_path = image_path(self.config.data_dir, self.current_project.id, metadata)
 
         # Display image logic
         if img_path.exists():
             # If image exist
             try:
-                texture = Gdk.Texture.new_from_filename(str(img_path))
-                
-                picture = Gtk.Picture()
-                picture.set_paintable(texture)
-                picture.set_can_shrink(True)
-                picture.set_content_fit(Gtk.ContentFit.CONTAIN)
-                
-                # Size
-                original_size = metadata.get('original_size', (800, 600))
-                if original_size[1] > 0:
-                    aspect_ratio = original_size[0] / original_size[1]
-                else:
-                    aspect_ratio = 1.33
-                
-                thumbnail_height = 200
-                thumbnail_width = int(thumbnail_height * aspect_ratio)
-                picture.set_size_request(thumbnail_width, thumbnail_height)
-                
-                frame = Gtk.Frame()
-                frame.set_child(picture)
-                image_container.append(frame)
-                
+                image_container.append(self._create_picture_frame(metadata, img_path, img_filename))
             except Exception as e:
                 # Error load file
                 self._create_error_placeholder(image_container, img_filename, str(e))
         else:
             # File not found (Sync from other computer)
-            self._create_missing_placeholder(image_container, img_filename)
+            placeholder = self._create_missing_placeholder(image_container, img_filename)
+            self._fetch_missing_image(image_container, placeholder, metadata, img_filename)
 
         # Subtitles, if it exist
         caption = metadata.get('caption', '')
@@ -726,6 +869,107 @@ class MainWindow(Adw.ApplicationWindow):
         
         return image_container
 
+    def _create_picture_frame(self, metadata, img_path, img_filename):
+        """Framed thumbnail of an image file"""
+        picture = Gtk.Picture()
+        picture.set_can_shrink(True)
+        picture.set_content_fit(Gtk.ContentFit.CONTAIN)
+
+        # Size
+        original_size = metadata.get('original_size', (800, 600))
+        if original_size[1] > 0:
+            aspect_ratio = original_size[0] / original_size[1]
+        else:
+            aspect_ratio = 1.33
+
+        thumbnail_height = 200
+        thumbnail_width = int(thumbnail_height * aspect_ratio)
+        picture.set_size_request(thumbnail_width, thumbnail_height)
+
+        frame = Gtk.Frame()
+        frame.set_child(picture)
+
+        # Decoded off the main thread; a spinner shows until it is ready
+        self._load_thumbnail(frame, picture, img_path, img_filename)
+        return frame
+
+    def _fetch_missing_image(self, container, placeholder, metadata, filename):
+        """Download a synced image in the background and swap it in for the placeholder"""
+        project_id = self.current_project.id
+
+        def on_fetched(path, error):
+            if placeholder.get_parent() is not container:
+                return  # Row was rebuilt or recycled meanwhile
+            if not path:
+                placeholder.hint.set_label(
+                    _("Clique em editar abaixo para selecionar o arquivo localmente.")
+                )
+                return
+            try:
+                frame = self._create_picture_frame(metadata, Path(path), filename)
+            except Exception as e:
+                logger.warning("Error showing synced image %s: %s", filename, e)
+                return
+            container.insert_child_after(frame, placeholder)
+            container.remove(placeholder)
+
+        if self.sync_scheduler.fetch_image(project_id, metadata, on_fetched):
+            placeholder.hint.set_label(_("Baixando imagem sincronizada..."))
+
+    def _load_thumbnail(self, frame, picture, img_path, filename):
+        """Show the cached thumbnail of an image, generating it in the background"""
+        thumbnail = self.thumbnails.lookup(img_path, THUMBNAIL_HEIGHT)
+        if thumbnail:
+            picture.set_paintable(self._get_thumbnail_texture(thumbnail))
+            return
+
+        spinner = Gtk.Spinner()
+        spinner.set_halign(Gtk.Align.CENTER)
+        spinner.set_valign(Gtk.Align.CENTER)
+        spinner.start()
+        overlay = Gtk.Overlay()
+        frame.set_child(overlay)
+        overlay.set_child(picture)
+        overlay.add_overlay(spinner)
+
+        def on_ready(thumb_path, error):
+            GLib.idle_add(self._on_thumbnail_ready, frame, picture, thumb_path, error, filename)
+
+        self.thumbnails.request(img_path, THUMBNAIL_HEIGHT, on_ready)
+
+    def _on_thumbnail_ready(self, frame, picture, thumb_path, error, filename):
+        """Main-loop callback once a thumbnail has been generated"""
+        overlay = frame.get_child()
+        if error or not thumb_path:
+            label = Gtk.Label(label=_("⚠️ Erro ao carregar: {}\n{}").format(filename, error))
+            label.add_css_class('error')
+            frame.set_child(label)
+            return False
+
+        try:
+            picture.set_paintable(self._get_thumbnail_texture(thumb_path))
+        except Exception as e:
+            logger.warning("Error loading thumbnail %s: %s", thumb_path, e)
+        if isinstance(overlay, Gtk.Overlay):
+            overlay.set_child(None)
+            frame.set_child(picture)
+        return False
+
+    def _get_thumbnail_texture(self, thumb_path: Path) -> Gdk.Texture:
+        """Texture of a thumbnail file, kept in a small LRU"""
+        key = str(thumb_path)
+        texture = self._thumbnail_textures.get(key)
+        if texture is not None:
+            self._thumbnail_textures.move_to_end(key)
+            return texture
+
+        texture = Gdk.Texture.new_from_filename(key)
+        self._thumbnail_textures[key] = texture
+        limit = self.config.get('thumbnail_texture_cache_size', 64)
+        while len(self._thumbnail_textures) > limit:
+            self._thumbnail_textures.popitem(last=False)
+        return texture
+
     def _create_missing_placeholder(self, container, filename):
         """Creates a UI element when image is missing"""
         frame = Gtk.Frame()
@@ -758,9 +1002,11 @@ class MainWindow(Adw.ApplicationWindow):
         hint.set_wrap(True)
         hint.set_max_width_chars(40)
         box.append(hint)
+        frame.hint = hint
         
         frame.set_child(box)
         container.append(frame)
+        return frame
 
     def _create_error_placeholder(self, container, filename, error_msg):
         """Creates a UI element when image fails to load"""
@@ -814,19 +1060,21 @@ class MainWindow(Adw.ApplicationWindow):
             if response == "remove":
                 try:
                     # Remove from project
+                    position = self.current_project.paragraphs.index(paragraph)
                     self.current_project.paragraphs.remove(paragraph)
                     self.current_project.update_paragraph_order()
+                    self.history.record(RemoveParagraphOp(paragraph, position))
                     
                     # Save
-                    self.project_manager.save_project(self.current_project)
+                    self._save_project_now()
                     
                     # Refresh UI
                     self._refresh_paragraphs()
-                    self._update_header_for_view("editor")
+                    self._queue_stats_refresh()
                     
                     self._show_toast(_("Imagem removida"))
                 except Exception as e:
-                    print(f"Error removing image: {e}")
+                    logger.warning("Error removing image: %s", e)
                     self._show_toast(_("Erro ao remover imagem"), Adw.ToastPriority.HIGH)
             d.destroy()
         
@@ -844,7 +1092,7 @@ class MainWindow(Adw.ApplicationWindow):
         try:
             para_index = self.current_project.paragraphs.index(paragraph)
         except ValueError:
-            print("Error: Paragraph not found in project")
+            logger.warning("Error: Paragraph not found in project")
             return
 
         # Open ImageDialog in edit mode
@@ -872,22 +1120,21 @@ class MainWindow(Adw.ApplicationWindow):
 
             # Update order
             updated_paragraph.order = original_paragraph.order
+            self.history.record(ReplaceParagraphOp(original_paragraph, updated_paragraph, index))
 
             # Save project
-            self.project_manager.save_project(self.current_project)
+            self._save_project_now()
 
             # Refresh UI
             self._refresh_paragraphs()
-            self._update_header_for_view("editor")
+            self._queue_stats_refresh()
 
             self._show_toast(_("Imagem atualizada"))
         except (ValueError, Exception) as e:
-            print(f"Error updating image: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error updating image: %s", e)
             self._show_toast(_("Erro ao atualizar imagem"), Adw.ToastPriority.HIGH)
 
-    def _get_focused_text_view(self):
+    def _get_focused_text_view(self, fallback: bool = True):
         """Get the currently focused TextView widget"""
         focus_widget = self.get_focus()
         
@@ -897,12 +1144,12 @@ class MainWindow(Adw.ApplicationWindow):
                 return current_widget
             current_widget = current_widget.get_parent()
         
-        if hasattr(self, 'paragraphs_box'):
-            child = self.paragraphs_box.get_first_child()
-            while child:
-                if hasattr(child, 'text_view') and isinstance(child.text_view, Gtk.TextView):
-                    return child.text_view
-                child = child.get_next_sibling()
+        if fallback and self.current_project:
+            for paragraph in self.current_project.paragraphs:
+                row_widget = self._bound_rows.get(paragraph.id)
+                editor = row_widget.editor if row_widget else None
+                if isinstance(getattr(editor, 'text_view', None), Gtk.TextView):
+                    return editor.text_view
         
         return None
 
@@ -921,44 +1168,65 @@ class MainWindow(Adw.ApplicationWindow):
 
     def _action_undo(self, action, param):
         """Handle global undo action"""
-        focused_text_view = self._get_focused_text_view()
+        # Text edits belong to the focused buffer, structural edits to the project history
+        focused_text_view = self._get_focused_text_view(fallback=False)
         if focused_text_view:
             buffer = focused_text_view.get_buffer()
-            if buffer and hasattr(buffer, 'get_can_undo'):
-                if buffer.get_can_undo():
-                    buffer.undo()
-                    self._show_toast(_("Desfazer"))
-                    return
-            
-            # Fallback: Try Ctrl+Z key simulation
-            try:
-                focused_text_view.emit('key-pressed', Gdk.KEY_z, Gdk.ModifierType.CONTROL_MASK, 0)
+            if buffer and buffer.get_can_undo():
+                buffer.undo()
+                self._show_toast(_("Desfazer"))
                 return
-            except:
-                pass
-        
+
+        operation = self._apply_history_step(redo=False)
+        if operation:
+            self._show_toast(_("Desfeito: {}").format(operation.label))
+            return
+
         self._show_toast(_("Nada para desfazer"))
 
     def _action_redo(self, action, param):
         """Handle global redo action"""
-        focused_text_view = self._get_focused_text_view()
+        focused_text_view = self._get_focused_text_view(fallback=False)
         if focused_text_view:
             buffer = focused_text_view.get_buffer()
-            if buffer and hasattr(buffer, 'get_can_redo'):
-                if buffer.get_can_redo():
-                    buffer.redo()
-                    self._show_toast(_("Refazer"))
-                    return
-            
-            # Fallback: Try Ctrl+Shift+Z key simulation
-            try:
-                focused_text_view.emit('key-pressed', Gdk.KEY_z, Gdk.ModifierType.CONTROL_MASK | Gdk.ModifierType.SHIFT_MASK, 0)
+            if buffer and buffer.get_can_redo():
+                buffer.redo()
+                self._show_toast(_("Refazer"))
                 return
-            except:
-                pass
-        
+
+        operation = self._apply_history_step(redo=True)
+        if operation:
+            self._show_toast(_("Refeito: {}").format(operation.label))
+            return
+
         self._show_toast(_("Nada para refazer"))
 
+    def _apply_history_step(self, redo: bool):
+        """Undo or redo one structural operation and refresh the editor"""
+        if not self.current_project:
+            return None
+
+        # Operations capture paragraph content, so it must be up to date
+        self.flush_paragraph_editors()
+
+        if redo:
+            operation = self.history.redo(self.current_project)
+        else:
+            operation = self.history.undo(self.current_project)
+        if not operation:
+            return None
+
+        # Rebind rows of the touched paragraphs so their editors are rebuilt
+        self._refresh_paragraphs(stale_ids=set(operation.affected_ids()))
+        self._queue_stats_refresh()
+        self._schedule_auto_save()
+        return operation
+
+    def _on_paragraph_history_operation(self, paragraph_editor, operation):
+        """Record an operation performed inside a paragraph editor"""
+        if self.current_project:
+            self.history.record(operation)
+
     # Event handlers
     def _on_create_project_from_welcome(self, widget, template_name):
         """Handle create project from welcome view"""
@@ -976,10 +1244,8 @@ class MainWindow(Adw.ApplicationWindow):
         """Handle paragraph content changes"""
         if self.current_project:
             self.current_project._update_modified_time()
-            self._update_header_for_view("editor")
-            # Update sidebar project list in real-time with current statistics
-            current_stats = self.current_project.get_statistics()
-            self.project_list.update_project_statistics(self.current_project.id, current_stats)
+            # Header and sidebar statistics are repainted once per frame
+            self._queue_stats_refresh()
             
             # Schedule auto-save if enabled
             self._schedule_auto_save()
@@ -987,18 +1253,21 @@ class MainWindow(Adw.ApplicationWindow):
     def _on_paragraph_remove_requested(self, paragraph_editor, paragraph_id):
         """Handle paragraph removal request"""
         if self.current_project:
+            self.flush_paragraph_editors()
+            paragraph = self.current_project.get_paragraph(paragraph_id)
+            if paragraph:
+                position = self.current_project.paragraphs.index(paragraph)
+                self.history.record(RemoveParagraphOp(paragraph, position))
             self.current_project.remove_paragraph(paragraph_id)
             self._refresh_paragraphs()
-            self._update_header_for_view("editor")
-            # Update sidebar project list in real-time with current statistics
-            current_stats = self.current_project.get_statistics()
-            self.project_list.update_project_statistics(self.current_project.id, current_stats)
+            self._queue_stats_refresh()
 
     def _on_paragraph_reorder(self, paragraph_editor, dragged_id, target_id, position):
         """
-        Handle paragraph reordering manually manipulating the widgets.
-        This prevents destroying the widgets during a Drop operation, 
-        fixing the Gdk-WARNING runtime check failure.
+        Handle paragraph reordering.
+        The list model is only updated after the drop completes, which prevents
+        destroying the dragged row during a Drop operation (Gdk-WARNING
+        runtime check failure).
         """
         if not self.current_project:
             return
@@ -1023,38 +1292,45 @@ class MainWindow(Adw.ApplicationWindow):
 
         # Move no backend
         self.current_project.move_paragraph(dragged_id, new_idx)
-        
-        # 2. Update the Interface
-        dragged_widget = self._existing_widgets.get(dragged_id)
-        target_widget = self._existing_widgets.get(target_id)
-        
-        if dragged_widget and target_widget:
-                        
-            sibling_to_insert_after = None
-            
-            if position == "after":
-                sibling_to_insert_after = target_widget
-            else:
-                sibling_to_insert_after = target_widget.get_prev_sibling()
+        if new_idx != current_idx:
+            self.history.record(MoveParagraphOp(dragged_id, current_idx, new_idx))
 
-            if sibling_to_insert_after != dragged_widget:
-                self.paragraphs_box.reorder_child_after(dragged_widget, sibling_to_insert_after)
+        # 2. Update the Interface once the drop has finished, so the dragged
+        # row is not unbound while GTK is still delivering the drop
+        GLib.idle_add(self._finish_paragraph_reorder)
 
-            # Atualiza cabeçalho (contador de palavras, etc)
-            self._update_header_for_view("editor")
-        else:
-            # Fallback if something goes wrong
-            self._refresh_paragraphs()
+    def _finish_paragraph_reorder(self):
+        """Apply a finished reorder to the paragraph list model"""
+        self._refresh_paragraphs()
+        # Atualiza cabeçalho (contador de palavras, etc)
+        self._queue_stats_refresh()
+        return False
 
     def _on_close_request(self, window):
         """Handle window close request"""
+        # Store edits still waiting in the editors (may schedule an auto-save)
+        self.flush_paragraph_editors()
+        self._remember_scroll_position()
+        self._save_session_snapshot()
+
         # Cancel any pending auto-save timer
         if self.auto_save_timeout_id is not None:
             GLib.source_remove(self.auto_save_timeout_id)
             self.auto_save_timeout_id = None
-        
+        self.sync_scheduler.stop()
+        interrupted = self.sync_scheduler.abort(SYNC_ABORT_TIMEOUT)
+        self._save_restored_edits()
+        self._cancel_project_load()
+
         # If there's a pending auto-save, perform final save now
-        if self.auto_save_pending and self.current_project:
+        unsaved = self.auto_save_pending or self._save_after_sync
+        if interrupted:
+            # The run may have merged into the database: keep both sides' edits
+            for project, saved_at, base_ids in self._deferred_saves.values():
+                self._save_over_sync(project, saved_at, base_ids)
+            if unsaved and self.current_project:
+                self._save_over_sync(self.current_project, self._saved_at, self._saved_paragraph_ids)
+        elif unsaved and self.current_project:
             self.project_manager.save_project(self.current_project)
         
         # Save window state
@@ -1129,6 +1405,125 @@ class MainWindow(Adw.ApplicationWindow):
         """Handle backup manager action"""
         self.show_backup_manager_dialog()
 
+    def _action_statistics(self, action, param):
+        """Show the writing statistics of the current project"""
+        if not self.current_project:
+            self._show_toast(_("Nenhum projeto aberto"), Adw.ToastPriority.HIGH)
+            return
+
+        if self.statistics_dialog is None:
+            self.statistics_dialog = StatisticsDialog(self)
+            self.statistics_dialog.connect('close-request', self._on_statistics_dialog_closed)
+        self.statistics_dialog.present()
+
+        self.flush_paragraph_editors()
+        self._submit_analytics()
+
+    def _on_statistics_dialog_closed(self, dialog):
+        self.statistics_dialog = None
+        return False
+
+    def _submit_analytics(self):
+        """Scheduler callback: analyze the changed paragraphs in the background"""
+        if self.current_project and self.statistics_dialog is not None:
+            self.analytics.submit(
+                self.current_project,
+                lambda result: GLib.idle_add(self._on_analytics_result, result)
+            )
+
+    def _action_repetitions(self, action, param):
+        """Show repeated words and near-duplicate paragraphs of the current project"""
+        if not self.current_project:
+            self._show_toast(_("Nenhum projeto aberto"), Adw.ToastPriority.HIGH)
+            return
+
+        if self.repetition_dialog is None:
+            self.repetition_dialog = RepetitionDialog(self)
+            self.repetition_dialog.connect('close-request', self._on_repetition_dialog_closed)
+            self.repetition_dialog.connect('paragraph-activated', self._on_repetition_paragraph_activated)
+            self.repetition_dialog.connect('scope-changed', lambda dialog, library: self._refresh_repetitions(True))
+        self.repetition_dialog.present()
+
+        self.flush_paragraph_editors()
+        self._refresh_repetitions(rescan_library=True)
+
+    def _on_repetition_dialog_closed(self, dialog):
+        self.repetition_dialog = None
+        return False
+
+    def _on_repetition_paragraph_activated(self, dialog, paragraph_id, start, length):
+        self._highlight_search_result(paragraph_id, start, length)
+
+    def _refresh_repetitions(self, rescan_library: bool = False):
+        """Re-index changed paragraphs on a worker thread and update the dialog"""
+        if not self.current_project or self.repetition_dialog is None:
+            return
+        if self._repetition_thread is not None and self._repetition_thread.is_alive():
+            # Run again with the latest content once the current pass is done
+            self._repetition_rerun = bool(self._repetition_rerun) or rescan_library
+            return
+
+        project = self.current_project
+        paragraphs = [(p.id, p.type, p.content or '') for p in project.paragraphs]
+        library = self.repetition_dialog.include_library
+        project_names = {entry['id']: entry['name'] for entry in self.project_list.get_project_entries()}
+
+        self._repetition_thread = threading.Thread(
+            target=self._repetition_worker,
+            args=(project.id, paragraphs, library, rescan_library, project_names),
+            name='repetitions', daemon=True
+        )
+        self._repetition_thread.start()
+
+    def _repetition_worker(self, project_id, paragraphs, library, rescan_library, project_names):
+        index = self.repetition_index
+        if not library:
+            index.retain_projects([project_id])
+        elif rescan_library:
+            texts = self.project_manager.list_paragraph_texts()
+            index.retain_projects(list(texts) + [project_id])
+            for other_id, rows in texts.items():
+                if other_id != project_id:
+                    index.sync(other_id, rows)
+        index.sync(project_id, paragraphs)
+
+        positions = {paragraph_id: position for position, (paragraph_id, _t, _c) in enumerate(paragraphs)}
+        repetitions = []
+        for position, (paragraph_id, _type, _content) in enumerate(paragraphs):
+            words = index.repetitions((project_id, paragraph_id))
+            if words:
+                words.sort(key=lambda repeated: len(repeated.spans), reverse=True)
+                repetitions.append((position, paragraph_id, [(w.word, w.spans) for w in words]))
+
+        duplicates = []
+        for first, second, similarity in index.duplicate_pairs(project_id):
+            if first[0] != project_id:
+                first, second = second, first
+            if second[0] == project_id:
+                other_label = _("Parágrafo {}").format(positions.get(second[1], -1) + 1)
+            else:
+                other_label = _("“{}”").format(project_names.get(second[0], _("outro projeto")))
+            duplicates.append((positions.get(first[1], -1), first[1], other_label, similarity))
+
+        GLib.idle_add(self._on_repetition_report, project_id,
+                      {'repetitions': repetitions, 'duplicates': duplicates})
+
+    def _on_repetition_report(self, project_id, report):
+        if (self.repetition_dialog is not None and self.current_project
+                and self.current_project.id == project_id):
+            self.repetition_dialog.show_report(report)
+
+        if self._repetition_rerun is not None:
+            rescan_library, self._repetition_rerun = self._repetition_rerun, None
+            self._refresh_repetitions(rescan_library)
+        return False
+
+    def _on_analytics_result(self, result):
+        if (self.statistics_dialog is not None and self.current_project
+                and result['project_id'] == self.current_project.id):
+            self.statistics_dialog.update(result)
+        return False
+
     # Public methods called by application
     def show_new_project_dialog(self, project_type="strandard"):
         """Show new project dialog"""
@@ -1167,7 +1562,9 @@ class MainWindow(Adw.ApplicationWindow):
                     file_path = file.get_path()
                     project = self.project_manager.load_project(file_path)
                     if project:
+                        self._cancel_project_load()
                         self.current_project = project
+                        self.history.clear()
                         self._show_editor_view()
                         self.project_list.refresh_projects()
                         self._show_toast(_("Projeto aberto: {}").format(project.name))
@@ -1178,16 +1575,32 @@ class MainWindow(Adw.ApplicationWindow):
         file_chooser.connect('response', on_response)
         file_chooser.show()
 
+    def flush_paragraph_editors(self) -> None:
+        """Store pending edits of all live paragraph editors in the project"""
+        for row_widget in list(self._bound_rows.values()):
+            editor = row_widget.editor
+            if hasattr(editor, 'flush_content'):
+                editor.flush_content()
+
     def save_current_project(self) -> bool:
         """Save the current project"""
         if not self.current_project:
             return False
 
+        self.flush_paragraph_editors()
+        if self.sync_scheduler.is_running():
+            # The sync may be merging into these rows: save once it ends
+            self._save_after_sync = True
+            self._show_toast(_("O projeto será salvo ao fim da sincronização"))
+            return True
+
         success = self.project_manager.save_project(self.current_project)
         if success:
+            self._mark_project_saved()
             self._show_toast(_("Projeto salvo com sucesso"))
             self.project_list.refresh_projects()
             self.config.add_recent_project(self.current_project.id)
+            self.sync_scheduler.notify_saved()
         else:
             self._show_toast(_("Falha ao salvar projeto"), Adw.ToastPriority.HIGH)
 
@@ -1199,20 +1612,24 @@ class MainWindow(Adw.ApplicationWindow):
         if not self.config.get('auto_save', True):
             return
         
-        # Cancel existing timeout if any
-        if self.auto_save_timeout_id is not None:
-            GLib.source_remove(self.auto_save_timeout_id)
-            self.auto_save_timeout_id = None
-        
         # Get auto-save interval (default 120 seconds = 2 minutes)
         interval_seconds = self.config.get('auto_save_interval', 120)
-        interval_ms = interval_seconds * 1000
         
         # Mark that auto-save is pending
         self.auto_save_pending = True
         
-        # Schedule new auto-save
-        self.auto_save_timeout_id = GLib.timeout_add(interval_ms, self._perform_auto_save)
+        # Push the deadline back; the running timer re-arms itself until it is reached
+        self._auto_save_deadline = GLib.get_monotonic_time() + interval_seconds * 1_000_000
+        if self.auto_save_timeout_id is None:
+            self.auto_save_timeout_id = GLib.timeout_add(interval_seconds * 1000, self._on_auto_save_timeout)
+
+    def _on_auto_save_timeout(self):
+        """Auto-save timer: save when the debounce deadline has passed"""
+        remaining_ms = (self._auto_save_deadline - GLib.get_monotonic_time()) // 1000
+        if remaining_ms > 0:
+            self.auto_save_timeout_id = GLib.timeout_add(remaining_ms, self._on_auto_save_timeout)
+            return False
+        return self._perform_auto_save()
 
     def _perform_auto_save(self):
         """Perform the actual auto-save operation"""
@@ -1224,28 +1641,81 @@ class MainWindow(Adw.ApplicationWindow):
         if not self.current_project:
             return False  # Don't repeat timeout
         
+        self.flush_paragraph_editors()
+        self.auto_save_pending = False
+
+        if self.sync_scheduler.is_running():
+            # The sync may be merging into these rows: save once it ends
+            self._save_after_sync = True
+            return False
+
         # Perform save (this will trigger backup creation)
         success = self.project_manager.save_project(self.current_project)
         
         if success:
+            self._mark_project_saved()
             # Silent save - no toast for auto-save to avoid interrupting user
             self.project_list.refresh_projects()
             self.config.add_recent_project(self.current_project.id)
             
             # Update header to show saved state (remove asterisk if you have one)
-            self._update_header_for_view("editor")
+            self.update_scheduler.mark_dirty('header')
+            self.sync_scheduler.notify_saved()
         else:
             # Only show toast on failure
             self._show_toast(_("Salvamento automático falhou"), Adw.ToastPriority.HIGH)
         
         return False  
 
+    def _save_project_now(self) -> bool:
+        """
+        Save the current project right away, without a toast (edits that
+        are written through at once: images, replace all). Held back like
+        the other saves while a sync run writes the database.
+        """
+        self.flush_paragraph_editors()
+        if self.sync_scheduler.is_running():
+            self._save_after_sync = True
+            return True
+
+        success = self.project_manager.save_project(self.current_project)
+        if success:
+            self._mark_project_saved()
+            self.sync_scheduler.notify_saved()
+        return success
+
+    def _mark_project_saved(self):
+        """The current project now matches the database"""
+        self._saved_at = datetime.now()
+        self._saved_paragraph_ids = [p.id for p in self.current_project.paragraphs] if self.current_project else []
+
+    def has_unsaved_changes(self) -> bool:
+        """Whether the current project was edited since it was last saved or loaded"""
+        if not self.current_project:
+            return False
+        self.flush_paragraph_editors()
+        if self._save_after_sync or self.current_project.modified_at > self._saved_at:
+            return True
+        return any(p.modified_at > self._saved_at for p in self.current_project.paragraphs)
+
+    def _save_over_sync(self, project, saved_at, base_ids):
+        """
+        Save a project whose rows a sync may have merged into since it was
+        saved at saved_at: its edits since then are rebased on the stored
+        version. Returns (success, saved project).
+        """
+        stored = self.project_manager.load_project(project.id)
+        if stored is not None:
+            project = rebase_edits(stored, project, saved_at, base_ids)
+        return self.project_manager.save_project(project), project
+
     def show_export_dialog(self):
         """Show export dialog"""
         if not self.current_project:
             self._show_toast(_("Nenhum projeto para exportar"), Adw.ToastPriority.HIGH)
             return
 
+        self.flush_paragraph_editors()
         dialog = ExportDialog(self, self.current_project, self.export_service)
         dialog.present()
 
@@ -1290,7 +1760,9 @@ class MainWindow(Adw.ApplicationWindow):
         self.project_list.refresh_projects()
         
         # Clear current project if one is open
+        self._cancel_project_load()
         self.current_project = None
+        self.history.clear()
         
         # Show welcome view
         self._show_welcome_view()
@@ -1298,15 +1770,285 @@ class MainWindow(Adw.ApplicationWindow):
         # Show success toast
         self._show_toast(_("Banco de dados importado com sucesso"), Adw.ToastPriority.HIGH)
 
+    @traced('MainWindow._load_project', 'project')
     def _load_project(self, project_id: str):
-        """Load a project by ID"""
+        """Load a project by ID, streaming its paragraphs from a worker thread"""
+        self.flush_paragraph_editors()
+        self._remember_scroll_position()
+        self._save_restored_edits()
+        self._cancel_project_load()
+
+        # Save the project being left before it is replaced
+        if self.auto_save_pending and self.current_project:
+            if self.auto_save_timeout_id is not None:
+                GLib.source_remove(self.auto_save_timeout_id)
+            self._perform_auto_save()
+        if self._save_after_sync and self.current_project:
+            # Held back by the sync run: saved over its result once it ends
+            self._deferred_saves[self.current_project.id] = (
+                self.current_project, self._saved_at, self._saved_paragraph_ids
+            )
+        self._save_after_sync = False
+
+        self.current_project = None
+        self._restoring_session = False
+        self.history.clear()
         self._show_loading_state()
 
+        self._start_project_load(project_id, self.config.get('project_scroll_positions', {}).get(project_id, 0))
+
+    def _start_project_load(self, project_id: str, scroll_index: int):
+        threading.Thread(
+            target=self._load_project_worker,
+            args=(project_id, scroll_index, self._load_generation),
+            name='project-loader', daemon=True
+        ).start()
+
+    def _restore_session(self, snapshot):
+        """Show the snapshot of the last session, then reload its project"""
+        self._session_snapshot = None
+        try:
+            project, slots = SessionSnapshot.restore(snapshot)
+            first_index = int(snapshot.get('first_index', 0))
+            scroll_offset = float(snapshot.get('scroll_offset', 0))
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning("Error restoring session snapshot: %s", e)
+            self.session.clear()
+            return
+
+        self._restoring_session = True
+        self._loading_project = project
+        self._loading_slots = slots
+        self._loading_remaining = len(slots)
+        self._snapshot_paragraphs = {p.id: p for p in slots if p is not None}
+        self._restored_at = datetime.now()
+
+        # The snapshot rows are editable right away: paragraphs edited
+        # before the database copy arrives are kept in its place
+        self._show_editor_view(first_index)
+        if scroll_offset > 0:
+            GLib.idle_add(self._apply_scroll_offset, scroll_offset, priority=GLib.PRIORITY_LOW)
+
+        self.project_list.refresh_projects_async()
+        self._start_project_load(project.id, first_index)
+
+    def _restored_edits(self) -> list:
+        """Snapshot paragraphs edited while the restored project was loading"""
+        return [p for p in self._snapshot_paragraphs.values() if p.modified_at > self._restored_at]
+
+    def _save_restored_edits(self):
+        """Store edits to the snapshot rows when their project load is abandoned"""
+        if not self._restoring_session or self._loading_project is None:
+            return
+        self.flush_paragraph_editors()
+        edited = self._restored_edits()
+        self._snapshot_paragraphs = {}
+        if not edited:
+            return
+
+        project = self._loading_project
+        project.paragraphs = edited
+        if self.sync_scheduler.is_running():
+            # Saved over the result of the run once it ends
+            self._deferred_saves[project.id] = (project, self._restored_at, [p.id for p in edited])
+            return
+        stored = self.project_manager.load_project(project.id)
+        if stored is not None:
+            self.project_manager.save_project(
+                rebase_edits(stored, project, self._restored_at, [p.id for p in edited])
+            )
+
+    def _apply_scroll_offset(self, offset: float):
+        """Scroll past the part of the first visible row that was hidden"""
+        adjustment = self.editor_scrolled.get_vadjustment()
+        adjustment.set_value(adjustment.get_value() + offset)
+        return False
+
+    def _save_session_snapshot(self):
+        """Store what is on screen for the next launch"""
+        if not self.config.get('restore_session', True):
+            return
+        if self.current_project:
+            first_index, scroll_offset = self._first_visible_paragraph()
+            self.session.save(self.current_project, first_index, scroll_offset,
+                              self.project_list.get_project_entries())
+        elif self._loading_project is None:
+            self.session.clear()
+
+    def _load_project_worker(self, project_id: str, scroll_index: int, generation: int):
+        """Decode the project off the main thread and hand each step to the main loop"""
+        found = False
         try:
-            project = self.project_manager.load_project(project_id)
-            self._on_project_loaded(project, None)
+            with span('ProjectManager.iter_project_load', 'io', project=project_id):
+                for event in self.project_manager.iter_project_load(project_id, scroll_index):
+                    if generation != self._load_generation:
+                        # Another project was opened meanwhile
+                        return
+                    found = True
+                    GLib.idle_add(self._on_project_load_event, generation, scroll_index, event)
         except Exception as e:
-            self._on_project_loaded(None, str(e))
+            GLib.idle_add(self._on_project_load_failed, generation, str(e))
+            return
+
+        if not found:
+            GLib.idle_add(self._on_project_load_failed, generation, None)
+
+    def _on_project_load_event(self, generation: int, scroll_index: int, event):
+        """Main loop side of the loader: show the project, then queue its paragraphs"""
+        if generation != self._load_generation:
+            return False
+
+        if event[0] == 'project':
+            _kind, project, count = event
+            if self._restoring_session and self._loading_project is not None:
+                # Keep the snapshot rows on screen until the stored
+                # paragraphs replace them
+                shown = self._loading_slots
+                self._loading_project = project
+                self._loading_slots = (shown + [None] * count)[:count]
+                self._loading_remaining = count
+                self._refresh_paragraphs()
+                self._update_add_paragraph_menu(project)
+                self._update_header_for_view("editor")
+                if count == 0:
+                    self._finish_project_load()
+                return False
+
+            self._loading_project = project
+            self._loading_slots = [None] * count
+            self._loading_remaining = count
+
+            # The list is shown at once, with placeholders around the saved
+            # position; it stays read-only until every paragraph is loaded
+            self._show_editor_view(scroll_index)
+            self.paragraph_list_view.set_sensitive(False)
+            if count == 0:
+                self._finish_project_load()
+        else:
+            _kind, start, paragraphs = event
+            self._loaded_batches.append((start, paragraphs))
+            if self._load_drain_id is None:
+                self._load_drain_id = GLib.idle_add(
+                    self._drain_loaded_paragraphs, priority=GLib.PRIORITY_LOW
+                )
+        return False
+
+    def _drain_loaded_paragraphs(self):
+        """Add decoded paragraphs to the list until this frame's time budget is spent"""
+        deadline = time.monotonic() + LOAD_FRAME_BUDGET_S
+        while self._loaded_batches:
+            now = time.monotonic()
+            if now >= deadline:
+                return True
+
+            # Size the chunk from the measured cost of adding one paragraph
+            start, paragraphs = self._loaded_batches[0]
+            size = max(1, min(len(paragraphs), int((deadline - now) / self._load_item_cost)))
+            if size < len(paragraphs):
+                self._loaded_batches[0] = (start + size, paragraphs[size:])
+            else:
+                self._loaded_batches.popleft()
+
+            self._apply_loaded_paragraphs(start, paragraphs[:size])
+            cost = (time.monotonic() - now) / size
+            self._load_item_cost = max(LOAD_ITEM_COST_MIN, (self._load_item_cost + cost) / 2)
+
+        self._load_drain_id = None
+        if self._loading_project is not None and self._loading_remaining == 0:
+            self._finish_project_load()
+        return False
+
+    def _apply_loaded_paragraphs(self, start: int, paragraphs: list) -> None:
+        """Replace the placeholders (or snapshot rows) of a run of decoded paragraphs"""
+        if self._restoring_session:
+            # Snapshot paragraphs edited meanwhile win over their stored copy
+            self.flush_paragraph_editors()
+            edited = {p.id: p for p in self._restored_edits()}
+            paragraphs = [edited.get(p.id, p) for p in paragraphs]
+
+        end = start + len(paragraphs)
+        self._loading_slots[start:end] = paragraphs
+        self._loading_remaining -= len(paragraphs)
+
+        # Rows already showing the same paragraph are not rebound, so an
+        # editor being typed in keeps its cursor
+        run_start = start
+        items = []
+        for index, paragraph in enumerate(paragraphs, start):
+            item = self._paragraph_items.get(paragraph.id)
+            if item is not None and item.paragraph is paragraph and self.paragraph_store.get_item(index) is item:
+                if items:
+                    self.paragraph_store.splice(run_start, len(items), items)
+                run_start, items = index + 1, []
+                continue
+            item = ParagraphItem(paragraph)
+            self._paragraph_items[paragraph.id] = item
+            items.append(item)
+        if items:
+            self.paragraph_store.splice(run_start, len(items), items)
+
+    def _finish_project_load(self):
+        """All paragraphs arrived: the project becomes the current one"""
+        project = self._loading_project
+        project.paragraphs = self._loading_slots
+        self._loading_project = None
+        self._loading_slots = None
+        self._on_project_loaded(project, None)
+
+    def _on_project_load_failed(self, generation: int, error: Optional[str]):
+        if generation != self._load_generation:
+            return False
+
+        self._cancel_project_load()
+        if self._restoring_session:
+            # The project of the last session is gone: start from the welcome view
+            self._restoring_session = False
+            self.session.clear()
+            self._show_welcome_view()
+        else:
+            self._on_project_loaded(None, error)
+        return False
+
+    def _cancel_project_load(self):
+        """Abandon a project load in progress"""
+        self._load_generation += 1
+        self._loading_project = None
+        self._loading_slots = None
+        self._loading_remaining = 0
+        self._loaded_batches.clear()
+        if self._load_drain_id is not None:
+            GLib.source_remove(self._load_drain_id)
+            self._load_drain_id = None
+        if self.paragraph_list_view is not None:
+            self.paragraph_list_view.set_sensitive(True)
+
+    def _remember_scroll_position(self):
+        """Store the first visible paragraph of the current project in the config"""
+        if not self.current_project or not self._bound_rows:
+            return
+
+        index, _offset = self._first_visible_paragraph()
+        positions = dict(self.config.get('project_scroll_positions', {}))
+        positions.pop(self.current_project.id, None)
+        if index > 0:
+            positions[self.current_project.id] = index
+        # Keep the most recently used projects only
+        while len(positions) > MAX_SCROLL_POSITIONS:
+            positions.pop(next(iter(positions)))
+        self.config.set('project_scroll_positions', positions)
+
+    def _first_visible_paragraph(self):
+        """Index of the topmost visible paragraph and how many pixels of it are scrolled away"""
+        top_id = None
+        top_y = None
+        for paragraph_id, row_widget in self._bound_rows.items():
+            ok, _x, y = row_widget.translate_coordinates(self.editor_scrolled, 0, 0)
+            if ok and y + row_widget.get_height() > 0 and (top_y is None or y < top_y):
+                top_id, top_y = paragraph_id, y
+
+        if top_id is None:
+            return 0, 0
+        return max(0, self._get_paragraph_index(top_id)), max(0, -top_y)
 
     def _add_paragraph(self, paragraph_type: ParagraphType):
         """Add a new paragraph"""
@@ -1314,26 +2056,20 @@ class MainWindow(Adw.ApplicationWindow):
             return
 
         paragraph = self.current_project.add_paragraph(paragraph_type)
+        self.history.record(InsertParagraphOp(paragraph, len(self.current_project.paragraphs) - 1))
 
-        paragraph_editor = ParagraphEditor(paragraph, config=self.config)
-        paragraph_editor.connect('content-changed', self._on_paragraph_changed)
-        paragraph_editor.connect('remove-requested', self._on_paragraph_remove_requested)
-        
-        # Create Wrapper
-        from ui.components import ReorderableParagraphRow
-        row_widget = ReorderableParagraphRow(paragraph_editor)
-        row_widget.connect('paragraph-reorder', self._on_paragraph_reorder)
-
-        self.paragraphs_box.append(row_widget)
-        self._existing_widgets[paragraph.id] = row_widget 
+        self._refresh_paragraphs()
+        self.paragraph_list_view.scroll_to(
+            len(self.current_project.paragraphs) - 1, Gtk.ListScrollFlags.FOCUS, None
+        )
 
-        self._update_header_for_view("editor")
-        current_stats = self.current_project.get_statistics()
-        self.project_list.update_project_statistics(self.current_project.id, current_stats)
+        self._queue_stats_refresh()
 
     def _on_project_created(self, dialog, project):
         """Handle new project creation"""
+        self._cancel_project_load()
         self.current_project = project
+        self.history.clear()
         self._show_editor_view()
 
         self.project_list.refresh_projects()
@@ -1410,33 +2146,28 @@ class MainWindow(Adw.ApplicationWindow):
             
             # Update order
             self.current_project.update_paragraph_order()
+            self.history.record(InsertParagraphOp(paragraph, self.current_project.paragraphs.index(paragraph)))
             
             # Mark as modified
             self.current_project.modified_at = datetime.now()
             
             # Save project
-            success = self.project_manager.save_project(self.current_project)
+            success = self._save_project_now()
             
             if success:
                 # Refresh UI
                 self._refresh_paragraphs()
                 
-                # Update header
-                self._update_header_for_view("editor")
+                # Update header and sidebar statistics
+                self._queue_stats_refresh()
                 
                 # Show success message
                 self._show_toast(_("Imagem inserida com sucesso"))
-                
-                # Update statistics
-                current_stats = self.current_project.get_statistics()
-                self.project_list.update_project_statistics(self.current_project.id, current_stats)
             else:
                 self._show_toast(_("Falha ao salvar projeto"), Adw.ToastPriority.HIGH)
         
         except Exception as e:
-            print(f"Error adding image: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error adding image: %s", e)
             
             self._show_toast(_("Erro ao inserir imagem"), Adw.ToastPriority.HIGH)
 
@@ -1777,27 +2508,17 @@ class MainWindow(Adw.ApplicationWindow):
     # Search helpers
     def _reset_search_state(self):
         self._search_state = {'paragraph_index': -1, 'offset': -1}
-
-    def _get_paragraph_textviews(self) -> List[Gtk.TextView]:
-        views: List[Gtk.TextView] = []
-        if not getattr(self, "paragraphs_box", None):
-            return views
-        child = self.paragraphs_box.get_first_child()
-        while child:
-            # Verify if is a Wrapper (ReorderableParagraphRow)
-            if hasattr(child, 'editor') and hasattr(child.editor, 'text_view'):
-                if child.editor.text_view:
-                    views.append(child.editor.text_view)
-            
-            # Fallback
-            elif hasattr(child, 'text_view') and child.text_view:
-                views.append(child.text_view)
-            child = child.get_next_sibling()
-        return views
+        self._pending_highlight = None
 
     def _on_search_text_changed(self, entry: Gtk.SearchEntry):
         self.search_query = entry.get_text().strip()
         self._reset_search_state()
+        self._run_search()
+
+    def _on_search_option_toggled(self, check: Gtk.CheckButton, option: str):
+        setattr(self.search_options, option, check.get_active())
+        self._reset_search_state()
+        self._run_search()
 
     def _on_search_activate(self, entry: Gtk.SearchEntry):
         if not self.search_query:
@@ -1812,48 +2533,135 @@ class MainWindow(Adw.ApplicationWindow):
             return
         self._find_next_occurrence(restart=False)
 
+    def _run_search(self) -> bool:
+        """Find every match of the query in the project and highlight them"""
+        self._search_matches = []
+        self._search_matches_by_id = {}
+        self.search_entry.remove_css_class("error")
+
+        if self.search_query and self.current_project:
+            self.flush_paragraph_editors()
+            try:
+                self._search_matches = self.search_index.find_all(
+                    self.current_project, self.search_query, self.search_options
+                )
+            except re.error:
+                # Incomplete regular expression while typing
+                self.search_entry.add_css_class("error")
+                self._search_matches = []
+
+        for match in self._search_matches:
+            self._search_matches_by_id.setdefault(match.paragraph_id, []).append(match)
+
+        for row_widget in self._bound_rows.values():
+            self._apply_search_highlights(row_widget)
+        return bool(self._search_matches)
+
+    def _apply_search_highlights(self, row_widget) -> None:
+        """Mark all matches of the row's paragraph in its editor"""
+        text_view = getattr(row_widget.editor, 'text_view', None)
+        if not text_view or not row_widget.paragraph:
+            return
+
+        buffer = text_view.get_buffer()
+        tag = buffer.get_tag_table().lookup('search-match')
+        if tag is None:
+            tag = buffer.create_tag('search-match', background='#f6d32d', foreground='#241f31')
+        buffer.remove_tag(tag, buffer.get_start_iter(), buffer.get_end_iter())
+
+        for match in self._search_matches_by_id.get(row_widget.paragraph.id, ()):
+            buffer.apply_tag(tag, buffer.get_iter_at_offset(match.start),
+                             buffer.get_iter_at_offset(match.end))
+
     def _find_next_occurrence(self, restart: bool) -> bool:
-        query = (self.search_query or "").strip()
-        if not query:
+        if not self.search_query or not self.current_project:
             return False
 
-        textviews = self._get_paragraph_textviews()
-        if not textviews:
-            self._show_toast(_("Nenhum parágrafo editável disponível."))
+        # Re-run against the model: only paragraphs edited since are re-folded
+        if not self._run_search():
+            if not self.search_entry.has_css_class("error"):
+                self._reset_search_state()
             return False
 
-        query_fold = query.casefold()
-        start_idx = 0
-        start_offset = 0
-        if not restart and self._search_state['paragraph_index'] >= 0:
-            start_idx = self._search_state['paragraph_index']
-            start_offset = self._search_state['offset'] + 1
-        else:
-            restart = True
-
-        for idx in range(start_idx, len(textviews)):
-            buffer = textviews[idx].get_buffer()
-            text = buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), True)
-            haystack = text.casefold()
-            search_offset = start_offset if (idx == start_idx and not restart) else 0
-            match = haystack.find(query_fold, max(search_offset, 0))
-            if match != -1:
-                self._highlight_search_result(textviews[idx], match, len(query))
-                self._search_state = {'paragraph_index': idx, 'offset': match}
+        positions = {p.id: index for index, p in enumerate(self.current_project.paragraphs)}
+        last = (self._search_state['paragraph_index'], self._search_state['offset'])
+        for match in self._search_matches:
+            position = (positions[match.paragraph_id], match.start)
+            if restart or position > last:
+                self._highlight_search_result(match.paragraph_id, match.start, match.length)
+                self._search_state = {'paragraph_index': position[0], 'offset': position[1]}
                 return True
-            restart = False
 
         self._show_toast(_("Fim do documento alcançado."))
         self._reset_search_state()
         return False
 
-    def _highlight_search_result(self, text_view: Gtk.TextView, start_offset: int, length: int) -> None:
+    def _on_replace_all_clicked(self, _widget):
+        """Replace every match as one undoable change and save once"""
+        if not self.search_query or not self.current_project:
+            self._show_toast(_("Digite o texto para pesquisar."))
+            return
+
+        if not self._run_search():
+            if self.search_entry.has_css_class("error"):
+                self._show_toast(_("Expressão regular inválida"), Adw.ToastPriority.HIGH)
+            else:
+                self._show_toast(_("Nenhuma correspondência encontrada."))
+            return
+
+        count = len(self._search_matches)
+        changes = self.search_index.replace_all(
+            self.current_project, self.search_query,
+            self.replace_entry.get_text(), self.search_options
+        )
+        if not changes:
+            return
+
+        operation = CompositeOp(
+            [ContentChangeOp(paragraph_id, old, new) for paragraph_id, (old, new) in changes.items()],
+            _("Substituir tudo")
+        )
+        operation.apply(self.current_project)
+        self.current_project._update_modified_time()
+        self.history.record(operation)
+
+        self._reset_search_state()
+        self._refresh_paragraphs(stale_ids=set(changes))
+        self._run_search()
+        self._queue_stats_refresh()
+
+        if self._save_project_now():
+            self.project_list.refresh_projects()
+        self._show_toast(_("{} ocorrência(s) substituída(s)").format(count))
+
+    def _highlight_search_result(self, paragraph_id: str, start_offset: int, length: int) -> None:
+        """Scroll the paragraph into view and select the match once it is bound"""
+        self._pending_highlight = (paragraph_id, start_offset, length)
+        if paragraph_id in self._bound_rows:
+            self._apply_pending_highlight()
+        else:
+            index = self._get_paragraph_index(paragraph_id)
+            if index >= 0:
+                self.paragraph_list_view.scroll_to(index, Gtk.ListScrollFlags.NONE, None)
+
+    def _apply_pending_highlight(self):
+        """Select the pending search match in its (now bound) editor"""
+        if not self._pending_highlight:
+            return False
+        paragraph_id, start_offset, length = self._pending_highlight
+        row_widget = self._bound_rows.get(paragraph_id)
+        text_view = getattr(row_widget.editor, 'text_view', None) if row_widget else None
+        if not text_view:
+            return False
+
+        self._pending_highlight = None
         buffer = text_view.get_buffer()
         start_iter = buffer.get_iter_at_offset(start_offset)
         end_iter = buffer.get_iter_at_offset(start_offset + length)
         buffer.select_range(start_iter, end_iter)
         text_view.scroll_to_iter(start_iter, 0.25, True, 0.5, 0.1)
         text_view.grab_focus()
+        return False
 
     def _save_window_state(self):
         """Save window state to config"""
@@ -1896,14 +2704,41 @@ class MainWindow(Adw.ApplicationWindow):
 
         elif view_name == "editor" and self.current_project:
             title_widget.set_title(self.current_project.name)
-            # Force recalculation of statistics
-            stats = self.current_project.get_statistics()
+            stats = self._get_current_stats()
             subtitle = FormatHelper.format_project_stats(stats['total_words'], stats['total_paragraphs'])
             title_widget.set_subtitle(subtitle)
             self.save_button.set_sensitive(True)
             self.pomodoro_button.set_sensitive(True)
             self.references_button.set_sensitive(True)
 
+        elif view_name == "editor" and self._loading_project:
+            title_widget.set_title(self._loading_project.name)
+            title_widget.set_subtitle(_("Carregando projeto..."))
+            self.save_button.set_sensitive(False)
+            self.pomodoro_button.set_sensitive(False)
+            self.references_button.set_sensitive(False)
+
+
+    def _queue_stats_refresh(self):
+        """Invalidate project statistics and repaint the surfaces showing them on the next frame"""
+        self._stats_cache = None
+        self.update_scheduler.mark_dirty('header', 'sidebar', 'analytics', 'repetitions')
+
+    def _get_current_stats(self) -> Dict:
+        """Statistics of the current project, computed at most once per change"""
+        if self._stats_cache is None or self._stats_cache[0] is not self.current_project:
+            self._stats_cache = (self.current_project, self.current_project.get_statistics())
+        return self._stats_cache[1]
+
+    def _repaint_header_stats(self):
+        """Scheduler callback: refresh the header title and statistics"""
+        if self.current_project and self.main_stack.get_visible_child_name() == "editor":
+            self._update_header_for_view("editor")
+
+    def _repaint_sidebar_stats(self):
+        """Scheduler callback: refresh the current project row in the sidebar"""
+        if self.current_project:
+            self.project_list.update_project_statistics(self.current_project.id, self._get_current_stats())
 
     def _show_loading_state(self):
         """Show loading indicator"""
@@ -1929,6 +2764,7 @@ class MainWindow(Adw.ApplicationWindow):
             self.main_stack.add_named(loading_box, "loading")
         
         # Show loading
+        self.loading_spinner.start()
         self.main_stack.set_visible_child_name("loading")
         self._update_header_for_view("loading")
 
@@ -1943,37 +2779,41 @@ class MainWindow(Adw.ApplicationWindow):
             self._show_welcome_view()
             return False
         
+        restored = self._restoring_session
+        self._restoring_session = False
+        restored_edits = restored and project is not None and bool(self._restored_edits())
+        self._snapshot_paragraphs = {}
+
         if project:
             self.current_project = project
-            # Show editor optimized
-            self._show_editor_view_optimized()
-            self._show_toast(_("Projeto aberto: {}").format(project.name))
+            self._mark_project_saved()
+            if restored_edits:
+                # Snapshot rows edited before the load finished still need saving
+                self._saved_at = self._restored_at
+                self._schedule_auto_save()
+            self.history.clear()
+            self.analytics.reset()
+            self._submit_analytics()
+            self._refresh_repetitions()
+            self._stats_cache = None
+            if self.main_stack.get_visible_child_name() == "editor":
+                # Shown progressively while loading: only finish the setup
+                self.paragraph_list_view.set_sensitive(True)
+                self._refresh_paragraphs()
+                self._update_header_for_view("editor")
+                self.search_index.clear()
+                self._reset_search_state()
+                self._run_search()
+            else:
+                self._show_editor_view()
+            if not restored:
+                self._show_toast(_("Projeto aberto: {}").format(project.name))
         else:
             self._show_toast(_("Falha ao abrir projeto"), Adw.ToastPriority.HIGH)
             self._show_welcome_view()
         
         return False 
 
-    def _show_editor_view_optimized(self):
-        """Show editor view with optimizations"""
-        if not self.current_project:
-            return
-        
-        # Check if editor view already exists
-        editor_page = self.main_stack.get_child_by_name("editor")
-        
-        if not editor_page:
-            # Create editor view only if it doesn't exist
-            self.editor_view = self._create_editor_view()
-            self.main_stack.add_named(self.editor_view, "editor")
-        else:
-            # Reuse existing view and only do incremental refresh
-            self.editor_view = editor_page
-            self._refresh_paragraphs()  # Now uses incremental update
-        
-        self.main_stack.set_visible_child_name("editor")
-        self._update_header_for_view("editor")
-
     def handle_ai_pdf_error(self, error_message: str):
         """Handle errors from AI assistent while PDF analyse is runnig"""
         
@@ -2003,6 +2843,73 @@ class MainWindow(Adw.ApplicationWindow):
         dialog = CloudSyncDialog(self)
         dialog.present()
 
+    def _on_sync_status(self, state: str, message: str):
+        """Show the background sync state on the cloud button"""
+        icons = {
+            'syncing': 'tac-emblem-synchronizing-symbolic',
+            'error': 'tac-dialog-warning-symbolic',
+        }
+        self.cloud_button.set_icon_name(icons.get(state, 'tac-cloud-symbolic'))
+        tooltip = _("Sincronização com Dropbox")
+        self.cloud_button.set_tooltip_text(f"{tooltip}\n{message}" if message else tooltip)
+
+    def _on_sync_finished(self, result):
+        """A sync run ended: show what it merged and make the saves held back during it"""
+        deferred, self._deferred_saves = self._deferred_saves, {}
+        for project, saved_at, base_ids in deferred.values():
+            self._save_over_sync(project, saved_at, base_ids)
+
+        merge = result.get('merge') if result else None
+        if deferred or merge:
+            self.project_list.refresh_projects()
+
+        if merge and self.current_project and self.current_project.id in merge.get('projects_changed', ()):
+            self._reload_synced_project()
+        elif self._save_after_sync:
+            self._save_after_sync = False
+            self._perform_auto_save()
+
+        conflicts = merge.get('conflicts') if merge else None
+        if conflicts:
+            self._show_toast(_("Sincronizado com {} conflito(s); mantida a versão mais recente.").format(
+                len(conflicts)
+            ))
+
+    def _reload_synced_project(self):
+        """
+        The sync changed the open project in the database: show the merged
+        version, with the edits made here since the last save rebased on it
+        """
+        project = self.current_project
+        if self.has_unsaved_changes():
+            self._save_after_sync = False
+            success, project = self._save_over_sync(project, self._saved_at, self._saved_paragraph_ids)
+            if success:
+                self.sync_scheduler.notify_saved()
+            else:
+                self._show_toast(_("Salvamento automático falhou"), Adw.ToastPriority.HIGH)
+        else:
+            project = self.project_manager.load_project(project.id)
+            if project is None:
+                # Deleted on another device
+                self.current_project = None
+                self.history.clear()
+                self._show_welcome_view()
+                self._show_toast(_("O projeto aberto foi excluído em outro dispositivo"))
+                return
+            success = True
+
+        self.current_project = project
+        if success:
+            self._mark_project_saved()
+        self.history.clear()
+        self._stats_cache = None
+        self._refresh_paragraphs()
+        self.update_scheduler.mark_dirty('header')
+        self.search_index.clear()
+        self._reset_search_state()
+        self._run_search()
+
     """def _on_references_clicked(self, button):
         Handle references to be used for quotes
         # Verificação de segurança: Só abre se houver projeto carregado
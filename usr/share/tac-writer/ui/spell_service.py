@@ -0,0 +1,451 @@
+"""
+TAC Spell Service
+Shared spell checking for all paragraph editors: one enchant dictionary per
+language, a word result cache and checking in idle slices
+"""
+
+import gi
+gi.require_version('Gtk', '4.0')
+
+import logging
+import re
+import time
+import weakref
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from gi.repository import Gtk, Gio, GLib, Pango
+
+from utils.helpers import DependencyHelper
+from utils.i18n import _
+
+logger = logging.getLogger(__name__)
+
+# enchant is probed here and imported when the first dictionary is opened
+SPELL_CHECK_AVAILABLE = DependencyHelper.is_available('enchant')
+
+MISSPELLED_TAG = 'misspelled'
+
+# Main loop time spent checking per idle slice
+SLICE_BUDGET_SECONDS = 0.004
+# Longest run of text checked in one step
+CHUNK_CHARS = 2000
+MAX_SUGGESTIONS = 8
+
+_WORD_RE = re.compile(r"\w+(?:['’]\w+)*")
+
+_default_service = None
+
+
+def get_spell_service(config=None) -> 'SpellService':
+    """Return the application-wide spell service"""
+    global _default_service
+    if _default_service is None:
+        _default_service = SpellService(config)
+    return _default_service
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char in "_'’"
+
+
+class SpellService:
+    """Spell checker shared by every text view of the application"""
+
+    def __init__(self, config=None):
+        self.config = config
+        self._cache_size = config.get('spell_check_cache_size', 50000) if config else 50000
+        self._word_cache: OrderedDict = OrderedDict()
+        self._dictionaries: Dict[str, object] = {}
+        self._ignored = set()
+        self._checkers = weakref.WeakSet()
+        self._queue = deque()
+        self._idle_id = None
+
+    @property
+    def available(self) -> bool:
+        return SPELL_CHECK_AVAILABLE
+
+    def default_language(self) -> str:
+        if self.config:
+            return self.config.get_spell_check_language()
+        return 'pt_BR'
+
+    # Dictionaries
+
+    def get_dictionary(self, language: str):
+        """Return the shared enchant dictionary for a language, or None"""
+        if language in self._dictionaries:
+            return self._dictionaries[language]
+
+        dictionary = None
+        if SPELL_CHECK_AVAILABLE:
+            import enchant
+
+            for candidate in self._language_candidates(language):
+                try:
+                    if enchant.dict_exists(candidate):
+                        dictionary = self._request_dictionary(candidate)
+                        break
+                except Exception as e:
+                    logger.warning("Error loading dictionary %s: %s", candidate, e)
+
+        self._dictionaries[language] = dictionary
+        return dictionary
+
+    def _request_dictionary(self, tag: str):
+        """Open a dictionary, backed by the personal word list when possible"""
+        import enchant
+
+        pwl_path = self.config.get_personal_dictionary_path() if self.config else None
+        if pwl_path:
+            try:
+                Path(pwl_path).parent.mkdir(parents=True, exist_ok=True)
+                Path(pwl_path).touch(exist_ok=True)
+                return enchant.DictWithPWL(tag, pwl_path)
+            except Exception as e:
+                logger.warning("Error opening personal dictionary %s: %s", pwl_path, e)
+        return enchant.Dict(tag)
+
+    @staticmethod
+    def _language_candidates(language: str) -> List[str]:
+        """Language tag variations to try (pt_BR -> pt-BR -> pt)"""
+        candidates = [language]
+        if '_' in language:
+            candidates.append(language.replace('_', '-'))
+        elif '-' in language:
+            candidates.append(language.replace('-', '_'))
+        base_lang = language.split('_')[0].split('-')[0]
+        if base_lang not in candidates:
+            candidates.append(base_lang)
+        return candidates
+
+    # Words
+
+    def check_word(self, word: str, language: str) -> bool:
+        """Whether a word is correct, using the shared result cache"""
+        if word in self._ignored:
+            return True
+
+        key = (language, word)
+        result = self._word_cache.get(key)
+        if result is not None:
+            self._word_cache.move_to_end(key)
+            return result
+
+        dictionary = self.get_dictionary(language)
+        if dictionary is None:
+            return True
+        try:
+            result = bool(dictionary.check(word))
+        except Exception:
+            result = True
+
+        self._word_cache[key] = result
+        if len(self._word_cache) > self._cache_size:
+            self._word_cache.popitem(last=False)
+        return result
+
+    def suggest(self, word: str, language: str) -> List[str]:
+        """Spelling suggestions for a word"""
+        dictionary = self.get_dictionary(language)
+        if dictionary is None:
+            return []
+        try:
+            return dictionary.suggest(word)[:MAX_SUGGESTIONS]
+        except Exception as e:
+            logger.warning("Error getting suggestions for %s: %s", word, e)
+            return []
+
+    def add_to_dictionary(self, word: str, language: str) -> None:
+        """Add a word to the personal dictionary"""
+        dictionary = self.get_dictionary(language)
+        if dictionary is not None:
+            try:
+                dictionary.add(word)
+            except Exception as e:
+                logger.warning("Error adding %s to dictionary: %s", word, e)
+        self._forget_word(word)
+
+    def ignore_word(self, word: str) -> None:
+        """Accept a word for the rest of the session"""
+        self._ignored.add(word)
+        self._forget_word(word)
+
+    def _forget_word(self, word: str) -> None:
+        for key in [key for key in self._word_cache if key[1] == word]:
+            del self._word_cache[key]
+        self.recheck_all()
+
+    # Text views
+
+    def attach(self, text_view: Gtk.TextView, language: Optional[str] = None) -> Optional['BufferSpellChecker']:
+        """Start checking a text view; the whole buffer is checked in idle slices"""
+        if not SPELL_CHECK_AVAILABLE:
+            return None
+        checker = BufferSpellChecker(self, text_view, language or self.default_language())
+        self._checkers.add(checker)
+        checker.queue_all()
+        return checker
+
+    def detach(self, checker: 'BufferSpellChecker') -> None:
+        """Stop checking the text view of a checker"""
+        checker.disconnect()
+        self._checkers.discard(checker)
+
+    def recheck_all(self) -> None:
+        """Re-check every attached text view"""
+        for checker in list(self._checkers):
+            checker.queue_all()
+
+    def set_language(self, language: str) -> None:
+        """Switch all attached text views to another language"""
+        for checker in list(self._checkers):
+            checker.set_language(language)
+
+    def schedule(self, checker: 'BufferSpellChecker') -> None:
+        """Queue a checker with pending work"""
+        if not checker.queued:
+            checker.queued = True
+            self._queue.append(checker)
+        if self._idle_id is None:
+            self._idle_id = GLib.idle_add(self._process_queue, priority=GLib.PRIORITY_LOW)
+
+    def _process_queue(self):
+        """Check pending text for a short time slice, then yield to the main loop"""
+        deadline = time.monotonic() + SLICE_BUDGET_SECONDS
+        while self._queue and time.monotonic() < deadline:
+            checker = self._queue[0]
+            if checker.process(deadline):
+                checker.queued = False
+                self._queue.popleft()
+
+        if self._queue:
+            return True
+        self._idle_id = None
+        return False
+
+
+class BufferSpellChecker:
+    """Marks misspelled words of one text view and offers suggestions"""
+
+    def __init__(self, service: SpellService, text_view: Gtk.TextView, language: str):
+        self.service = service
+        self.text_view = text_view
+        self.buffer = text_view.get_buffer()
+        self.language = language
+        self.enabled = True
+        self.queued = False
+        self._dirty = []
+        self._menu_marks = None
+
+        self._tag = self.buffer.get_tag_table().lookup(MISSPELLED_TAG)
+        if not self._tag:
+            self._tag = self.buffer.create_tag(MISSPELLED_TAG, underline=Pango.Underline.ERROR)
+
+        self._handlers = [
+            self.buffer.connect_after('insert-text', self._on_insert_text),
+            self.buffer.connect_after('delete-range', self._on_delete_range),
+        ]
+        self._setup_context_menu()
+
+    def queue_all(self) -> None:
+        """Queue the whole buffer for checking"""
+        if not self.enabled:
+            return
+        self._dirty = [(0, self.buffer.get_char_count())]
+        self.service.schedule(self)
+
+    def set_enabled(self, enabled: bool) -> None:
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        if enabled:
+            self.queue_all()
+        else:
+            self._dirty = []
+            self.buffer.remove_tag(self._tag, self.buffer.get_start_iter(), self.buffer.get_end_iter())
+
+    def set_language(self, language: str) -> None:
+        if language != self.language:
+            self.language = language
+            self.queue_all()
+
+    def disconnect(self) -> None:
+        """Stop tracking buffer changes"""
+        for handler_id in self._handlers:
+            self.buffer.disconnect(handler_id)
+        self._handlers = []
+        self._dirty = []
+        self.enabled = False
+
+    def _mark_dirty(self, start: int, end: int) -> None:
+        if not self.enabled:
+            return
+        self._dirty.append((start, end))
+        self.service.schedule(self)
+
+    def _on_insert_text(self, buffer, location, text, length):
+        # Runs after the default handler, so location is past the new text
+        end = location.get_offset()
+        self._mark_dirty(end - len(text), end)
+
+    def _on_delete_range(self, buffer, start, end):
+        offset = start.get_offset()
+        self._mark_dirty(offset, offset)
+
+    def process(self, deadline: float) -> bool:
+        """Check dirty ranges until the deadline; returns True when done"""
+        if not self.enabled or not self._dirty:
+            return True
+
+        length = self.buffer.get_char_count()
+
+        while self._dirty and time.monotonic() < deadline:
+            start, end = self._dirty.pop()
+            start = max(0, min(start, length))
+            end = max(start, min(end, length))
+
+            # Widen the range to whole words
+            start_iter = self._word_start(start)
+            end_iter = self._word_end(end)
+
+            # Long ranges (e.g. the initial check) are split into chunks
+            if end_iter.get_offset() - start_iter.get_offset() > CHUNK_CHARS:
+                split_iter = self._word_end(start_iter.get_offset() + CHUNK_CHARS)
+                self._dirty.append((split_iter.get_offset(), end_iter.get_offset()))
+                end_iter = split_iter
+
+            # Only the text of the range is copied, not the whole buffer
+            self._check_range(self.buffer.get_text(start_iter, end_iter, False),
+                              start_iter, end_iter)
+
+        return not self._dirty
+
+    def _word_start(self, offset: int) -> Gtk.TextIter:
+        """Iter at offset moved back to the start of the word it is in"""
+        text_iter = self.buffer.get_iter_at_offset(offset)
+        while text_iter.backward_char():
+            if not _is_word_char(text_iter.get_char()):
+                text_iter.forward_char()
+                break
+        return text_iter
+
+    def _word_end(self, offset: int) -> Gtk.TextIter:
+        """Iter at offset moved forward to the end of the word it is in"""
+        text_iter = self.buffer.get_iter_at_offset(offset)
+        while not text_iter.is_end() and _is_word_char(text_iter.get_char()):
+            text_iter.forward_char()
+        return text_iter
+
+    def _check_range(self, text: str, start: Gtk.TextIter, end: Gtk.TextIter) -> None:
+        """Tag the misspelled words of text, the buffer content from start to end"""
+        offset = start.get_offset()
+        self.buffer.remove_tag(self._tag, start, end)
+        for match in _WORD_RE.finditer(text):
+            word = match.group()
+            if any(char.isdigit() for char in word):
+                continue
+            if not self.service.check_word(word, self.language):
+                self.buffer.apply_tag(self._tag, self.buffer.get_iter_at_offset(offset + match.start()),
+                                      self.buffer.get_iter_at_offset(offset + match.end()))
+
+    # Context menu
+
+    def _setup_context_menu(self):
+        group = Gio.SimpleActionGroup()
+
+        replace_action = Gio.SimpleAction.new('replace', GLib.VariantType.new('s'))
+        replace_action.connect('activate', self._on_replace)
+        group.add_action(replace_action)
+
+        add_action = Gio.SimpleAction.new('add', None)
+        add_action.connect('activate', self._on_add_to_dictionary)
+        group.add_action(add_action)
+
+        ignore_action = Gio.SimpleAction.new('ignore', None)
+        ignore_action.connect('activate', self._on_ignore)
+        group.add_action(ignore_action)
+
+        self.text_view.insert_action_group('spell', group)
+
+        click = Gtk.GestureClick(button=3)
+        click.set_propagation_phase(Gtk.PropagationPhase.CAPTURE)
+        click.connect('pressed', self._on_right_click)
+        self.text_view.add_controller(click)
+
+    def _on_right_click(self, gesture, n_press, x, y):
+        """Rebuild the extra context menu for the word under the pointer"""
+        menu = Gio.Menu()
+        self._clear_menu_marks()
+
+        word = None
+        if self.enabled:
+            bx, by = self.text_view.window_to_buffer_coords(Gtk.TextWindowType.WIDGET, int(x), int(y))
+            found, location = self.text_view.get_iter_at_location(bx, by)
+            if found and location.has_tag(self._tag):
+                start = location.copy()
+                if not start.starts_tag(self._tag):
+                    start.backward_to_tag_toggle(self._tag)
+                end = location.copy()
+                end.forward_to_tag_toggle(self._tag)
+                word = self.buffer.get_text(start, end, False)
+                self._menu_marks = (
+                    self.buffer.create_mark(None, start, True),
+                    self.buffer.create_mark(None, end, False),
+                )
+
+        if word:
+            suggestions_section = Gio.Menu()
+            suggestions = self.service.suggest(word, self.language)
+            for suggestion in suggestions:
+                item = Gio.MenuItem.new(suggestion, None)
+                item.set_action_and_target_value('spell.replace', GLib.Variant('s', suggestion))
+                suggestions_section.append_item(item)
+            if not suggestions:
+                suggestions_section.append(_("(Sem sugestões)"), None)
+            menu.append_section(None, suggestions_section)
+
+            actions_section = Gio.Menu()
+            actions_section.append(_("Adicionar ao dicionário"), 'spell.add')
+            actions_section.append(_("Ignorar"), 'spell.ignore')
+            menu.append_section(None, actions_section)
+
+        self.text_view.set_extra_menu(menu)
+
+    def _menu_word_bounds(self):
+        if not self._menu_marks:
+            return None
+        start_mark, end_mark = self._menu_marks
+        return (self.buffer.get_iter_at_mark(start_mark), self.buffer.get_iter_at_mark(end_mark))
+
+    def _clear_menu_marks(self):
+        if self._menu_marks:
+            for mark in self._menu_marks:
+                if not mark.get_deleted():
+                    self.buffer.delete_mark(mark)
+            self._menu_marks = None
+
+    def _on_replace(self, action, param):
+        bounds = self._menu_word_bounds()
+        if not bounds:
+            return
+        start, end = bounds
+        self.buffer.begin_user_action()
+        self.buffer.delete(start, end)
+        self.buffer.insert(start, param.get_string())
+        self.buffer.end_user_action()
+        self._clear_menu_marks()
+
+    def _on_add_to_dictionary(self, action, param):
+        bounds = self._menu_word_bounds()
+        if bounds:
+            self.service.add_to_dictionary(self.buffer.get_text(bounds[0], bounds[1], False), self.language)
+        self._clear_menu_marks()
+
+    def _on_ignore(self, action, param):
+        bounds = self._menu_word_bounds()
+        if bounds:
+            self.service.ignore_word(self.buffer.get_text(bounds[0], bounds[1], False))
+        self._clear_menu_marks()
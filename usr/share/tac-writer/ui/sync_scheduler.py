@@ -0,0 +1,326 @@
+"""
+TAC Sync Scheduler
+Runs the sync engine in the background: after startup, after saves
+(debounced) and periodically, backing off after failures
+"""
+
+import gi
+gi.require_version('Gtk', '4.0')
+
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from gi.repository import GLib
+
+from core.assets import AssetSync
+from core.sync import SyncCancelled, SyncEngine, Transfer, create_backend
+from utils.i18n import _
+
+logger = logging.getLogger(__name__)
+
+# Seconds after startup before the first sync
+STARTUP_DELAY = 5
+
+# Retry delays after failures: RETRY_DELAY, doubled per failure up to MAX_RETRY_DELAY
+RETRY_DELAY = 30
+MAX_RETRY_DELAY = 30 * 60
+
+
+def format_sync_result(result: Dict) -> str:
+    """Short user-facing summary of a sync run"""
+    stats = result.get('merge')
+    if result.get('skipped'):
+        return _("Sincronização concluída (sem alterações remotas).")
+    if stats and stats['conflicts']:
+        return _("Sincronizado com {} conflito(s); mantida a versão mais recente.").format(
+            len(stats['conflicts'])
+        )
+    if stats and (stats['projects_added'] > 0 or stats['projects_updated'] > 0 or stats['projects_deleted'] > 0):
+        return _("Sincronizado: +{} novos, {} atualizados.").format(
+            stats['projects_added'], stats['projects_updated']
+        )
+    if result.get('sent'):
+        return _("Sincronizado: {} alteração(ões) enviada(s).").format(result['sent'])
+    return _("Sincronização concluída (sem alterações remotas).")
+
+
+class SyncScheduler:
+    """
+    Decides when the window's database is synced and runs it off the
+    main thread, one run at a time.
+
+    Saves push the next run back by 'auto_sync_delay' seconds, so a burst
+    of saves leads to a single sync; without saves the remote is checked
+    every 'auto_sync_interval' seconds. The engine itself skips runs in
+    which neither side changed, so a check costs two small requests.
+    After a failure the next attempt waits RETRY_DELAY, doubling up to
+    MAX_RETRY_DELAY. Manual runs (sync_now) ignore the backoff.
+
+    Scheduled runs wait while the window's project has unsaved edits, and
+    manual runs save it first, so a merge never happens under edits that
+    are not in the database yet.
+
+    status_callback(state, message) is called on the main thread with
+    state 'syncing', 'ok', 'error' or 'off' (and again with the progress
+    of snapshot transfers); on_finished(result) after every run, with None
+    if it failed or was cancelled. A run can be cancelled; that is not a
+    failure.
+
+    Each run also uploads new images; images missing locally are fetched
+    one by one through fetch_image().
+    """
+
+    def __init__(self, window, status_callback: Callable[[str, str], None],
+                 on_finished: Optional[Callable[[Optional[Dict]], None]] = None):
+        self.window = window
+        self.config = window.config
+        self.status_callback = status_callback
+        self.on_finished = on_finished
+        self._timer_id = None
+        self._running = False
+        self._pending = False
+        self._failures = 0
+        self._backoff_until_us = 0
+        self._waiters: List[Callable] = []
+        self._progress_listeners: List[Callable[[str], None]] = []
+        self._cancel_event = None
+        self._thread = None
+        self._last_progress = None
+        # Image downloads in progress: local path -> callbacks
+        self._fetches: Dict[str, List[Callable]] = {}
+
+    def is_configured(self) -> bool:
+        """True if a sync destination has been set up"""
+        if self.config.get('sync_backend') == 'folder':
+            return bool(self.config.get('sync_folder'))
+        return bool(self.config.get('dropbox_refresh_token'))
+
+    def is_running(self) -> bool:
+        return self._running
+
+    # Triggers
+
+    def start(self) -> None:
+        """Schedule the startup sync"""
+        if self._enabled():
+            self._schedule(STARTUP_DELAY)
+        elif not self.is_configured():
+            self._set_status('off', '')
+
+    def stop(self) -> None:
+        """Cancel scheduled runs (a run in progress finishes on its own)"""
+        if self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+        self._waiters.clear()
+
+    def abort(self, timeout: float) -> bool:
+        """
+        Cancel the run in progress and wait up to timeout seconds for its
+        thread to end (its result is not reported). Returns whether a run
+        was in progress.
+        """
+        if not self._running:
+            return False
+        self.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._running = False
+        self._thread = None
+        return True
+
+    def notify_saved(self) -> None:
+        """The database was written: sync once the saves settle down"""
+        if self._enabled():
+            self._schedule(self.config.get('auto_sync_delay', 10))
+
+    def sync_now(self, callback: Optional[Callable[[Optional[Dict], Optional[Exception]], None]] = None,
+                 progress: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Sync as soon as possible, ignoring the backoff. callback(result,
+        error) is called on the main thread when the run ends (the run in
+        progress, if there is one) and progress(message) while it transfers.
+        """
+        if callback is not None:
+            self._waiters.append(callback)
+        if progress is not None:
+            self._progress_listeners.append(progress)
+        if self._running:
+            return
+        if self.window.has_unsaved_changes():
+            self.window.save_current_project()
+        if self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = None
+        self._start_run()
+
+    def cancel(self) -> None:
+        """Stop the run in progress at its next chunk"""
+        if self._running and self._cancel_event is not None:
+            self._cancel_event.set()
+
+    def fetch_image(self, project_id: str, metadata: Dict,
+                    callback: Callable[[Optional[str], Optional[Exception]], None]) -> bool:
+        """
+        Download a synced image missing on this machine. callback(path,
+        error) runs on the main thread; path is None if the remote does
+        not have the image. Returns False if no sync is set up.
+        """
+        if not self.is_configured():
+            return False
+        key = f"{project_id}/{metadata.get('hash') or metadata.get('filename')}"
+        waiting = self._fetches.get(key)
+        if waiting is not None:
+            waiting.append(callback)
+            return True
+        self._fetches[key] = [callback]
+
+        def worker():
+            try:
+                backend = create_backend(self.config)
+                path = AssetSync(backend, self.config.data_dir).fetch(project_id, metadata) if backend else None
+                GLib.idle_add(self._on_fetch_finished, key, str(path) if path else None, None)
+            except Exception as e:
+                logger.warning("Error fetching image %s: %s", metadata.get('filename'), e)
+                GLib.idle_add(self._on_fetch_finished, key, None, e)
+
+        threading.Thread(target=worker, daemon=True).start()
+        return True
+
+    def _on_fetch_finished(self, key, path, error):
+        for callback in self._fetches.pop(key, []):
+            try:
+                callback(path, error)
+            except Exception as e:
+                logger.exception("Error in image fetch callback: %s", e)
+        return False
+
+    # Internals
+
+    def _enabled(self) -> bool:
+        return bool(self.config.get('auto_sync', True)) and self.is_configured()
+
+    def _schedule(self, delay_seconds: float) -> None:
+        """(Re)arm the timer, never earlier than the end of the backoff"""
+        delay_us = int(delay_seconds * 1_000_000)
+        delay_us = max(delay_us, self._backoff_until_us - GLib.get_monotonic_time())
+        if self._timer_id is not None:
+            GLib.source_remove(self._timer_id)
+        self._timer_id = GLib.timeout_add(max(0, delay_us // 1000), self._on_timer)
+
+    def _on_timer(self):
+        self._timer_id = None
+        if self._running:
+            self._pending = True
+        elif self._enabled():
+            if self.window.has_unsaved_changes():
+                # A merge now would be overwritten by the next save, which reschedules
+                self._schedule(self.config.get('auto_sync_interval', 300))
+            else:
+                self._start_run()
+        return False
+
+    def _start_run(self) -> None:
+        self._running = True
+        self._pending = False
+        self._cancel_event = threading.Event()
+        self._last_progress = None
+        self._set_status('syncing', _("Sincronizando..."))
+        self._thread = threading.Thread(target=self._run_worker, args=(self._cancel_event,), daemon=True)
+        self._thread.start()
+
+    def _run_worker(self, cancel_event):
+        try:
+            backend = create_backend(self.config)
+            if backend is None:
+                GLib.idle_add(self._on_run_finished, None, None)
+                return
+            transfer = Transfer(self._on_transfer_progress, cancel_event)
+            result = SyncEngine(self.window.project_manager, backend, transfer).run()
+            result['assets'] = AssetSync(backend, self.config.data_dir, transfer).upload(
+                self.window.project_manager.db_path
+            )
+            GLib.idle_add(self._on_run_finished, result, None)
+        except SyncCancelled as e:
+            GLib.idle_add(self._on_run_finished, None, e)
+        except Exception as e:
+            logger.warning("Erro de Sync: %s", e)
+            GLib.idle_add(self._on_run_finished, None, e)
+
+    def _on_transfer_progress(self, stage: str, done: int, total: int):
+        """Called on the sync thread; forwards whole-percent changes to the main thread"""
+        progress = (stage, done * 100 // total if total else done // (1024 * 1024))
+        if progress != self._last_progress:
+            self._last_progress = progress
+            GLib.idle_add(self._show_progress, stage, done, total)
+
+    def _show_progress(self, stage: str, done: int, total: int):
+        if not self._running:
+            return False
+        label = _("Enviando") if stage == 'upload' else _("Baixando")
+        if total:
+            message = "{}... {}%".format(label, done * 100 // total)
+        else:
+            message = "{}... {:.1f} MB".format(label, done / (1024 * 1024))
+        self._set_status('syncing', message)
+        for listener in self._progress_listeners:
+            try:
+                listener(message)
+            except Exception as e:
+                logger.exception("Error in sync progress listener: %s", e)
+        return False
+
+    def _on_run_finished(self, result: Optional[Dict], error: Optional[Exception]):
+        if not self._running:
+            return False  # Aborted
+        self._running = False
+        self._cancel_event = None
+        self._thread = None
+        waiters, self._waiters = self._waiters, []
+        self._progress_listeners = []
+
+        if isinstance(error, SyncCancelled):
+            self._set_status('ok', _("Sincronização cancelada"))
+        elif error is not None:
+            self._failures += 1
+            retry = min(RETRY_DELAY * 2 ** (self._failures - 1), MAX_RETRY_DELAY)
+            self._backoff_until_us = GLib.get_monotonic_time() + retry * 1_000_000
+            self._set_status('error', _("Falha na sincronização: {}. Nova tentativa em {} min.").format(
+                error, max(1, round(retry / 60))
+            ))
+        elif result is None:
+            self._set_status('off', '')
+        else:
+            self._failures = 0
+            self._backoff_until_us = 0
+            timestamp = datetime.now().strftime("%H:%M")
+            self._set_status('ok', _("Sincronizado às {}").format(timestamp))
+
+        if self.on_finished is not None:
+            try:
+                self.on_finished(result)
+            except Exception as e:
+                logger.exception("Error in sync finished callback: %s", e)
+
+        for callback in waiters:
+            try:
+                callback(result, error)
+            except Exception as e:
+                logger.exception("Error in sync callback: %s", e)
+
+        failed = error is not None and not isinstance(error, SyncCancelled)
+        if self._pending or (failed and self._enabled()):
+            # Saved while running, or failed: go again once the backoff allows
+            self._pending = False
+            self._schedule(0)
+        elif self._enabled():
+            self._schedule(self.config.get('auto_sync_interval', 300))
+        return False
+
+    def _set_status(self, state: str, message: str) -> None:
+        try:
+            self.status_callback(state, message)
+        except Exception as e:
+            logger.exception("Error showing sync status: %s", e)
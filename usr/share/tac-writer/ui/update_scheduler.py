@@ -0,0 +1,95 @@
+"""
+TAC UI Update Scheduler
+Coalesces repaints of window surfaces (header, sidebar, ...) into one per frame
+"""
+
+import gi
+gi.require_version('Gtk', '4.0')
+
+import logging
+from typing import Callable, Dict, List
+
+from gi.repository import Gtk, GLib
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateScheduler:
+    """
+    Marks named UI surfaces dirty and repaints them later in one pass.
+
+    With an interval of 0 the repaint runs on the next frame of the owner
+    widget (falling back to idle while it is not mapped); otherwise it runs
+    at most once every interval_ms milliseconds.
+    """
+
+    def __init__(self, widget: Gtk.Widget, interval_ms: int = 0):
+        self.widget = widget
+        self.interval_ms = max(0, int(interval_ms))
+        self._surfaces: Dict[str, Callable[[], None]] = {}
+        self._order: List[str] = []
+        self._dirty = set()
+        self._tick_id = None
+        self._source_id = None
+        self._last_flush_us = 0
+
+    def register(self, surface: str, callback: Callable[[], None]) -> None:
+        """Register the repaint callback of a surface (called in registration order)"""
+        if surface not in self._surfaces:
+            self._order.append(surface)
+        self._surfaces[surface] = callback
+
+    def mark_dirty(self, *surfaces: str) -> None:
+        """Request a repaint of the given surfaces"""
+        self._dirty.update(s for s in surfaces if s in self._surfaces)
+        if self._dirty:
+            self._schedule()
+
+    def flush(self) -> None:
+        """Repaint all dirty surfaces now"""
+        self._cancel()
+        dirty, self._dirty = self._dirty, set()
+        self._last_flush_us = GLib.get_monotonic_time()
+
+        for surface in self._order:
+            if surface in dirty:
+                try:
+                    self._surfaces[surface]()
+                except Exception as e:
+                    logger.exception("Error repainting %s: %s", surface, e)
+
+    def cancel(self) -> None:
+        """Drop pending repaints"""
+        self._cancel()
+        self._dirty.clear()
+
+    def _schedule(self) -> None:
+        if self._tick_id is not None or self._source_id is not None:
+            return
+
+        if self.interval_ms > 0:
+            elapsed_ms = (GLib.get_monotonic_time() - self._last_flush_us) // 1000
+            delay = max(0, self.interval_ms - elapsed_ms)
+            self._source_id = GLib.timeout_add(delay, self._on_source)
+        elif self.widget.get_mapped():
+            self._tick_id = self.widget.add_tick_callback(self._on_tick)
+        else:
+            self._source_id = GLib.idle_add(self._on_source)
+
+    def _cancel(self) -> None:
+        if self._tick_id is not None:
+            self.widget.remove_tick_callback(self._tick_id)
+            self._tick_id = None
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+    def _on_tick(self, widget, frame_clock):
+        self._tick_id = None
+        self.flush()
+        return GLib.SOURCE_REMOVE
+
+    def _on_source(self):
+        self._source_id = None
+        self.flush()
+        return GLib.SOURCE_REMOVE
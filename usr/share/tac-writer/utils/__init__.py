@@ -8,6 +8,7 @@ from .helpers import (
     TextHelper, 
     ValidationHelper,
     FormatHelper,
+    DependencyHelper,
     DebugHelper
 )
 from .i18n import _
@@ -24,6 +25,7 @@ __all__ = [
     'TextHelper',
     'ValidationHelper', 
     'FormatHelper',
+    'DependencyHelper',
     'DebugHelper',
     '_'
 ]
\ No newline at end of file
@@ -3,15 +3,20 @@ TAC Utility Helpers
 General utility functions for file operations, validation, and common tasks
 """
 
+import logging
 import os
 import re
 import mimetypes
+import importlib.util
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 
 from utils.i18n import _
 
+logger = logging.getLogger(__name__)
+
 
 class FileHelper:
     """Helper functions for file operations"""
@@ -339,33 +344,47 @@ class FormatHelper:
         return formatted
 
 
+class DependencyHelper:
+    """Probes for optional dependencies that do not import them"""
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def is_available(module_name: str) -> bool:
+        """Check whether a module can be found without importing it"""
+        try:
+            return importlib.util.find_spec(module_name) is not None
+        except (ImportError, ValueError):
+            return False
+
+
 class DebugHelper:
     """Helper functions for debugging and logging"""
     
     @staticmethod
     def print_object_info(obj: Any, name: str = "Object") -> None:
-        """Print detailed information about an object"""
-        print(f"\n=== {name} " + _("Info") + " ===")
-        print(_("Tipo: {}").format(type(obj).__name__))
-        print(_("Módulo: {}").format(type(obj).__module__))
-        
+        """Log detailed information about an object (debug level)"""
+        lines = [f"=== {name} " + _("Info") + " ===",
+                 _("Tipo: {}").format(type(obj).__name__),
+                 _("Módulo: {}").format(type(obj).__module__)]
+
         if hasattr(obj, '__dict__'):
-            print(_("Atributos:"))
+            lines.append(_("Atributos:"))
             for attr, value in obj.__dict__.items():
-                print(f"  {attr}: {type(value).__name__} = {repr(value)[:100]}")
-        
-        print(_("Métodos:"))
+                lines.append(f"  {attr}: {type(value).__name__} = {repr(value)[:100]}")
+
+        lines.append(_("Métodos:"))
         methods = [method for method in dir(obj) if callable(getattr(obj, method)) and not method.startswith('_')]
         for method in methods[:10]:  # Limit to first 10 methods
-            print(f"  {method}()")
-        
+            lines.append(f"  {method}()")
+
         if len(methods) > 10:
-            print(_("  ... e mais {} métodos").format(len(methods) - 10))
-        
-        print("=" * (len(name) + len(_("Info")) + 4))
+            lines.append(_("  ... e mais {} métodos").format(len(methods) - 10))
+
+        lines.append("=" * (len(name) + len(_("Info")) + 4))
+        logger.debug("\n".join(lines))
     
     @staticmethod
     def log_performance(func_name: str, start_time: datetime, end_time: datetime) -> None:
         """Log performance information"""
         duration = (end_time - start_time).total_seconds()
-        print(_("Performance: {} levou {:.3f} segundos").format(func_name, duration))
+        logger.debug(_("Performance: {} levou {:.3f} segundos").format(func_name, duration))
@@ -0,0 +1,128 @@
+"""
+TAC Tracing
+Lightweight timing spans kept in a ring buffer and exported as Chrome
+trace-event JSON (load the file in chrome://tracing or ui.perfetto.dev)
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+# Completed spans kept in memory; older ones are dropped
+BUFFER_SIZE = 20000
+
+# TAC_TRACE=1 enables recording, TAC_TRACE=/path/file.json also writes the
+# trace there when the application exits
+TRACE_ENV = os.environ.get('TAC_TRACE', '')
+
+_enabled = bool(TRACE_ENV) and TRACE_ENV != '0'
+_events = deque(maxlen=BUFFER_SIZE)
+_pid = os.getpid()
+_origin_ns = time.perf_counter_ns()
+_origin_epoch_us = time.time_ns() // 1000
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> None:
+    """Start or stop recording spans"""
+    global _enabled
+    _enabled = enabled
+
+
+def _now_us() -> float:
+    return (time.perf_counter_ns() - _origin_ns) / 1000
+
+
+@contextmanager
+def span(name: str, category: str = 'app', **args):
+    """Record the duration of the enclosed block"""
+    if not _enabled:
+        yield
+        return
+
+    start = _now_us()
+    try:
+        yield
+    finally:
+        event = {
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': start, 'dur': _now_us() - start,
+            'pid': _pid, 'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = {key: str(value) for key, value in args.items()}
+        _events.append(event)
+
+
+def traced(name: Optional[str] = None, category: str = 'app'):
+    """Decorator recording every call of a function as a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instant(name: str, category: str = 'app', **args) -> None:
+    """Record a point in time (e.g. first frame shown)"""
+    if _enabled:
+        event = {
+            'name': name, 'cat': category, 'ph': 'i', 's': 'p',
+            'ts': _now_us(), 'pid': _pid, 'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = {key: str(value) for key, value in args.items()}
+        _events.append(event)
+
+
+def dump_chrome_trace(path=None, directory=None) -> Path:
+    """
+    Write the recorded spans as Chrome trace-event JSON and return the path.
+
+    Without an explicit path the file is created in directory (or the
+    current directory) with a timestamped name.
+    """
+    if path is None:
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = Path(directory or '.') / f'tac-trace-{stamp}.json'
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    events = list(_events)
+    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+    for tid in {event['tid'] for event in events}:
+        events.append({
+            'name': 'thread_name', 'ph': 'M', 'pid': _pid, 'tid': tid,
+            'args': {'name': thread_names.get(tid, str(tid))},
+        })
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'origin_epoch_us': _origin_epoch_us},
+        }, f)
+    return path
+
+
+def dump_on_exit() -> Optional[Path]:
+    """Write the trace to the TAC_TRACE path, if one was given"""
+    if _enabled and TRACE_ENV not in ('', '0', '1'):
+        return dump_chrome_trace(os.path.expanduser(TRACE_ENV))
+    return None